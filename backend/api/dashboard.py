@@ -6,6 +6,7 @@ from bson import ObjectId, json_util
 import json
 import datetime
 from collections import defaultdict
+from models.route import SUMMARY_PROJECTION
 
 dashboard_bp = Blueprint('dashboard', __name__, url_prefix='/api/dashboard')
 
@@ -24,7 +25,7 @@ def get_dashboard_summary():
     recent_routes = list(db.routes.find({
         'user_id': ObjectId(current_user_id),
         'created_at': {'$gte': thirty_days_ago}
-    }).sort('created_at', -1))
+    }, SUMMARY_PROJECTION).sort('created_at', -1))
     
     # Calculate risk distribution
     risk_distribution = {
@@ -83,17 +84,9 @@ def get_dashboard_summary():
             latest_telemetry[str(vehicle['_id'])] = telemetry
     
     # Count risk points by type
-    risk_points_by_type = defaultdict(int)
-    from models.risk_data import RiskData
-    for route in recent_routes:
-        risk_data = RiskData.get_by_route_id(route['route_id'])
-        if risk_data:
-            risk_points_by_type['accident'] += len(risk_data.get('accident_risks', []))
-            risk_points_by_type['weather'] += len(risk_data.get('weather_hazards', []))
-            risk_points_by_type['elevation'] += len(risk_data.get('elevation_risks', []))
-            risk_points_by_type['blind_spot'] += len(risk_data.get('blind_spots', []))
-            risk_points_by_type['network'] += len(risk_data.get('network_coverage', []))
-            risk_points_by_type['eco_zone'] += len(risk_data.get('eco_sensitive_zones', []))
+    from models.risk_point import RiskPoint
+    counts = RiskPoint.count_by_category([route['route_id'] for route in recent_routes])
+    risk_points_by_type = {category: sum(levels.values()) for category, levels in counts.items()}
     
     return jsonify({
         "summary": {
@@ -102,7 +95,7 @@ def get_dashboard_summary():
             "total_duration": round(total_duration / 60, 1),  # in hours
             "risk_distribution": risk_distribution,
             "total_vehicles": len(vehicles),
-            "risk_points_by_type": dict(risk_points_by_type)
+            "risk_points_by_type": risk_points_by_type
         },
         "recent_routes": json_response(recent_routes[:5]),
         "vehicles": json_response(vehicles),
@@ -125,7 +118,7 @@ def get_risk_analysis():
         'user_id': ObjectId(current_user_id),
         'created_at': {'$gte': start_date},
         'status': 'completed'
-    }).sort('created_at', 1))
+    }, SUMMARY_PROJECTION).sort('created_at', 1))
     
     # Prepare data for visualization
     
@@ -141,72 +134,39 @@ def get_risk_analysis():
             })
     
     # 2. Risk categories distribution
-    risk_categories = defaultdict(lambda: {'high': 0, 'medium': 0, 'low': 0})
+    from models.risk_point import RiskPoint
+    route_ids = [route['route_id'] for route in routes]
+    heatmap_categories = ['accident', 'weather', 'elevation', 'blind_spot', 'network']
     
-    from models.risk_data import RiskData
-    for route in routes:
-        risk_data = RiskData.get_by_route_id(route['route_id'])
-        if not risk_data:
-            continue
-        
-        # Count accident risks
-        for risk in risk_data.get('accident_risks', []):
-            level = risk.get('risk_level', '').lower()
-            if level in ['high', 'medium', 'low']:
-                risk_categories['accident'][level] += 1
-        
-        # Count weather hazards
-        for risk in risk_data.get('weather_hazards', []):
-            level = risk.get('risk_level', '').lower()
-            if level in ['high', 'medium', 'low']:
-                risk_categories['weather'][level] += 1
-        
-        # Count elevation risks
-        for risk in risk_data.get('elevation_risks', []):
-            level = risk.get('risk_level', '').lower()
-            if level in ['high', 'medium', 'low']:
-                risk_categories['elevation'][level] += 1
-        
-        # Count blind spots
-        for risk in risk_data.get('blind_spots', []):
-            level = risk.get('risk_level', '').lower()
-            if level in ['high', 'medium', 'low']:
-                risk_categories['blind_spot'][level] += 1
-        
-        # Count network issues
-        for risk in risk_data.get('network_coverage', []):
-            level = risk.get('risk_level', '').lower()
+    risk_categories = defaultdict(lambda: {'high': 0, 'medium': 0, 'low': 0})
+    counts = RiskPoint.count_by_category(route_ids, heatmap_categories)
+    for category, levels in counts.items():
+        for level, count in levels.items():
+            level = (level or '').lower()
             if level in ['high', 'medium', 'low']:
-                risk_categories['network'][level] += 1
+                risk_categories[category][level] += count
+    
+    # 3. Risk heatmap data (risk points of these routes, optionally within
+    # a south/west/north/east box)
+    bbox_keys = ('south', 'west', 'north', 'east')
+    bbox = None
+    if all(request.args.get(key) for key in bbox_keys):
+        try:
+            bbox = tuple(float(request.args[key]) for key in bbox_keys)
+        except ValueError:
+            return jsonify({"error": "Invalid bounding box"}), 400
     
-    # 3. Risk heatmap data (aggregate risk points by location)
     risk_heatmap = []
-    
-    for route in routes:
-        risk_data = RiskData.get_by_route_id(route['route_id'])
-        if not risk_data:
-            continue
-        
-        # Add all risk points to heatmap
-        for category in ['accident_risks', 'weather_hazards', 'elevation_risks', 
-                        'blind_spots', 'network_coverage']:
-            for risk in risk_data.get(category, []):
-                if 'location' in risk:
-                    location = risk['location']
-                elif 'coordinates' in risk:
-                    location = risk['coordinates']
-                else:
-                    continue
-                
-                # Convert risk level to weight
-                level = risk.get('risk_level', '').lower()
-                weight = 3 if level == 'high' else 2 if level == 'medium' else 1
-                
-                risk_heatmap.append({
-                    'lat': location['lat'],
-                    'lng': location['lng'],
-                    'weight': weight
-                })
+    weights = {'high': 3, 'medium': 2}
+    
+    for point in RiskPoint.find(route_ids, heatmap_categories, bbox=bbox,
+                                projection={'_id': 0, 'location': 1, 'level': 1}):
+        lng, lat = point['location']['coordinates']
+        risk_heatmap.append({
+            'lat': lat,
+            'lng': lng,
+            'weight': weights.get((point.get('level') or '').lower(), 1)
+        })
     
     # 4. Time-of-day analysis
     time_analysis = {
@@ -260,9 +220,8 @@ def get_risk_analysis():
         }
     }
     
-    for route in routes:
-        risk_data = RiskData.get_by_route_id(route['route_id'])
-        if not risk_data or 'nearby_facilities' not in risk_data:
+    for risk_data in db.risk_data.find({'route_id': {'$in': route_ids}}, {'nearby_facilities': 1}):
+        if 'nearby_facilities' not in risk_data:
             continue
         
         for facility_type in facilities_stats.keys():
@@ -299,6 +258,8 @@ def get_vehicle_analysis():
     
     # Prepare response data
     vehicle_analysis = []
+    fleet = []
+    scored_vehicles = []
     
     for vehicle in vehicles:
         # Get routes for this vehicle
@@ -307,7 +268,7 @@ def get_vehicle_analysis():
             'user_id': ObjectId(current_user_id),
             'vehicle_id': vehicle['_id'],
             'status': 'completed'
-        }).sort('created_at', -1))
+        }, SUMMARY_PROJECTION).sort('created_at', -1))
         
         # Get telemetry data
         from models.telemetry import Telemetry
@@ -369,17 +330,13 @@ def get_vehicle_analysis():
                     'engine_temp': record['engine_temp']
                 })
         
-        # Predict breakdown probability
-        from services.breakdown_predictor import predict_breakdown_probability
-        breakdown_probability = 0
-        
+        # Queue vehicles with telemetry for fleet-wide breakdown scoring
         if telemetry_data:
             latest_telemetry = telemetry_data[0]
             maintenance_history = vehicle.get('maintenance', {}).get('history', [])
             
-            breakdown_probability = predict_breakdown_probability(
-                vehicle, latest_telemetry, maintenance_history
-            )
+            scored_vehicles.append(len(vehicle_analysis))
+            fleet.append((vehicle, latest_telemetry, maintenance_history))
         
         # Prepare response for this vehicle
         vehicle_analysis.append({
@@ -389,7 +346,7 @@ def get_vehicle_analysis():
                 'total_distance': round(total_distance, 1),
                 'total_duration': round(total_duration / 60, 1),  # in hours
                 'risk_levels': risk_levels,
-                'breakdown_probability': round(breakdown_probability * 100, 1)  # as percentage
+                'breakdown_probability': 0  # filled in below, as percentage
             },
             'telemetry': {
                 'fuel_data': json_response(fuel_data[-20:]),  # last 20 records
@@ -398,6 +355,13 @@ def get_vehicle_analysis():
             'recent_routes': json_response(routes[:5])
         })
     
+    # Predict breakdown probability for the whole fleet in one model call
+    from services.breakdown_predictor import predict_breakdown_probabilities
+    probabilities = predict_breakdown_probabilities(fleet)
+    
+    for index, breakdown_probability in zip(scored_vehicles, probabilities):
+        vehicle_analysis[index]['stats']['breakdown_probability'] = round(breakdown_probability * 100, 1)
+    
     return jsonify({
         "vehicle_analysis": vehicle_analysis
     }), 200
@@ -525,7 +489,7 @@ def get_real_time_updates():
     active_routes = list(db.routes.find({
         'user_id': ObjectId(current_user_id),
         'last_updated': {'$gte': one_hour_ago}
-    }).sort('last_updated', -1))
+    }, SUMMARY_PROJECTION).sort('last_updated', -1))
     
     # Get current weather alerts
     from services.weather_service import get_current_weather_alerts
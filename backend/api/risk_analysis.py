@@ -45,49 +45,80 @@ def analyze_risk(route_id):
 @risk_bp.route('/hotspots', methods=['GET'])
 @jwt_required()
 def get_risk_hotspots():
-    """Get risk hotspots in a geographical area"""
-    # Extract query parameters
-    lat = request.args.get('lat')
-    lng = request.args.get('lng')
-    radius = request.args.get('radius', 10)  # Default 10 km
-    
-    if not lat or not lng:
-        return jsonify({"error": "Missing lat or lng parameters"}), 400
+    """
+    Get stored risk points of the caller's routes in a geographical area
+    (admins see every route's points)
+
+    Query by circle (lat, lng, radius in km) or bounding box (south, west,
+    north, east). Optional: types (comma-separated accident, weather,
+    blind_spot, elevation), min_level (Low, Medium, High), limit, and
+    cluster=true to also get grid clusters (cluster_size in km).
+    """
+    from config import RISK_INDEX_CONFIG
+    from services.risk_index import (RISK_LEVELS, RISK_TYPES, cluster_hotspots, hotspot_records,
+                                     query_hotspots, rank_hotspots, risk_index)
+    
+    args = request.args
+    bbox_keys = ('south', 'west', 'north', 'east')
+    center = bbox = None
     
     try:
-        lat = float(lat)
-        lng = float(lng)
-        radius = float(radius)
+        if all(args.get(key) for key in bbox_keys):
+            bbox = tuple(float(args[key]) for key in bbox_keys)
+            if bbox[0] > bbox[2]:
+                return jsonify({"error": "south must not be greater than north"}), 400
+        elif args.get('lat') and args.get('lng'):
+            center = (float(args['lat']), float(args['lng']))
+        else:
+            return jsonify({"error": "Missing lat/lng or south/west/north/east parameters"}), 400
+        
+        radius = float(args.get('radius', RISK_INDEX_CONFIG['default_radius']))
+        limit = int(args.get('limit', RISK_INDEX_CONFIG['default_limit']))
+        cluster_size = float(args['cluster_size']) if args.get('cluster_size') else None
     except ValueError:
         return jsonify({"error": "Invalid parameter values"}), 400
     
-    # Get risk hotspots
-    from services.route_safety import analyze_historical_accidents
-    
-    # Generate synthetic route points for the area
-    from math import sin, cos, radians
+    types = [t for t in args.get('types', '').split(',') if t]
+    min_level = args.get('min_level')
     
-    route_points = []
-    for i in range(8):  # 8 points around the center
-        angle = radians(i * 45)  # 45 degrees apart
-        # Calculate points on a circle around the center
-        point_lat = lat + (radius / 111) * sin(angle)  # 111 km per degree of latitude
-        point_lng = lng + (radius / (111 * cos(radians(lat)))) * cos(angle)  # Adjust for longitude
-        
-        route_points.append({
-            'lat': point_lat,
-            'lng': point_lng
-        })
-    
-    # Add center point
-    route_points.append({
-        'lat': lat,
-        'lng': lng
-    })
+    if radius <= 0 or limit < 0:
+        return jsonify({"error": "Invalid parameter values"}), 400
+    if cluster_size is not None and not cluster_size >= RISK_INDEX_CONFIG['min_cluster_size']:
+        return jsonify({"error": f"cluster_size must be at least {RISK_INDEX_CONFIG['min_cluster_size']} km"}), 400
+    if any(t not in RISK_TYPES for t in types):
+        return jsonify({"error": f"types must be among {', '.join(RISK_TYPES)}"}), 400
+    if min_level and min_level not in RISK_LEVELS:
+        return jsonify({"error": "min_level must be Low, Medium or High"}), 400
     
-    # Get accident hotspots
-    accident_hotspots = analyze_historical_accidents(route_points)
+    limit = min(limit, RISK_INDEX_CONFIG['max_limit'])
     
-    return jsonify({
-        "hotspots": accident_hotspots
-    }), 200
+    # Only the caller's own routes, unless admin
+    from models import db
+    from bson.objectid import ObjectId
+    current_user_id = get_jwt_identity()
+    user = db.users.find_one({'_id': ObjectId(current_user_id)})
+    route_ids = None if user and user.get('role') == 'admin' else Route.get_route_ids_by_user(current_user_id)
+    
+    snapshot = risk_index.snapshot()
+    
+    index, distance = query_hotspots(
+        snapshot, center=center, radius=radius, bbox=bbox, types=types, min_level=min_level, route_ids=route_ids
+    )
+    top = rank_hotspots(snapshot, index, limit)
+    
+    response = {
+        "total": len(index),
+        "hotspots": hotspot_records(snapshot, index[top], distance[top] if distance is not None else None)
+    }
+    
+    if args.get('cluster', 'false').lower() == 'true':
+        if cluster_size is None:
+            # Span of the query area divided into a fixed number of cells
+            extent = 2 * radius if center else max(
+                (bbox[2] - bbox[0]) * 111, ((bbox[3] - bbox[1]) % 360 or 360) * 111
+            )
+            cluster_size = max(extent / RISK_INDEX_CONFIG['clusters_per_side'],
+                               RISK_INDEX_CONFIG['min_cluster_size'])
+        response["clusters"] = cluster_hotspots(snapshot, index, cluster_size, limit)
+    
+    return jsonify(response), 200
@@ -3,11 +3,15 @@ from flask import Blueprint, request, jsonify, current_app
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from models.route import Route
 from models.risk_data import RiskData
+from models.risk_point import RiskPoint
 from services.google_maps import get_route_details
-from services.accident_prediction import predict_accident_risks
-from services.weather_service import get_weather_hazards
-from services.route_safety import analyze_route_safety
+from services.accident_prediction import reanalyze_accident_risks
+from services.weather_service import reanalyze_weather_hazards
+from services.route_safety import analyze_route_safety, overall_risk, train_blind_spot_model
+from services.model_registry import get_model, get_model_version
+from services.segment_analysis import fingerprints_changed, reuse_stored, route_fingerprint
 from services.eta_optimizer import optimize_eta
+from services.route_geometry import RouteGeometry, load_route_geometry
 import threading
 import json
 from bson import ObjectId, json_util
@@ -98,29 +102,60 @@ def process_route(route_id):
             from models.vehicle import Vehicle
             vehicle = Vehicle.get_by_id(route['vehicle_id'])
         
-        # Analyze risks
-        route_points = route_details['waypoints']
+        # Decode the polyline once and store the packed geometry so later
+        # jobs and endpoints load arrays instead of decoding again
+        geometry = RouteGeometry.from_polyline(route_details['polyline'])
+        Route.save_geometry(route_id, geometry.to_packed())
+        
+        # Analyze risks: share the route geometry, simplified to the points
+        # that carry its shape, with every service (each samples it at its
+        # own resolution)
+        route_points = geometry.for_stage('route')
+        
+        # Stored results are kept for every route segment (or whole-route
+        # analysis) whose inputs are unchanged, so regenerating a route only
+        # recomputes what its new geometry, weather or models affect
+        risk_data = RiskData.get_by_route_id(route_id)
         
         # Get accident risks
-        accident_risks = predict_accident_risks(route_points)
-        RiskData.update(route_id, {'accident_risks': accident_risks})
+        accident_risks, fingerprints, recomputed = reanalyze_accident_risks(route_points, risk_data)
+        if recomputed or fingerprints_changed(risk_data, 'accident_risks', fingerprints):
+            RiskData.update(route_id, {
+                'accident_risks': accident_risks,
+                'segment_fingerprints.accident_risks': fingerprints
+            }, user_id=route['user_id'])
         
         # Get weather hazards
-        weather_hazards = get_weather_hazards(route_points)
-        RiskData.update(route_id, {'weather_hazards': weather_hazards})
+        weather_hazards, fingerprints, recomputed = (
+            reanalyze_weather_hazards(route_points, risk_data) or ([], [], 0)
+        )
+        if recomputed or fingerprints_changed(risk_data, 'weather_hazards', fingerprints):
+            RiskData.update(route_id, {
+                'weather_hazards': weather_hazards,
+                'segment_fingerprints.weather_hazards': fingerprints
+            }, user_id=route['user_id'])
         
         # Analyze route safety (elevation, sharp turns, etc.)
-        safety_data = analyze_route_safety(route_points)
-        RiskData.update(route_id, {
-            'elevation_risks': safety_data['elevation_risks'],
-            'blind_spots': safety_data['blind_spots'],
-            'network_coverage': safety_data['network_coverage'],
-            'eco_sensitive_zones': safety_data['eco_sensitive_zones']
-        })
+        get_model('blind_spot', trainer=train_blind_spot_model)
+        fingerprints = route_fingerprint(route_points, 'route_safety', get_model_version('blind_spot'))
+        if not reuse_stored(risk_data, 'route_safety', fingerprints):
+            safety_data = analyze_route_safety(route_points)
+            RiskData.update(route_id, {
+                'elevation_risks': safety_data['elevation_risks'],
+                'blind_spots': safety_data['blind_spots'],
+                'network_coverage': safety_data['network_coverage'],
+                'eco_sensitive_zones': safety_data['eco_sensitive_zones'],
+                'segment_fingerprints.route_safety': fingerprints
+            }, user_id=route['user_id'])
         
         # Get nearby facilities
-        nearby_facilities = get_nearby_facilities(route_points)
-        RiskData.update(route_id, {'nearby_facilities': nearby_facilities})
+        fingerprints = route_fingerprint(route_points, 'nearby_facilities')
+        if not reuse_stored(risk_data, 'nearby_facilities', fingerprints):
+            nearby_facilities = get_nearby_facilities(route_points)
+            RiskData.update(route_id, {
+                'nearby_facilities': nearby_facilities,
+                'segment_fingerprints.nearby_facilities': fingerprints
+            }, user_id=route['user_id'])
         
         # Calculate risk score
         risk_score, risk_level = calculate_overall_risk(route_id)
@@ -164,8 +199,8 @@ def get_nearby_facilities(route_points):
     """Get nearby facilities for route points"""
     from services.google_maps import get_nearby_places
     
-    # Sample route points to reduce API calls
-    sampled_points = [route_points[i] for i in range(0, len(route_points), max(1, len(route_points) // 10))]
+    # Sample route points to reduce API calls (one every 10 km)
+    sampled_points = RouteGeometry.from_points(route_points).for_stage('nearby_facilities').points()
     
     facilities = {
         'hospitals': [],
@@ -219,73 +254,11 @@ def get_nearby_facilities(route_points):
 
 def calculate_overall_risk(route_id):
     """Calculate overall risk score and level for a route"""
-    from config import RISK_THRESHOLDS
-    
     risk_data = RiskData.get_by_route_id(route_id)
     if not risk_data:
         return 0, 'unknown'
     
-    # Count risks by category and severity
-    risk_counts = {
-        'high': 0,
-        'medium': 0,
-        'low': 0
-    }
-    
-    # Count accident risks
-    for risk in risk_data.get('accident_risks', []):
-        risk_level = risk.get('risk_level', '').lower()
-        if risk_level in risk_counts:
-            risk_counts[risk_level] += 1
-    
-    # Count weather hazards
-    for hazard in risk_data.get('weather_hazards', []):
-        risk_level = hazard.get('risk_level', '').lower()
-        if risk_level in risk_counts:
-            risk_counts[risk_level] += 1
-    
-    # Count elevation risks
-    for risk in risk_data.get('elevation_risks', []):
-        risk_level = risk.get('risk_level', '').lower()
-        if risk_level in risk_counts:
-            risk_counts[risk_level] += 1
-    
-    # Count blind spots
-    for spot in risk_data.get('blind_spots', []):
-        risk_level = spot.get('risk_level', '').lower()
-        if risk_level in risk_counts:
-            risk_counts[risk_level] += 1
-    
-    # Count network coverage issues
-    for issue in risk_data.get('network_coverage', []):
-        risk_level = issue.get('risk_level', '').lower()
-        if risk_level in risk_counts:
-            risk_counts[risk_level] += 1
-    
-    # Calculate weighted risk score
-    total_risks = sum(risk_counts.values())
-    if total_risks == 0:
-        return 0, 'low'
-    
-    # Weight: high=5, medium=2, low=1
-    weighted_score = (
-        5 * risk_counts['high'] + 
-        2 * risk_counts['medium'] + 
-        1 * risk_counts['low']
-    ) / total_risks
-    
-    # Normalize to 0-10 scale
-    normalized_score = min(10, (weighted_score / 5) * 10)
-    
-    # Determine risk level
-    if normalized_score >= RISK_THRESHOLDS['route_safety']['high']:
-        risk_level = 'high'
-    elif normalized_score >= RISK_THRESHOLDS['route_safety']['medium']:
-        risk_level = 'medium'
-    else:
-        risk_level = 'low'
-    
-    return round(normalized_score, 1), risk_level
+    return overall_risk(risk_data)
 
 @routes_bp.route('/', methods=['GET'])
 @jwt_required()
@@ -339,6 +312,31 @@ def get_route(route_id):
         "risk_data": json_response(risk_data)
     }), 200
 
+@routes_bp.route('/<route_id>/geometry', methods=['GET'])
+@jwt_required()
+def get_route_geometry(route_id):
+    """Get the route's path as a GeoJSON LineString feature"""
+    current_user_id = get_jwt_identity()
+    
+    # Get route
+    route = Route.get_by_id(route_id)
+    
+    if not route:
+        return jsonify({"error": "Route not found"}), 404
+    
+    # Check if user owns the route (unless admin)
+    from models import db
+    user = db.users.find_one({'_id': ObjectId(current_user_id)})
+    if str(route['user_id']) != current_user_id and user.get('role') != 'admin':
+        return jsonify({"error": "Unauthorized"}), 403
+    
+    if not route.get('polyline'):
+        return jsonify({"error": "Route has not been processed yet"}), 404
+    
+    geometry = load_route_geometry(route)
+    
+    return jsonify(geometry.to_geojson({'route_id': route_id})), 200
+
 @routes_bp.route('/<route_id>', methods=['DELETE'])
 @jwt_required()
 def delete_route(route_id):
@@ -359,6 +357,10 @@ def delete_route(route_id):
     # Delete route and risk data
     Route.delete(route_id)
     db.risk_data.delete_one({'route_id': route_id})
+    RiskPoint.delete_by_route(route_id)
+    
+    from services.risk_index import risk_index
+    risk_index.remove_route(route_id)
     
     return jsonify({
         "message": "Route deleted successfully"
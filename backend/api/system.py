@@ -0,0 +1,88 @@
+# backend/api/system.py
+from flask import Blueprint, jsonify
+from flask_jwt_extended import get_jwt_identity, verify_jwt_in_request
+import os
+
+system_bp = Blueprint('system', __name__)
+
+@system_bp.before_request
+def require_admin():
+    """Worker internals (PIDs, models, caches, queues) are for admins only"""
+    # Same check as @jwt_required(), for every route of the blueprint
+    verify_jwt_in_request()
+    
+    from models import db
+    from bson.objectid import ObjectId
+    user = db.users.find_one({'_id': ObjectId(get_jwt_identity())}, {'role': 1})
+    if not user or user.get('role') != 'admin':
+        return jsonify({"error": "Unauthorized"}), 403
+
+@system_bp.route('/models', methods=['GET'])
+def get_model_status():
+    """Get model registry counters for this worker process"""
+    from services.model_registry import get_model_stats
+    
+    return jsonify({
+        "pid": os.getpid(),
+        "models": get_model_stats()
+    }), 200
+
+@system_bp.route('/training', methods=['GET'])
+def get_training_runs():
+    """Get recent out-of-process training runs (duration and CPU time)"""
+    from services.model_training import get_training_runs as recent_runs
+    
+    return jsonify({
+        "pid": os.getpid(),
+        "runs": recent_runs()
+    }), 200
+
+@system_bp.route('/inference', methods=['GET'])
+def get_inference_stats():
+    """Get micro-batching queue depth and batch-size histograms"""
+    from services.inference_batcher import get_batcher_stats
+    
+    return jsonify({
+        "pid": os.getpid(),
+        "batchers": get_batcher_stats()
+    }), 200
+
+@system_bp.route('/caches', methods=['GET'])
+def get_cache_stats():
+    """Get hit/miss counters of the in-process result caches and indexes"""
+    from services.breakdown_predictor import get_breakdown_cache_stats
+    from services.cell_cache import get_cell_cache_stats
+    from services.elevation import get_elevation_stats
+    from services.risk_index import get_risk_index_stats
+    from services.segment_analysis import get_segment_stats
+    
+    return jsonify({
+        "pid": os.getpid(),
+        "caches": {
+            "breakdown_scores": get_breakdown_cache_stats(),
+            "cells": get_cell_cache_stats(),
+            "elevations": get_elevation_stats(),
+            "risk_points": get_risk_index_stats(),
+            "segments": get_segment_stats()
+        }
+    }), 200
+
+@system_bp.route('/http', methods=['GET'])
+def get_http_status():
+    """Get per-provider outbound request counters, errors and latency histograms"""
+    from services.http_client import get_http_stats
+    
+    return jsonify({
+        "pid": os.getpid(),
+        "providers": get_http_stats()
+    }), 200
+
+@system_bp.route('/imports', methods=['GET'])
+def get_import_status():
+    """Get which lazily imported ML libraries are loaded and their import time"""
+    from services.lazy_imports import get_import_stats
+    
+    return jsonify({
+        "pid": os.getpid(),
+        "imports": get_import_stats()
+    }), 200
@@ -115,6 +115,23 @@ try:
 except ImportError as e:
     app.logger.warning(f"dashboard_bp blueprint not available: {str(e)}")
 
+try:
+    from api.system import system_bp
+    app.register_blueprint(system_bp, url_prefix='/api/system')
+    app.logger.info("Registered system_bp blueprint")
+except ImportError as e:
+    app.logger.warning(f"system_bp blueprint not available: {str(e)}")
+
+# Reload models when training workers publish new artifacts
+from services.model_registry import start_reload_listener
+start_reload_listener()
+
+# Import the heavy ML libraries off the startup path
+from config import STARTUP_CONFIG
+if STARTUP_CONFIG['preload_imports']:
+    from services.lazy_imports import start_preload
+    start_preload(STARTUP_CONFIG['preload_modules'])
+
 # Error handlers
 @app.errorhandler(404)
 def not_found(error):
@@ -203,8 +220,31 @@ def create_default_admin():
     else:
         app.logger.info("Users already exist, skipping default admin creation")
 
+def init_risk_points():
+    """Create the risk point indexes (idempotent; the backfill is the init-risk-points command)"""
+    from models.risk_point import RiskPoint
+    
+    try:
+        RiskPoint.ensure_indexes()
+    except Exception as e:
+        app.logger.error(f"Error initializing risk points: {str(e)}")
+
+@app.cli.command('init-risk-points')
+def backfill_risk_points():
+    """Fill risk_points from existing risk_data (run once after upgrading)"""
+    from models.risk_point import RiskPoint
+    
+    RiskPoint.ensure_indexes()
+    written = RiskPoint.backfill()
+    
+    if written is None:
+        print("Risk points backfill already ran (or is running), skipping")
+    else:
+        print(f"Backfilled {written} risk points from risk_data")
+
 # Add this to the end of app.py, just before the if __name__ == '__main__': block
 create_default_admin()
+init_risk_points()
 
 # At the end of your app.py file, make sure it looks like this:
 if __name__ == '__main__':
@@ -0,0 +1,137 @@
+#!/usr/bin/env python
+"""
+Check the bounding-box filter of RiskPoint.find on spherical geometry
+
+MongoDB reads $geoWithin $geometry polygons as great-circle edges. For
+each test box, random points inside and around it are classified the way
+MongoDB would: by which side of each polygon ring they fall on, with the
+smaller side taken as the polygon. The bbox_polygons pieces must contain
+every point of the box, and the $expr of bbox_filter must keep exactly the
+points inside it. The previous single four-corner polygon is reported
+alongside; it misses most of a wide box and, for a box across the
+antimeridian wider than 180 degrees, matches the outside of the box instead.
+
+Usage (from the backend directory):
+    python benchmarks/bench_bbox_filter.py [--points 5000]
+"""
+
+import argparse
+import os
+import sys
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.geo import bbox_filter, bbox_polygons
+
+BOXES = {
+    'small (India)': (8.0, 68.0, 35.0, 97.0),
+    'wide': (-60.0, -170.0, 70.0, 170.0),
+    'across antimeridian': (10.0, 170.0, 30.0, -170.0),
+    'wide across antimeridian': (-40.0, 10.0, 50.0, -10.0),
+    'high latitude': (60.0, -100.0, 85.0, 100.0),
+    'single meridian': (0.0, 45.0, 10.0, 45.0),
+}
+
+def to_vectors(lats, lngs):
+    lats, lngs = np.radians(lats), np.radians(lngs)
+    return np.stack([np.cos(lats) * np.cos(lngs), np.cos(lats) * np.sin(lngs), np.sin(lats)], axis=-1)
+
+def winding(ring, points, chunk=2000):
+    """Turns of a great-circle ring around each point (0 or +-1)"""
+    ring = np.asarray(ring, dtype=np.float64)
+    vertices = to_vectors(ring[:, 1], ring[:, 0])
+    a, b = vertices[:-1], vertices[1:]
+    normals, dots = np.cross(a, b), np.einsum('ij,ij->i', a, b)
+    turns = np.empty(len(points), dtype=int)
+
+    for start in range(0, len(points), chunk):
+        block = points[start:start + chunk]
+        # Signed angle at each point between the directions to a and to b
+        sine = block @ normals.T
+        cosine = dots - (block @ a.T) * (block @ b.T)
+        turns[start:start + chunk] = np.rint(np.arctan2(sine, cosine).sum(axis=1) / (2 * np.pi))
+
+    return turns
+
+def polygon_contains(polygon, points, rng):
+    """Points inside a GeoJSON polygon, taken as the smaller side of its ring"""
+    turns = winding(polygon['coordinates'][0], points)
+    sphere = rng.normal(size=(20000, 3))
+    sphere /= np.linalg.norm(sphere, axis=1, keepdims=True)
+    # Which winding value marks the smaller side
+    inside_value = 1 if np.mean(np.abs(winding(polygon['coordinates'][0], sphere)) == 1) < 0.5 else 0
+    return np.abs(turns) == inside_value
+
+def evaluate(expression, lng, lat):
+    """The subset of MongoDB aggregation expressions bbox_filter uses, over point arrays"""
+    if isinstance(expression, dict):
+        (operator, operands), = expression.items()
+        if operator == '$arrayElemAt':
+            return lng if operands[1] == 0 else lat
+        values = [evaluate(operand, lng, lat) for operand in operands]
+        return {
+            '$and': lambda: np.logical_and.reduce(values),
+            '$or': lambda: np.logical_or.reduce(values),
+            '$gte': lambda: values[0] >= values[1],
+            '$lte': lambda: values[0] <= values[1],
+        }[operator]()
+    return expression
+
+def in_box(lats, lngs, south, west, north, east):
+    inside_lng = (lngs >= west) & (lngs <= east) if west <= east else (lngs >= west) | (lngs <= east)
+    return (lats >= south) & (lats <= north) & inside_lng
+
+def sample_points(rng, n, south, west, north, east):
+    """Points inside the box (including its edges and corners) and around it"""
+    width = (east - west) % 360 if west != east else 0.0
+    inside_lats = rng.uniform(south, north, n)
+    inside_lngs = (west + rng.uniform(0, width, n) + 180) % 360 - 180
+    # Points on the edges, where great-circle polygons go wrong first
+    edge = rng.integers(4, size=n // 4)
+    inside_lats[:n // 4] = np.where(edge == 0, south, np.where(edge == 1, north, inside_lats[:n // 4]))
+    inside_lngs[:n // 4] = np.where(edge == 2, west, np.where(edge == 3, east, inside_lngs[:n // 4]))
+    around_lats = np.clip(rng.uniform(south - 5, north + 5, n), -89.9, 89.9)
+    around_lngs = (rng.uniform(west - 5, west + width + 5, n) + 180) % 360 - 180
+    return np.concatenate([inside_lats, around_lats]), np.concatenate([inside_lngs, around_lngs])
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--points', type=int, default=5000)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(21)
+    failures = 0
+
+    print(f"{'box':<26} {'pieces':>6} {'vertices':>8}  {'covered':>7}  {'exact':>5}  previous polygon")
+    for name, (south, west, north, east) in BOXES.items():
+        lats, lngs = sample_points(rng, args.points, south, west, north, east)
+        points = to_vectors(lats, lngs)
+        expected = in_box(lats, lngs, south, west, north, east)
+
+        # Index stage: the pieces must cover every point of the box
+        polygons = bbox_polygons(south, west, north, east)
+        candidates = np.logical_or.reduce([polygon_contains(polygon, points, rng) for polygon in polygons])
+        covered = bool(np.all(candidates[expected]))
+
+        # Exact stage: the $expr keeps the points inside the box
+        query = bbox_filter('location', south, west, north, east)
+        exact = np.array_equal(candidates & evaluate(query['$expr'], lngs, lats), expected)
+
+        # The previous query: one polygon through the four corners
+        previous = {'type': 'Polygon', 'coordinates': [[[west, south], [east, south], [east, north],
+                                                         [west, north], [west, south]]]}
+        wrong = int(np.sum(polygon_contains(previous, points, rng) != expected))
+
+        ok = covered and exact
+        failures += not ok
+        print(f"{name:<26} {len(polygons):>6} {sum(len(p['coordinates'][0]) for p in polygons):>8}  "
+              f"{'OK' if covered else 'MISS':>7}  {'OK' if exact else 'MISS':>5}  "
+              f"{wrong} of {len(lats)} points misclassified")
+
+    print(f"\n{'OK' if not failures else 'MISMATCH'}")
+    sys.exit(1 if failures else 0)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,105 @@
+#!/usr/bin/env python
+"""
+Benchmark fleet-wide breakdown scoring against per-vehicle calls
+
+Builds a synthetic fleet, then times the old per-vehicle path (feature
+dict + single-row predict_proba per vehicle), the batched
+predict_breakdown_probabilities call on a cold cache, and the same call
+again with every score cached. Checks that all three agree.
+
+Usage (from the backend directory):
+    python benchmarks/bench_breakdown_scoring.py [--vehicles 500]
+"""
+
+import argparse
+import datetime
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask import Flask
+from services.model_registry import registry
+from services import breakdown_predictor
+from services.breakdown_predictor import (
+    prepare_breakdown_features, predict_breakdown_probabilities, train_breakdown_model
+)
+
+def make_fleet(n_vehicles, rng):
+    """Synthetic (vehicle, latest telemetry, maintenance history) tuples"""
+    now = datetime.datetime.utcnow()
+    fleet = []
+
+    for i in range(n_vehicles):
+        history = [
+            {'date': now - datetime.timedelta(days=int(d))}
+            for d in sorted(rng.integers(1, 700, rng.integers(0, 6)))
+        ]
+        vehicle = {
+            '_id': i,
+            'type': ['car', 'truck', 'van', 'bus'][i % 4],
+            'year': int(rng.integers(2005, 2024)),
+            'last_updated': now,
+            'maintenance': {
+                'last_service_date': history[0]['date'] if history else None,
+                'history': history
+            }
+        }
+        telemetry = {
+            '_id': f't{i}',
+            'timestamp': now,
+            'engine_temp': float(rng.normal(90, 15)),
+            'oil_pressure': float(rng.normal(30, 10)),
+            'battery_voltage': float(rng.normal(12, 1)),
+            'rpm': float(rng.normal(1500, 500)),
+            'fuel_level': float(rng.uniform(0, 100))
+        }
+        fleet.append((vehicle, telemetry, history))
+
+    return fleet
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--vehicles', type=int, default=500)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as folder:
+        registry.model_folder = folder
+        with Flask('jrm_benchmark').app_context():
+            model = train_breakdown_model()
+
+        fleet = make_fleet(args.vehicles, np.random.default_rng(42))
+
+        start = time.perf_counter()
+        single = [
+            model.predict_proba(pd.DataFrame([prepare_breakdown_features(*entry)]))[0][1]
+            for entry in fleet
+        ]
+        single_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        batched = predict_breakdown_probabilities(fleet)
+        batched_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        cached = predict_breakdown_probabilities(fleet)
+        cached_time = time.perf_counter() - start
+
+    ok = np.allclose(single, batched) and batched == cached
+
+    print(f"{args.vehicles} vehicles")
+    print(f"  per-vehicle:   {single_time * 1000:>9.1f} ms")
+    print(f"  batched:       {batched_time * 1000:>9.1f} ms ({single_time / batched_time:.0f}x)")
+    print(f"  cached:        {cached_time * 1000:>9.1f} ms ({single_time / cached_time:.0f}x)")
+    print(f"  cache:         {breakdown_predictor.get_breakdown_cache_stats()}")
+    print(f"  results:       {'OK' if ok else 'MISMATCH'}")
+
+    sys.exit(0 if ok else 1)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,191 @@
+#!/usr/bin/env python
+"""
+Benchmark the geohash cell cache on repeated route analyses
+
+Runs the location-derived lookups of a route analysis (traffic, network
+coverage, eco zones, environmental hazards, historical accidents) for a
+set of routes that share their middle section, as routes between nearby
+depots do, first uncached and then through the in-process cell cache.
+Checks that:
+  - geohash_cells matches a scalar reference encoder
+  - cell centers hash back to their own cell
+  - every point in a cell gets the value computed at the cell center
+  - values written to Redis (an in-memory stand-in) are JSON that a
+    second worker reads back equal, and entries that are not JSON (such
+    as pickles) count as misses
+
+Redis is left out of the timings so they show the in-process tier alone.
+
+Usage (from the backend directory):
+    python benchmarks/bench_cell_cache.py [--routes 20] [--km 300]
+"""
+
+import argparse
+import json
+import os
+import pickle
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import CELL_CACHE_CONFIG
+from services.cell_cache import GEOHASH_ALPHABET, CellCache, cell_center, geohash_cells
+from services.environmental_service import generate_eco_zones, generate_environmental_hazards
+from services.google_maps import get_cell_traffic
+from services.network_service import generate_synthetic_coverage
+from services.route_geometry import RouteGeometry
+from services.route_safety import generate_accident_statistics
+
+# Data type -> (sampling stage, cell loader)
+LOOKUPS = {
+    'traffic': ('traffic', get_cell_traffic),
+    'network_coverage': ('network_coverage', generate_synthetic_coverage),
+    'eco_zones': ('eco_zones', generate_eco_zones),
+    'environmental_hazards': ('eco_zones', generate_environmental_hazards),
+    'historical_accidents': ('historical_accidents', generate_accident_statistics)
+}
+
+def reference_geohash(lat, lng, precision):
+    """Textbook bisection encoder"""
+    lat_range, lng_range = [-90.0, 90.0], [-180.0, 180.0]
+    code, bits, even, result = 0, 0, True, ''
+
+    while len(result) < precision:
+        interval, value = (lng_range, lng) if even else (lat_range, lat)
+        middle = (interval[0] + interval[1]) / 2
+        if value >= middle:
+            code = code * 2 + 1
+            interval[0] = middle
+        else:
+            code = code * 2
+            interval[1] = middle
+        even = not even
+        bits += 1
+        if bits == 5:
+            result += GEOHASH_ALPHABET[code]
+            code, bits = 0, 0
+
+    return result
+
+def make_routes(rng, count, km):
+    """Routes with their own ends and a shared middle third"""
+    shared = rng.normal(0, 0.004, size=(int(km / 3), 2)).cumsum(axis=0) + [20.0, 78.0]
+    routes = []
+
+    for _ in range(count):
+        head = shared[0] - rng.normal(0, 0.004, size=(int(km / 3), 2)).cumsum(axis=0)[::-1]
+        tail = shared[-1] + rng.normal(0, 0.004, size=(int(km / 3), 2)).cumsum(axis=0)
+        coords = np.vstack([head, shared, tail])
+        routes.append(RouteGeometry(coords[:, 0], coords[:, 1]))
+
+    return routes
+
+def analyze(routes, lookup):
+    for route in routes:
+        for data_type, (stage, loader) in LOOKUPS.items():
+            lookup(data_type, route.for_stage(stage).points(), loader)
+
+class MemoryRedis:
+    """In-memory stand-in for the Redis client calls CellCache makes"""
+
+    def __init__(self):
+        self.data = {}
+
+    def mget(self, keys):
+        return [self.data.get(key) for key in keys]
+
+    def pipeline(self, transaction=True):
+        return self
+
+    def setex(self, key, ttl, value):
+        self.data[key] = value.encode('utf-8') if isinstance(value, str) else value
+
+    def execute(self):
+        pass
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--routes', type=int, default=20)
+    parser.add_argument('--km', type=float, default=300)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(18)
+    failures = 0
+
+    # Encoder and cell centers
+    lats, lngs = rng.uniform(-89.9, 89.9, 2000), rng.uniform(-179.9, 179.9, 2000)
+    ok = True
+    for precision in (5, 6, 7, 9):
+        cells = geohash_cells(lats, lngs, precision)
+        ok = ok and cells == [reference_geohash(lat, lng, precision) for lat, lng in zip(lats, lngs)]
+        ok = ok and all(geohash_cells(*map(np.atleast_1d, cell_center(cell)), precision)[0] == cell
+                        for cell in cells[:200])
+    failures += not ok
+    print(f"geohash encoder and cell centers: {'OK' if ok else 'MISMATCH'}")
+
+    routes = make_routes(rng, args.routes, args.km)
+    config = {**CELL_CACHE_CONFIG, 'enabled': True, 'redis': False}
+    cache = CellCache(config)
+
+    def uncached(data_type, points, loader):
+        return loader(np.array([p['lat'] for p in points]), np.array([p['lng'] for p in points]))
+
+    def cached(data_type, points, loader):
+        return cache.get_many(data_type, [p['lat'] for p in points], [p['lng'] for p in points], loader)
+
+    start = time.perf_counter()
+    analyze(routes, uncached)
+    uncached_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    analyze(routes, cached)
+    cold_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    analyze(routes, cached)
+    warm_time = time.perf_counter() - start
+
+    print(f"{args.routes} routes of {routes[0].length:.0f} km sharing their middle third; times in ms")
+    print(f"  uncached {uncached_time * 1e3:.1f}, cold cache {cold_time * 1e3:.1f}, "
+          f"warm cache {warm_time * 1e3:.1f} ({uncached_time / warm_time:.0f}x)")
+
+    print(f"  {'data type':<24} {'memory hits':>12} {'misses':>8} {'hit rate':>9}")
+    for data_type, counts in cache.stats()['types'].items():
+        print(f"  {data_type:<24} {counts['memory_hits']:>12} {counts['misses']:>8} {counts['hit_rate']:>9}")
+
+    # Every point of a cell shares the value computed at its center
+    points = routes[0].for_stage('historical_accidents').points()
+    precision = config['types']['historical_accidents']['precision']
+    values = cached('historical_accidents', points, generate_accident_statistics)
+    centers = np.array([cell_center(cell) for cell in
+                        geohash_cells([p['lat'] for p in points], [p['lng'] for p in points], precision)])
+    expected = generate_accident_statistics(centers[:, 0], centers[:, 1])
+    ok = values == expected
+    failures += not ok
+    print(f"  values computed at cell centers: {'OK' if ok else 'MISMATCH'}")
+
+    # Redis tier: JSON entries shared between workers, foreign entries ignored
+    redis = MemoryRedis()
+    workers = [CellCache({**CELL_CACHE_CONFIG, 'enabled': True, 'redis': True}) for _ in range(2)]
+    for worker in workers:
+        worker._client = redis
+    lats, lngs = [p['lat'] for p in points], [p['lng'] for p in points]
+    written = workers[0].get_many('historical_accidents', lats, lngs, generate_accident_statistics)
+    entries = dict(redis.data)
+    key = next(iter(redis.data))
+    redis.data[key] = pickle.dumps({'planted': True})
+    read = workers[1].get_many('historical_accidents', lats, lngs, generate_accident_statistics)
+    counts = workers[1].stats()['types']['historical_accidents']
+    # Every entry decodes as JSON, the planted pickle reloaded and rewritten
+    ok = (read == written and counts['misses'] == 1 and counts['redis_errors'] == 0
+          and [json.loads(data) for data in entries.values()] == [json.loads(data) for data in redis.data.values()])
+    failures += not ok
+    print(f"  Redis entries shared as JSON:    {'OK' if ok else 'MISMATCH'}")
+
+    sys.exit(1 if failures else 0)
+
+if __name__ == '__main__':
+    main()
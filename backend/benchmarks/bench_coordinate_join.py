@@ -0,0 +1,87 @@
+#!/usr/bin/env python
+"""
+Benchmark joining per-point samples to route points
+
+Compares the float-equality next() scan predict_accident_risks used to
+match traffic samples to route points with a CoordinateIndex lookup.
+Checks that both pick the same samples for exactly equal coordinates,
+and reports how many points each matches after the samples' coordinates
+go through 7-decimal formatting, as a JSON/API round trip would do.
+
+Usage (from the backend directory):
+    python benchmarks/bench_coordinate_join.py [--points 1000 10000 50000]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.coordinate_join import CoordinateIndex, join_records
+
+def scan_join(points, samples):
+    """The former next() scan, one pass over the samples per point"""
+    return [
+        next((s for s in samples if
+              s['location']['lat'] == point['lat'] and
+              s['location']['lng'] == point['lng']), {})
+        for point in points
+    ]
+
+def index_join(points, samples):
+    index = CoordinateIndex.from_locations(samples)
+    lats = np.array([p['lat'] for p in points])
+    lngs = np.array([p['lng'] for p in points])
+    return join_records(samples, index.lookup(lats, lngs), default={})
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return time.perf_counter() - start, result
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--points', type=int, nargs='+', default=[1000, 10000, 50000])
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(5)
+    failures = 0
+
+    print("times in ms; samples at every 50th point, joined to every 10th point")
+    print(f"  {'points':>8} {'samples':>8} {'next() scan':>12} {'index':>8} {'speedup':>8} "
+          f"{'matched':>8} {'after round trip':>17}  check")
+
+    for n_points in args.points:
+        coords = rng.normal(0, 0.001, size=(n_points, 2)).cumsum(axis=0) + [12.97, 77.59]
+        route_points = [{'lat': float(lat), 'lng': float(lng)} for lat, lng in coords]
+        queries = route_points[::10]
+        samples = [{'location': dict(p), 'congestion_level': i % 5} for i, p in enumerate(route_points[::50])]
+
+        scan_time, expected = timed(lambda: scan_join(queries, samples))
+        index_time, actual = timed(lambda: index_join(queries, samples))
+        ok = len(actual) == len(expected) and all((a is b) if b else not a for a, b in zip(actual, expected))
+        failures += not ok
+
+        # Samples whose coordinates were re-parsed from formatted strings
+        round_tripped = [
+            {**s, 'location': {k: float(f'{v:.7f}') for k, v in s['location'].items()}}
+            for s in samples
+        ]
+        matched = sum(1 for s in expected if s)
+        scan_matched = sum(1 for s in scan_join(queries[:2000], round_tripped) if s)
+        index_matched = sum(1 for s in index_join(queries[:2000], round_tripped) if s)
+        expected_matched = sum(1 for s in expected[:2000] if s)
+
+        print(f"  {n_points:>8} {len(samples):>8} {scan_time * 1e3:>12.1f} {index_time * 1e3:>8.2f} "
+              f"{scan_time / index_time:>7.0f}x {matched:>8} {f'{scan_matched} vs {index_matched}':>17}  "
+              f"{'OK' if ok and index_matched == expected_matched else 'MISMATCH'}")
+        failures += index_matched != expected_matched
+
+    sys.exit(1 if failures else 0)
+
+if __name__ == '__main__':
+    main()
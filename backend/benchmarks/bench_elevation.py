@@ -0,0 +1,191 @@
+#!/usr/bin/env python
+"""
+Benchmark deduplicated, concurrent elevation fetching with a persistent store
+
+Replays the elevation lookups of analyze_route_safety on a synthetic
+route against a simulated Elevation API with fixed per-request latency.
+The previous flow fetched the full route and then the blind-spot sample
+points separately, one 100-point batch at a time with a 0.1 s sleep
+after each. It is compared with get_elevations fetching each distinct
+rounded coordinate once in concurrent batches, cold and with the store
+already holding the corridor. Also checks the values match the previous
+flow, that an overlapping route only fetches its new points, that a
+failed batch leaves NaN and is retried on the next lookup, and the
+HTTP client's token-bucket rate limiter.
+
+Usage (from the backend directory):
+    python benchmarks/bench_elevation.py [--points 3000] [--latency 0.05]
+"""
+
+import argparse
+import os
+import sys
+import threading
+import time
+
+import numpy as np
+import polyline
+from flask import Flask
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import ELEVATION_CONFIG
+from services.elevation import get_elevations
+from services.http_client import RateLimiter
+from services.route_geometry import RouteGeometry
+
+def make_route(rng, n_points, start=(30.0, 78.0)):
+    """Random walk with about 50 m steps, through an encoded polyline (1e-5 degree coordinates)"""
+    coords = rng.normal(0.0003, 0.0003, size=(n_points, 2)).cumsum(axis=0) + start
+    return RouteGeometry.from_polyline(polyline.encode([tuple(c) for c in coords.tolist()]))
+
+def terrain(lats, lngs):
+    return 1500 + 400 * np.sin(np.asarray(lats) * 40) * np.cos(np.asarray(lngs) * 40)
+
+class SimulatedElevationAPI:
+    """Elevation API stand-in with fixed latency that records its load"""
+
+    def __init__(self, latency, fail_calls=()):
+        self.latency = latency
+        self.fail_calls = set(fail_calls)
+        self.calls = 0
+        self.points = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.lock = threading.Lock()
+
+    def fetch(self, lats, lngs):
+        with self.lock:
+            self.calls += 1
+            call = self.calls
+            self.points += len(lats)
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            time.sleep(self.latency)
+            if call in self.fail_calls:
+                raise ValueError('Elevation API returned status OVER_QUERY_LIMIT')
+            return terrain(lats, lngs).tolist()
+        finally:
+            with self.lock:
+                self.in_flight -= 1
+
+class MemoryStore:
+    """In-memory stand-in for the elevations collection"""
+
+    def __init__(self):
+        self.values = {}
+
+    def get_many(self, keys):
+        return {key: self.values[key] for key in keys if key in self.values}
+
+    def save_many(self, keys, lats, lngs, elevations):
+        for key, elevation in zip(keys, elevations):
+            self.values.setdefault(key, elevation)
+
+def previous_flow(route, sampled, api):
+    """Full route, then the blind-spot samples, in sequential batches with 0.1 s sleeps"""
+    results = []
+    for indices in (np.arange(len(route)), sampled):
+        values = []
+        for start in range(0, len(indices), 100):
+            batch = indices[start:start + 100]
+            values.extend(api.fetch(route.lats[batch], route.lngs[batch]))
+            time.sleep(0.1)
+        results.append(np.array(values))
+    return results
+
+def blind_spot_samples(route):
+    sampled = np.concatenate([route.stage_indices('blind_spots'), np.flatnonzero(route.turn_angle < 135)])
+    _, first = np.unique(sampled, return_index=True)
+    return sampled[np.sort(first)]
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--points', type=int, default=3000)
+    parser.add_argument('--latency', type=float, default=0.05, help='seconds per simulated API request')
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(25)
+    failures = 0
+    route = make_route(rng, args.points)
+    sampled = blind_spot_samples(route)
+    print(f"{len(route)} route points ({route.length:.0f} km), {len(sampled)} blind-spot samples, "
+          f"{args.latency * 1e3:.0f} ms per API request, {ELEVATION_CONFIG['workers']} workers")
+
+    with Flask('jrm_benchmark').app_context():
+        # Previous flow
+        api = SimulatedElevationAPI(args.latency)
+        start = time.perf_counter()
+        full, blind = previous_flow(route, sampled, api)
+        previous_time = time.perf_counter() - start
+        previous_calls = api.calls
+
+        # Shared, deduplicated, concurrent fetch into an empty store
+        store = MemoryStore()
+        api = SimulatedElevationAPI(args.latency)
+        start = time.perf_counter()
+        elevations = get_elevations(route.lats, route.lngs, fetch_batch=api.fetch, store=store)
+        cold_time = time.perf_counter() - start
+        cold_calls, max_in_flight = api.calls, api.max_in_flight
+
+        ok = np.array_equal(elevations, full) and np.array_equal(elevations[sampled], blind)
+        failures += not ok
+        print(f"  same elevations as the previous flow      {'OK' if ok else 'MISMATCH'}")
+
+        # Same corridor again: served from the store
+        api = SimulatedElevationAPI(args.latency)
+        start = time.perf_counter()
+        again = get_elevations(route.lats, route.lngs, fetch_batch=api.fetch, store=store)
+        warm_time = time.perf_counter() - start
+        ok = api.calls == 0 and np.array_equal(again, elevations)
+        failures += not ok
+        print(f"  repeat corridor makes no API calls        {'OK' if ok else 'MISMATCH'}")
+
+        # Overlapping route: the reversed corridor plus a new extension
+        extension = make_route(rng, 500, start=(route.lats[-1], route.lngs[-1]))
+        lats = np.concatenate([route.lats[::-1], extension.lats])
+        lngs = np.concatenate([route.lngs[::-1], extension.lngs])
+        new_points = len(set(zip(extension.lats.tolist(), extension.lngs.tolist()))
+                         - set(zip(route.lats.tolist(), route.lngs.tolist())))
+        api = SimulatedElevationAPI(args.latency)
+        overlap = get_elevations(lats, lngs, fetch_batch=api.fetch, store=store)
+        ok = api.points == new_points and np.allclose(overlap, terrain(lats, lngs))
+        failures += not ok
+        print(f"  overlapping route fetches only new points {'OK' if ok else 'MISMATCH'} "
+              f"({api.points} of {len(lats)})")
+
+        # A failed batch is left NaN, not stored, and fetched next time
+        other = make_route(rng, 1000, start=(12.0, 77.0))
+        store = MemoryStore()
+        api = SimulatedElevationAPI(0, fail_calls={2})
+        partial = get_elevations(other.lats, other.lngs, fetch_batch=api.fetch, store=store)
+        missing = int(np.isnan(partial).sum())
+        api = SimulatedElevationAPI(0)
+        retried = get_elevations(other.lats, other.lngs, fetch_batch=api.fetch, store=store)
+        ok = (missing == ELEVATION_CONFIG['batch_size'] and api.points == missing
+              and np.allclose(retried, terrain(other.lats, other.lngs)))
+        failures += not ok
+        print(f"  failed batch retried on next lookup       {'OK' if ok else 'MISMATCH'}")
+
+    # Rate limiter: a burst of 10, then 100 per second
+    limiter = RateLimiter(100, burst=10)
+    start = time.perf_counter()
+    for _ in range(40):
+        limiter.acquire()
+    elapsed = time.perf_counter() - start
+    ok = 0.27 <= elapsed <= 0.5
+    failures += not ok
+    print(f"  rate limiter (40 at 100/s, burst 10)      {'OK' if ok else 'MISMATCH'} ({elapsed * 1e3:.0f} ms)")
+
+    print("\nelevation lookups for one route")
+    print(f"  {'':<34} {'time (s)':>9} {'API calls':>10}")
+    print(f"  {'previous (two sequential passes)':<34} {previous_time:>9.2f} {previous_calls:>10}")
+    print(f"  {'shared + concurrent, cold store':<34} {cold_time:>9.2f} {cold_calls:>10}   "
+          f"({previous_time / cold_time:.1f}x, max {max_in_flight} in flight)")
+    print(f"  {'shared + concurrent, warm store':<34} {warm_time:>9.3f} {0:>10}")
+
+    sys.exit(1 if failures else 0)
+
+if __name__ == '__main__':
+    main()
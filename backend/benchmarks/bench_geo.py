@@ -0,0 +1,116 @@
+#!/usr/bin/env python
+"""
+Micro-benchmarks for services.geo against the scalar math implementations
+
+Compares the scalar haversine loops the services used to run with the
+vectorized geo functions on synthetic routes: per-segment distances,
+cumulative distance and the weather interpolation distance matrix. Checks that both give the same
+distances.
+
+Usage (from the backend directory):
+    python benchmarks/bench_geo.py [--points 5000] [--samples 250]
+"""
+
+import argparse
+import math
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.geo import (
+    calculate_distance, cumulative_distance, distance_matrix, haversine, midpoints,
+    segment_lengths, to_arrays, turn_angles
+)
+
+def scalar_distance(lat1, lon1, lat2, lon2):
+    """The haversine previously copied into three service modules"""
+    R = 6371
+    lat1_rad = math.radians(lat1)
+    lon1_rad = math.radians(lon1)
+    lat2_rad = math.radians(lat2)
+    lon2_rad = math.radians(lon2)
+    dlon = lon2_rad - lon1_rad
+    dlat = lat2_rad - lat1_rad
+    a = math.sin(dlat/2)**2 + math.cos(lat1_rad) * math.cos(lat2_rad) * math.sin(dlon/2)**2
+    c = 2 * math.atan2(math.sqrt(a), math.sqrt(1-a))
+    return R * c
+
+def make_route(n_points, rng):
+    """Random-walk route of ~50 m steps"""
+    steps = rng.normal(0, 0.0005, size=(n_points, 2)).cumsum(axis=0)
+    coords = steps + [12.97, 77.59]
+    return [{'lat': float(lat), 'lng': float(lng)} for lat, lng in coords]
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return time.perf_counter() - start, result
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--points', type=int, default=5000)
+    parser.add_argument('--samples', type=int, default=250, help='traffic/weather samples')
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(42)
+    points = make_route(args.points, rng)
+    samples = points[::max(1, args.points // args.samples)]
+    lats, lngs = to_arrays(points)
+    sample_lats, sample_lngs = to_arrays(samples)
+    failures = 0
+
+    def report(name, scalar_time, vector_time, ok):
+        nonlocal failures
+        failures += not ok
+        print(f"  {name:<28} {scalar_time * 1e3:>10.2f} {vector_time * 1e3:>10.2f} "
+              f"{scalar_time / vector_time:>8.1f}x  {'OK' if ok else 'MISMATCH'}")
+
+    print(f"{args.points} route points, {len(samples)} samples")
+    print(f"  {'operation':<28} {'scalar ms':>10} {'numpy ms':>10} {'speedup':>9}")
+
+    scalar_time, expected = timed(lambda: [
+        scalar_distance(a['lat'], a['lng'], b['lat'], b['lng']) for a, b in zip(points, points[1:])
+    ])
+    vector_time, actual = timed(lambda: segment_lengths(*to_arrays(points)))
+    report('segment lengths', scalar_time, vector_time, np.allclose(expected, actual, atol=1e-9))
+
+    scalar_time, expected = timed(lambda: np.cumsum([0] + expected))
+    vector_time, actual = timed(lambda: cumulative_distance(lats, lngs))
+    report('cumulative distance', scalar_time, vector_time, np.allclose(expected, actual, atol=1e-6))
+
+    scalar_time, expected = timed(lambda: [
+        [scalar_distance(p['lat'], p['lng'], s['lat'], s['lng']) for s in samples] for p in points
+    ])
+    vector_time, actual = timed(lambda: distance_matrix(lats, lngs, sample_lats, sample_lngs))
+    report('distance matrix', scalar_time, vector_time, np.allclose(expected, actual, atol=1e-9))
+
+    pair = (points[0]['lat'], points[0]['lng'], points[1]['lat'], points[1]['lng'])
+    scalar_time, expected = timed(lambda: [scalar_distance(*pair) for _ in range(10000)])
+    vector_time, actual = timed(lambda: [calculate_distance(*pair) for _ in range(10000)])
+    report('10k single pairs (scalar)', scalar_time, vector_time, math.isclose(expected[0], actual[0]))
+
+    numpy_time, _ = timed(lambda: [haversine(*pair) for _ in range(10000)])
+    print(f"  {'10k single pairs (haversine)':<28} {'':>10} {numpy_time * 1e3:>10.2f}  "
+          f"(why calculate_distance stays scalar)")
+
+    vector_time, angles = timed(lambda: turn_angles(lats, lngs))
+    straight = turn_angles([0, 0.001, 0.002], [0, 0, 0])[0]
+    right = turn_angles([0, 0.001, 0.001], [0, 0, 0.001])[0]
+    mid_lats, mid_lngs = midpoints(lats, lngs)
+    ok = (
+        math.isclose(straight, 180) and abs(right - 90) < 0.01 and len(angles) == args.points - 2 and
+        np.allclose(haversine(lats[:-1], lngs[:-1], mid_lats, mid_lngs),
+                    haversine(lats[1:], lngs[1:], mid_lats, mid_lngs), atol=1e-9)
+    )
+    print(f"  {'turn angles, midpoints':<28} {'':>10} {vector_time * 1e3:>10.2f}  "
+          f"{'':>8}  {'OK' if ok else 'MISMATCH'}")
+    failures += not ok
+
+    sys.exit(1 if failures else 0)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,195 @@
+#!/usr/bin/env python
+"""
+Benchmark the pooled provider HTTP client against bare requests.get
+
+Starts a local HTTP/1.1 server (HTTPS with a throwaway self-signed
+certificate when openssl is available) and compares sequential calls
+through a ProviderClient, which reuses keep-alive connections, with
+bare requests.get calls that open a new connection (and TLS session)
+each time. Also checks retries of a flaky endpoint, giving up with the
+last response or exception, read timeouts, the per-provider concurrency
+limit and the latency histogram counters.
+
+Usage (from the backend directory):
+    python benchmarks/bench_http_client.py [--calls 300] [--plain]
+"""
+
+import argparse
+import json
+import os
+import shutil
+import ssl
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import requests
+import urllib3
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.http_client import ProviderClient, provider_config
+
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    # Headers and body go out in separate writes; without this, delayed
+    # ACKs stall every keep-alive response
+    disable_nagle_algorithm = True
+    attempts = {}
+    connections = set()
+    in_flight = 0
+    max_in_flight = 0
+    lock = threading.Lock()
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        query = {key: values[0] for key, values in parse_qs(url.query).items()}
+        cls = type(self)
+
+        with cls.lock:
+            cls.connections.add(self.client_address)
+            cls.in_flight += 1
+            cls.max_in_flight = max(cls.max_in_flight, cls.in_flight)
+            attempt = cls.attempts[query.get('key')] = cls.attempts.get(query.get('key'), 0) + 1
+
+        try:
+            status = 200
+            if url.path == '/flaky' and attempt <= int(query['fail']):
+                status = 503
+            elif url.path == '/slow':
+                time.sleep(float(query['delay']))
+            self.reply(status, {'status': 'OK', 'attempt': attempt})
+        finally:
+            with cls.lock:
+                cls.in_flight -= 1
+
+    def reply(self, status, payload):
+        body = json.dumps(payload).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+class Server(ThreadingHTTPServer):
+    def handle_error(self, request, client_address):
+        # Clients that timed out close their connection mid-response
+        pass
+
+def start_server(tls):
+    server = Server(('127.0.0.1', 0), Handler)
+    server.daemon_threads = True
+    scheme = 'http'
+
+    if tls:
+        directory = tempfile.mkdtemp()
+        cert, key = os.path.join(directory, 'cert.pem'), os.path.join(directory, 'key.pem')
+        subprocess.run(
+            ['openssl', 'req', '-x509', '-newkey', 'rsa:2048', '-nodes', '-keyout', key, '-out', cert,
+             '-days', '1', '-subj', '/CN=127.0.0.1'],
+            check=True, capture_output=True
+        )
+        context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+        context.load_cert_chain(cert, key)
+        server.socket = context.wrap_socket(server.socket, server_side=True)
+        scheme = 'https'
+
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f'{scheme}://127.0.0.1:{server.server_address[1]}'
+
+def make_client(**overrides):
+    return ProviderClient('bench', {**provider_config('bench'), 'backoff_base': 0.01, **overrides})
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--calls', type=int, default=300)
+    parser.add_argument('--plain', action='store_true', help='serve plain HTTP even if openssl is available')
+    args = parser.parse_args()
+
+    urllib3.disable_warnings()
+    tls = not args.plain and shutil.which('openssl') is not None
+    server, base = start_server(tls)
+    failures = 0
+
+    # Sequential calls: new connection per call against the pooled client
+    Handler.connections.clear()
+    start = time.perf_counter()
+    for _ in range(args.calls):
+        requests.get(f'{base}/ok', verify=False, timeout=5).json()
+    bare_time = time.perf_counter() - start
+    bare_connections = len(Handler.connections)
+
+    client = make_client()
+    Handler.connections.clear()
+    start = time.perf_counter()
+    for _ in range(args.calls):
+        client.get(f'{base}/ok', verify=False).json()
+    pooled_time = time.perf_counter() - start
+    pooled_connections = len(Handler.connections)
+
+    print(f"{args.calls} sequential GETs over {'HTTPS' if tls else 'HTTP'}")
+    print(f"  bare requests.get {bare_time / args.calls * 1e3:6.2f} ms/call, {bare_connections} connections")
+    print(f"  pooled client     {pooled_time / args.calls * 1e3:6.2f} ms/call, {pooled_connections} connections "
+          f"({bare_time / pooled_time:.1f}x)")
+    ok = pooled_connections == 1
+    failures += not ok
+    print(f"  connection reuse            {'OK' if ok else 'MISMATCH'}")
+
+    # Retries: recovers within the budget, gives up with the last response
+    client = make_client(retries=3)
+    recovered = client.get(f'{base}/flaky', params={'key': 'a', 'fail': 2}, verify=False)
+    exhausted = client.get(f'{base}/flaky', params={'key': 'b', 'fail': 10}, verify=False)
+    stats = client.stats()
+    ok = (recovered.status_code == 200 and recovered.json()['attempt'] == 3 and exhausted.status_code == 503
+          and Handler.attempts['b'] == 4 and stats['retries'] == 5 and stats['failed'] == 1
+          and stats['errors'] == {'http_503': 6} and stats['attempts'] == 7)
+    failures += not ok
+    print(f"  retries and give-up         {'OK' if ok else 'MISMATCH'}")
+
+    # Read timeout: retried, then raised
+    client = make_client(retries=1, read_timeout=0.1)
+    try:
+        client.get(f'{base}/slow', params={'key': 'c', 'delay': 0.3}, verify=False)
+        ok = False
+    except requests.Timeout:
+        stats = client.stats()
+        ok = stats['errors'] == {'timeout': 2} and stats['failed'] == 1 and Handler.attempts['c'] == 2
+    failures += not ok
+    print(f"  timeouts                    {'OK' if ok else 'MISMATCH'}")
+
+    # Concurrency limit across threads (once the timed-out requests finished)
+    while Handler.in_flight:
+        time.sleep(0.01)
+    client = make_client(max_concurrency=4)
+    Handler.max_in_flight = 0
+    threads = [
+        threading.Thread(target=client.get, args=(f'{base}/slow',),
+                         kwargs={'params': {'key': f'd{i}', 'delay': 0.02}, 'verify': False})
+        for i in range(32)
+    ]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    stats = client.stats()
+    ok = Handler.max_in_flight <= 4 and stats['calls'] == 32 and stats['in_flight'] == 0
+    ok &= sum(stats['latency_ms_histogram'].values()) == stats['attempts'] == 32
+    failures += not ok
+    print(f"  concurrency limit           {'OK' if ok else 'MISMATCH'} "
+          f"(max {Handler.max_in_flight} in flight, 32 x 20 ms in {elapsed * 1e3:.0f} ms)")
+    print(f"  latency p50 <= {stats['p50_latency_ms']} ms, p95 <= {stats['p95_latency_ms']} ms")
+
+    server.shutdown()
+    sys.exit(1 if failures else 0)
+
+if __name__ == '__main__':
+    main()
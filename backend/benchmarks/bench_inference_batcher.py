@@ -0,0 +1,95 @@
+#!/usr/bin/env python
+"""
+Benchmark micro-batched scoring against per-thread predict_proba calls
+
+Simulates concurrent route jobs: each thread scores a series of small
+feature frames with an accident-sized RandomForest, either directly or
+through an InferenceBatcher. Checks that every caller gets back exactly
+the probabilities for its own rows, then reports throughput and the
+batch-size histogram.
+
+Usage (from the backend directory):
+    python benchmarks/bench_inference_batcher.py [--threads 16] [--rows 20]
+"""
+
+import argparse
+import os
+import sys
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+from sklearn.ensemble import RandomForestClassifier
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.inference_batcher import InferenceBatcher
+
+def run(threads, frames, score):
+    """Score every thread's frames concurrently, return (seconds, results)"""
+    results = [None] * threads
+    barrier = threading.Barrier(threads)
+
+    def job(index):
+        barrier.wait()
+        results[index] = [score(frame) for frame in frames[index]]
+
+    workers = [threading.Thread(target=job, args=(i,)) for i in range(threads)]
+    start = time.perf_counter()
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+
+    return time.perf_counter() - start, results
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--threads', type=int, default=16)
+    parser.add_argument('--rows', type=int, default=20, help='rows per request')
+    parser.add_argument('--requests', type=int, default=25, help='requests per thread')
+    parser.add_argument('--max-batch-rows', type=int, default=1024)
+    parser.add_argument('--max-wait-ms', type=float, default=2.0)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(42)
+    columns = [f'f{i}' for i in range(13)]
+    X = pd.DataFrame(rng.normal(size=(1000, 13)), columns=columns)
+    y = (X['f0'] + X['f1'] ** 2 > 1).astype(int)
+    model = RandomForestClassifier(n_estimators=100, random_state=42).fit(X, y)
+
+    frames = [
+        [pd.DataFrame(rng.normal(size=(args.rows, 13)), columns=columns) for _ in range(args.requests)]
+        for _ in range(args.threads)
+    ]
+
+    batcher = InferenceBatcher('benchmark', args.max_batch_rows, args.max_wait_ms)
+
+    direct_time, direct = run(args.threads, frames, model.predict_proba)
+    batched_time, batched = run(args.threads, frames, lambda f: batcher.predict_proba(model, f))
+
+    mismatches = sum(
+        not np.array_equal(a, b)
+        for thread_a, thread_b in zip(direct, batched)
+        for a, b in zip(thread_a, thread_b)
+    )
+
+    total = args.threads * args.requests
+    stats = batcher.stats()
+
+    print(f"{args.threads} threads x {args.requests} requests x {args.rows} rows")
+    print(f"  direct:  {direct_time:.3f}s ({total / direct_time:,.0f} requests/s)")
+    print(f"  batched: {batched_time:.3f}s ({total / batched_time:,.0f} requests/s), "
+          f"{stats['batches']} batches, {stats['avg_requests_per_batch']} requests/batch, "
+          f"max queue depth {stats['max_queue_depth']}")
+    print(f"  results: {'OK' if not mismatches else f'{mismatches} MISMATCHED'}")
+    print("  batch rows histogram:")
+    for bucket, count in stats['batch_rows_histogram'].items():
+        if count:
+            print(f"    {bucket:>7} {count}")
+
+    sys.exit(1 if mismatches else 0)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,160 @@
+#!/usr/bin/env python
+"""
+Benchmark location-keyed counter-based random generation
+
+Compares the former per-point np.random.seed() providers (reproduced
+here for historical accident statistics) with the LocationRandom-based
+array versions, and checks that the new providers are:
+  - deterministic: the same coordinate always gets the same values,
+    whatever other coordinates are in the batch and in whatever order
+  - calibrated: hotspot, eco zone and hazard rates match their
+    configured probabilities
+  - thread-safe: providers run concurrently from several threads give
+    the same results as a single thread (the seeded versions do not,
+    since all threads share NumPy's global generator)
+
+Exits non-zero if any check fails.
+
+Usage (from the backend directory):
+    python benchmarks/bench_location_random.py [--points 1000 10000 100000] [--threads 8]
+"""
+
+import argparse
+import os
+import sys
+import threading
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.environmental_service import generate_eco_zones, generate_environmental_hazards
+from services.google_maps import get_road_geometry, synthetic_congestion, synthetic_road_types
+from services.network_service import generate_synthetic_coverage
+from services.route_safety import generate_accident_statistics
+
+def seeded_accident_statistics(lats, lngs):
+    """The former analyze_historical_accidents loop body, one point at a time"""
+    results = []
+    for lat, lng in zip(lats, lngs):
+        np.random.seed(int(abs(lat * 10000) + abs(lng * 10000)))
+        if np.random.random() >= 0.05:
+            results.append(None)
+            continue
+        accident_count = np.random.randint(5, 30)
+        injury_rate = np.random.random() * 0.5
+        fatality_rate = np.random.random() * 0.1
+        results.append((accident_count, round(injury_rate * 100, 1), round(fatality_rate * 100, 1)))
+    return results
+
+def run_threads(fn, batches, threads):
+    """Run fn over the batches from `threads` threads at once"""
+    results = [None] * len(batches)
+    barrier = threading.Barrier(threads)
+
+    def worker(offset):
+        barrier.wait()
+        for i in range(offset, len(batches), threads):
+            results[i] = fn(*batches[i])
+
+    workers = [threading.Thread(target=worker, args=(offset,)) for offset in range(threads)]
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join()
+    return results
+
+def timed(fn, repeats=3):
+    best = float('inf')
+    for _ in range(repeats):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--points', type=int, nargs='+', default=[1000, 10000, 100000])
+    parser.add_argument('--threads', type=int, default=8)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(19)
+    failures = 0
+
+    print("accident statistics, times in ms (best of 3)")
+    print(f"  {'points':>8} {'seeded loop':>12} {'LocationRandom':>15} {'speedup':>8} {'hotspot rate':>13}")
+
+    for n_points in args.points:
+        lats, lngs = rng.uniform(8, 35, n_points), rng.uniform(68, 97, n_points)
+
+        before, _ = timed(lambda: seeded_accident_statistics(lats.tolist(), lngs.tolist()), repeats=1)
+        after, stats = timed(lambda: generate_accident_statistics(lats, lngs))
+        rate = sum(s is not None for s in stats) / n_points
+
+        print(f"  {n_points:>8} {before * 1e3:>12.1f} {after * 1e3:>15.2f} {before / after:>7.0f}x {rate:>13.3f}")
+
+    # Determinism and batch independence
+    lats, lngs = rng.uniform(8, 35, 20000), rng.uniform(68, 97, 20000)
+    order = rng.permutation(len(lats))
+    providers = {
+        'accident statistics': generate_accident_statistics,
+        'eco zones': generate_eco_zones,
+        'environmental hazards': generate_environmental_hazards,
+        'network coverage': lambda la, ln: [{k: v for k, v in c.items() if k != 'timestamp'}
+                                            for c in generate_synthetic_coverage(la, ln)],
+        'congestion': lambda la, ln: synthetic_congestion(la, ln, hour=12).tolist(),
+        'road types': lambda la, ln: synthetic_road_types(la, ln).tolist()
+    }
+
+    print("\ndeterminism (same values for a point whatever the batch)")
+    for name, provider in providers.items():
+        full = provider(lats, lngs)
+        shuffled = provider(lats[order], lngs[order])
+        single = [provider(lats[i:i + 1], lngs[i:i + 1])[0] for i in range(200)]
+        ok = [full[i] for i in order] == list(shuffled) and single == list(full[:200])
+        failures += not ok
+        print(f"  {name:<24} {'OK' if ok else 'MISMATCH'}")
+
+    print("\nrates (expected)")
+    for name, provider, expected in (('eco zones', generate_eco_zones, 0.10),
+                                     ('environmental hazards', generate_environmental_hazards, 0.05),
+                                     ('accident hotspots', generate_accident_statistics, 0.05)):
+        rate = sum(v is not None for v in provider(lats, lngs)) / len(lats)
+        ok = abs(rate - expected) < 0.01
+        failures += not ok
+        print(f"  {name:<24} {rate:.3f} ({expected:.2f})  {'OK' if ok else 'MISMATCH'}")
+
+    # Thread safety: many small batches (route-sized) from several threads,
+    # switching threads as often as the interpreter allows
+    sys.setswitchinterval(1e-6)
+    batches = [(rng.uniform(8, 35, 50), rng.uniform(68, 97, 50)) for _ in range(400)]
+    thread_safe = {}
+    for name, provider in providers.items():
+        expected = [list(provider(*batch)) for batch in batches]
+        concurrent = run_threads(lambda la, ln: list(provider(la, ln)), batches, args.threads)
+        thread_safe[name] = concurrent == expected
+        failures += not thread_safe[name]
+
+    road_points = [[{'lat': lat, 'lng': lng} for lat, lng in zip(*batch)] for batch in batches]
+    expected_geometry = [get_road_geometry(points) for points in road_points]
+    concurrent_geometry = run_threads(lambda points: get_road_geometry(points), [(p,) for p in road_points],
+                                      args.threads)
+    ok_geometry = concurrent_geometry == expected_geometry
+    failures += not ok_geometry
+
+    seeded_expected = [seeded_accident_statistics(*map(np.ndarray.tolist, batch)) for batch in batches]
+    seeded_concurrent = run_threads(lambda la, ln: seeded_accident_statistics(la.tolist(), ln.tolist()),
+                                    batches, args.threads)
+    corrupted = sum(a != b for a, b in zip(seeded_concurrent, seeded_expected))
+
+    print(f"\nthread safety ({args.threads} threads, {len(batches)} batches of 50 points)")
+    for name, ok in thread_safe.items():
+        print(f"  {name:<24} {'OK' if ok else 'MISMATCH'}")
+    print(f"  road geometry            {'OK' if ok_geometry else 'MISMATCH'}")
+    print(f"  seeded loop (before)     {corrupted} of {len(batches)} batches differ from a single thread")
+
+    sys.exit(1 if failures else 0)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,157 @@
+#!/usr/bin/env python
+"""
+Measure per-worker memory for the native, compiled and memory-mapped engines
+
+Trains the service tree models into a temporary model folder, then starts
+N concurrent worker processes per engine. Each worker loads every model
+through a ModelRegistry, scores a batch with each one and touches every
+page of the served arrays (the worst case for mapped bundles). RSS and PSS
+are read from /proc/<pid>/smaps_rollup before and after loading, with all
+workers alive. PSS splits shared pages between the processes that map
+them, so it shows what sharing saves.
+
+Linux only. Usage (from the backend directory):
+    python benchmarks/bench_model_memory.py [--workers 4]
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+
+import numpy as np
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+# (model name, "module:trainer") for the tree ensembles served by the app
+TREE_MODELS = [
+    ('accident_risk', 'services.accident_prediction:train_accident_model'),
+    ('weather_hazard', 'services.weather_service:train_weather_hazard_model'),
+    ('blind_spot', 'services.route_safety:train_blind_spot_model'),
+    ('eta_optimization', 'services.eta_optimizer:train_eta_model'),
+    ('breakdown_prediction', 'services.breakdown_predictor:train_breakdown_model')
+]
+
+# (label, engine, mmap)
+MODES = [
+    ('native', 'native', False),
+    ('compiled', 'compiled', False),
+    ('compiled-mmap', 'compiled', True)
+]
+
+def read_memory(pid='self'):
+    """RSS and PSS of a process in KiB"""
+    memory = {}
+    with open(f'/proc/{pid}/smaps_rollup') as f:
+        for line in f:
+            key, _, value = line.partition(':')
+            if key in ('Rss', 'Pss'):
+                memory[key.lower()] = int(value.split()[0])
+    return memory
+
+def train_models(folder):
+    """Train every tree model into `folder` with the service trainers"""
+    import importlib
+    from flask import Flask
+    from services.model_registry import registry
+
+    registry.model_folder = folder
+    app = Flask('jrm_benchmark')
+
+    with app.app_context():
+        for name, target in TREE_MODELS:
+            module_name, function_name = target.split(':')
+            getattr(importlib.import_module(module_name), function_name)()
+
+def worker(folder, engine, mmap):
+    """Load and exercise every model when told to, reporting on stdout"""
+    import pandas as pd  # noqa: F401 - imported up front so it is in the baseline
+    import sklearn.ensemble  # noqa: F401
+    import xgboost  # noqa: F401
+    from config import MODEL_ARTIFACTS
+    from services.model_registry import ModelRegistry
+    from services.tree_inference import BUNDLE_ARRAYS, CompiledForest
+
+    registry = ModelRegistry(folder, MODEL_ARTIFACTS, engine=engine, mmap=mmap)
+    print('ready', flush=True)
+    sys.stdin.readline()
+
+    for name, _ in TREE_MODELS:
+        model = registry.get(name)
+
+        if isinstance(model, CompiledForest):
+            n_features = len(model.feature_names)
+            for array in BUNDLE_ARRAYS:
+                np.asarray(getattr(model, array)).sum()
+        else:
+            n_features = model.n_features_in_
+
+        X = np.random.default_rng(0).normal(size=(256, n_features))
+        if getattr(model, 'classes_', None) is not None:
+            model.predict_proba(X)
+        else:
+            model.predict(X)
+
+    print(registry.stats()[TREE_MODELS[0][0]]['engine'], flush=True)
+
+    # Stay alive until the parent has measured every worker
+    sys.stdin.readline()
+
+def run_mode(folder, engine, mmap, n_workers):
+    """
+    Start n_workers concurrently and measure each one before and after
+    loading the models, with all of them alive so shared pages are split
+    """
+    processes = [
+        subprocess.Popen(
+            [sys.executable, os.path.abspath(__file__), '--worker', folder, engine, str(int(mmap))],
+            cwd=BACKEND_DIR, stdin=subprocess.PIPE, stdout=subprocess.PIPE, text=True
+        )
+        for _ in range(n_workers)
+    ]
+
+    for p in processes:
+        p.stdout.readline()
+    baseline = [read_memory(p.pid) for p in processes]
+
+    for p in processes:
+        p.stdin.write('\n')
+        p.stdin.flush()
+    engines = [p.stdout.readline().strip() for p in processes]
+    loaded = [read_memory(p.pid) for p in processes]
+
+    for p in processes:
+        p.communicate('\n')
+
+    return engines[0], baseline, loaded
+
+def main():
+    if len(sys.argv) > 1 and sys.argv[1] == '--worker':
+        import warnings
+        warnings.filterwarnings('ignore')
+        worker(sys.argv[2], sys.argv[3], sys.argv[4] == '1')
+        return
+
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--workers', type=int, default=4)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as folder:
+        train_models(folder)
+
+        print(f"{args.workers} workers, {len(TREE_MODELS)} tree models; "
+              f"memory attributable to models (loaded - baseline), MiB per worker")
+        print(f"  {'mode':<15} {'engine':<15} {'RSS':>8} {'PSS':>8} {'total PSS':>10}")
+
+        for label, engine, mmap in MODES:
+            served, baseline, loaded = run_mode(folder, engine, mmap, args.workers)
+            rss = np.mean([a['rss'] - b['rss'] for a, b in zip(loaded, baseline)]) / 1024
+            pss = np.mean([a['pss'] - b['pss'] for a, b in zip(loaded, baseline)]) / 1024
+
+            print(f"  {label:<15} {served:<15} {rss:>8.1f} {pss:>8.1f} "
+                  f"{pss * args.workers:>10.1f}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,205 @@
+#!/usr/bin/env python
+"""
+Benchmark the risk point index behind /api/risk/hotspots
+
+Builds a RiskPointSnapshot over synthetic risk_points documents (routes
+of clustered accident, weather, blind-spot and elevation points across
+India, plus network points the index leaves out) and checks radius and bounding-box queries, the per-route filter,
+ranking and clustering against brute-force scans of every point. Reports
+build time and per-query latency for hotspot-sized areas.
+
+Usage (from the backend directory):
+    python benchmarks/bench_risk_index.py [--points 1000000] [--queries 200]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.geo import haversine
+from services.risk_index import (RISK_LEVELS, RISK_TYPES, RiskPointSnapshot,
+                                 cluster_hotspots, extract_risk_points, hotspot_records,
+                                 query_hotspots, rank_hotspots)
+
+def make_documents(rng, n_points, points_per_route=500):
+    """risk_points documents for routes wandering from random start points"""
+    documents = []
+
+    for route in range(max(1, n_points // points_per_route)):
+        steps = rng.normal(0, 0.01, size=(points_per_route, 2)).cumsum(axis=0)
+        coords = steps + [rng.uniform(8, 35), rng.uniform(68, 97)]
+        categories = rng.choice(RISK_TYPES + ['network'], points_per_route, p=[0.24] * 4 + [0.04])
+        levels = rng.choice(['Low', 'Medium', 'High'], points_per_route, p=[0.5, 0.3, 0.2])
+
+        for (lat, lng), category, level in zip(coords.tolist(), categories, levels):
+            document = {
+                'route_id': f'route-{route}',
+                'category': str(category),
+                'level': str(level),
+                'location': {'type': 'Point', 'coordinates': [lng, lat]},
+                'details': {}
+            }
+            if category == 'accident':
+                document['details']['probability'] = float(rng.random())
+            documents.append(document)
+
+    return documents
+
+def brute_force_radius(snapshot, lat, lng, radius):
+    distance = haversine(lat, lng, snapshot.lats, snapshot.lngs)
+    index = np.flatnonzero(distance <= radius)
+    return index[np.argsort(distance[index], kind='stable')], distance
+
+def brute_force_bbox(snapshot, south, west, north, east):
+    lats, lngs = snapshot.lats, snapshot.lngs
+    inside = (lats >= south) & (lats <= north)
+    if west <= east:
+        inside &= (lngs >= west) & (lngs <= east)
+    else:
+        inside &= (lngs >= west) | (lngs <= east)
+    return np.flatnonzero(inside)
+
+def brute_force_rank(snapshot, index, limit):
+    """Positions of the most severe points by a plain Python sort"""
+    keys = [(-int(snapshot.levels[point]), -np.nan_to_num(snapshot.probability[point]), position)
+            for position, point in enumerate(index.tolist())]
+    return [key[2] for key in sorted(keys)[:limit]]
+
+def timed(fn, repeats):
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        result = fn()
+        times.append(time.perf_counter() - start)
+    return np.array(times), result
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--points', type=int, default=1000000)
+    parser.add_argument('--queries', type=int, default=200)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(20)
+    failures = 0
+
+    documents = make_documents(rng, args.points)
+    start = time.perf_counter()
+    routes = extract_risk_points(documents)
+    extract_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    snapshot = RiskPointSnapshot(routes)
+    build_time = time.perf_counter() - start
+
+    print(f"{len(snapshot)} risk points on {len(routes)} routes")
+    print(f"  extract {extract_time:.2f} s, build snapshot {build_time:.2f} s")
+
+    # Every hotspot category point made it in, and nothing else
+    ok_extract = len(snapshot) == sum(document['category'] in RISK_TYPES for document in documents)
+
+    # Correctness against brute force
+    ok_radius = ok_bbox = ok_rank = True
+    for _ in range(20):
+        point = rng.integers(len(snapshot))
+        lat, lng = snapshot.lats[point], snapshot.lngs[point]
+        radius = float(rng.uniform(1, 50))
+
+        index, distance = query_hotspots(snapshot, center=(lat, lng), radius=radius)
+        expected, expected_distance = brute_force_radius(snapshot, lat, lng, radius)
+        # Points within rounding of the boundary may fall either side
+        edge = np.abs(expected_distance - radius) < 1e-6
+        ok_radius &= set(index.tolist()) ^ set(expected.tolist()) <= set(np.flatnonzero(edge).tolist())
+        ok_radius &= np.allclose(distance, expected_distance[index], atol=1e-6)
+        ok_radius &= bool(np.all(np.diff(distance) >= 0))
+
+        span = float(rng.uniform(0.05, 1.0))
+        bbox = (lat - span, lng - span, lat + span, lng + span)
+        ok_bbox &= np.array_equal(query_hotspots(snapshot, bbox=bbox)[0], brute_force_bbox(snapshot, *bbox))
+
+        for limit in (0, 1, 10, 100, len(index) + 1):
+            ok_rank &= rank_hotspots(snapshot, index, limit).tolist() == brute_force_rank(snapshot, index, limit)
+
+    # Antimeridian-crossing box and type/level filters
+    bbox = (10.0, 90.0, 30.0, -170.0)
+    ok_bbox &= np.array_equal(query_hotspots(snapshot, bbox=bbox)[0], brute_force_bbox(snapshot, *bbox))
+    index, _ = query_hotspots(snapshot, bbox=(8, 68, 35, 97), types=['accident', 'blind_spot'], min_level='Medium')
+    expected = brute_force_bbox(snapshot, 8, 68, 35, 97)
+    expected = expected[np.isin(snapshot.types[expected], [RISK_TYPES.index('accident'), RISK_TYPES.index('blind_spot')])
+                        & (snapshot.levels[expected] >= RISK_LEVELS.index('Medium'))]
+    ok_bbox &= np.array_equal(index, expected)
+
+    # Route filter: only the points of the given routes (unknown ids ignored)
+    owned = snapshot.route_ids[::7]
+    index, _ = query_hotspots(snapshot, bbox=(8, 68, 35, 97), route_ids=owned + ['missing'])
+    expected = brute_force_bbox(snapshot, 8, 68, 35, 97)
+    expected = expected[np.isin([snapshot.route_ids[r] for r in snapshot.routes[expected]], owned)]
+    ok_owner = len(index) > 0 and np.array_equal(index, expected)
+    ok_owner &= len(query_hotspots(snapshot, bbox=(8, 68, 35, 97), route_ids=[])[0]) == 0
+
+    # Clusters partition the matches
+    lat, lng = snapshot.lats[0], snapshot.lngs[0]
+    index, _ = query_hotspots(snapshot, center=(lat, lng), radius=50)
+    clusters = cluster_hotspots(snapshot, index, 5)
+    ok_cluster = sum(c['count'] for c in clusters) == len(index)
+    ok_cluster &= sum(sum(c['types'].values()) for c in clusters) == len(index)
+    ok_cluster &= max(RISK_LEVELS.index(c['risk_level']) for c in clusters) == snapshot.levels[index].max()
+
+    # Tiny cells: one cluster per distinct location, however far apart the columns
+    index, _ = query_hotspots(snapshot, bbox=(8, 68, 35, 97))
+    index = index[:5000]
+    for cell_size in (0.01, 1e-6):
+        clusters = cluster_hotspots(snapshot, index, cell_size)
+        locations = set(zip(snapshot.lats[index].tolist(), snapshot.lngs[index].tolist()))
+        ok_cluster &= len(clusters) == len(locations) and sum(c['count'] for c in clusters) == len(index)
+
+    for name, ok in (('extraction', ok_extract), ('radius queries', ok_radius), ('bounding-box queries', ok_bbox),
+                     ('route filter', ok_owner), ('ranking', ok_rank), ('clusters', ok_cluster)):
+        failures += not ok
+        print(f"  {name:<22} {'OK' if ok else 'MISMATCH'}")
+
+    # Latency of full requests (query, rank 100, records, clusters)
+    centers = rng.integers(len(snapshot), size=args.queries)
+
+    def request(point, radius=None, span=None, cluster=False):
+        lat, lng = snapshot.lats[point], snapshot.lngs[point]
+        if radius:
+            index, distance = query_hotspots(snapshot, center=(lat, lng), radius=radius)
+        else:
+            index, distance = query_hotspots(snapshot, bbox=(lat - span, lng - span, lat + span, lng + span))
+        top = rank_hotspots(snapshot, index, 100)
+        records = hotspot_records(snapshot, index[top], distance[top] if distance is not None else None)
+        if cluster:
+            cluster_hotspots(snapshot, index, (radius or span * 111) / 10, 100)
+        return len(index), records
+
+    print(f"\nper-request latency in ms over {args.queries} queries (limit 100)")
+    print(f"  {'query':<28} {'matches':>9} {'median':>8} {'p95':>8} {'full scan':>12}")
+
+    for label, kwargs in (('radius 10 km', {'radius': 10}),
+                          ('radius 50 km', {'radius': 50}),
+                          ('radius 50 km + clusters', {'radius': 50, 'cluster': True}),
+                          ('box 1 x 1 deg', {'span': 0.5}),
+                          ('box 4 x 4 deg + clusters', {'span': 2.0, 'cluster': True})):
+        times, matches = [], []
+        for point in centers:
+            elapsed, (count, _) = timed(lambda: request(point, **kwargs), 1)
+            times.append(elapsed[0])
+            matches.append(count)
+        lat, lng, span = snapshot.lats[0], snapshot.lngs[0], kwargs.get('span')
+        if span:
+            brute, _ = timed(lambda: brute_force_bbox(snapshot, lat - span, lng - span, lat + span, lng + span), 3)
+        else:
+            brute, _ = timed(lambda: brute_force_radius(snapshot, lat, lng, kwargs['radius']), 3)
+        times = np.array(times) * 1e3
+        print(f"  {label:<28} {np.median(matches):>9.0f} {np.median(times):>8.2f} "
+              f"{np.percentile(times, 95):>8.2f} {brute.min() * 1e3:>12.1f}")
+
+    sys.exit(1 if failures else 0)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,100 @@
+#!/usr/bin/env python
+"""
+Benchmark building a RouteGeometry once versus re-deriving it per service
+
+Before RouteGeometry, each of the five route analyses got the waypoint
+dictionaries and rebuilt coordinate arrays, segment distances and turn
+angles for itself. This times that against decoding the polyline once,
+and checks that:
+  - every(10) gives the same points as get_route_details' waypoints
+  - distances and angles match the geo functions
+  - slices are zero-copy views
+  - GeoJSON coordinates round-trip
+
+Usage (from the backend directory):
+    python benchmarks/bench_route_geometry.py [--points 2000 20000 200000]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import polyline
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.geo import cumulative_distance, segment_lengths, to_arrays, turn_angles
+from services.route_geometry import RouteGeometry
+
+SERVICES = 5
+
+def waypoints(points):
+    """Waypoint sampling from get_route_details"""
+    return [
+        {'lat': point[0], 'lng': point[1]}
+        for i, point in enumerate(points)
+        if i == 0 or i == len(points) - 1 or i % 10 == 0
+    ]
+
+def per_service(polyline_str):
+    """Decode to dicts once, then every service re-derives its own arrays"""
+    route_points = waypoints(polyline.decode(polyline_str))
+    for _ in range(SERVICES):
+        lats, lngs = to_arrays(route_points)
+        segment_lengths(lats, lngs)
+        turn_angles(lats, lngs)
+    return route_points
+
+def timed(fn, repeats=3):
+    best = float('inf')
+    for _ in range(repeats):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--points', type=int, nargs='+', default=[2000, 20000, 200000])
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(11)
+    failures = 0
+
+    print(f"times in ms (best of 3), {SERVICES} services")
+    print(f"  {'points':>8} {'waypoints':>10} {'per service':>12} {'geometry':>10} {'speedup':>8}  check")
+
+    for n_points in args.points:
+        coords = rng.normal(0.0005, 0.0005, size=(n_points, 2)).cumsum(axis=0) + [12.97, 77.59]
+        polyline_str = polyline.encode([tuple(c) for c in coords])
+
+        before, route_points = timed(lambda: per_service(polyline_str))
+        after, route = timed(lambda: RouteGeometry.from_polyline(polyline_str).every(10))
+
+        lats, lngs = to_arrays(route_points)
+        view = route[5:50]
+        geojson = route.to_geojson()
+        sampled = route.distance_indices(1.0)
+
+        ok = (
+            route.points() == route_points and
+            np.allclose(route.distance, cumulative_distance(lats, lngs)) and
+            np.allclose(route.turn_angle[1:-1], turn_angles(lats, lngs)) and
+            route.turn_angle[0] == route.turn_angle[-1] == 180 and
+            np.shares_memory(view.lats, route.lats) and np.shares_memory(view.turn_angle, route.turn_angle) and
+            view.distance[0] == route.distance[5] and
+            np.array_equal(np.array(geojson['geometry']['coordinates'])[:, ::-1], np.column_stack([lats, lngs])) and
+            sampled[0] == 0 and sampled[-1] == len(route) - 1 and
+            len(sampled) <= np.ceil(route.length) + 1 and bool((np.diff(sampled) > 0).all())
+        )
+        failures += not ok
+
+        print(f"  {n_points:>8} {len(route):>10} {before * 1e3:>12.1f} {after * 1e3:>10.1f} "
+              f"{before / after:>7.1f}x  {'OK' if ok else 'MISMATCH'}")
+
+    sys.exit(1 if failures else 0)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,139 @@
+#!/usr/bin/env python
+"""
+Benchmark distance-based route sampling and polyline simplification
+
+Builds polylines whose point density varies along the route, as Google's
+encoding does (dense on bends and in towns, sparse on straight highways),
+and compares sampling by list index (every 10th point) with the
+ROUTE_SAMPLING_CONFIG stages. Checks that:
+  - simplified routes stay within the tolerance of every dropped point
+  - simplified routes keep a point at least every max_spacing km
+  - resampled points are spaced exactly `interval` km along the route
+  - each stage stays within its point budget
+
+Usage (from the backend directory):
+    python benchmarks/bench_route_sampling.py [--km 20 200 1000]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import ROUTE_SAMPLING_CONFIG
+from services.geo import EARTH_RADIUS_KM
+from services.route_geometry import RouteGeometry
+
+def make_route(rng, km):
+    """Winding route with 5-20 m spacing in towns and 100-500 m on highways"""
+    lats, lngs = [30.0], [78.0]
+    heading, travelled = 0.0, 0.0
+
+    while travelled < km:
+        town = rng.random() < 0.3
+        stretch = rng.uniform(1, 10)
+        spacing = rng.uniform(0.005, 0.02) if town else rng.uniform(0.1, 0.5)
+        steps = max(1, int(stretch / spacing))
+        turn = rng.normal(0, 6 if town else 0.5, steps)
+
+        headings = heading + np.cumsum(turn)
+        step_deg = spacing / 111.2
+        lats.extend(lats[-1] + np.cumsum(step_deg * np.cos(np.radians(headings))))
+        lngs.extend(lngs[-1] + np.cumsum(step_deg * np.sin(np.radians(headings)) / np.cos(np.radians(30))))
+        heading = headings[-1]
+        travelled += steps * spacing
+
+    return RouteGeometry(np.array(lats), np.array(lngs))
+
+def max_deviation(route, kept):
+    """Largest distance in meters from a dropped point to the simplified line"""
+    scale = EARTH_RADIUS_KM * 1000 * np.pi / 180
+    x = route.lngs * scale * np.cos(np.radians(route.lats.mean()))
+    y = route.lats * scale
+    worst = 0.0
+
+    for first, last in zip(kept[:-1], kept[1:]):
+        if last - first < 2:
+            continue
+        dx, dy = x[last] - x[first], y[last] - y[first]
+        px, py = x[first + 1:last] - x[first], y[first + 1:last] - y[first]
+        chord = dx * dx + dy * dy
+        t = np.clip((px * dx + py * dy) / chord, 0, 1) if chord > 0 else 0
+        worst = max(worst, float(np.hypot(px - t * dx, py - t * dy).max()))
+
+    return worst
+
+def spacing_spread(route):
+    """Shortest and longest gap in km between consecutive sampled points"""
+    gaps = np.diff(route.distance)
+    return (float(gaps.min()), float(gaps.max())) if len(gaps) else (0.0, 0.0)
+
+def timed(fn, repeats=3):
+    best = float('inf')
+    for _ in range(repeats):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--km', type=float, nargs='+', default=[20, 200, 1000])
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(17)
+    route_settings = ROUTE_SAMPLING_CONFIG['route']
+    failures = 0
+
+    for km in args.km:
+        decoded = make_route(rng, km)
+        simplify_time, route = timed(lambda: decoded.for_stage('route'))
+        kept = decoded.stage_indices('route')
+        deviation = max_deviation(decoded, kept)
+        _, widest = spacing_spread(route)
+
+        # Gaps wider than max_spacing only where the decoded polyline has
+        # no point in between
+        wide = np.flatnonzero(np.diff(decoded.distance[kept]) > route_settings['max_spacing'])
+        ok = deviation <= route_settings['tolerance'] and bool((np.diff(kept)[wide] == 1).all())
+        failures += not ok
+
+        print(f"{decoded.length:.0f} km: {len(decoded)} decoded points -> {len(route)} after simplifying "
+              f"in {simplify_time * 1e3:.1f} ms (max deviation {deviation:.2f} m, "
+              f"widest gap {widest:.2f} km)  {'OK' if ok else 'MISMATCH'}")
+
+        every = route.every(10)
+        gap_min, gap_max = spacing_spread(every)
+        print(f"  {'every 10th point':<22} {len(every):>6} points  gaps {gap_min:.3f}-{gap_max:.3f} km")
+
+        for stage, settings in ROUTE_SAMPLING_CONFIG.items():
+            if stage == 'route':
+                continue
+
+            stage_time, sampled = timed(lambda: route.for_stage(stage))
+            gap_min, gap_max = spacing_spread(sampled)
+            interval = route._stage_interval(settings)
+            gaps = np.diff(sampled.distance)
+
+            ok = len(sampled) <= settings.get('max_points', len(sampled)) + 1
+            if settings['mode'] == 'resample':
+                # One point per interval plus the last point; straight-line
+                # gaps can only be shorter than the distance travelled along
+                # the route between two points
+                ok = ok and len(sampled) == len(np.arange(0, route.length, interval)) + 1 and \
+                    bool((gaps[:-1] <= interval + 1e-6).all()) and \
+                    sampled.point(0) == route.point(0) and sampled.point(-1) == route.point(-1)
+            failures += not ok
+
+            print(f"  {stage:<22} {len(sampled):>6} points  gaps {gap_min:.3f}-{gap_max:.3f} km "
+                  f"({settings['mode']} {interval:.2f} km, {stage_time * 1e3:.2f} ms)  "
+                  f"{'OK' if ok else 'MISMATCH'}")
+
+    sys.exit(1 if failures else 0)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,97 @@
+#!/usr/bin/env python
+"""
+Benchmark packed route geometry storage against polyline decoding
+
+Compares, per route size, the BSON size and load time of the three ways
+a route's path can be stored:
+  - the encoded polyline, decoded on every load (the previous behaviour
+    of update_weather_data and the geometry endpoint)
+  - a list of {lat, lng} dictionaries, as waypoints are stored
+  - packed E7 coordinates and float32 cumulative distance in one BSON
+    binary field (RouteGeometry.to_packed / from_packed)
+
+Load time covers BSON decoding of the field plus building the
+RouteGeometry (packed loads reuse the stored distances and leave
+bearings and turn angles until first use). Also checks that the packed
+round trip keeps the decoded coordinates to 1e-7 degrees, the distances
+to float32 precision and the bearings and turn angles unchanged.
+
+Usage (from the backend directory):
+    python benchmarks/bench_route_storage.py [--points 1000 10000 100000]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import bson
+import numpy as np
+import polyline
+from bson.binary import Binary
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.route_geometry import RouteGeometry, unpack_geometry
+
+def make_polyline(rng, n_points):
+    """Encoded polyline of a random walk with about 100 m steps"""
+    coords = rng.normal(0, 0.001, size=(n_points, 2)).cumsum(axis=0) + [20.0, 78.0]
+    return polyline.encode([tuple(c) for c in coords.tolist()])
+
+def timed(fn, repeats=5):
+    best = float('inf')
+    for _ in range(repeats):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--points', type=int, nargs='+', default=[1000, 10000, 100000])
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(22)
+    failures = 0
+
+    print("sizes in KB, load times in ms (best of 5)")
+    print(f"  {'points':>8} {'polyline':>9} {'dicts':>9} {'packed':>9}   "
+          f"{'decode':>8} {'dicts':>8} {'packed':>8} {'speedup':>8}")
+
+    for n_points in args.points:
+        encoded = make_polyline(rng, n_points)
+        geometry = RouteGeometry.from_polyline(encoded)
+        packed = geometry.to_packed()
+
+        documents = {
+            'polyline': bson.encode({'polyline': encoded}),
+            'dicts': bson.encode({'points': geometry.points()}),
+            'packed': bson.encode({'geometry': {**packed, 'data': Binary(packed['data'])}})
+        }
+
+        decode_time, _ = timed(lambda: RouteGeometry.from_polyline(bson.decode(documents['polyline'])['polyline']))
+        dicts_time, _ = timed(lambda: RouteGeometry.from_points(bson.decode(documents['dicts'])['points']))
+        packed_time, loaded = timed(lambda: RouteGeometry.from_packed(bson.decode(documents['packed'])['geometry']))
+
+        sizes = [len(documents[name]) / 1024 for name in ('polyline', 'dicts', 'packed')]
+        print(f"  {n_points:>8} {sizes[0]:>9.1f} {sizes[1]:>9.1f} {sizes[2]:>9.1f}   "
+              f"{decode_time * 1e3:>8.2f} {dicts_time * 1e3:>8.2f} {packed_time * 1e3:>8.2f} "
+              f"{decode_time / packed_time:>7.1f}x")
+
+        # Round trip
+        lats, lngs, distance = unpack_geometry(packed['data'], packed['count'])
+        ok = (np.abs(lats - geometry.lats).max() < 1e-7 and np.abs(lngs - geometry.lngs).max() < 1e-7
+              and np.allclose(distance, geometry.distance, rtol=1e-6, atol=1e-4)
+              and np.allclose(loaded.distance, geometry.distance, rtol=1e-6, atol=1e-4)
+              and np.allclose(loaded.turn_angle, geometry.turn_angle, atol=1e-6)
+              and np.allclose(loaded.bearing, geometry.bearing, atol=1e-6)
+              and abs(packed['length'] - geometry.length) < 1e-9
+              and len(packed['data']) == 12 * len(geometry))
+        failures += not ok
+        print(f"           round trip {'OK' if ok else 'MISMATCH'}")
+
+    sys.exit(1 if failures else 0)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,151 @@
+#!/usr/bin/env python
+"""
+Benchmark incremental weather re-analysis of route segments
+
+Builds a long synthetic route with weather samples about every 10 km,
+analyzes it once from scratch and then again after the weather of a few
+samples changes, as update_weather_data does on each refresh, with the
+weather hazard model it uses (trained into a temporary folder). Checks
+that only the segments drawing on a changed sample are recomputed, that
+the patched results equal a full re-analysis of the new weather, that an
+unchanged refresh recomputes nothing, and that moving part of the route
+invalidates only the segments it touches. Reports full against
+incremental analysis time.
+
+Usage (from the backend directory):
+    python benchmarks/bench_segment_analysis.py [--points 50000] [--changed 3]
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask import Flask
+from services.model_registry import registry
+from services.route_geometry import RouteGeometry
+from services.segment_analysis import route_fingerprint, segment_bounds
+from services.weather_service import (WEATHER_HAZARD_FEATURES, interpolate_weather_profile,
+                                      reanalyze_weather_hazards)
+
+def make_route(rng, n_points):
+    """Random walk with about 50 m steps heading north-east"""
+    steps = rng.normal(0.0003, 0.0002, size=(n_points, 2))
+    coords = steps.cumsum(axis=0) + [20.0, 78.0]
+    return RouteGeometry(coords[:, 0], coords[:, 1])
+
+def make_sample(rng, location):
+    return {
+        'location': location,
+        'temperature': float(rng.uniform(-10, 35)),
+        'feels_like': float(rng.uniform(-10, 35)),
+        'humidity': float(rng.uniform(20, 100)),
+        'pressure': float(rng.uniform(990, 1030)),
+        'wind_speed': float(rng.uniform(0, 25)),
+        'cloudiness': float(rng.uniform(0, 100)),
+        'visibility': float(rng.uniform(0.5, 10)),
+        'precipitation': float(rng.uniform(0, 8)),
+        'weather_condition': str(rng.choice(['Clear', 'Clouds', 'Rain', 'Fog'])),
+        'weather_description': '',
+        'weather_icon': '',
+        'timestamp': None
+    }
+
+def analyze(route, risk_data, samples):
+    profile = interpolate_weather_profile(route, samples)
+    return reanalyze_weather_hazards(route, risk_data, profile=profile)
+
+def stored(hazards, fingerprints):
+    return {'weather_hazards': hazards, 'segment_fingerprints': {'weather_hazards': fingerprints}}
+
+def timed(fn, repeats=3):
+    best = float('inf')
+    for _ in range(repeats):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+def run(args):
+    rng = np.random.default_rng(23)
+    failures = 0
+
+    route = make_route(rng, args.points)
+    sample_index = route.stage_indices('weather')
+    samples = [make_sample(rng, point) for point in route.points(sample_index)]
+    n_segments = len(segment_bounds(route)) - 1
+    print(f"{len(route)} points, {route.length:.0f} km, {len(samples)} weather samples, {n_segments} segments")
+
+    # Full analysis, as for a new route
+    full_time, (hazards, fingerprints, recomputed) = timed(lambda: analyze(route, None, samples))
+    ok = recomputed == n_segments and len(fingerprints) == n_segments
+    failures += not ok
+    print(f"  first analysis recomputes every segment {'OK' if ok else 'MISMATCH'} ({len(hazards)} hazards)")
+
+    # Refresh with unchanged weather
+    same_time, (same, same_fingerprints, recomputed) = timed(
+        lambda: analyze(route, stored(hazards, fingerprints), samples)
+    )
+    ok = recomputed == 0 and same == hazards and same_fingerprints == fingerprints
+    failures += not ok
+    print(f"  unchanged weather reuses every segment   {'OK' if ok else 'MISMATCH'}")
+
+    # Refresh after the weather of a few samples changed
+    new_samples = list(samples)
+    for i in rng.choice(len(samples), args.changed, replace=False):
+        new_samples[i] = make_sample(rng, samples[i]['location'])
+
+    old_profile = interpolate_weather_profile(route, samples)
+    new_profile = interpolate_weather_profile(route, new_samples)
+    moved = np.zeros(len(route), dtype=bool)
+    for field in WEATHER_HAZARD_FEATURES:
+        moved |= old_profile[field] != new_profile[field]
+    expected_segments = len(np.unique(np.searchsorted(segment_bounds(route), np.flatnonzero(moved), side='right') - 1))
+
+    incremental_time, (patched, new_fingerprints, recomputed) = timed(
+        lambda: analyze(route, stored(hazards, fingerprints), new_samples)
+    )
+    full_new, full_fingerprints, _ = analyze(route, None, new_samples)
+    ok = 0 < recomputed <= expected_segments + 2 * args.changed and patched == full_new
+    ok &= new_fingerprints == full_fingerprints
+    failures += not ok
+    print(f"  {args.changed} changed samples recompute {recomputed} of {n_segments} segments "
+          f"({expected_segments} with changed values), patched results equal full analysis "
+          f"{'OK' if ok else 'MISMATCH'}")
+
+    # Route-level fingerprints follow the geometry
+    shifted = RouteGeometry(route.lats + np.where(np.arange(len(route)) == len(route) // 2, 1e-6, 0), route.lngs)
+    ok = route_fingerprint(route, 'x') == route_fingerprint(RouteGeometry(route.lats.copy(), route.lngs.copy()), 'x')
+    ok &= route_fingerprint(route, 'x') != route_fingerprint(shifted, 'x')
+    ok &= route_fingerprint(route, 'x') != route_fingerprint(route, 'y')
+    _, shifted_fingerprints, recomputed = analyze(shifted, stored(hazards, fingerprints), samples)
+    ok &= recomputed == 1 and sum(a != b for a, b in zip(shifted_fingerprints, fingerprints)) == 1
+    failures += not ok
+    print(f"  moving one point invalidates one segment {'OK' if ok else 'MISMATCH'}")
+
+    print("\nanalysis time in ms (best of 3)")
+    print(f"  full {full_time * 1e3:.1f}, unchanged {same_time * 1e3:.1f}, "
+          f"{args.changed} samples changed {incremental_time * 1e3:.1f} "
+          f"({full_time / incremental_time:.1f}x)")
+
+    return failures
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--points', type=int, default=50000)
+    parser.add_argument('--changed', type=int, default=3)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as folder, Flask('jrm_benchmark').app_context():
+        registry.model_folder = folder
+        failures = run(args)
+
+    sys.exit(1 if failures else 0)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,106 @@
+#!/usr/bin/env python
+"""
+Benchmark nearest-sample matching for ETA segments
+
+For every segment midpoint of a synthetic route, finds the closest
+traffic/weather sample three ways: a scalar Python scan (what
+optimize_eta used to do per segment), a brute-force NumPy distance
+matrix, and the KD-tree SpatialIndex. Checks that all of them find
+equally distant samples and agree on the 5 km weather cut-off.
+
+Usage (from the backend directory):
+    python benchmarks/bench_spatial_index.py [--segments 10000] [--samples 50 500 5000]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.geo import calculate_distance, distance_matrix, haversine, midpoints
+from services.spatial_index import SpatialIndex
+
+WEATHER_CUTOFF_KM = 5
+SCALAR_MAX_PAIRS = 2_000_000
+
+def scalar_nearest(mid_lats, mid_lngs, sample_lats, sample_lngs):
+    distance = []
+    for lat, lng in zip(mid_lats.tolist(), mid_lngs.tolist()):
+        distance.append(min(
+            calculate_distance(lat, lng, s_lat, s_lng)
+            for s_lat, s_lng in zip(sample_lats.tolist(), sample_lngs.tolist())
+        ))
+    return np.array(distance)
+
+def matrix_nearest(mid_lats, mid_lngs, sample_lats, sample_lngs, chunk_rows=1024):
+    distance = np.empty(len(mid_lats))
+    for start in range(0, len(mid_lats), chunk_rows):
+        block = distance_matrix(mid_lats[start:start + chunk_rows], mid_lngs[start:start + chunk_rows],
+                                sample_lats, sample_lngs)
+        distance[start:start + chunk_rows] = block.min(axis=1)
+    return distance
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return time.perf_counter() - start, result
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--segments', type=int, default=10000)
+    parser.add_argument('--samples', type=int, nargs='+', default=[50, 500, 5000])
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(7)
+    # ~100 m steps, so a 10k-segment route spans several hundred km
+    route = rng.normal(0, 0.001, size=(args.segments + 1, 2)).cumsum(axis=0) + [12.97, 77.59]
+    mid_lats, mid_lngs = midpoints(route[:, 0], route[:, 1])
+    failures = 0
+
+    # Keep the one-off scikit-learn import out of the build timings
+    SpatialIndex([0.0], [0.0]).nearest([0.0], [0.0])
+
+    print(f"{args.segments} segments, times in ms")
+    print(f"  {'samples':>8} {'scalar':>10} {'matrix':>10} {'build':>8} {'query':>8} {'index total':>11}  check")
+
+    for n_samples in args.samples:
+        # Samples scattered around the route, some beyond the cut-off
+        picks = rng.integers(0, len(route), n_samples)
+        samples = route[picks] + rng.normal(0, 0.05, size=(n_samples, 2))
+        sample_lats, sample_lngs = samples[:, 0], samples[:, 1]
+
+        if args.segments * n_samples <= SCALAR_MAX_PAIRS:
+            scalar_time, _ = timed(lambda: scalar_nearest(mid_lats, mid_lngs, sample_lats, sample_lngs))
+            scalar_column = f'{scalar_time * 1e3:>10.1f}'
+        else:
+            scalar_column = f'{"-":>10}'
+
+        matrix_time, expected = timed(lambda: matrix_nearest(mid_lats, mid_lngs, sample_lats, sample_lngs))
+        build_time, index = timed(lambda: SpatialIndex(sample_lats, sample_lngs))
+        query_time, (nearest, distance) = timed(
+            lambda: index.nearest(mid_lats, mid_lngs, max_distance=WEATHER_CUTOFF_KM)
+        )
+
+        # Distances match brute force, the returned sample really is that
+        # far away, and the cut-off keeps the same segments
+        matched = nearest >= 0
+        ok = (
+            np.allclose(distance, expected, atol=1e-6) and
+            np.allclose(haversine(mid_lats[matched], mid_lngs[matched],
+                                  sample_lats[nearest[matched]], sample_lngs[nearest[matched]]),
+                        expected[matched], atol=1e-6) and
+            np.array_equal(matched, expected < WEATHER_CUTOFF_KM)
+        )
+        failures += not ok
+
+        print(f"  {n_samples:>8} {scalar_column} {matrix_time * 1e3:>10.1f} {build_time * 1e3:>8.2f} "
+              f"{query_time * 1e3:>8.2f} {(build_time + query_time) * 1e3:>11.2f}  {'OK' if ok else 'MISMATCH'}")
+
+    sys.exit(1 if failures else 0)
+
+if __name__ == '__main__':
+    main()
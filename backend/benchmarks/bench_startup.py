@@ -0,0 +1,133 @@
+#!/usr/bin/env python
+"""
+Benchmark worker startup: import time and time to first request
+
+Each measurement runs in a fresh interpreter:
+  services  initializes the (lazily connecting) database handle and imports
+            the API and service modules app.py loads, then times
+            the deferred ML imports (what the first ML request pays)
+  backend   imports app.py and serves GET /api/system/models to the
+            default admin (needs the backend dependencies and a reachable
+            MongoDB)
+  frontend  imports the Dash frontend and serves GET /
+
+Also lists which heavy libraries were imported eagerly, so a module that
+re-introduces a top-level `import xgboost` shows up as a regression.
+
+Usage (from the backend directory):
+    python benchmarks/bench_startup.py [--repeats 3] [--targets services backend frontend]
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+FRONTEND_DIR = os.path.join(os.path.dirname(BACKEND_DIR), 'frontend')
+
+HEAVY_MODULES = ['pandas', 'sklearn', 'xgboost', 'lifelines', 'scipy', 'matplotlib', 'plotly']
+
+# Child-process programs; each prints one JSON line of timings
+PROBE = '''
+import json, sys, time
+start = time.perf_counter()
+{setup}
+import_time = time.perf_counter() - start
+result = {{'import_time': import_time}}
+result['heavy'] = [m for m in {heavy!r} if m in sys.modules]
+{measure}
+result['total_time'] = time.perf_counter() - start
+print(json.dumps(result))
+'''
+
+TARGETS = {
+    'services': (BACKEND_DIR, PROBE.format(
+        setup=(
+            "from flask import Flask\n"
+            "from config import MONGO_URI\n"
+            "from models import init_db\n"
+            "flask_app = Flask('jrm_startup')\n"
+            "flask_app.config['MONGO_URI'] = MONGO_URI\n"
+            "init_db(flask_app)\n"
+            "import api.routes, api.weather, api.dashboard, api.system, services.model_training"
+        ),
+        measure=(
+            "from config import STARTUP_CONFIG\n"
+            "from services.lazy_imports import preload\n"
+            "t = time.perf_counter()\n"
+            "preload(STARTUP_CONFIG['preload_modules'])\n"
+            "result['ml_import_time'] = time.perf_counter() - t"
+        ),
+        heavy=HEAVY_MODULES
+    )),
+    'backend': (BACKEND_DIR, PROBE.format(
+        setup='import app',
+        measure=(
+            "with app.app.app_context():\n"
+            "    from flask_jwt_extended import create_access_token\n"
+            "    from models import db\n"
+            "    token = create_access_token(identity=str(db.users.find_one({'role': 'admin'})['_id']))\n"
+            "t = time.perf_counter()\n"
+            "response = app.app.test_client().get('/api/system/models', headers={'Authorization': f'Bearer {token}'})\n"
+            "assert response.status_code == 200, response.status_code\n"
+            "result['first_request_time'] = time.perf_counter() - t"
+        ),
+        heavy=HEAVY_MODULES
+    )),
+    'frontend': (FRONTEND_DIR, PROBE.format(
+        setup='import app',
+        measure=(
+            "t = time.perf_counter()\n"
+            "response = app.app.test_client().get('/')\n"
+            "result['first_request_time'] = time.perf_counter() - t"
+        ),
+        heavy=HEAVY_MODULES
+    ))
+}
+
+METRICS = ['import_time', 'first_request_time', 'ml_import_time', 'total_time']
+
+def probe(target):
+    """Run one fresh-interpreter measurement, return its result dict"""
+    cwd, program = TARGETS[target]
+    # Measure the cold path; the background warm-up would race the probe
+    env = dict(os.environ, PRELOAD_ML_IMPORTS='false', PYTHONDONTWRITEBYTECODE='1')
+
+    result = subprocess.run(
+        [sys.executable, '-c', program],
+        cwd=cwd, env=env, capture_output=True, text=True, timeout=300
+    )
+    if result.returncode != 0:
+        lines = result.stderr.strip().splitlines()
+        raise RuntimeError(lines[-1] if lines else f'exit code {result.returncode}')
+
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--repeats', type=int, default=3)
+    parser.add_argument('--targets', nargs='+', default=list(TARGETS), choices=list(TARGETS))
+    args = parser.parse_args()
+
+    print(f"median of {args.repeats} cold starts, seconds")
+    print(f"  {'target':<10} " + ' '.join(f'{m:>18}' for m in METRICS) + '  eager heavy imports')
+
+    for target in args.targets:
+        try:
+            runs = [probe(target) for _ in range(args.repeats)]
+        except (RuntimeError, subprocess.TimeoutExpired) as e:
+            print(f"  {target:<10} unavailable: {e}")
+            continue
+
+        values = []
+        for metric in METRICS:
+            samples = [run[metric] for run in runs if metric in run]
+            values.append(f'{statistics.median(samples):>18.3f}' if samples else f'{"-":>18}')
+
+        print(f"  {target:<10} " + ' '.join(values) + f"  {', '.join(runs[-1]['heavy']) or 'none'}")
+
+if __name__ == '__main__':
+    main()
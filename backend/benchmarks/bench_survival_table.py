@@ -0,0 +1,103 @@
+#!/usr/bin/env python
+"""
+Benchmark SurvivalTable serving against lifelines' CoxPHFitter
+
+Fits the service survival model, checks that the exported lookup table
+reproduces lifelines' cumulative hazard at a range of horizons, and that
+predict_breakdown_within, which builds features from vehicle documents,
+matches lifelines on the same features whatever the table's covariate
+order. Then times both for single vehicles and for batches, plus the
+end-to-end predict_breakdown_within call.
+
+Usage (from the backend directory):
+    python benchmarks/bench_survival_table.py [--vehicles 1000]
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask import Flask
+from services import breakdown_predictor
+from services.model_registry import get_model_metadata, registry
+from services.breakdown_predictor import (
+    SurvivalTable, generate_survival_training_data, predict_breakdown_within,
+    prepare_breakdown_features, train_survival_model
+)
+
+from bench_breakdown_scoring import make_fleet
+
+HORIZONS = [1, 7, 30, 90, 365, 10000]
+
+def best_of(fn, repeats=20):
+    best = float('inf')
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--vehicles', type=int, default=1000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as folder:
+        registry.model_folder = folder
+        with Flask('jrm_benchmark').app_context():
+            cph = train_survival_model()
+
+        table = SurvivalTable.from_cox(cph, get_model_metadata('breakdown_survival')['covariate_mean'])
+        X = generate_survival_training_data(args.vehicles, random_state=7)[table.features]
+
+        expected = 1 - np.exp(-cph.predict_cumulative_hazard(X, times=HORIZONS).values.T)
+        actual = table.breakdown_probability(X.values, HORIZONS)
+        diff = np.abs(expected - actual).max()
+        ok = diff < 1e-9
+
+        print(f"baseline table: {len(table.times)} event times, "
+              f"{table.times.nbytes + table.baseline_hazard.nbytes} bytes")
+        print(f"equivalence: max |diff| = {diff:.2e} {'OK' if ok else 'MISMATCH'}")
+
+        single = X.iloc[:1]
+        print(f"  {'':<28} {'lifelines':>12} {'table':>12}")
+        for label, frame in (('1 vehicle', single), (f'{args.vehicles} vehicles', X)):
+            native = best_of(lambda: cph.predict_cumulative_hazard(frame, times=HORIZONS))
+            fast = best_of(lambda: table.breakdown_probability(frame.values, HORIZONS))
+            print(f"  {label:<28} {native * 1e3:>10.3f}ms {fast * 1e3:>10.3f}ms")
+
+        # End to end, with lifelines picking the covariates by name
+        fleet = make_fleet(args.vehicles, np.random.default_rng(42))
+        frame = pd.DataFrame([prepare_breakdown_features(*entry) for entry in fleet])
+        expected = 1 - np.exp(-cph.predict_cumulative_hazard(frame, times=HORIZONS).values.T)
+        fleet_diff = np.abs(predict_breakdown_within(fleet, HORIZONS) - expected).max()
+
+        # Same with the table's covariates in another order than training
+        version, model, served = breakdown_predictor._survival_table
+        order = np.arange(len(served.features))[::-1]
+        breakdown_predictor._survival_table = (version, model, SurvivalTable(
+            served.times, served.baseline_hazard, served.coefficients[order], served.mean[order],
+            [served.features[i] for i in order]
+        ))
+        fleet_diff = max(fleet_diff, np.abs(predict_breakdown_within(fleet, HORIZONS) - expected).max())
+        breakdown_predictor._survival_table = (version, model, served)
+        fleet_ok = fleet_diff < 1e-9
+        ok &= fleet_ok
+        print(f"predict_breakdown_within: max |diff| = {fleet_diff:.2e} {'OK' if fleet_ok else 'MISMATCH'}")
+
+        end_to_end = best_of(lambda: predict_breakdown_within(fleet, 30))
+        one = best_of(lambda: predict_breakdown_within(fleet[:1], 500, unit='km'))
+        print(f"predict_breakdown_within: {one * 1e3:.3f} ms for 1 vehicle, "
+              f"{end_to_end / args.vehicles * 1e6:.1f} us/vehicle for {args.vehicles}")
+
+    sys.exit(0 if ok else 1)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,126 @@
+#!/usr/bin/env python
+"""
+Benchmark the synthetic training-data generators across sample sizes
+
+Streams the ETA and survival generators chunk by chunk for 10k to 10M
+samples and reports generation time and peak traced memory, which stays
+bounded by the chunk size rather than the sample count. Optionally fits
+the models on the smaller sizes, each in a child process so its peak RSS
+can be reported: the ETA model streams the chunks (fit_eta_model), the
+survival model is fitted on the concatenated frame. Checks that the
+streamed ETA fit predicts the same as a fit on the full frame.
+
+Usage (from the backend directory):
+    python benchmarks/bench_training_data.py [--max-samples 10000000]
+        [--chunk-size 250000] [--fit-limit 0]
+"""
+
+import argparse
+import multiprocessing
+import os
+import resource
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.eta_optimizer import fit_eta_model, iter_eta_training_data, generate_eta_training_data
+from services.breakdown_predictor import (
+    iter_survival_training_data, generate_survival_training_data
+)
+
+SAMPLE_SIZES = [10000, 100000, 1000000, 10000000]
+
+GENERATORS = [
+    ('eta', iter_eta_training_data),
+    ('survival', iter_survival_training_data)
+]
+
+def stream(iterator):
+    """Consume a chunk iterator, returning (rows, bytes) seen"""
+    rows = 0
+    nbytes = 0
+    for chunk in iterator:
+        rows += len(chunk)
+        nbytes += chunk.memory_usage(index=False).sum()
+    return rows, nbytes
+
+def fit(name, n_samples, chunk_size, results):
+    """Fit the service model on n_samples generated rows, put (seconds, peak RSS in MiB) in results"""
+    start = time.perf_counter()
+
+    if name == 'eta':
+        fit_eta_model(lambda: iter_eta_training_data(n_samples, chunk_size=chunk_size))
+    else:
+        from lifelines import CoxPHFitter
+        df = generate_survival_training_data(n_samples, chunk_size=chunk_size)
+        CoxPHFitter().fit(df, duration_col='duration', event_col='observed')
+
+    elapsed = time.perf_counter() - start
+    results.put((elapsed, resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024))
+
+def fit_in_child(name, n_samples, chunk_size):
+    """fit() in a fresh process, so its peak RSS is the fit's alone"""
+    context = multiprocessing.get_context('spawn')
+    results = context.Queue()
+    process = context.Process(target=fit, args=(name, n_samples, chunk_size, results))
+    process.start()
+    result = results.get()
+    process.join()
+    return result
+
+def check_streamed_eta():
+    """The streamed ETA fit predicts like a fit on the concatenated frame"""
+    import xgboost as xgb
+
+    df = generate_eta_training_data(50000, chunk_size=10000)
+    X, y = df.drop('travel_time', axis=1), df['travel_time']
+    streamed = fit_eta_model(lambda: iter_eta_training_data(50000, chunk_size=10000))
+    full = xgb.XGBRegressor(n_estimators=100, max_depth=6, learning_rate=0.1, random_state=42).fit(X, y)
+    return np.allclose(streamed.predict(X), full.predict(X), atol=1e-4)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--max-samples', type=int, default=10000000)
+    parser.add_argument('--chunk-size', type=int, default=None)
+    parser.add_argument('--fit-limit', type=int, default=0,
+                        help='also fit models for sample sizes up to this value')
+    args = parser.parse_args()
+
+    ok = check_streamed_eta()
+    print(f"streamed ETA fit equals full-frame fit {'OK' if ok else 'MISMATCH'}")
+
+    for name, iterate in GENERATORS:
+        print(f"\n{name}")
+        print(f"  {'samples':>10} {'gen s':>8} {'rows/s':>12} {'data MiB':>10} "
+              f"{'peak MiB':>10} {'fit s':>8} {'fit RSS MiB':>12}")
+
+        for n_samples in SAMPLE_SIZES:
+            if n_samples > args.max_samples:
+                break
+
+            tracemalloc.start()
+            start = time.perf_counter()
+            rows, nbytes = stream(iterate(n_samples, chunk_size=args.chunk_size))
+            elapsed = time.perf_counter() - start
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+
+            assert rows == n_samples, f"generated {rows} rows, expected {n_samples}"
+
+            fit_time = fit_rss = '-'
+            if n_samples <= args.fit_limit:
+                seconds, rss = fit_in_child(name, n_samples, args.chunk_size)
+                fit_time, fit_rss = f"{seconds:.2f}", f"{rss:.0f}"
+
+            print(f"  {n_samples:>10} {elapsed:>8.2f} {rows / elapsed:>12,.0f} "
+                  f"{nbytes / 2**20:>10.1f} {peak / 2**20:>10.1f} "
+                  f"{fit_time:>8} {fit_rss:>12}")
+
+    sys.exit(0 if ok else 1)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,142 @@
+#!/usr/bin/env python
+"""
+Benchmark the compiled NumPy tree-ensemble engine against sklearn/xgboost
+
+Trains forests shaped like the service models (accident, breakdown and
+blind-spot RandomForests, ETA XGBRegressor), checks that the compiled
+engine reproduces their outputs, in memory and loaded back memory-mapped
+from a saved bundle, over enough rows to span several evaluation blocks,
+then times both engines across batch sizes, checking every timed batch
+too. Exits non-zero on any mismatch, so it can gate CI (--max-rows 0
+skips the timings).
+
+Usage (from the backend directory):
+    python benchmarks/bench_tree_inference.py [--max-rows 100000]
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.tree_inference import BLOCK_ROWS, CompiledForest, compile_model
+
+# (name, number of features, kind) for each service model
+MODEL_SHAPES = [
+    ('accident_risk', 13, 'classifier'),
+    ('breakdown_prediction', 10, 'classifier'),
+    ('blind_spot', 6, 'classifier'),
+    ('eta_optimization', 12, 'regressor')
+]
+
+BATCH_SIZES = [1, 10, 100, 1000, 10000, 100000]
+
+def make_data(n_features, n_samples, rng):
+    """Synthetic training data with a non-linear target"""
+    columns = [f'f{i}' for i in range(n_features)]
+    X = pd.DataFrame(rng.normal(size=(n_samples, n_features)), columns=columns)
+    signal = X.iloc[:, 0] * 2 + X.iloc[:, 1] ** 2 - X.iloc[:, 2] * X.iloc[:, 3 % n_features]
+    return X, signal + rng.normal(scale=0.5, size=n_samples)
+
+def train_model(kind, X, signal):
+    if kind == 'classifier':
+        from sklearn.ensemble import RandomForestClassifier
+        model = RandomForestClassifier(n_estimators=100, random_state=42)
+        model.fit(X, (signal > signal.median()).astype(int))
+    else:
+        import xgboost as xgb
+        model = xgb.XGBRegressor(n_estimators=100, max_depth=6, learning_rate=0.1, random_state=42)
+        model.fit(X, signal)
+    return model
+
+def score(model, kind, X):
+    if kind == 'classifier':
+        return model.predict_proba(X)
+    return model.predict(X)
+
+def check_equivalence(model, compiled, kind, X):
+    """Return the max absolute difference between the two engines"""
+    if kind == 'regressor':
+        # XGBoost accepts missing values; exercise the default directions
+        X = X.copy()
+        X.iloc[::97, 0] = np.nan
+
+    expected = np.asarray(score(model, kind, X), dtype=np.float64)
+    return max_diff(expected, score(compiled, kind, X))
+
+def max_diff(expected, actual):
+    """Max absolute difference (inf if the shapes differ or a value is NaN)"""
+    expected, actual = np.asarray(expected, dtype=np.float64), np.asarray(actual, dtype=np.float64)
+    if expected.shape != actual.shape:
+        return float('inf')
+    return float(np.nan_to_num(np.max(np.abs(expected - actual), initial=0.0), nan=np.inf))
+
+def time_call(fn, X, repeats):
+    """Return (best seconds, result of the last call)"""
+    best = float('inf')
+    for _ in range(repeats):
+        start = time.perf_counter()
+        result = fn(X)
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--max-rows', type=int, default=100000)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(42)
+    failures = 0
+
+    for name, n_features, kind in MODEL_SHAPES:
+        X_train, signal = make_data(n_features, 3000, rng)
+        model = train_model(kind, X_train, signal)
+        compiled = compile_model(model)
+
+        # Past two block boundaries, so partial last blocks are covered
+        n_check = 2 * BLOCK_ROWS + 1
+        X_test, _ = make_data(n_features, max(args.max_rows, n_check), rng)
+
+        # RandomForest outputs match exactly; XGBoost sums leaves in float32
+        tolerance = 1e-9 if kind == 'classifier' else 1e-4
+        diff = check_equivalence(model, compiled, kind, X_test.iloc[:n_check])
+        with tempfile.TemporaryDirectory() as folder:
+            compiled.save(folder)
+            mapped = CompiledForest.load(folder)
+            mapped_diff = check_equivalence(model, mapped, kind, X_test.iloc[:n_check])
+            del mapped
+        status = 'OK' if diff <= tolerance else 'MISMATCH'
+        mapped_status = 'OK' if mapped_diff <= tolerance else 'MISMATCH'
+        failures += (status != 'OK') + (mapped_status != 'OK')
+
+        print(f"\n{name}: {compiled.n_trees} trees, max depth {compiled.max_depth}, "
+              f"{compiled.nbytes / 1024:.0f} KiB packed")
+        print(f"  equivalence: max |diff| = {diff:.2e} (tolerance {tolerance:.0e}) {status}")
+        print(f"  mapped bundle: max |diff| = {mapped_diff:.2e} {mapped_status}")
+        print(f"  {'rows':>8} {'native ms':>12} {'compiled ms':>12} {'speedup':>8}")
+
+        for rows in BATCH_SIZES:
+            if rows > args.max_rows:
+                break
+
+            batch = X_test.iloc[:rows]
+            repeats = 20 if rows <= 1000 else 3
+            native, expected = time_call(lambda X: score(model, kind, X), batch, repeats)
+            fast, actual = time_call(lambda X: score(compiled, kind, X), batch, repeats)
+            ok = max_diff(expected, actual) <= tolerance
+            failures += not ok
+
+            print(f"  {rows:>8} {native * 1000:>12.3f} {fast * 1000:>12.3f} {native / fast:>7.1f}x"
+                  f"{'' if ok else '  MISMATCH'}")
+
+    print(f"\n{'OK' if not failures else f'{failures} MISMATCHED'}")
+    sys.exit(1 if failures else 0)
+
+if __name__ == '__main__':
+    main()
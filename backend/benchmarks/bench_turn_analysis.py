@@ -0,0 +1,115 @@
+#!/usr/bin/env python
+"""
+Benchmark turn, curvature and gradient analysis on long polylines
+
+Compares a per-point loop in the style of the original route_safety code
+(math bearing and haversine per point, one turn reported per sharp point)
+with the geo kernels: polyline_metrics, curvature_radius, gradients and
+turn_segments. Checks that:
+  - turn angles and gradients match the loop
+  - every sharp point lies in exactly one merged turn segment
+  - segment apexes are the sharpest point of their run
+
+Usage (from the backend directory):
+    python benchmarks/bench_turn_analysis.py [--points 5000 50000 200000]
+"""
+
+import argparse
+import math
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.geo import calculate_distance, curvature_radius, gradients, polyline_metrics, turn_segments
+
+THRESHOLD = 150
+
+def loop_bearing(lat1, lng1, lat2, lng2):
+    lat1, lng1, lat2, lng2 = map(math.radians, [lat1, lng1, lat2, lng2])
+    y = math.sin(lng2 - lng1) * math.cos(lat2)
+    x = math.cos(lat1) * math.sin(lat2) - math.sin(lat1) * math.cos(lat2) * math.cos(lng2 - lng1)
+    return math.degrees(math.atan2(y, x))
+
+def loop_analysis(lats, lngs, elevations):
+    """Per-point turn angles, sharp points and gradients"""
+    angles = []
+    for i in range(1, len(lats) - 1):
+        incoming = loop_bearing(lats[i - 1], lngs[i - 1], lats[i], lngs[i])
+        outgoing = loop_bearing(lats[i], lngs[i], lats[i + 1], lngs[i + 1])
+        deflection = abs((outgoing - incoming + 180) % 360 - 180)
+        angles.append(180 - deflection)
+
+    sharp = [i + 1 for i, angle in enumerate(angles) if angle < THRESHOLD]
+
+    grads = []
+    for i in range(1, len(lats)):
+        distance = calculate_distance(lats[i - 1], lngs[i - 1], lats[i], lngs[i])
+        grads.append((elevations[i] - elevations[i - 1]) / (distance * 1000) * 100 if distance >= 0.01 else 0)
+
+    return np.array(angles), sharp, np.array(grads)
+
+def kernel_analysis(lats, lngs, elevations):
+    lengths, _, angles = polyline_metrics(lats, lngs)
+    distance = np.concatenate([[0], np.cumsum(lengths)])
+    point_angles = np.concatenate([[180], angles, [180]])
+    radius = curvature_radius(distance, point_angles)
+    segments = turn_segments(point_angles, distance, THRESHOLD)
+    return angles, segments, gradients(elevations, lengths, min_length=0.01), radius
+
+def timed(fn, repeats=3):
+    best = float('inf')
+    for _ in range(repeats):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--points', type=int, nargs='+', default=[5000, 50000, 200000])
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(16)
+    failures = 0
+
+    print(f"times in ms (best of 3), sharp turns below {THRESHOLD} degrees")
+    print(f"  {'points':>8} {'loop':>9} {'kernels':>8} {'speedup':>8} {'sharp points':>13} {'segments':>9}  check")
+
+    for n_points in args.points:
+        # Winding road: heading drifts, with occasional hairpins
+        headings = np.cumsum(rng.normal(0, 8, n_points) + np.where(rng.random(n_points) < 0.01, 60, 0))
+        steps = 0.0003 * np.column_stack([np.cos(np.radians(headings)), np.sin(np.radians(headings))])
+        coords = steps.cumsum(axis=0) + [30.0, 78.0]
+        lats, lngs = coords[:, 0].copy(), coords[:, 1].copy()
+        elevations = 500 + np.cumsum(rng.normal(0, 2, n_points))
+
+        loop_time, (angles, sharp, grads) = timed(
+            lambda: loop_analysis(lats.tolist(), lngs.tolist(), elevations.tolist()), repeats=1)
+        kernel_time, (kernel_angles, segments, kernel_grads, radius) = timed(
+            lambda: kernel_analysis(lats, lngs, elevations))
+
+        covered = np.concatenate([np.arange(s, e + 1) for s, e in zip(segments['start'], segments['end'])]) \
+            if len(segments['start']) else np.empty(0, dtype=np.int64)
+        point_angles = np.concatenate([[180], kernel_angles, [180]])
+        ok = (
+            np.allclose(kernel_angles, angles, atol=1e-6) and
+            np.allclose(kernel_grads, grads) and
+            np.array_equal(covered, sharp) and
+            bool((segments['end'][:-1] + 1 < segments['start'][1:]).all()) and
+            np.array_equal(point_angles[segments['apex']], segments['min_angle']) and
+            bool(np.isinf(radius[point_angles == 180]).all())
+        )
+        failures += not ok
+
+        print(f"  {n_points:>8} {loop_time * 1e3:>9.1f} {kernel_time * 1e3:>8.2f} "
+              f"{loop_time / kernel_time:>7.0f}x {len(sharp):>13} {len(segments['start']):>9}  "
+              f"{'OK' if ok else 'MISMATCH'}")
+
+    sys.exit(1 if failures else 0)
+
+if __name__ == '__main__':
+    main()
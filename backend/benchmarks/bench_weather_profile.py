@@ -0,0 +1,148 @@
+#!/usr/bin/env python
+"""
+Benchmark weather interpolation along a route
+
+Compares the per-point dictionary interpolation (a distance matrix, then
+one dict per route point) with the columnar WeatherProfile (a k=2
+KD-tree query and array weights), including building the hazard model's
+feature frame from each. Checks that both give the same weather at every
+point.
+
+Usage (from the backend directory):
+    python benchmarks/bench_weather_profile.py [--points 1000 5000 15000]
+"""
+
+import argparse
+import datetime
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.geo import distance_matrix, to_arrays
+from services.weather_service import (
+    WEATHER_FIELDS, WEATHER_HAZARD_FEATURES, WEATHER_TEXT_FIELDS, interpolate_weather_profile
+)
+
+CONDITIONS = [('Clear', 'clear sky', '01d'), ('Rain', 'light rain', '10d'), ('Fog', 'fog', '50d')]
+
+def make_samples(route_points, rng):
+    """Weather samples at every 20th point, as get_weather_profile fetches them"""
+    samples = []
+    for point in route_points[::20]:
+        condition, description, icon = CONDITIONS[rng.integers(len(CONDITIONS))]
+        samples.append({
+            'location': {'lat': point['lat'], 'lng': point['lng']},
+            'timestamp': datetime.datetime.utcnow(),
+            'temperature': rng.normal(15, 10),
+            'feels_like': rng.normal(15, 10),
+            'humidity': rng.uniform(30, 100),
+            'pressure': rng.normal(1013, 10),
+            'wind_speed': rng.exponential(5),
+            'wind_direction': rng.uniform(0, 360),
+            'cloudiness': rng.uniform(0, 100),
+            'visibility': rng.uniform(0, 10),
+            'precipitation': rng.exponential(1),
+            'weather_condition': condition,
+            'weather_description': description,
+            'weather_icon': icon
+        })
+    return samples
+
+def interpolate_records(route_points, weather_data):
+    """The per-point implementation WeatherProfile replaced"""
+    if len(weather_data) == 1:
+        return [weather_data[0]] * len(route_points)
+
+    all_weather = []
+    point_lats, point_lngs = to_arrays(route_points)
+    sample_lats, sample_lngs = to_arrays([w['location'] for w in weather_data])
+    matrix = distance_matrix(point_lats, point_lngs, sample_lats, sample_lngs)
+    closest = np.argsort(matrix, axis=1, kind='stable')[:, :2]
+
+    for i, point in enumerate(route_points):
+        distances = [(float(matrix[i, j]), weather_data[j]) for j in closest[i]]
+        if distances[0][0] < 5:
+            all_weather.append(distances[0][1])
+            continue
+
+        (d1, w1), (d2, w2) = distances
+        w1_weight = 1 - (d1 / (d1 + d2))
+        w2_weight = 1 - (d2 / (d1 + d2))
+
+        interpolated = {
+            'location': {'lat': point['lat'], 'lng': point['lng']},
+            'timestamp': datetime.datetime.utcnow()
+        }
+        for field in WEATHER_FIELDS:
+            interpolated[field] = w1[field] * w1_weight + w2[field] * w2_weight
+        for field in WEATHER_TEXT_FIELDS:
+            interpolated[field] = w1[field]
+        all_weather.append(interpolated)
+
+    return all_weather
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return time.perf_counter() - start, result
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--points', type=int, nargs='+', default=[1000, 5000, 15000])
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(3)
+    failures = 0
+
+    # Keep the one-off scikit-learn import out of the timings
+    interpolate_weather_profile([{'lat': 0.0, 'lng': 0.0}], [{'location': {'lat': 0.0, 'lng': 0.0},
+                                                             **{f: 0.0 for f in WEATHER_FIELDS}}])
+
+    print("times in ms")
+    print(f"  {'points':>8} {'samples':>8} {'dicts':>10} {'+features':>10} {'profile':>10} "
+          f"{'+features':>10} {'speedup':>8}  check")
+
+    for n_points in args.points:
+        # ~700 m steps, so samples 20 points apart are ~15 km apart and
+        # points between them fall outside the 5 km snap distance
+        steps = rng.normal(0.005, 0.002, size=(n_points, 2)) * rng.choice([-1, 1], size=2)
+        coords = steps.cumsum(axis=0) + [12.97, 77.59]
+        route_points = [{'lat': float(lat), 'lng': float(lng)} for lat, lng in coords]
+        samples = make_samples(route_points, rng)
+
+        records_time, records = timed(lambda: interpolate_records(route_points, samples))
+        records_features_time, _ = timed(lambda: pd.DataFrame([
+            {field: w[field] for field in WEATHER_HAZARD_FEATURES} for w in records
+        ]))
+        profile_time, profile = timed(lambda: interpolate_weather_profile(route_points, samples))
+        profile_features_time, _ = timed(lambda: pd.DataFrame(
+            {field: profile[field] for field in WEATHER_HAZARD_FEATURES}
+        ))
+
+        converted = profile.to_records()
+        sample_ids = {id(sample) for sample in samples}
+        ok = (
+            len(converted) == len(records) and
+            all(np.allclose([w[field] for w in converted], [w[field] for w in records], rtol=1e-9)
+                for field in WEATHER_FIELDS) and
+            all([w[field] for w in converted] == [w[field] for w in records]
+                for field in WEATHER_TEXT_FIELDS) and
+            all((a is b) == (id(b) in sample_ids) for a, b in zip(converted, records))
+        )
+        failures += not ok
+
+        before = records_time + records_features_time
+        after = profile_time + profile_features_time
+        print(f"  {n_points:>8} {len(samples):>8} {records_time * 1e3:>10.1f} {before * 1e3:>10.1f} "
+              f"{profile_time * 1e3:>10.1f} {after * 1e3:>10.1f} {before / after:>7.1f}x  "
+              f"{'OK' if ok else 'MISMATCH'} ({int((~profile.snapped).sum())} interpolated)")
+
+    sys.exit(1 if failures else 0)
+
+if __name__ == '__main__':
+    main()
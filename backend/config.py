@@ -27,10 +27,120 @@ UPLOAD_FOLDER = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'upload
 REPORT_FOLDER = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'reports')
 MODEL_FOLDER = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'ml_models')
 
+# Model artifacts (relative to MODEL_FOLDER)
+MODEL_ARTIFACTS = {
+    'accident_risk': os.path.join('accident_risk', 'model.pkl'),
+    'weather_hazard': os.path.join('weather_hazard', 'model.pkl'),
+    'blind_spot': os.path.join('route_safety', 'blind_spot_model.pkl'),
+    'eta_optimization': os.path.join('eta_optimization', 'model.pkl'),
+    'breakdown_prediction': os.path.join('breakdown_prediction', 'model.pkl'),
+    'breakdown_survival': os.path.join('breakdown_prediction', 'survival_model.pkl')
+}
+
+# Model registry (process-wide model cache)
+MODEL_REGISTRY_CONFIG = {
+    'check_interval': int(os.getenv('MODEL_CHECK_INTERVAL', 30))  # seconds between artifact mtime checks
+}
+
+# Out-of-process model training
+TRAINING_CONFIG = {
+    'max_concurrent_jobs': 1,
+    'timeout': 3600,  # seconds
+    'keep_versions': 3,  # versioned artifacts kept per model
+    'data_chunk_size': 250000,  # rows per synthetic training-data chunk
+    'reload_channel': 'jrm:model_reload'  # Redis pub/sub channel
+}
+
+# Inference engine for tree ensembles: 'native' (sklearn/xgboost) or
+# 'compiled' (packed NumPy node arrays, faster for small batches)
+ML_INFERENCE_CONFIG = {
+    'engine': os.getenv('ML_INFERENCE_ENGINE', 'native'),
+    # With the compiled engine, memory-map the .forest bundle saved next to
+    # each artifact so all workers on a host share one copy of the node arrays
+    'mmap': os.getenv('ML_MODEL_MMAP', 'true').lower() == 'true'
+}
+
+# Heavy ML libraries are imported on first use; optionally warm them up in a
+# background thread once the app has started
+STARTUP_CONFIG = {
+    'preload_imports': os.getenv('PRELOAD_ML_IMPORTS', 'true').lower() == 'true',
+    'preload_modules': ['pandas', 'sklearn.ensemble', 'xgboost', 'lifelines']
+}
+
+# Micro-batching of concurrent accident/weather-hazard scoring requests
+ML_BATCHING_CONFIG = {
+    'enabled': os.getenv('ML_BATCHING_ENABLED', 'true').lower() == 'true',
+    'max_batch_rows': int(os.getenv('ML_BATCH_MAX_ROWS', 1024)),
+    'max_wait_ms': float(os.getenv('ML_BATCH_MAX_WAIT_MS', 2))
+}
+
+# Spatial resolution of each route analysis stage, so work and API calls
+# scale with kilometres driven rather than with polyline density:
+#   'simplify': Douglas-Peucker points within `tolerance` meters of the
+#               polyline, plus a point at least every `max_spacing` km
+#   'distance': first polyline point at or beyond every `interval` km
+#   'resample': points interpolated exactly every `interval` km
+# `max_points` caps a stage on long routes by widening its interval.
+ROUTE_SAMPLING_CONFIG = {
+    'route': {'mode': 'simplify', 'tolerance': 5, 'max_spacing': 0.5},
+    'accident': {'mode': 'distance', 'interval': 1, 'max_points': 500},
+    'weather': {'mode': 'distance', 'interval': 10, 'max_points': 50},
+    'traffic': {'mode': 'distance', 'interval': 2, 'max_points': 50},
+    'blind_spots': {'mode': 'distance', 'interval': 1, 'max_points': 500},
+    'network_coverage': {'mode': 'resample', 'interval': 2, 'max_points': 200},
+    'eco_zones': {'mode': 'resample', 'interval': 5, 'max_points': 50},
+    'historical_accidents': {'mode': 'resample', 'interval': 5, 'max_points': 50},
+    'nearby_facilities': {'mode': 'resample', 'interval': 10, 'max_points': 11}
+}
+
+# Decoded route geometry is stored once per route as packed E7 arrays
+# (12 bytes per point); larger blobs go to GridFS instead of the route
+# document (16 MB limit)
+ROUTE_GEOMETRY_CONFIG = {
+    'inline_max_bytes': 1024 * 1024,  # about 87,000 points
+    'gridfs_collection': 'route_geometry'
+}
+
 # Ensure directories exist
 os.makedirs(UPLOAD_FOLDER, exist_ok=True)
 os.makedirs(REPORT_FOLDER, exist_ok=True)
 
+# Outbound HTTP to external data providers: one keep-alive connection pool
+# per provider, bounded timeouts, jittered exponential backoff on
+# connection errors, timeouts and retryable statuses, and a cap on
+# requests in flight. Provider entries override 'default'.
+HTTP_CLIENT_CONFIG = {
+    'default': {
+        'pool_size': 10,  # keep-alive connections per host
+        'max_concurrency': 8,  # requests in flight per provider and process
+        'connect_timeout': 3.05,  # seconds
+        'read_timeout': 10,  # seconds
+        'retries': 3,
+        'backoff_base': 0.25,  # seconds, doubled per retry (full jitter)
+        'backoff_max': 5,  # seconds
+        'retry_statuses': [429, 500, 502, 503, 504],
+        'rate_limit': None  # requests per second (token bucket), None for no limit
+    },
+    'google_maps': {
+        'max_concurrency': int(os.getenv('GOOGLE_MAPS_MAX_CONCURRENCY', 10)),
+        'rate_limit': float(os.getenv('GOOGLE_MAPS_RATE_LIMIT', 50))
+    },
+    'openweather': {
+        'max_concurrency': int(os.getenv('OPENWEATHER_MAX_CONCURRENCY', 4))
+    }
+}
+
+# Elevation is fetched once per distinct coordinate, rounded to
+# `precision` decimal places (the resolution of Google encoded polylines),
+# and kept in the elevations collection for good since terrain does not
+# change. Missing points are requested in batches of `batch_size` from up
+# to `workers` threads, under the google_maps client's rate limit.
+ELEVATION_CONFIG = {
+    'precision': 5,  # about 1.1 m
+    'batch_size': 100,  # locations per Elevation API request
+    'workers': int(os.getenv('ELEVATION_WORKERS', 4))
+}
+
 # API rate limiting
 RATE_LIMIT = {
     'default': '100 per day, 10 per hour',
@@ -63,7 +173,9 @@ ML_MODEL_CONFIG = {
     'breakdown_prediction': {
         'model_type': 'survival',
         'update_frequency': 24,  # hours
-        'features': ['engine_temp', 'oil_pressure', 'mileage', 'maintenance_history']
+        'features': ['engine_temp', 'oil_pressure', 'mileage', 'maintenance_history'],
+        'score_cache_size': 10000,  # vehicles whose latest score is cached per process
+        'km_per_day': 200  # converts km horizons for survival predictions into days
     },
     'fuel_efficiency': {
         'model_type': 'regression',
@@ -108,6 +220,37 @@ CACHE_CONFIG = {
     }
 }
 
+# Cache of location-derived data (traffic, coverage, zones, ...) keyed by
+# geohash cell: an in-process LRU in front of Redis. Precision 5 cells are
+# about 4.9 km across, 6 about 1.2 x 0.6 km and 7 about 150 m.
+CELL_CACHE_CONFIG = {
+    'enabled': os.getenv('CELL_CACHE_ENABLED', 'true').lower() == 'true',
+    'redis': os.getenv('CELL_CACHE_REDIS', 'true').lower() == 'true',
+    'redis_timeout': 0.2,  # seconds
+    'redis_retry': 30,  # seconds Redis is skipped after an error
+    'memory_entries': int(os.getenv('CELL_CACHE_ENTRIES', 100000)),
+    'key_prefix': 'jrm:cell',
+    'types': {
+        'weather': {'precision': 5, 'ttl': CACHE_CONFIG['expiration']['weather']},
+        'traffic': {'precision': 7, 'ttl': CACHE_CONFIG['expiration']['traffic']},
+        'network_coverage': {'precision': 6, 'ttl': 86400},
+        'eco_zones': {'precision': 6, 'ttl': 7 * 86400},
+        'environmental_hazards': {'precision': 6, 'ttl': 86400},
+        'historical_accidents': {'precision': 7, 'ttl': 86400}
+    }
+}
+
+# In-process index of the stored risk points served by /api/risk/hotspots
+RISK_INDEX_CONFIG = {
+    'refresh_interval': 60,  # seconds between incremental reloads
+    'full_reload_interval': 3600,  # seconds between full reloads (drops deleted routes)
+    'default_radius': 10,  # km
+    'default_limit': 100,
+    'max_limit': 1000,
+    'clusters_per_side': 20,  # default cluster cell is the query extent / this
+    'min_cluster_size': 0.01  # km; smallest cluster cell accepted
+}
+
 # Risk thresholds
 RISK_THRESHOLDS = {
     'accident': {
@@ -130,4 +273,10 @@ RISK_THRESHOLDS = {
         'medium': 6.0,
         'high': 8.0
     }
-}
\ No newline at end of file
+}
+
+# Incremental re-analysis: risk results are stored per fixed-length route
+# segment with a fingerprint of the inputs each segment was computed from
+SEGMENT_ANALYSIS_CONFIG = {
+    'segment_length': 10  # km
+}
@@ -0,0 +1,38 @@
+# backend/models/elevation.py
+import datetime
+from pymongo import UpdateOne
+from . import db
+
+class Elevation:
+    """
+    Elevation samples keyed by quantized coordinate
+    
+    _id is the integer coordinate key from services.elevation; samples
+    never expire since terrain does not change, so routes along known
+    corridors need no Elevation API calls.
+    """
+    collection = db.elevations
+    
+    @staticmethod
+    def get_many(keys):
+        """Stored elevation (meters) of the given keys, as a dictionary of the keys found"""
+        return {
+            document['_id']: document['elevation']
+            for document in db.elevations.find({'_id': {'$in': list(keys)}}, {'elevation': 1})
+        }
+    
+    @staticmethod
+    def save_many(keys, lats, lngs, elevations):
+        """Store elevations of quantized coordinates (keys already stored are kept)"""
+        if not keys:
+            return
+    
+        now = datetime.datetime.utcnow()
+        db.elevations.bulk_write([
+            UpdateOne(
+                {'_id': key},
+                {'$setOnInsert': {'lat': lat, 'lng': lng, 'elevation': elevation, 'created_at': now}},
+                upsert=True
+            )
+            for key, lat, lng, elevation in zip(keys, lats, lngs, elevations)
+        ], ordered=False)
@@ -2,6 +2,7 @@
 # backend/models/risk_data.py
 import datetime
 from . import db
+from .risk_point import RiskPoint
 
 class RiskData:
     collection = db.risk_data
@@ -40,26 +41,29 @@ class RiskData:
         return db.risk_data.find_one({'route_id': route_id})
     
     @staticmethod
-    def update(route_id, data):
-        """Update risk data"""
+    def update(route_id, data, user_id=None):
+        """Update risk data (user_id: route owner, saves looking it up for risk_points)"""
         data['last_updated'] = datetime.datetime.utcnow()
         db.risk_data.update_one(
             {'route_id': route_id},
             {'$set': data}
         )
+        RiskPoint.replace_route_points(route_id, data, user_id=user_id)
     
     @staticmethod
-    def add_risk_point(route_id, risk_type, risk_data):
+    def add_risk_point(route_id, risk_type, risk_data, user_id=None):
         """Add a risk point to a specific risk category"""
         update_field = f'{risk_type}'
         
-        return db.risk_data.update_one(
+        result = db.risk_data.update_one(
             {'route_id': route_id},
             {
                 '$push': {update_field: risk_data},
                 '$set': {'last_updated': datetime.datetime.utcnow()}
             }
         )
+        RiskPoint.add_point(route_id, update_field, risk_data, user_id=user_id)
+        return result
     
     @staticmethod
     def update_risk_score(route_id, overall_score, risk_level):
@@ -0,0 +1,230 @@
+# backend/models/risk_point.py
+import datetime
+from bson.objectid import ObjectId
+from pymongo.errors import DuplicateKeyError
+from . import db
+from services.geo import bbox_filter
+
+# migrations document marking a started or finished backfill
+BACKFILL_MARKER = 'risk_points_backfill'
+
+# risk_data arrays mirrored into risk_points and the category of each
+RISK_POINT_CATEGORIES = {
+    'accident_risks': 'accident',
+    'weather_hazards': 'weather',
+    'elevation_risks': 'elevation',
+    'blind_spots': 'blind_spot',
+    'network_coverage': 'network',
+    'eco_sensitive_zones': 'eco_zone'
+}
+
+class RiskPoint:
+    """
+    Flat, geo-indexed copy of the risk points nested in risk_data
+    
+    One document per point with its route, owner, category, level and a
+    GeoJSON location, so heatmaps, alerts and area queries run as single
+    indexed queries instead of loading and walking every risk_data
+    document. risk_data stays the source of truth; RiskData writes keep
+    this collection in step.
+    """
+    collection = db.risk_points
+    
+    @staticmethod
+    def ensure_indexes():
+        """Create the geospatial and compound indexes (idempotent)"""
+        db.risk_points.create_index([('location', '2dsphere')])
+        db.risk_points.create_index([('category', 1), ('level', 1), ('location', '2dsphere')])
+        db.risk_points.create_index([('route_id', 1), ('category', 1), ('level', 1)])
+        db.risk_points.create_index([('user_id', 1), ('category', 1), ('level', 1)])
+    
+    @staticmethod
+    def to_document(route_id, user_id, category, risk, now):
+        """Risk point document for one entry of a risk_data array (None if it has no location)"""
+        location = risk.get('location') or risk.get('coordinates')
+        if not location or location.get('lat') is None or location.get('lng') is None:
+            return None
+    
+        return {
+            'route_id': route_id,
+            'user_id': user_id,
+            'category': category,
+            'level': risk.get('risk_level'),
+            'location': {'type': 'Point', 'coordinates': [location['lng'], location['lat']]},
+            'details': {k: v for k, v in risk.items() if k not in ('location', 'coordinates', 'risk_level')},
+            'created_at': now,
+            'updated_at': now
+        }
+    
+    @staticmethod
+    def route_owner(route_id):
+        """user_id of the route a risk point belongs to"""
+        route = db.routes.find_one({'route_id': route_id}, {'user_id': 1})
+        return route.get('user_id') if route else None
+    
+    @staticmethod
+    def replace_route_points(route_id, data, user_id=None):
+        """
+        Mirror the risk arrays of a risk_data update
+    
+        The new points are inserted under a batch tag of their own before
+        the route's previous points of those categories are deleted, so
+        readers never find the route without points (at worst both sets
+        for a moment) and a failed insert keeps the previous points.
+    
+        Args:
+            route_id: Route the arrays belong to
+            data: risk_data fields being set; only those in
+                RISK_POINT_CATEGORIES are mirrored, each replacing the
+                route's points of that category
+            user_id: Route owner (looked up only if not given)
+    
+        Returns:
+            Number of risk points written
+        """
+        categories = {RISK_POINT_CATEGORIES[field]: risks for field, risks in data.items()
+                      if field in RISK_POINT_CATEGORIES}
+    
+        if not categories:
+            return 0
+    
+        if user_id is None:
+            user_id = RiskPoint.route_owner(route_id)
+    
+        now = datetime.datetime.utcnow()
+        batch = ObjectId()
+        documents = [
+            {**document, 'batch': batch}
+            for category, risks in categories.items()
+            for document in (RiskPoint.to_document(route_id, user_id, category, risk, now) for risk in risks or [])
+            if document is not None
+        ]
+    
+        if documents:
+            try:
+                db.risk_points.insert_many(documents, ordered=False)
+            except Exception:
+                # Drop whatever part of the batch made it in
+                db.risk_points.delete_many({'route_id': route_id, 'batch': batch})
+                raise
+    
+        db.risk_points.delete_many({
+            'route_id': route_id,
+            'category': {'$in': list(categories)},
+            'batch': {'$ne': batch}
+        })
+    
+        return len(documents)
+    
+    @staticmethod
+    def add_point(route_id, field, risk, user_id=None):
+        """Mirror one point pushed onto a risk_data array (user_id looked up only if not given)"""
+        if field not in RISK_POINT_CATEGORIES:
+            return
+    
+        if user_id is None:
+            user_id = RiskPoint.route_owner(route_id)
+    
+        document = RiskPoint.to_document(
+            route_id, user_id, RISK_POINT_CATEGORIES[field], risk, datetime.datetime.utcnow()
+        )
+        if document is not None:
+            db.risk_points.insert_one(document)
+    
+    @staticmethod
+    def delete_by_route(route_id):
+        """Delete all risk points of a route"""
+        return db.risk_points.delete_many({'route_id': route_id})
+    
+    @staticmethod
+    def count_by_category(route_ids, categories=None):
+        """
+        Number of risk points per category and level over a set of routes
+    
+        Returns:
+            Dictionary of category -> {level: count}
+        """
+        match = {'route_id': {'$in': list(route_ids)}}
+        if categories:
+            match['category'] = {'$in': list(categories)}
+    
+        counts = {}
+        for row in db.risk_points.aggregate([
+            {'$match': match},
+            {'$group': {'_id': {'category': '$category', 'level': '$level'}, 'count': {'$sum': 1}}}
+        ]):
+            counts.setdefault(row['_id']['category'], {})[row['_id'].get('level')] = row['count']
+    
+        return counts
+    
+    @staticmethod
+    def find(route_ids=None, categories=None, levels=None, bbox=None, projection=None):
+        """
+        Risk points matching the given filters
+    
+        Args:
+            route_ids: Optional routes to restrict to
+            categories: Optional categories to restrict to
+            levels: Optional risk levels to restrict to ('High', ...)
+            bbox: Optional (south, west, north, east) box (west > east
+                crosses the antimeridian), narrowed by the 2dsphere index
+            projection: Optional fields to return
+        """
+        query = {}
+        if route_ids is not None:
+            query['route_id'] = {'$in': list(route_ids)}
+        if categories:
+            query['category'] = {'$in': list(categories)}
+        if levels:
+            query['level'] = {'$in': list(levels)}
+        if bbox:
+            query.update(bbox_filter('location', *bbox))
+    
+        return db.risk_points.find(query, projection)
+    
+    @staticmethod
+    def backfill():
+        """
+        Fill risk_points from risk_data once (the init-risk-points command
+        after upgrading)
+    
+        A marker document in migrations makes a second or concurrent run a
+        no-op; it is removed again if the backfill fails, so it can be
+        retried. Each route's points are replaced, never appended, so
+        routes written by the app meanwhile are not duplicated.
+    
+        Returns:
+            Number of risk points written, or None if the backfill already
+            ran or is running
+        """
+        try:
+            db.migrations.insert_one({
+                '_id': BACKFILL_MARKER, 'status': 'running', 'started_at': datetime.datetime.utcnow()
+            })
+        except DuplicateKeyError:
+            return None
+    
+        try:
+            written = RiskPoint._copy_from_risk_data()
+        except Exception:
+            db.migrations.delete_one({'_id': BACKFILL_MARKER})
+            raise
+    
+        db.migrations.update_one({'_id': BACKFILL_MARKER}, {'$set': {
+            'status': 'completed', 'points': written, 'completed_at': datetime.datetime.utcnow()
+        }})
+        return written
+    
+    @staticmethod
+    def _copy_from_risk_data():
+        owners = {route['route_id']: route.get('user_id')
+                  for route in db.routes.find({}, {'route_id': 1, 'user_id': 1})}
+        projection = {'route_id': 1, **{field: 1 for field in RISK_POINT_CATEGORIES}}
+        written = 0
+    
+        for risk_data in db.risk_data.find({}, projection):
+            route_id = risk_data['route_id']
+            data = {field: risk_data.get(field) or [] for field in RISK_POINT_CATEGORIES}
+            written += RiskPoint.replace_route_points(route_id, data, user_id=owners.get(route_id))
+    
+        return written
@@ -1,8 +1,14 @@
 # backend/models/route.py
 import datetime
 import uuid
+import gridfs
 from . import db
+from bson.binary import Binary
 from bson.objectid import ObjectId
+from config import ROUTE_GEOMETRY_CONFIG
+
+# Route fields without the packed geometry, for lists and API responses
+SUMMARY_PROJECTION = {'geometry': 0}
 
 class Route:
     collection = db.routes
@@ -38,9 +44,9 @@ class Route:
         return route
     
     @staticmethod
-    def get_by_id(route_id):
-        """Get route by ID"""
-        return db.routes.find_one({'route_id': route_id})
+    def get_by_id(route_id, include_geometry=False):
+        """Get route by ID (without its packed geometry unless asked)"""
+        return db.routes.find_one({'route_id': route_id}, None if include_geometry else SUMMARY_PROJECTION)
     
     @staticmethod
     def get_by_user(user_id, limit=10, skip=0):
@@ -48,12 +54,20 @@ class Route:
         if isinstance(user_id, str):
             user_id = ObjectId(user_id)
             
-        cursor = db.routes.find({'user_id': user_id}).sort(
+        cursor = db.routes.find({'user_id': user_id}, SUMMARY_PROJECTION).sort(
             'created_at', -1
         ).skip(skip).limit(limit)
         
         return list(cursor)
     
+    @staticmethod
+    def get_route_ids_by_user(user_id):
+        """route_id of every route of a user"""
+        if isinstance(user_id, str):
+            user_id = ObjectId(user_id)
+            
+        return [route['route_id'] for route in db.routes.find({'user_id': user_id}, {'route_id': 1})]
+    
     @staticmethod
     def update_status(route_id, status):
         """Update route status"""
@@ -74,7 +88,64 @@ class Route:
             {'$set': details}
         )
     
+    @staticmethod
+    def save_geometry(route_id, packed):
+        """
+        Store a route's packed geometry (RouteGeometry.to_packed())
+        
+        Kept inline as BSON binary up to ROUTE_GEOMETRY_CONFIG's
+        inline_max_bytes, in GridFS beyond that. A previously stored
+        GridFS file is replaced.
+        """
+        fs = gridfs.GridFS(db, collection=ROUTE_GEOMETRY_CONFIG['gridfs_collection'])
+        previous = db.routes.find_one({'route_id': route_id}, {'geometry.file_id': 1})
+        
+        geometry = {key: value for key, value in packed.items() if key != 'data'}
+        if len(packed['data']) > ROUTE_GEOMETRY_CONFIG['inline_max_bytes']:
+            geometry['file_id'] = fs.put(packed['data'], route_id=route_id, encoding=packed['encoding'])
+        else:
+            geometry['data'] = Binary(packed['data'])
+        
+        db.routes.update_one(
+            {'route_id': route_id},
+            {'$set': {'geometry': geometry}}
+        )
+        
+        previous_file = ((previous or {}).get('geometry') or {}).get('file_id')
+        if previous_file:
+            fs.delete(previous_file)
+    
+    @staticmethod
+    def load_geometry(route):
+        """
+        Packed geometry of a route document, with its data as bytes
+        
+        Fetches the geometry field if the document was loaded without it.
+        Returns None for routes with no stored geometry.
+        """
+        if 'geometry' in route:
+            geometry = route['geometry']
+        else:
+            stored = db.routes.find_one({'route_id': route['route_id']}, {'geometry': 1})
+            geometry = (stored or {}).get('geometry')
+        
+        if not geometry:
+            return None
+        
+        if 'file_id' in geometry:
+            fs = gridfs.GridFS(db, collection=ROUTE_GEOMETRY_CONFIG['gridfs_collection'])
+            data = fs.get(geometry['file_id']).read()
+        else:
+            data = geometry['data']
+        
+        return {**geometry, 'data': data}
+    
     @staticmethod
     def delete(route_id):
-        """Delete a route"""
+        """Delete a route and its stored geometry"""
+        route = db.routes.find_one({'route_id': route_id}, {'geometry.file_id': 1})
+        file_id = ((route or {}).get('geometry') or {}).get('file_id')
+        if file_id:
+            gridfs.GridFS(db, collection=ROUTE_GEOMETRY_CONFIG['gridfs_collection']).delete(file_id)
+        
         return db.routes.delete_one({'route_id': route_id})
\ No newline at end of file
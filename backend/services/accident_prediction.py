@@ -1,98 +1,118 @@
 # backend/services/accident_prediction.py
-import os
 import numpy as np
-import pandas as pd
-import pickle
 import datetime
-from sklearn.ensemble import RandomForestClassifier
 from flask import current_app
-from config import MODEL_FOLDER
+from services.coordinate_join import CoordinateIndex, join_records
+from services.lazy_imports import lazy_import
+from services.model_registry import get_model, get_model_version, save_model
+from services.route_geometry import RouteGeometry
+
+pd = lazy_import('pandas')
 
 def predict_accident_risks(route_points):
     """
     Predict accident risks for route points
     
     Args:
-        route_points: List of dictionaries with lat, lng coordinates
+        route_points: RouteGeometry or list of dictionaries with lat, lng coordinates
         
     Returns:
         List of accident risk points with risk level and probability
     """
-    # Load pre-trained model
-    model_path = os.path.join(MODEL_FOLDER, 'accident_risk', 'model.pkl')
-    
-    try:
-        with open(model_path, 'rb') as f:
-            model = pickle.load(f)
-    except (FileNotFoundError, EOFError):
-        # If model doesn't exist, train a new one
-        model = train_accident_model()
-    
-    # Prepare input data
-    if not route_points:
+    route = RouteGeometry.from_points(route_points)
+    if not len(route):
         return []
     
+    sampled, feature_df = accident_features(route)
+    return [risk for _, risk in accident_risks_from_features(route, sampled, feature_df)]
+
+def accident_features(route):
+    """
+    Model features at the route points sampled for accident prediction
+    
+    Args:
+        route: RouteGeometry
+        
+    Returns:
+        Tuple of (sampled point indices, DataFrame with one feature row per
+        sampled point)
+    """
     # Get current time
     now = datetime.datetime.utcnow()
     
-    # Get weather data for points
-    from services.weather_service import get_weather_data
-    weather_data = get_weather_data(route_points)
+    # Get weather along the route (arrays aligned with route_points)
+    from services.weather_service import get_weather_profile
+    weather = get_weather_profile(route)
     
     # Get traffic data for points
     from services.google_maps import get_traffic_data
-    traffic_data = get_traffic_data(route_points)
+    traffic_data = get_traffic_data(route)
+    
+    # Only process a sample of points for efficiency (about one per km)
+    sampled = route.stage_indices('accident')
+    
+    # Traffic sample at each point, joined on coordinate keys
+    traffic_index = CoordinateIndex.from_locations(traffic_data)
+    sampled_traffic = join_records(
+        traffic_data, traffic_index.lookup(route.lats[sampled], route.lngs[sampled]), default={}
+    )
     
     # Prepare features for each point
     features = []
     
-    for i, point in enumerate(route_points):
-        # Only process a sample of points for efficiency (every 10th point)
-        if i % 10 != 0:
-            continue
-        
-        # Get weather for this point
-        point_weather = next((w for w in weather_data if 
-                              w['location']['lat'] == point['lat'] and 
-                              w['location']['lng'] == point['lng']), {})
-        
-        # Get traffic for this point
-        point_traffic = next((t for t in traffic_data if 
-                             t['location']['lat'] == point['lat'] and 
-                             t['location']['lng'] == point['lng']), {})
+    for i, point_traffic in zip(sampled.tolist(), sampled_traffic):
+        point = route.point(i)
         
         # Extract features
-        feature_dict = {
+        features.append({
             'hour_of_day': now.hour,
             'day_of_week': now.weekday(),
             'is_weekend': 1 if now.weekday() >= 5 else 0,
             'is_holiday': 0,  # Would need holiday API
             'latitude': point['lat'],
             'longitude': point['lng'],
-            'precipitation': point_weather.get('precipitation', 0),
-            'temperature': point_weather.get('temperature', 20),
-            'visibility': point_weather.get('visibility', 10),
-            'wind_speed': point_weather.get('wind_speed', 0),
+            'precipitation': float(weather['precipitation'][i]) if weather else 0,
+            'temperature': float(weather['temperature'][i]) if weather else 20,
+            'visibility': float(weather['visibility'][i]) if weather else 10,
+            'wind_speed': float(weather['wind_speed'][i]) if weather else 0,
             'traffic_congestion': point_traffic.get('congestion_level', 0),
             'speed_limit': point_traffic.get('speed_limit', 50),
             'road_type': encode_road_type(point_traffic.get('road_type', 'unknown'))
-        }
+        })
+    
+    return sampled, pd.DataFrame(features)
+
+def accident_risks_from_features(route, sampled, feature_df, rows=None):
+    """
+    Score accident features and build the risk points
+    
+    Args:
+        route: RouteGeometry the features were built for
+        sampled: Route point index of each feature row
+        feature_df: DataFrame from accident_features
+        rows: Optional positions of the feature rows to score (all by default)
         
-        features.append((point, feature_dict))
+    Returns:
+        List of (feature row position, accident risk point) pairs
+    """
+    rows = np.arange(len(feature_df)) if rows is None else np.asarray(rows, dtype=np.int64)
     
-    if not features:
+    if not len(rows):
         return []
     
-    # Convert to DataFrame
-    feature_df = pd.DataFrame([f[1] for f in features])
+    # Get pre-trained model (trained on first use if missing)
+    model = get_model('accident_risk', trainer=train_accident_model)
     
-    # Make predictions
-    probabilities = model.predict_proba(feature_df)
+    # Make predictions (coalesced with concurrent route jobs)
+    from services.inference_batcher import predict_proba
+    scored = feature_df.iloc[rows]
+    probabilities = predict_proba('accident_risk', model, scored)
     
     # Process results
     accident_risks = []
     
-    for i, (point, _) in enumerate(features):
+    for i, (row, features) in enumerate(zip(rows.tolist(), scored.to_dict('records'))):
+        point = route.point(sampled[row])
         probability = float(probabilities[i][1])  # Probability of accident
         
         # Determine risk level
@@ -103,18 +123,57 @@ def predict_accident_risks(route_points):
         else:
             risk_level = 'Low'
         
-        accident_risks.append({
+        accident_risks.append((row, {
             'location': {
                 'lat': point['lat'],
                 'lng': point['lng']
             },
             'risk_level': risk_level,
             'probability': round(probability, 3),
-            'factors': get_risk_factors(features[i][1], probability)
-        })
+            'factors': get_risk_factors(features, probability)
+        }))
     
     return accident_risks
 
+def reanalyze_accident_risks(route, risk_data):
+    """
+    Accident risks per route segment, re-predicting only the segments
+    whose inputs (coordinates, weather, traffic, time features or model
+    version) changed since the stored results
+    
+    Args:
+        route: RouteGeometry
+        risk_data: Stored risk_data document (or None)
+        
+    Returns:
+        Tuple of (accident risk points, segment fingerprints, number of
+        segments recomputed)
+    """
+    from services.segment_analysis import (fingerprints, geometry_fingerprint_columns, reanalyze,
+                                           segment_bounds, segment_of)
+    
+    get_model('accident_risk', trainer=train_accident_model)
+    
+    sampled, feature_df = accident_features(route)
+    bounds = segment_bounds(route)
+    segments = segment_of(sampled, bounds)
+    
+    segment_fingerprints = fingerprints(
+        segments, len(bounds) - 1,
+        geometry_fingerprint_columns(route, sampled) + [feature_df[column].to_numpy() for column in feature_df.columns],
+        'accident_risk', get_model_version('accident_risk')
+    )
+    
+    def compute(changed):
+        rows = np.flatnonzero(np.isin(segments, changed))
+        return [
+            {**risk, 'segment': int(segments[row])}
+            for row, risk in accident_risks_from_features(route, sampled, feature_df, rows)
+        ]
+    
+    accident_risks, recomputed = reanalyze(risk_data, 'accident_risks', segment_fingerprints, compute)
+    return accident_risks, segment_fingerprints, recomputed
+
 def train_accident_model():
     """Train a new accident prediction model"""
     current_app.logger.info("Training new accident prediction model")
@@ -160,25 +219,23 @@ def train_accident_model():
     y = np.random.binomial(1, accident_prob)
     
     # Train model
+    from sklearn.ensemble import RandomForestClassifier
     model = RandomForestClassifier(n_estimators=100, random_state=42)
     model.fit(X, y)
     
-    # Save model
-    os.makedirs(os.path.join(MODEL_FOLDER, 'accident_risk'), exist_ok=True)
-    model_path = os.path.join(MODEL_FOLDER, 'accident_risk', 'model.pkl')
-    
-    with open(model_path, 'wb') as f:
-        pickle.dump(model, f)
+    # Save model and swap it into the registry
+    save_model('accident_risk', model)
     
     return model
 
 def update_accident_model():
     """Update the accident prediction model with new data"""
-    current_app.logger.info("Updating accident prediction model")
-    
     # In a real-world scenario, you would fetch new accident data
     # and update the model. For demonstration, just train a new model.
-    train_accident_model()
+    # Training runs in a separate process and the new artifact is swapped in
+    # by every serving process once it lands.
+    from services.model_training import submit_training
+    return submit_training('accident_risk')
 
 def encode_road_type(road_type):
     """Encode road type as integer"""
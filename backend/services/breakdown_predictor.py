@@ -1,13 +1,14 @@
 # backend/services/breakdown_predictor.py
-import os
+import collections
+import threading
 import numpy as np
-import pandas as pd
-import pickle
 import datetime
-from sklearn.ensemble import RandomForestClassifier
-from lifelines import CoxPHFitter
 from flask import current_app
-from config import MODEL_FOLDER
+from config import TRAINING_CONFIG, ML_MODEL_CONFIG
+from services.lazy_imports import lazy_import
+from services.model_registry import get_model, get_model_metadata, get_model_version, save_model
+
+pd = lazy_import('pandas')
 
 def predict_breakdown_probability(vehicle, telemetry, maintenance_history):
     """
@@ -21,23 +22,241 @@ def predict_breakdown_probability(vehicle, telemetry, maintenance_history):
     Returns:
         Probability of breakdown in the next 100 km
     """
-    # Load model
-    model_path = os.path.join(MODEL_FOLDER, 'breakdown_prediction', 'model.pkl')
+    return predict_breakdown_probabilities([(vehicle, telemetry, maintenance_history)])[0]
+
+def predict_breakdown_probabilities(fleet):
+    """
+    Predict breakdown probabilities for many vehicles in one model call
+    
+    Scores are cached per vehicle and reused until the vehicle's latest
+    telemetry, its maintenance records (tracked by `last_updated`), the
+    model version or the day changes; only the remaining vehicles are
+    scored.
+    
+    Args:
+        fleet: List of (vehicle, latest telemetry, maintenance history) tuples
+        
+    Returns:
+        List of breakdown probabilities, in the order of `fleet`
+    """
+    if not fleet:
+        return []
     
-    try:
-        with open(model_path, 'rb') as f:
-            model = pickle.load(f)
-    except (FileNotFoundError, EOFError):
-        # If model doesn't exist, train a new one
-        model = train_breakdown_model()
+    # Get model (trained on first use if missing)
+    model = get_model('breakdown_prediction', trainer=train_breakdown_model)
+    model_version = get_model_version('breakdown_prediction')
+    today = datetime.datetime.utcnow().date()
     
-    # Prepare features
-    features = prepare_breakdown_features(vehicle, telemetry, maintenance_history)
+    probabilities = [None] * len(fleet)
+    misses = []
     
-    # Make prediction
-    probability = model.predict_proba(pd.DataFrame([features]))[0][1]
+    for i, (vehicle, telemetry, maintenance_history) in enumerate(fleet):
+        key = vehicle.get('_id')
+        fingerprint = _score_fingerprint(vehicle, telemetry, maintenance_history, model_version, today)
+        
+        cached = _score_cache.get(key) if key is not None else None
+        if cached and cached[0] == fingerprint:
+            probabilities[i] = cached[1]
+        else:
+            misses.append((i, key, fingerprint))
+    
+    _score_cache.record(len(fleet) - len(misses), len(misses))
     
-    return probability
+    if misses:
+        # Build the feature matrix for every uncached vehicle at once
+        features = pd.DataFrame([
+            prepare_breakdown_features(*fleet[i]) for i, _, _ in misses
+        ])
+        scores = model.predict_proba(features)[:, 1]
+        
+        for (i, key, fingerprint), score in zip(misses, scores):
+            probabilities[i] = float(score)
+            if key is not None:
+                _score_cache.put(key, (fingerprint, float(score)))
+    
+    return probabilities
+
+def get_breakdown_cache_stats():
+    """Get hit/miss counters of the per-vehicle score cache"""
+    return _score_cache.stats()
+
+def _score_fingerprint(vehicle, telemetry, maintenance_history, model_version, today):
+    """Identify everything a cached breakdown score depends on"""
+    telemetry = telemetry or {}
+    return (
+        telemetry.get('_id'),
+        telemetry.get('timestamp'),
+        vehicle.get('last_updated'),
+        len(maintenance_history),
+        model_version,
+        # days_since_service and vehicle_age move with the calendar
+        today
+    )
+
+class _ScoreCache:
+    """Thread-safe LRU of vehicle id -> (fingerprint, probability)"""
+    
+    def __init__(self, max_entries):
+        self.max_entries = max_entries
+        self._entries = collections.OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+    
+    def get(self, key):
+        with self._lock:
+            value = self._entries.get(key)
+            if value is not None:
+                self._entries.move_to_end(key)
+            return value
+    
+    def put(self, key, value):
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+    
+    def record(self, hits, misses):
+        with self._lock:
+            self._hits += hits
+            self._misses += misses
+    
+    def stats(self):
+        with self._lock:
+            return {
+                'entries': len(self._entries),
+                'hits': self._hits,
+                'misses': self._misses
+            }
+
+_score_cache = _ScoreCache(ML_MODEL_CONFIG['breakdown_prediction']['score_cache_size'])
+
+def predict_breakdown_within(fleet, horizon, unit='days', km_per_day=None):
+    """
+    Predict the probability of breakdown within the next N days or km
+    
+    Uses the CoxPH survival model through its exported SurvivalTable, so a
+    whole fleet costs one matrix product and one interpolation.
+    
+    Args:
+        fleet: List of (vehicle, latest telemetry, maintenance history) tuples
+        horizon: Look-ahead as a number, or a list of numbers for a
+            survival curve per vehicle
+        unit: 'days' or 'km'
+        km_per_day: Distance driven per day used to convert km horizons
+            (defaults to ML_MODEL_CONFIG['breakdown_prediction']['km_per_day'])
+        
+    Returns:
+        Array of probabilities with shape (vehicles,) for a single horizon
+        or (vehicles, horizons) for a list
+        
+    Raises:
+        ValueError for an unknown unit, or if the model uses a covariate
+        prepare_breakdown_features does not produce
+    """
+    if unit not in ('days', 'km'):
+        raise ValueError(f"Unknown horizon unit: {unit}")
+    
+    horizons = np.atleast_1d(np.asarray(horizon, dtype=np.float64))
+    if not fleet:
+        return np.empty((0,) if np.ndim(horizon) == 0 else (0, len(horizons)))
+    
+    if unit == 'km':
+        km_per_day = km_per_day or ML_MODEL_CONFIG['breakdown_prediction']['km_per_day']
+        horizons = horizons / km_per_day
+    
+    table = get_survival_table()
+    features = [prepare_breakdown_features(*entry) for entry in fleet]
+    
+    # Columns in the order of the model's coefficients
+    missing = [name for name in table.features if name not in features[0]]
+    if missing:
+        raise ValueError(f"Survival model covariates missing from breakdown features: {', '.join(missing)}")
+    X = np.array([[f[name] for name in table.features] for f in features], dtype=np.float64)
+    
+    probabilities = table.breakdown_probability(X, horizons)
+    
+    return probabilities[:, 0] if np.ndim(horizon) == 0 else probabilities
+
+def get_survival_table():
+    """Get the SurvivalTable for the currently served CoxPH model"""
+    global _survival_table
+    
+    model = get_model('breakdown_survival', trainer=train_survival_model)
+    version = get_model_version('breakdown_survival')
+    
+    cached = _survival_table
+    if cached is None or cached[0] != version or cached[1] is not model:
+        mean = get_model_metadata('breakdown_survival').get('covariate_mean')
+        if mean is None:
+            # Saved before the covariate means went into the sidecar
+            current_app.logger.info("Retraining breakdown survival model to record its covariate means")
+            model = train_survival_model()
+            version = get_model_version('breakdown_survival')
+            mean = get_model_metadata('breakdown_survival')['covariate_mean']
+        table = SurvivalTable.from_cox(model, mean)
+        _survival_table = cached = (version, model, table)
+    
+    return cached[2]
+
+class SurvivalTable:
+    """
+    CoxPH survival model exported to flat NumPy arrays
+    
+    For covariates x the cumulative hazard is
+    H(t | x) = H0(t) * exp((x - mean) . coefficients), with the baseline
+    H0 linearly interpolated between the fitted event times exactly as
+    lifelines does, so the breakdown probability by t is 1 - exp(-H).
+    """
+    
+    def __init__(self, times, baseline_hazard, coefficients, mean, features):
+        self.times = np.ascontiguousarray(times, dtype=np.float64)
+        self.baseline_hazard = np.ascontiguousarray(baseline_hazard, dtype=np.float64)
+        self.coefficients = np.ascontiguousarray(coefficients, dtype=np.float64)
+        self.mean = np.ascontiguousarray(mean, dtype=np.float64)
+        self.features = list(features)
+    
+    @classmethod
+    def from_cox(cls, cph, mean):
+        """
+        Export a fitted lifelines CoxPHFitter
+        
+        Args:
+            cph: The fitted model
+            mean: Covariate -> mean over the frame it was fitted on, which
+                lifelines centers the covariates by (see covariate_means)
+        """
+        baseline = cph.baseline_cumulative_hazard_.iloc[:, 0]
+        features = list(cph.params_.index)
+        
+        return cls(
+            times=baseline.index.values,
+            baseline_hazard=baseline.values,
+            coefficients=cph.params_[features].values,
+            mean=[mean[name] for name in features],
+            features=features
+        )
+    
+    def partial_hazard(self, X):
+        """exp((x - mean) . coefficients) for each row of X"""
+        return np.exp((np.asarray(X, dtype=np.float64) - self.mean) @ self.coefficients)
+    
+    def cumulative_hazard(self, X, times):
+        """
+        Cumulative hazard for each row of X at the given times
+        
+        `times` may be 1-D (the same horizons for every row) or 2-D with
+        one row of horizons per row of X; the result has shape (rows, times).
+        """
+        baseline = np.interp(times, self.times, self.baseline_hazard)
+        return baseline * self.partial_hazard(X)[:, None]
+    
+    def breakdown_probability(self, X, times):
+        """Probability of breakdown before each time, i.e. 1 - S(t | x)"""
+        return -np.expm1(-self.cumulative_hazard(X, times))
+
+_survival_table = None
 
 def prepare_breakdown_features(vehicle, telemetry, maintenance_history):
     """Prepare features for breakdown prediction"""
@@ -146,67 +365,105 @@ def train_breakdown_model():
     y = np.random.binomial(1, breakdown_prob)
     
     # Train model
+    from sklearn.ensemble import RandomForestClassifier
     model = RandomForestClassifier(n_estimators=100, random_state=42)
     model.fit(X, y)
     
-    # Save model
-    os.makedirs(os.path.join(MODEL_FOLDER, 'breakdown_prediction'), exist_ok=True)
-    model_path = os.path.join(MODEL_FOLDER, 'breakdown_prediction', 'model.pkl')
-    
-    with open(model_path, 'wb') as f:
-        pickle.dump(model, f)
+    # Save model and swap it into the registry
+    save_model('breakdown_prediction', model)
     
     return model
 
-def train_survival_model():
+def train_survival_model(n_samples=5000):
     """Train a survival analysis model for breakdown prediction"""
     # Create synthetic survival data
-    np.random.seed(42)
-    n_samples = 5000
+    df = generate_survival_training_data(n_samples)
     
-    # Generate features
-    data = {
-        'vehicle_age': np.random.randint(0, 20, n_samples),
-        'days_since_service': np.random.randint(0, 500, n_samples),
-        'engine_temp': np.random.normal(90, 15, n_samples),
-        'oil_pressure': np.random.normal(30, 10, n_samples),
-        'battery_voltage': np.random.normal(12, 1, n_samples),
-        'maintenance_issues': np.random.randint(0, 5, n_samples),
-        'vehicle_type': np.random.randint(0, 6, n_samples)
-    }
+    # Train Cox model
+    from lifelines import CoxPHFitter
+    cph = CoxPHFitter()
+    cph.fit(df, duration_col='duration', event_col='observed')
     
-    # Generate time to breakdown
-    baseline_time = np.random.exponential(1000, n_samples)
+    # Save model and swap it into the registry, with the covariate means
+    # SurvivalTable needs alongside it
+    save_model('breakdown_survival', cph, {'covariate_mean': covariate_means(df)})
     
-    # Modify time based on features
-    for i in range(n_samples):
-        vehicle_age_factor = 0.9 ** data['vehicle_age'][i]
-        service_factor = 0.95 ** (data['days_since_service'][i] / 30)
-        temp_factor = 0.8 if data['engine_temp'][i] > 110 else 1.0
-        oil_factor = 0.7 if data['oil_pressure'][i] < 15 else 1.0
-        
-        baseline_time[i] *= vehicle_age_factor * service_factor * temp_factor * oil_factor
+    return cph
+
+def covariate_means(df, duration_col='duration', event_col='observed'):
+    """Mean of each covariate of a survival training frame (as CoxPHFitter centers them)"""
+    # In float64, as lifelines fits; float32 columns would otherwise average in float32
+    covariates = df.drop(columns=[duration_col, event_col]).astype(np.float64)
+    return {name: float(value) for name, value in covariates.mean().items()}
+
+def generate_survival_training_data(n_samples=5000, random_state=42, chunk_size=None):
+    """
+    Generate synthetic time-to-breakdown data for the survival model
     
-    # Generate censored indicator (0=censored, 1=observed breakdown)
-    censored = np.random.binomial(1, 0.6, n_samples)
+    Args:
+        n_samples: Number of vehicles to generate
+        random_state: Seed (output is reproducible for a given chunk_size)
+        chunk_size: Rows generated per chunk (defaults to TRAINING_CONFIG)
+        
+    Returns:
+        DataFrame with covariates, duration and observed columns
+    """
+    return pd.concat(
+        iter_survival_training_data(n_samples, random_state, chunk_size),
+        ignore_index=True
+    )
+
+def iter_survival_training_data(n_samples, random_state=42, chunk_size=None):
+    """
+    Yield synthetic survival training data in chunks of at most chunk_size rows
     
-    # Create dataframe
-    df = pd.DataFrame(data)
-    df['duration'] = baseline_time
-    df['observed'] = censored
+    Peak memory is bounded by one chunk, so this can be streamed for
+    stress tests with millions of samples.
+    """
+    chunk_size = chunk_size or TRAINING_CONFIG['data_chunk_size']
     
-    # Train Cox model
-    cph = CoxPHFitter()
-    cph.fit(df, duration_col='duration', event_col='observed')
+    for chunk_index, start in enumerate(range(0, n_samples, chunk_size)):
+        # Seed each chunk from (random_state, chunk_index) so chunks can be
+        # generated independently and in any order
+        rng = np.random.default_rng([random_state, chunk_index])
+        yield _generate_survival_chunk(min(chunk_size, n_samples - start), rng)
+
+def _generate_survival_chunk(n, rng):
+    """Generate one chunk of synthetic survival data"""
+    # Generate features
+    vehicle_age = rng.integers(0, 20, n)
+    days_since_service = rng.integers(0, 500, n)
+    engine_temp = rng.normal(90, 15, n)
+    oil_pressure = rng.normal(30, 10, n)
+    battery_voltage = rng.normal(12, 1, n)
+    maintenance_issues = rng.integers(0, 5, n)
+    vehicle_type = rng.integers(0, 6, n)
     
-    # Save model
-    os.makedirs(os.path.join(MODEL_FOLDER, 'breakdown_prediction'), exist_ok=True)
-    model_path = os.path.join(MODEL_FOLDER, 'breakdown_prediction', 'survival_model.pkl')
+    # Generate time to breakdown, shortened by age, time since service,
+    # overheating and low oil pressure
+    duration = (
+        rng.exponential(1000, n) *
+        0.9 ** vehicle_age *
+        0.95 ** (days_since_service / 30) *
+        np.where(engine_temp > 110, 0.8, 1.0) *
+        np.where(oil_pressure < 15, 0.7, 1.0)
+    )
     
-    with open(model_path, 'wb') as f:
-        pickle.dump(cph, f)
+    # Generate censored indicator (0=censored, 1=observed breakdown)
+    observed = rng.binomial(1, 0.6, n)
     
-    return cph
+    # Compact dtypes keep large stress-test frames in memory budget
+    return pd.DataFrame({
+        'vehicle_age': vehicle_age.astype(np.int8),
+        'days_since_service': days_since_service.astype(np.int16),
+        'engine_temp': engine_temp.astype(np.float32),
+        'oil_pressure': oil_pressure.astype(np.float32),
+        'battery_voltage': battery_voltage.astype(np.float32),
+        'maintenance_issues': maintenance_issues.astype(np.int8),
+        'vehicle_type': vehicle_type.astype(np.int8),
+        'duration': duration,
+        'observed': observed.astype(np.int8)
+    })
 
 def encode_vehicle_type(vehicle_type):
     """Encode vehicle type as integer"""
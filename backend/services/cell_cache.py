@@ -0,0 +1,273 @@
+# backend/services/cell_cache.py
+import collections
+import threading
+import time
+
+import numpy as np
+from bson import json_util
+from config import CELL_CACHE_CONFIG, REDIS_URL
+
+GEOHASH_ALPHABET = '0123456789bcdefghjkmnpqrstuvwxyz'
+
+_ALPHABET_CODES = np.frombuffer(GEOHASH_ALPHABET.encode('ascii'), dtype=np.uint8)
+
+# Marks a cached None (e.g. "no eco zone in this cell") apart from a miss
+_MISSING = object()
+
+def geohash_cells(lats, lngs, precision):
+    """
+    Geohash of each coordinate at `precision` characters
+
+    Vectorized: quantizes both axes to integers, interleaves their bits
+    (longitude first) and maps each 5-bit group to the geohash alphabet.
+    Precision 5 cells are about 4.9 x 4.9 km, 6 about 1.2 x 0.6 km and
+    7 about 150 x 150 m.
+
+    Returns:
+        List of geohash strings
+    """
+    lats = np.asarray(lats, dtype=np.float64)
+    lngs = np.asarray(lngs, dtype=np.float64)
+    bits = 5 * precision
+    lng_bits = (bits + 1) // 2
+    lat_bits = bits // 2
+
+    lng_units = np.clip(((lngs + 180) / 360 * (1 << lng_bits)).astype(np.int64), 0, (1 << lng_bits) - 1)
+    lat_units = np.clip(((lats + 90) / 180 * (1 << lat_bits)).astype(np.int64), 0, (1 << lat_bits) - 1)
+
+    codes = np.zeros(len(lats), dtype=np.int64)
+    for bit in range(bits):
+        # Even bits (from the most significant) come from longitude
+        if bit % 2 == 0:
+            value = (lng_units >> (lng_bits - 1 - bit // 2)) & 1
+        else:
+            value = (lat_units >> (lat_bits - 1 - bit // 2)) & 1
+        codes = (codes << 1) | value
+
+    shifts = 5 * np.arange(precision - 1, -1, -1)
+    chars = _ALPHABET_CODES[(codes[:, None] >> shifts) & 0x1f]
+    return [row.tobytes().decode('ascii') for row in chars]
+
+def geohash(lat, lng, precision):
+    """Geohash of a single coordinate"""
+    return geohash_cells([lat], [lng], precision)[0]
+
+def cell_center(cell):
+    """(lat, lng) at the center of a geohash cell"""
+    lat_range, lng_range = [-90.0, 90.0], [-180.0, 180.0]
+    even = True
+
+    for char in cell:
+        code = GEOHASH_ALPHABET.index(char)
+        for shift in range(4, -1, -1):
+            interval = lng_range if even else lat_range
+            middle = (interval[0] + interval[1]) / 2
+            if (code >> shift) & 1:
+                interval[0] = middle
+            else:
+                interval[1] = middle
+            even = not even
+
+    return (lat_range[0] + lat_range[1]) / 2, (lng_range[0] + lng_range[1]) / 2
+
+class CellCache:
+    """
+    Two-tier cache of location-derived data keyed by geohash cell
+
+    Each data type (traffic, network coverage, eco zones, ...) has its own
+    cell precision and TTL in CELL_CACHE_CONFIG['types']. Values are
+    computed once per cell, at the cell center, so every point in a cell
+    shares them no matter which point asked first. The first tier is an
+    in-process LRU; the second is Redis, shared by all workers. Redis
+    errors are counted and otherwise ignored; after one, Redis is skipped
+    for `redis_retry` seconds so an outage does not slow every lookup.
+    Values go to Redis as Extended JSON (bson.json_util, so datetimes and
+    ObjectIds round-trip at MongoDB's millisecond precision); entries
+    that do not decode are treated as misses.
+    """
+
+    def __init__(self, config, redis_url=REDIS_URL):
+        self.config = config
+        self.redis_url = redis_url
+        self._client = None
+        self._redis_down_until = 0
+        self.max_entries = config['memory_entries']
+        self._entries = collections.OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = collections.defaultdict(lambda: dict.fromkeys(
+            ('memory_hits', 'redis_hits', 'misses', 'redis_errors'), 0))
+
+    def get(self, data_type, lat, lng, loader, variant=None):
+        """
+        Value for the cell containing (lat, lng)
+
+        Args:
+            data_type: Key of CELL_CACHE_CONFIG['types']
+            lat, lng: Coordinate to look up
+            loader: Called as loader(lat, lng) with the cell center on a miss
+            variant: Optional extra key part (e.g. a network provider)
+        """
+        def load_each(lats, lngs):
+            return [loader(cell_lat, cell_lng) for cell_lat, cell_lng in zip(lats.tolist(), lngs.tolist())]
+
+        return self.get_many(data_type, [lat], [lng], load_each, variant)[0]
+
+    def get_many(self, data_type, lats, lngs, loader, variant=None):
+        """
+        Values for the cells containing each coordinate, in input order
+
+        Each distinct cell is looked up once per call; misses in memory go
+        to Redis in one round trip and the remaining cells are loaded with
+        one loader(lats, lngs) call over their centers, which returns a
+        list of values.
+        """
+        if len(lats) == 0:
+            return []
+
+        settings = self.config['types'][data_type]
+
+        if not self.config['enabled']:
+            return list(loader(np.asarray(lats, dtype=np.float64), np.asarray(lngs, dtype=np.float64)))
+
+        cells = geohash_cells(lats, lngs, settings['precision'])
+        prefix = f"{self.config['key_prefix']}:{data_type}:{variant or ''}:"
+        values = {}
+
+        # Memory tier
+        now = time.monotonic()
+        with self._lock:
+            for cell in set(cells):
+                entry = self._entries.get(prefix + cell)
+                if entry is not None and entry[0] > now:
+                    self._entries.move_to_end(prefix + cell)
+                    values[cell] = entry[1]
+
+        stats = {'memory_hits': len(values), 'redis_hits': 0, 'misses': 0, 'redis_errors': 0}
+        missing = [cell for cell in set(cells) if cell not in values]
+
+        # Redis tier
+        if missing and self.config['redis']:
+            found = self._redis_get([prefix + cell for cell in missing])
+            if found is None:
+                stats['redis_errors'] += 1
+            else:
+                for cell, value in zip(missing, found):
+                    if value is not _MISSING:
+                        values[cell] = value
+                        stats['redis_hits'] += 1
+
+        # Load what neither tier had
+        unloaded = [cell for cell in missing if cell not in values]
+        loaded = {}
+        if unloaded:
+            centers = np.array([cell_center(cell) for cell in unloaded])
+            loaded = dict(zip(unloaded, loader(centers[:, 0], centers[:, 1])))
+            values.update(loaded)
+            stats['misses'] += len(unloaded)
+
+        if loaded and self.config['redis']:
+            if not self._redis_set({prefix + cell: value for cell, value in loaded.items()}, settings['ttl']):
+                stats['redis_errors'] += 1
+
+        self._remember(prefix, {cell: values[cell] for cell in missing}, now + settings['ttl'])
+        self._record(data_type, stats)
+        return [values[cell] for cell in cells]
+
+    def _remember(self, prefix, values, expires):
+        with self._lock:
+            for cell, value in values.items():
+                self._entries[prefix + cell] = (expires, value)
+                self._entries.move_to_end(prefix + cell)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def _record(self, data_type, stats):
+        with self._lock:
+            for name, count in stats.items():
+                self._stats[data_type][name] += count
+
+    def _redis(self):
+        if time.monotonic() < self._redis_down_until:
+            return None
+
+        if self._client is None:
+            import redis
+            self._client = redis.Redis.from_url(
+                self.redis_url, socket_timeout=self.config['redis_timeout'],
+                socket_connect_timeout=self.config['redis_timeout']
+            )
+
+        return self._client
+
+    def _redis_failed(self):
+        self._redis_down_until = time.monotonic() + self.config['redis_retry']
+
+    def _redis_get(self, keys):
+        try:
+            client = self._redis()
+            if client is None:
+                return [_MISSING] * len(keys)
+
+            return [_decode(data) for data in client.mget(keys)]
+        except Exception:
+            self._redis_failed()
+            return None
+
+    def _redis_set(self, values, ttl):
+        try:
+            client = self._redis()
+            if client is None:
+                return True
+
+            pipeline = client.pipeline(transaction=False)
+            for key, value in values.items():
+                pipeline.setex(key, ttl, json_util.dumps(value))
+            pipeline.execute()
+            return True
+        except Exception:
+            self._redis_failed()
+            return False
+
+    def clear(self):
+        """Drop the in-process tier (Redis entries expire on their own)"""
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            stats = {data_type: dict(counts) for data_type, counts in self._stats.items()}
+            for counts in stats.values():
+                lookups = counts['memory_hits'] + counts['redis_hits'] + counts['misses']
+                counts['hit_rate'] = round(1 - counts['misses'] / lookups, 3) if lookups else None
+            return {'entries': len(self._entries), 'types': stats}
+
+def _decode(data):
+    """Value of a Redis entry, or _MISSING if absent or not valid JSON"""
+    if data is None:
+        return _MISSING
+
+    try:
+        return json_util.loads(data)
+    except ValueError:
+        return _MISSING
+
+_cell_cache = CellCache(CELL_CACHE_CONFIG)
+
+def cell_cached(data_type, lat, lng, loader, variant=None):
+    """Value for the cell containing (lat, lng) (see CellCache.get)"""
+    return _cell_cache.get(data_type, lat, lng, loader, variant)
+
+def cell_cached_points(data_type, points, loader, variant=None):
+    """
+    Values for the cells containing each {'lat', 'lng'} point, in order
+
+    `loader(lats, lngs)` gets arrays of the centers of the cells to load
+    (see CellCache.get_many).
+    """
+    lats = [point['lat'] for point in points]
+    lngs = [point['lng'] for point in points]
+    return _cell_cache.get_many(data_type, lats, lngs, loader, variant)
+
+def get_cell_cache_stats():
+    """Entries and per data type hit/miss counters of the cell cache"""
+    return _cell_cache.stats()
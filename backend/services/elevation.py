@@ -0,0 +1,151 @@
+# backend/services/elevation.py
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+from flask import current_app
+from config import ELEVATION_CONFIG
+
+_stats = dict.fromkeys(
+    ('lookups', 'points', 'distinct', 'stored_hits', 'fetched', 'failed', 'batches', 'failed_batches',
+     'store_errors'), 0
+)
+_stats_lock = threading.Lock()
+
+def coordinate_keys(lats, lngs, precision=None):
+    """
+    Integer key of each coordinate rounded to `precision` decimal places
+
+    Returns:
+        Tuple of (int64 keys, rounded lats, rounded lngs)
+    """
+    precision = ELEVATION_CONFIG['precision'] if precision is None else precision
+    scale = 10 ** precision
+    lat_units = np.rint(np.asarray(lats, dtype=np.float64) * scale).astype(np.int64)
+    lng_units = np.rint(np.asarray(lngs, dtype=np.float64) * scale).astype(np.int64)
+
+    # Row-major index on the lat/lng grid (fits int64 up to 7 decimals)
+    keys = (lat_units + 90 * scale) * (360 * scale + 1) + (lng_units + 180 * scale)
+    return keys, lat_units / scale, lng_units / scale
+
+def fetch_elevations(lats, lngs, fetch_batch, batch_size=None, workers=None):
+    """
+    Elevation at each coordinate, requested in concurrent batches
+
+    Args:
+        lats, lngs: Coordinate arrays
+        fetch_batch: Called as fetch_batch(lats, lngs) for each batch;
+            returns one elevation per coordinate or raises
+        batch_size: Coordinates per batch (ELEVATION_CONFIG by default)
+        workers: Batches in flight at once (ELEVATION_CONFIG by default)
+
+    Returns:
+        Tuple of (elevations with NaN where a batch failed, list of the
+        failed batches' exceptions)
+    """
+    batch_size = batch_size or ELEVATION_CONFIG['batch_size']
+    workers = workers or ELEVATION_CONFIG['workers']
+    elevations = np.full(len(lats), np.nan)
+    starts = list(range(0, len(lats), batch_size))
+
+    def run(start):
+        stop = start + batch_size
+        try:
+            return start, np.asarray(fetch_batch(lats[start:stop], lngs[start:stop]), dtype=np.float64), None
+        except Exception as e:
+            return start, None, e
+
+    if workers > 1 and len(starts) > 1:
+        with ThreadPoolExecutor(max_workers=min(workers, len(starts)), thread_name_prefix='elevation') as pool:
+            results = list(pool.map(run, starts))
+    else:
+        results = [run(start) for start in starts]
+
+    errors = []
+    for start, values, error in results:
+        if error is not None:
+            errors.append(error)
+        else:
+            count = min(len(values), batch_size, len(lats) - start)
+            elevations[start:start + count] = values[:count]
+
+    return elevations, errors
+
+def get_elevations(lats, lngs, fetch_batch=None, store=None):
+    """
+    Elevation (meters) at each coordinate
+
+    Coordinates are rounded to ELEVATION_CONFIG['precision'] decimals and
+    each distinct one is looked up once: first in the elevation store,
+    then, for the rest, from the Elevation API in concurrent batches.
+    Fetched values are added to the store.
+
+    Args:
+        lats, lngs: Coordinate arrays
+        fetch_batch: Batch loader (the Google Maps Elevation API by default)
+        store: Object with get_many/save_many (models.elevation.Elevation
+            by default)
+
+    Returns:
+        Float array aligned with the input, NaN where the elevation could
+        not be fetched
+    """
+    if fetch_batch is None:
+        from services.google_maps import fetch_elevation_batch as fetch_batch
+    if store is None:
+        from models.elevation import Elevation as store
+
+    keys, rounded_lats, rounded_lngs = coordinate_keys(lats, lngs)
+    if not len(keys):
+        return np.empty(0)
+
+    unique, first, inverse = np.unique(keys, return_index=True, return_inverse=True)
+    stats = {'lookups': 1, 'points': len(keys), 'distinct': len(unique), 'store_errors': 0}
+
+    # Stored elevations
+    try:
+        stored = store.get_many(unique.tolist())
+    except Exception as e:
+        current_app.logger.error(f"Error reading stored elevations: {str(e)}")
+        stored = {}
+        stats['store_errors'] += 1
+
+    elevations = np.array([stored.get(key, np.nan) for key in unique.tolist()], dtype=np.float64)
+    missing = np.flatnonzero(np.isnan(elevations))
+    stats['stored_hits'] = len(unique) - len(missing)
+
+    # Fetch the rest at the rounded coordinates the keys stand for
+    if len(missing):
+        missing_lats, missing_lngs = rounded_lats[first[missing]], rounded_lngs[first[missing]]
+        fetched, errors = fetch_elevations(missing_lats, missing_lngs, fetch_batch)
+        elevations[missing] = fetched
+
+        for error in errors:
+            current_app.logger.error(f"Error getting elevation data: {str(error)}")
+
+        ok = ~np.isnan(fetched)
+        stats['fetched'] = int(ok.sum())
+        stats['failed'] = int((~ok).sum())
+        stats['batches'] = -(-len(missing) // ELEVATION_CONFIG['batch_size'])
+        stats['failed_batches'] = len(errors)
+
+        try:
+            store.save_many(unique[missing[ok]].tolist(), missing_lats[ok].tolist(),
+                            missing_lngs[ok].tolist(), fetched[ok].tolist())
+        except Exception as e:
+            current_app.logger.error(f"Error storing elevations: {str(e)}")
+            stats['store_errors'] += 1
+
+    with _stats_lock:
+        for name, count in stats.items():
+            _stats[name] += count
+
+    return elevations[inverse]
+
+def get_elevation_stats():
+    """Points looked up, stored hits and API fetches in this process"""
+    with _stats_lock:
+        stats = dict(_stats)
+
+    stats['stored_hit_rate'] = round(stats['stored_hits'] / stats['distinct'], 3) if stats['distinct'] else None
+    return stats
@@ -5,6 +5,8 @@ import numpy as np
 import datetime
 import math
 from flask import current_app
+from services.cell_cache import cell_cached_points
+from services.location_random import LocationRandom
 
 def get_eco_zones(points):
     """
@@ -22,47 +24,32 @@ def get_eco_zones(points):
     # In a real application, would use an environmental API
     # For this demo, generate synthetic eco-sensitive zone data
     eco_zones = []
+    cell_zones = cell_cached_points('eco_zones', sampled_points, generate_eco_zones)
     
-    for point in sampled_points:
-        # Generate synthetic data
-        if is_in_eco_zone(point["lat"], point["lng"]):
-            zone = generate_eco_zone(point["lat"], point["lng"])
-            eco_zones.append(zone)
+    for point, zone in zip(sampled_points, cell_zones):
+        if zone:
+            eco_zones.append({**zone, "location": {"lat": point["lat"], "lng": point["lng"]}})
     
     return eco_zones
 
-def is_in_eco_zone(lat, lng):
+def generate_eco_zones(lats, lngs):
     """
-    Check if a point is in an eco-sensitive zone
+    Generate synthetic eco-sensitive zone data
     
     Args:
-        lat: Latitude
-        lng: Longitude
+        lats: Latitudes
+        lngs: Longitudes
         
     Returns:
-        Boolean indicating if the point is in an eco-sensitive zone
+        List with a dictionary of eco-sensitive zone information for each
+        coordinate in a zone, and None for the others
     """
-    # Use lat/lng to seed a pseudo-random generator for consistent results
-    seed = int(abs(lat * 10000) + abs(lng * 10000))
-    np.random.seed(seed)
+    lats = np.asarray(lats, dtype=np.float64)
+    lngs = np.asarray(lngs, dtype=np.float64)
+    rng = LocationRandom(lats, lngs, 'eco_zone')
     
     # 10% chance of being in an eco-sensitive zone
-    return np.random.random() < 0.1
-
-def generate_eco_zone(lat, lng):
-    """
-    Generate synthetic eco-sensitive zone data
-    
-    Args:
-        lat: Latitude
-        lng: Longitude
-        
-    Returns:
-        Dictionary with eco-sensitive zone information
-    """
-    # Use lat/lng to seed a pseudo-random generator for consistent results
-    seed = int(abs(lat * 10000) + abs(lng * 10000))
-    np.random.seed(seed)
+    in_zone = rng.random() < 0.1
     
     # Zone types
     zone_types = [
@@ -85,35 +72,30 @@ def generate_eco_zone(lat, lng):
     ]
     
     # Generate random zone name
-    zone_type = np.random.choice(zone_types)
+    zone_type = rng.choice(zone_types).tolist()
     
     # Common naming patterns for ecological zones
     location_prefixes = ["Northern", "Eastern", "Western", "Southern", "Central", "Upper", "Lower"]
     location_features = ["Valley", "Ridge", "Hills", "Plains", "Basin", "Mountains", "Forest"]
     
-    prefix = np.random.choice(location_prefixes)
-    feature = np.random.choice(location_features)
-    
-    zone_name = f"{prefix} {feature} {zone_type}"
-    
-    # Generate random restrictions
-    num_restrictions = np.random.randint(1, 4)
-    restrictions = []
-    
-    for _ in range(num_restrictions):
-        restriction = np.random.choice(restriction_types)
-        if restriction not in restrictions:
-            restrictions.append(restriction)
-    
-    return {
-        "location": {
-            "lat": lat,
-            "lng": lng
-        },
-        "name": zone_name,
-        "type": zone_type,
-        "restrictions": restrictions
-    }
+    prefix = rng.choice(location_prefixes).tolist()
+    feature = rng.choice(location_features).tolist()
+    
+    # Generate 1-3 distinct restrictions
+    restrictions = rng.samples(restriction_types, rng.integers(1, 4))
+    
+    return [
+        {
+            "location": {
+                "lat": lat,
+                "lng": lng
+            },
+            "name": f"{prefix[i]} {feature[i]} {zone_type[i]}",
+            "type": zone_type[i],
+            "restrictions": restrictions[i]
+        } if in_zone[i] else None
+        for i, (lat, lng) in enumerate(zip(lats.tolist(), lngs.tolist()))
+    ]
 
 def get_environmental_hazards(points):
     """
@@ -131,47 +113,32 @@ def get_environmental_hazards(points):
     # In a real application, would use an environmental API
     # For this demo, generate synthetic environmental hazard data
     hazards = []
+    cell_hazards = cell_cached_points('environmental_hazards', sampled_points, generate_environmental_hazards)
     
-    for point in sampled_points:
-        # Generate synthetic data
-        if has_environmental_hazard(point["lat"], point["lng"]):
-            hazard = generate_environmental_hazard(point["lat"], point["lng"])
-            hazards.append(hazard)
+    for point, hazard in zip(sampled_points, cell_hazards):
+        if hazard:
+            hazards.append({**hazard, "location": {"lat": point["lat"], "lng": point["lng"]}})
     
     return hazards
 
-def has_environmental_hazard(lat, lng):
+def generate_environmental_hazards(lats, lngs):
     """
-    Check if a point has an environmental hazard
+    Generate synthetic environmental hazard data
     
     Args:
-        lat: Latitude
-        lng: Longitude
+        lats: Latitudes
+        lngs: Longitudes
         
     Returns:
-        Boolean indicating if the point has an environmental hazard
+        List with a dictionary of environmental hazard information for each
+        coordinate with a hazard, and None for the others
     """
-    # Use lat/lng to seed a pseudo-random generator for consistent results
-    seed = int(abs(lat * 10000) + abs(lng * 10000))
-    np.random.seed(seed)
+    lats = np.asarray(lats, dtype=np.float64)
+    lngs = np.asarray(lngs, dtype=np.float64)
+    rng = LocationRandom(lats, lngs, 'environmental_hazard')
     
     # 5% chance of having an environmental hazard
-    return np.random.random() < 0.05
-
-def generate_environmental_hazard(lat, lng):
-    """
-    Generate synthetic environmental hazard data
-    
-    Args:
-        lat: Latitude
-        lng: Longitude
-        
-    Returns:
-        Dictionary with environmental hazard information
-    """
-    # Use lat/lng to seed a pseudo-random generator for consistent results
-    seed = int(abs(lat * 10000) + abs(lng * 10000))
-    np.random.seed(seed)
+    has_hazard = rng.random() < 0.05
     
     # Hazard types
     hazard_types = [
@@ -184,33 +151,33 @@ def generate_environmental_hazard(lat, lng):
     ]
     
     # Generate random hazard type
-    hazard_type = np.random.choice(hazard_types)
+    hazard_type = rng.choice(hazard_types).tolist()
     
     # Generate risk level
     risk_levels = ["Low", "Medium", "High"]
-    risk_level = np.random.choice(risk_levels, p=[0.5, 0.3, 0.2])
+    risk_level = rng.choice(risk_levels, p=[0.5, 0.3, 0.2]).tolist()
     
     # Generate seasonal flag
-    is_seasonal = np.random.random() < 0.7
-    
-    # Generate seasons if seasonal
-    seasons = []
-    if is_seasonal:
-        all_seasons = ["Spring", "Summer", "Autumn", "Winter"]
-        num_seasons = np.random.randint(1, 4)
-        seasons = list(np.random.choice(all_seasons, size=num_seasons, replace=False))
-    
-    return {
-        "location": {
-            "lat": lat,
-            "lng": lng
-        },
-        "hazard_type": hazard_type,
-        "risk_level": risk_level,
-        "is_seasonal": is_seasonal,
-        "seasons": seasons,
-        "data_source": "Environmental Risk Model"
-    }
+    is_seasonal = (rng.random() < 0.7).tolist()
+    
+    # Generate 1-3 seasons (for seasonal hazards)
+    all_seasons = ["Spring", "Summer", "Autumn", "Winter"]
+    seasons = rng.samples(all_seasons, rng.integers(1, 4))
+    
+    return [
+        {
+            "location": {
+                "lat": lat,
+                "lng": lng
+            },
+            "hazard_type": hazard_type[i],
+            "risk_level": risk_level[i],
+            "is_seasonal": is_seasonal[i],
+            "seasons": seasons[i] if is_seasonal[i] else [],
+            "data_source": "Environmental Risk Model"
+        } if has_hazard[i] else None
+        for i, (lat, lng) in enumerate(zip(lats.tolist(), lngs.tolist()))
+    ]
 
 def get_pollutant_levels(lat, lng):
     """
@@ -223,9 +190,8 @@ def get_pollutant_levels(lat, lng):
     Returns:
         Dictionary with pollutant levels
     """
-    # Use lat/lng to seed a pseudo-random generator for consistent results
-    seed = int(abs(lat * 10000) + abs(lng * 10000))
-    np.random.seed(seed)
+    # Location-keyed random numbers for consistent results
+    rng = LocationRandom([lat], [lng], 'pollutants')
     
     # Current date and time
     now = datetime.datetime.utcnow()
@@ -255,10 +221,10 @@ def get_pollutant_levels(lat, lng):
     
     # Adjust based on location (simplified model)
     # Urban areas tend to have worse air quality
-    urban_factor = 1.0 + np.random.random() * 0.5
+    urban_factor = 1.0 + float(rng.random()[0]) * 0.5
     
     # Random variation
-    random_factor = np.random.normal(1.0, 0.2)
+    random_factor = float(rng.normal(1.0, 0.2)[0])
     
     # Calculate final levels
     pollutant_levels = {}
@@ -1,19 +1,41 @@
 # backend/services/eta_optimizer.py
-import os
 import numpy as np
-import pandas as pd
-import pickle
-import xgboost as xgb
 import datetime
 from flask import current_app
-from config import MODEL_FOLDER
+from config import TRAINING_CONFIG
+from services.geo import midpoints
+from services.lazy_imports import lazy_import
+from services.model_registry import get_model, save_model
+from services.route_geometry import RouteGeometry
+from services.spatial_index import SpatialIndex
+
+pd = lazy_import('pandas')
+xgb = lazy_import('xgboost')
+
+# Base travel times (minutes per km) for different road types
+ETA_BASE_TIMES = {
+    'highway': 0.6,      # 100 km/h
+    'primary': 1.0,      # 60 km/h
+    'secondary': 1.5,    # 40 km/h
+    'residential': 2.0,  # 30 km/h
+    'unknown': 1.2       # 50 km/h
+}
+
+# Vehicle type multipliers for the synthetic travel times
+ETA_VEHICLE_MULTIPLIERS = {
+    'car': 1.0,
+    'truck': 1.3,
+    'bus': 1.4,
+    'motorcycle': 0.9,
+    'bicycle': 3.0
+}
 
 def optimize_eta(route_points, vehicle_type='car', weather_data=None):
     """
     Optimize ETA based on traffic, weather, and vehicle characteristics
     
     Args:
-        route_points: List of dictionaries with lat, lng coordinates
+        route_points: RouteGeometry or list of dictionaries with lat, lng coordinates
         vehicle_type: Type of vehicle (car, truck, bus, etc.)
         weather_data: Weather hazard data if available
         
@@ -23,90 +45,52 @@ def optimize_eta(route_points, vehicle_type='car', weather_data=None):
     # Get original duration from Google Maps data
     from services.google_maps import get_route_details
     
-    if not route_points or len(route_points) < 2:
-        return None
+    route = RouteGeometry.from_points(route_points)
     
-    # Load pre-trained model
-    model_path = os.path.join(MODEL_FOLDER, 'eta_optimization', 'model.pkl')
+    if len(route) < 2:
+        return None
     
-    try:
-        with open(model_path, 'rb') as f:
-            model = pickle.load(f)
-    except (FileNotFoundError, EOFError):
-        # If model doesn't exist, train a new one
-        model = train_eta_model()
+    # Get pre-trained model (trained on first use if missing)
+    model = get_model('eta_optimization', trainer=train_eta_model)
     
     # Get traffic data
     from services.google_maps import get_traffic_data
-    traffic_data = get_traffic_data(route_points)
+    traffic_data = get_traffic_data(route)
     
     # Get or reuse weather data
     if not weather_data:
         from services.weather_service import get_weather_hazards
-        weather_data = get_weather_hazards(route_points)
+        weather_data = get_weather_hazards(route)
     
     # Calculate route segments
     segments = []
-    for i in range(len(route_points) - 1):
-        # Calculate segment distance
-        from services.weather_service import calculate_distance
-        distance = calculate_distance(
-            route_points[i]['lat'], route_points[i]['lng'],
-            route_points[i+1]['lat'], route_points[i+1]['lng']
-        )
+    
+    distances = np.diff(route.distance)
+    
+    # Closest traffic sample and closest weather hazard (within 5 km) to
+    # every segment midpoint, answered for all segments in one query each
+    mid_lats, mid_lngs = midpoints(route.lats, route.lngs)
+    traffic_index, _ = SpatialIndex.from_locations(
+        [t['location'] for t in traffic_data]
+    ).nearest(mid_lats, mid_lngs)
+    weather_index, _ = SpatialIndex.from_locations(
+        [w['location'] for w in weather_data]
+    ).nearest(mid_lats, mid_lngs, max_distance=5)
+    
+    for i in range(len(route) - 1):
+        distance = float(distances[i])
         
         # Skip if distance is too small
         if distance < 0.01:  # 10 meters
             continue
         
-        # Find closest traffic data
-        traffic = None
-        min_dist = float('inf')
-        
-        for t in traffic_data:
-            dist1 = calculate_distance(
-                route_points[i]['lat'], route_points[i]['lng'],
-                t['location']['lat'], t['location']['lng']
-            )
-            dist2 = calculate_distance(
-                route_points[i+1]['lat'], route_points[i+1]['lng'],
-                t['location']['lat'], t['location']['lng']
-            )
-            
-            avg_dist = (dist1 + dist2) / 2
-            if avg_dist < min_dist:
-                min_dist = avg_dist
-                traffic = t
-        
-        # Find closest weather hazard
-        weather = None
-        min_dist = float('inf')
-        
-        for w in weather_data:
-            dist1 = calculate_distance(
-                route_points[i]['lat'], route_points[i]['lng'],
-                w['location']['lat'], w['location']['lng']
-            )
-            dist2 = calculate_distance(
-                route_points[i+1]['lat'], route_points[i+1]['lng'],
-                w['location']['lat'], w['location']['lng']
-            )
-            
-            avg_dist = (dist1 + dist2) / 2
-            if avg_dist < min_dist and avg_dist < 5:  # Within 5 km
-                min_dist = avg_dist
-                weather = w
+        traffic = traffic_data[traffic_index[i]] if traffic_index[i] >= 0 else None
+        weather = weather_data[weather_index[i]] if weather_index[i] >= 0 else None
         
         # Create segment with features
         segment = {
-            'start': {
-                'lat': route_points[i]['lat'],
-                'lng': route_points[i]['lng']
-            },
-            'end': {
-                'lat': route_points[i+1]['lat'],
-                'lng': route_points[i+1]['lng']
-            },
+            'start': route.point(i),
+            'end': route.point(i + 1),
             'distance': distance,
             'congestion': traffic['congestion_level'] if traffic else 0,
             'speed_limit': traffic['speed_limit'] if traffic else 50,
@@ -179,124 +163,166 @@ def optimize_eta(route_points, vehicle_type='car', weather_data=None):
     
     return formatted_duration
 
-def train_eta_model():
+def train_eta_model(n_samples=5000):
     """Train a new ETA optimization model"""
     current_app.logger.info("Training new ETA optimization model")
     
     # In a real-world scenario, you would load historical route and travel time data,
     # and train a model. For demonstration, create a synthetic model.
+    model = fit_eta_model(lambda: iter_eta_training_data(n_samples))
     
-    # Create synthetic training data
-    np.random.seed(42)
-    n_samples = 5000
-    
-    # Base travel times (minutes per km) for different road types
-    base_times = {
-        'highway': 0.6,      # 100 km/h
-        'primary': 1.0,      # 60 km/h
-        'secondary': 1.5,    # 40 km/h
-        'residential': 2.0,  # 30 km/h
-        'unknown': 1.2       # 50 km/h
-    }
+    # Save model and swap it into the registry
+    save_model('eta_optimization', model)
     
-    # Vehicle type multipliers
-    vehicle_multipliers = {
-        'car': 1.0,
-        'truck': 1.3,
-        'bus': 1.4,
-        'motorcycle': 0.9,
-        'bicycle': 3.0
-    }
+    return model
+
+def fit_eta_model(chunks):
+    """
+    Fit the ETA model chunk by chunk
     
-    # Generate data
-    data = []
-    for _ in range(n_samples):
-        # Generate random segment
-        distance = np.random.uniform(0.1, 5.0)  # km
-        road_type = np.random.choice(list(base_times.keys()))
-        vehicle_type = np.random.choice(list(vehicle_multipliers.keys()))
-        
-        congestion = np.random.randint(0, 5)
-        time_of_day = np.random.randint(0, 24)
-        is_weekend = np.random.randint(0, 2)
-        
-        # Weather conditions
-        temperature = np.random.normal(15, 10)
-        visibility = np.random.normal(8, 5).clip(0, 20)
-        precipitation = np.random.exponential(1)
-        wind_speed = np.random.exponential(5)
-        weather_risk = np.random.randint(0, 3)
-        
-        # Calculate base time
-        base_time = distance * base_times[road_type] * vehicle_multipliers[vehicle_type]
-        
-        # Apply modifiers
-        modifiers = 1.0
-        
-        # Congestion modifier (0-100% increase)
-        modifiers += 0.2 * congestion
-        
-        # Time of day modifier
-        if 7 <= time_of_day <= 9 or 16 <= time_of_day <= 18:
-            modifiers += 0.3  # Rush hour
-        elif 22 <= time_of_day or time_of_day <= 5:
-            modifiers -= 0.15  # Night time, less traffic
+    The chunks are streamed into an xgboost QuantileDMatrix, which keeps
+    only the binned features (a byte per value), so the full frame is never
+    built and peak memory stays near one chunk plus the binned data.
+    
+    Args:
+        chunks: Callable returning a fresh iterator of training-data chunks
+            (e.g. iter_eta_training_data); it is called once per pass
+            xgboost makes over the data
         
-        # Weekend modifier
-        modifiers -= 0.1 * is_weekend
+    Returns:
+        Fitted XGBRegressor
+    """
+    class Chunks(xgb.DataIter):
+        def __init__(self):
+            self._chunks = chunks()
+            super().__init__()
         
-        # Weather modifiers
-        modifiers += 0.05 * (precipitation > 0)  # Light rain
-        modifiers += 0.2 * (precipitation > 3)   # Heavy rain
-        modifiers += 0.3 * (visibility < 3)      # Low visibility
-        modifiers += 0.1 * (weather_risk)        # Weather risk level
+        def next(self, input_data):
+            chunk = next(self._chunks, None)
+            if chunk is None:
+                return False
+            input_data(data=chunk.drop('travel_time', axis=1), label=chunk['travel_time'])
+            return True
         
-        # Calculate final time with some random noise
-        travel_time = base_time * modifiers * np.random.normal(1, 0.05)
+        def reset(self):
+            self._chunks = chunks()
+    
+    booster = xgb.train(
+        {'max_depth': 6, 'learning_rate': 0.1, 'seed': 42, 'objective': 'reg:squarederror'},
+        xgb.QuantileDMatrix(Chunks()),
+        num_boost_round=100
+    )
+    
+    # Served through the scikit-learn interface like the other models
+    model = xgb.XGBRegressor()
+    model.load_model(booster.save_raw())
+    return model
+
+def generate_eta_training_data(n_samples=5000, random_state=42, chunk_size=None):
+    """
+    Generate synthetic segment travel times for the ETA model
+    
+    Args:
+        n_samples: Number of segments to generate
+        random_state: Seed (output is reproducible for a given chunk_size)
+        chunk_size: Rows generated per chunk (defaults to TRAINING_CONFIG)
         
-        # Add to dataset
-        data.append({
-            'distance': distance,
-            'congestion': congestion,
-            'speed_limit': 100 if road_type == 'highway' else 50,
-            'is_highway': 1 if road_type == 'highway' else 0,
-            'vehicle_type': encode_vehicle_type(vehicle_type),
-            'time_of_day': time_of_day,
-            'is_weekend': is_weekend,
-            'temperature': temperature,
-            'visibility': visibility,
-            'precipitation': precipitation,
-            'wind_speed': wind_speed,
-            'weather_risk': weather_risk,
-            'travel_time': travel_time
-        })
+    Returns:
+        DataFrame with the model features and a travel_time column
+    """
+    return pd.concat(
+        iter_eta_training_data(n_samples, random_state, chunk_size),
+        ignore_index=True
+    )
+
+def iter_eta_training_data(n_samples, random_state=42, chunk_size=None):
+    """
+    Yield synthetic ETA training data in chunks of at most chunk_size rows
+    
+    Peak memory is bounded by one chunk, so this can be streamed for
+    stress tests with millions of samples.
+    """
+    chunk_size = chunk_size or TRAINING_CONFIG['data_chunk_size']
     
-    # Convert to DataFrame
-    df = pd.DataFrame(data)
+    for chunk_index, start in enumerate(range(0, n_samples, chunk_size)):
+        # Seed each chunk from (random_state, chunk_index) so chunks can be
+        # generated independently and in any order
+        rng = np.random.default_rng([random_state, chunk_index])
+        yield _generate_eta_chunk(min(chunk_size, n_samples - start), rng)
+
+def _generate_eta_chunk(n, rng):
+    """Generate one chunk of synthetic ETA training data"""
+    base_times = np.array(list(ETA_BASE_TIMES.values()))
+    vehicle_multipliers = np.array(list(ETA_VEHICLE_MULTIPLIERS.values()))
+    vehicle_codes = np.array([encode_vehicle_type(v) for v in ETA_VEHICLE_MULTIPLIERS], dtype=np.int8)
+    highway_index = list(ETA_BASE_TIMES).index('highway')
     
-    # Train model
-    X = df.drop('travel_time', axis=1)
-    y = df['travel_time']
+    # Generate random segments
+    distance = rng.uniform(0.1, 5.0, n)  # km
+    road_type = rng.integers(0, len(base_times), n)
+    vehicle_type = rng.integers(0, len(vehicle_multipliers), n)
     
-    model = xgb.XGBRegressor(n_estimators=100, max_depth=6, learning_rate=0.1, random_state=42)
-    model.fit(X, y)
+    congestion = rng.integers(0, 5, n)
+    time_of_day = rng.integers(0, 24, n)
+    is_weekend = rng.integers(0, 2, n)
     
-    # Save model
-    os.makedirs(os.path.join(MODEL_FOLDER, 'eta_optimization'), exist_ok=True)
-    model_path = os.path.join(MODEL_FOLDER, 'eta_optimization', 'model.pkl')
+    # Weather conditions
+    temperature = rng.normal(15, 10, n)
+    visibility = rng.normal(8, 5, n).clip(0, 20)
+    precipitation = rng.exponential(1, n)
+    wind_speed = rng.exponential(5, n)
+    weather_risk = rng.integers(0, 3, n)
     
-    with open(model_path, 'wb') as f:
-        pickle.dump(model, f)
+    # Calculate base time
+    base_time = distance * base_times[road_type] * vehicle_multipliers[vehicle_type]
     
-    return model
+    # Congestion modifier (0-100% increase)
+    modifiers = 1.0 + 0.2 * congestion
+    
+    # Time of day modifier: rush hour, or night time with less traffic
+    rush_hour = ((time_of_day >= 7) & (time_of_day <= 9)) | ((time_of_day >= 16) & (time_of_day <= 18))
+    night = (time_of_day >= 22) | (time_of_day <= 5)
+    modifiers += np.where(rush_hour, 0.3, np.where(night, -0.15, 0.0))
+    
+    # Weekend modifier
+    modifiers -= 0.1 * is_weekend
+    
+    # Weather modifiers
+    modifiers += 0.05 * (precipitation > 0)  # Light rain
+    modifiers += 0.2 * (precipitation > 3)   # Heavy rain
+    modifiers += 0.3 * (visibility < 3)      # Low visibility
+    modifiers += 0.1 * weather_risk          # Weather risk level
+    
+    # Calculate final time with some random noise
+    travel_time = base_time * modifiers * rng.normal(1, 0.05, n)
+    
+    is_highway = road_type == highway_index
+    
+    # Compact dtypes keep large stress-test frames in memory budget
+    return pd.DataFrame({
+        'distance': distance.astype(np.float32),
+        'congestion': congestion.astype(np.int8),
+        'speed_limit': np.where(is_highway, 100, 50).astype(np.int16),
+        'is_highway': is_highway.astype(np.int8),
+        'vehicle_type': vehicle_codes[vehicle_type],
+        'time_of_day': time_of_day.astype(np.int8),
+        'is_weekend': is_weekend.astype(np.int8),
+        'temperature': temperature.astype(np.float32),
+        'visibility': visibility.astype(np.float32),
+        'precipitation': precipitation.astype(np.float32),
+        'wind_speed': wind_speed.astype(np.float32),
+        'weather_risk': weather_risk.astype(np.int8),
+        'travel_time': travel_time.astype(np.float32)
+    })
 
 def update_eta_model():
     """Update the ETA optimization model with new data"""
-    current_app.logger.info("Updating ETA optimization model")
-    
     # In a real-world scenario, you would fetch new travel time data
     # and update the model. For demonstration, just train a new model.
-    train_eta_model()
+    # Training runs in a separate process and the new artifact is swapped in
+    # by every serving process once it lands.
+    from services.model_training import submit_training
+    return submit_training('eta_optimization')
 
 def encode_vehicle_type(vehicle_type):
     """Encode vehicle type as integer"""
@@ -0,0 +1,373 @@
+# backend/services/geo.py
+import math
+import numpy as np
+
+EARTH_RADIUS_KM = 6371
+
+def calculate_distance(lat1, lon1, lat2, lon2):
+    """Calculate distance between two points in km using Haversine formula"""
+    # Scalar version: for a single pair, math is several times faster than
+    # NumPy's per-call overhead
+    lat1_rad = math.radians(lat1)
+    lat2_rad = math.radians(lat2)
+    dlat = lat2_rad - lat1_rad
+    dlon = math.radians(lon2 - lon1)
+
+    a = math.sin(dlat / 2) ** 2 + math.cos(lat1_rad) * math.cos(lat2_rad) * math.sin(dlon / 2) ** 2
+    return EARTH_RADIUS_KM * 2 * math.atan2(math.sqrt(a), math.sqrt(1 - a))
+
+def to_arrays(points):
+    """
+    Split a list of {'lat', 'lng'} dictionaries into coordinate arrays
+
+    Args:
+        points: List of dictionaries with lat, lng coordinates
+
+    Returns:
+        Tuple of (lats, lngs) float64 arrays
+    """
+    if not points:
+        return np.empty(0), np.empty(0)
+
+    coords = np.array([(p['lat'], p['lng']) for p in points], dtype=np.float64)
+    return coords[:, 0], coords[:, 1]
+
+def haversine(lat1, lng1, lat2, lng2):
+    """
+    Vectorized great-circle distance in km
+
+    Arguments are scalars or arrays and broadcast against each other.
+    """
+    lat1 = np.radians(lat1)
+    lat2 = np.radians(lat2)
+    dlat = lat2 - lat1
+    dlng = np.radians(np.subtract(lng2, lng1))
+
+    a = np.sin(dlat / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin(dlng / 2) ** 2
+    return EARTH_RADIUS_KM * 2 * np.arctan2(np.sqrt(a), np.sqrt(1 - a))
+
+def segment_lengths(lats, lngs):
+    """Length in km of each segment between consecutive points (n - 1 values)"""
+    lats = np.asarray(lats, dtype=np.float64)
+    lngs = np.asarray(lngs, dtype=np.float64)
+    return haversine(lats[:-1], lngs[:-1], lats[1:], lngs[1:])
+
+def cumulative_distance(lats, lngs):
+    """Along-route distance in km from the first point to each point (n values)"""
+    lengths = segment_lengths(lats, lngs)
+    result = np.zeros(len(lengths) + 1)
+    np.cumsum(lengths, out=result[1:])
+    return result
+
+def distance_matrix(lats1, lngs1, lats2, lngs2):
+    """Pairwise distances in km, shape (len(lats1), len(lats2))"""
+    lats1 = np.asarray(lats1, dtype=np.float64)
+    lngs1 = np.asarray(lngs1, dtype=np.float64)
+    return haversine(lats1[:, None], lngs1[:, None], lats2, lngs2)
+
+def bearing(lat1, lng1, lat2, lng2):
+    """Vectorized initial bearing in degrees clockwise from north, in [0, 360)"""
+    lat1 = np.radians(lat1)
+    lat2 = np.radians(lat2)
+    dlng = np.radians(np.subtract(lng2, lng1))
+
+    x = np.sin(dlng) * np.cos(lat2)
+    y = np.cos(lat1) * np.sin(lat2) - np.sin(lat1) * np.cos(lat2) * np.cos(dlng)
+    return np.degrees(np.arctan2(x, y)) % 360
+
+def polyline_metrics(lats, lngs):
+    """
+    Segment lengths, headings and turn angles of a polyline in one pass
+
+    Shares the per-point trigonometry between the haversine and bearing
+    formulas, so it is cheaper than calling segment_lengths, bearing and
+    turn_angles separately.
+
+    Returns:
+        Tuple of (lengths, headings, angles): n - 1 segment lengths in km,
+        n - 1 segment headings in degrees and n - 2 interior angles (see
+        turn_angles)
+    """
+    lats = np.radians(np.asarray(lats, dtype=np.float64))
+    lngs = np.radians(np.asarray(lngs, dtype=np.float64))
+
+    if len(lats) < 2:
+        return np.empty(0), np.empty(0), np.empty(0)
+
+    sin_lats = np.sin(lats)
+    cos_lats = np.cos(lats)
+    dlat = np.diff(lats)
+    dlng = np.diff(lngs)
+
+    a = np.sin(dlat / 2) ** 2 + cos_lats[:-1] * cos_lats[1:] * np.sin(dlng / 2) ** 2
+    lengths = EARTH_RADIUS_KM * 2 * np.arctan2(np.sqrt(a), np.sqrt(1 - a))
+
+    x = np.sin(dlng) * cos_lats[1:]
+    y = cos_lats[:-1] * sin_lats[1:] - sin_lats[:-1] * cos_lats[1:] * np.cos(dlng)
+    headings = np.degrees(np.arctan2(x, y)) % 360
+
+    change = np.abs(np.diff(headings))
+    change = np.minimum(change, 360 - change)
+    degenerate = (lengths[:-1] == 0) | (lengths[1:] == 0)
+    angles = np.where(degenerate, 180.0, 180.0 - change)
+
+    return lengths, headings, angles
+
+def turn_angles(lats, lngs):
+    """
+    Interior angle in degrees at each interior point of a polyline
+
+    180 means the route continues straight, 90 a right-angle turn and 0
+    a full U-turn. Points where either adjoining segment has zero length
+    count as straight.
+
+    Returns:
+        Array of n - 2 angles (for points 1 .. n - 2)
+    """
+    return polyline_metrics(lats, lngs)[2]
+
+def curvature_radius(distance, angles):
+    """
+    Radius of curvature in meters at each point of a polyline
+
+    The heading change at a point spread over half of each adjoining
+    segment: radius = ((d[i+1] - d[i-1]) / 2) / deflection. Straight
+    points and the two end points get infinity.
+
+    Args:
+        distance: Cumulative along-route distance in km (n values)
+        angles: Interior turn angle at every point in degrees (n values,
+            180 at the end points)
+    """
+    distance = np.asarray(distance, dtype=np.float64)
+    radius = np.full(len(distance), np.inf)
+
+    if len(distance) < 3:
+        return radius
+
+    deflection = np.radians(180.0 - np.asarray(angles[1:-1], dtype=np.float64))
+    arc = (distance[2:] - distance[:-2]) / 2 * 1000
+    np.divide(arc, deflection, out=radius[1:-1], where=deflection > 0)
+    return radius
+
+def gradients(elevations, lengths, min_length=0.01):
+    """
+    Gradient in percent of each segment
+
+    Args:
+        elevations: Elevation in meters at each point (n values)
+        lengths: Segment lengths in km (n - 1 values)
+        min_length: Segments shorter than this (km) get a gradient of 0
+
+    Returns:
+        Array of n - 1 gradients, positive for ascents
+    """
+    lengths = np.asarray(lengths, dtype=np.float64)
+    rise = np.diff(np.asarray(elevations, dtype=np.float64))
+    result = np.zeros(len(lengths))
+    np.divide(rise * 100, lengths * 1000, out=result, where=lengths >= min_length)
+    return result
+
+def turn_segments(angles, distance, threshold=150):
+    """
+    Merge consecutive sharp points into turn segments
+
+    A bend drawn with several polyline vertices shows up as a run of
+    points whose interior angle is below `threshold`; each run becomes
+    one segment.
+
+    Args:
+        angles: Interior turn angle at every point in degrees (n values)
+        distance: Cumulative along-route distance in km (n values)
+        threshold: Points with a smaller angle are sharp
+
+    Returns:
+        Dictionary of arrays, one entry per segment: 'start' and 'end'
+        (first and last sharp point index), 'apex' (index of the sharpest
+        point), 'min_angle', 'deflection' (total heading change in degrees)
+        and 'length' (meters from the point before the segment to the
+        point after it)
+    """
+    angles = np.asarray(angles, dtype=np.float64)
+    distance = np.asarray(distance, dtype=np.float64)
+    sharp = angles < threshold
+
+    edges = np.diff(np.concatenate([[0], sharp.view(np.int8), [0]]))
+    starts = np.flatnonzero(edges == 1)
+    ends = np.flatnonzero(edges == -1) - 1
+
+    # Total deflection of each run from a cumulative sum
+    deflection = np.where(sharp, 180.0 - angles, 0.0)
+    totals = np.concatenate([[0.0], np.cumsum(deflection)])
+
+    # Sharpest point of each run: the run minimum, then its first occurrence
+    if len(starts):
+        masked = np.where(sharp, angles, np.inf)
+        min_angle = np.minimum.reduceat(masked, starts)
+        run_of_point = np.maximum(np.cumsum(edges[:-1] == 1) - 1, 0)
+        candidates = np.flatnonzero(sharp & (masked == min_angle[run_of_point]))
+        _, first = np.unique(run_of_point[candidates], return_index=True)
+        apex = candidates[first]
+    else:
+        min_angle = np.empty(0)
+        apex = np.empty(0, dtype=np.int64)
+
+    last = len(distance) - 1
+    before = np.maximum(starts - 1, 0)
+    after = np.minimum(ends + 1, last)
+
+    return {
+        'start': starts,
+        'end': ends,
+        'apex': apex,
+        'min_angle': min_angle,
+        'deflection': totals[ends + 1] - totals[starts],
+        'length': (distance[after] - distance[before]) * 1000
+    }
+
+def midpoints(lats, lngs):
+    """Great-circle midpoint of each segment between consecutive points (n - 1 values)"""
+    lats = np.radians(np.asarray(lats, dtype=np.float64))
+    lngs = np.radians(np.asarray(lngs, dtype=np.float64))
+    lat1, lat2 = lats[:-1], lats[1:]
+    dlng = lngs[1:] - lngs[:-1]
+
+    bx = np.cos(lat2) * np.cos(dlng)
+    by = np.cos(lat2) * np.sin(dlng)
+    mid_lats = np.arctan2(np.sin(lat1) + np.sin(lat2), np.sqrt((np.cos(lat1) + bx) ** 2 + by ** 2))
+    mid_lngs = lngs[:-1] + np.arctan2(by, np.cos(lat1) + bx)
+    return np.degrees(mid_lats), (np.degrees(mid_lngs) + 540) % 360 - 180
+
+def simplify_indices(lats, lngs, tolerance, max_spacing=None):
+    """
+    Douglas-Peucker simplification of a polyline
+
+    Keeps the end points and every point needed so that no dropped point
+    lies more than `tolerance` meters from the simplified line. Distances
+    are measured on a local equirectangular projection, which is accurate
+    to well under a meter for the tolerances used on road geometry.
+
+    With `max_spacing` (km), stretches longer than that along the route are
+    also split at their middle point, so straight roads keep a point at
+    least every `max_spacing` km wherever the input has one.
+
+    Returns:
+        Sorted int64 array of the indices of the kept points
+    """
+    lats = np.asarray(lats, dtype=np.float64)
+    lngs = np.asarray(lngs, dtype=np.float64)
+    n = len(lats)
+
+    if n < 3:
+        return np.arange(n)
+
+    # Project to meters around the polyline's mean latitude
+    scale = EARTH_RADIUS_KM * 1000 * np.pi / 180
+    x = (lngs - lngs[0]) * scale * np.cos(np.radians(lats.mean()))
+    y = (lats - lats[0]) * scale
+
+    if max_spacing:
+        distance = cumulative_distance(lats, lngs)
+
+    keep = np.zeros(n, dtype=bool)
+    keep[[0, -1]] = True
+    stack = [(0, n - 1)]
+
+    while stack:
+        first, last = stack.pop()
+        if last - first < 2:
+            continue
+
+        # Distance of each interior point from the chord first -> last
+        # (from the nearer end point when it falls outside the chord)
+        dx, dy = x[last] - x[first], y[last] - y[first]
+        px, py = x[first + 1:last] - x[first], y[first + 1:last] - y[first]
+        chord = dx * dx + dy * dy
+        t = np.clip((px * dx + py * dy) / chord, 0, 1) if chord > 0 else 0
+        offsets = np.hypot(px - t * dx, py - t * dy)
+
+        farthest = int(np.argmax(offsets))
+        if offsets[farthest] > tolerance:
+            split = first + 1 + farthest
+        elif max_spacing and distance[last] - distance[first] > max_spacing:
+            middle = (distance[first] + distance[last]) / 2
+            split = int(np.clip(np.searchsorted(distance, middle), first + 1, last - 1))
+        else:
+            split = None
+
+        if split is not None:
+            keep[split] = True
+            stack.append((first, split))
+            stack.append((split, last))
+
+    return np.flatnonzero(keep)
+
+def bbox_polygons(south, west, north, east, step=1.0, max_width=90.0):
+    """
+    GeoJSON polygons that together cover a latitude/longitude box under
+    MongoDB's spherical ($geometry) semantics
+
+    Polygon edges are great-circle arcs, so a box given as its four
+    corners bulges away from the parallels (badly, for wide boxes) and a
+    box crossing the antimeridian becomes its complement. Here the box is
+    split at the antimeridian and into pieces at most `max_width` degrees
+    wide (each well under a hemisphere), the parallels get a vertex every
+    `step` degrees, and the latitudes are pushed out by the largest sag
+    left between those vertices (about 0.001 degrees for 1 degree steps). The pieces may reach slightly past the
+    box (use bbox_filter for the exact box); points within 1e-4 degrees of
+    a pole are left out.
+
+    Args:
+        south, west, north, east: Box in degrees (west > east crosses the
+            antimeridian)
+
+    Returns:
+        List of GeoJSON Polygon dictionaries
+    """
+    spans = [(west, east)] if west <= east else [(west, 180.0), (-180.0, east)]
+
+    # Largest gap between a parallel and the arc through two of its
+    # vertices `step` degrees apart (reached at 45 degrees latitude)
+    pad = math.degrees(math.atan(1 / math.cos(math.radians(step) / 2))) - 45 + 1e-7
+    low, high = max(south - pad, -90 + 1e-4), min(north + pad, 90 - 1e-4)
+
+    polygons = []
+    for span_west, span_east in spans:
+        # Keep zero-width boxes valid polygons
+        span_west, span_east = max(span_west - 1e-7, -180.0), min(span_east + 1e-7, 180.0)
+        n_pieces = max(1, math.ceil((span_east - span_west) / max_width))
+        bounds = np.linspace(span_west, span_east, n_pieces + 1)
+
+        for piece_west, piece_east in zip(bounds[:-1], bounds[1:]):
+            n_steps = max(1, math.ceil((piece_east - piece_west) / step))
+            lngs = np.linspace(piece_west, piece_east, n_steps + 1).tolist()
+            ring = ([[lng, low] for lng in lngs] + [[lng, high] for lng in reversed(lngs)]
+                    + [[lngs[0], low]])
+            polygons.append({'type': 'Polygon', 'coordinates': [ring]})
+
+    return polygons
+
+def bbox_filter(field, south, west, north, east):
+    """
+    MongoDB filter for GeoJSON points in `field` inside a latitude/longitude
+    box (west > east crosses the antimeridian)
+
+    The bbox_polygons pieces let a 2dsphere index narrow the candidates;
+    an $expr on the coordinates then keeps exactly the points inside the
+    box.
+    """
+    polygons = bbox_polygons(south, west, north, east)
+    lng = {'$arrayElemAt': [f'${field}.coordinates', 0]}
+    lat = {'$arrayElemAt': [f'${field}.coordinates', 1]}
+
+    in_lng = [{'$gte': [lng, west]}, {'$lte': [lng, east]}]
+    within = [{field: {'$geoWithin': {'$geometry': polygon}}} for polygon in polygons]
+
+    return {
+        '$or': within,
+        '$expr': {'$and': [
+            {'$gte': [lat, south]},
+            {'$lte': [lat, north]},
+            {'$and': in_lng} if west <= east else {'$or': in_lng}
+        ]}
+    }
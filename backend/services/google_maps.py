@@ -1,12 +1,16 @@
 # backend/services/google_maps.py
-import requests
 import os
 import polyline
 import json
-import time
-import math
+import datetime
+import numpy as np
 from flask import current_app
 from config import GOOGLE_MAPS_API_KEY
+from services.cell_cache import cell_cached_points
+from services.geo import haversine, to_arrays
+from services.http_client import http_get
+from services.location_random import LocationRandom
+from services.route_geometry import RouteGeometry
 
 def get_route_details(origin, destination, waypoints=None):
     """
@@ -35,7 +39,7 @@ def get_route_details(origin, destination, waypoints=None):
         params["waypoints"] = "|".join(waypoints)
     
     try:
-        response = requests.get(url, params=params)
+        response = http_get('google_maps', url, params=params)
         data = response.json()
         
         if data["status"] != "OK":
@@ -114,89 +118,103 @@ def decode_polyline(polyline_str):
 
 def get_elevation_data(points):
     """
-    Get elevation data from Google Maps Elevation API
+    Get elevation data for route points (stored elevations first, the
+    Google Maps Elevation API for the rest)
     
     Args:
         points: List of dictionaries with lat, lng coordinates
         
     Returns:
-        List of dictionaries with lat, lng, elevation
+        List of dictionaries with lat, lng, elevation (points whose
+        elevation could not be fetched are left out)
     """
-    url = "https://maps.googleapis.com/maps/api/elevation/json"
+    from services.elevation import get_elevations
     
-    # Process in batches due to URL length limits
-    max_points_per_request = 100
-    all_results = []
+    lats, lngs = to_arrays(points)
+    elevations = get_elevations(lats, lngs)
     
-    for i in range(0, len(points), max_points_per_request):
-        batch = points[i:i + max_points_per_request]
-        
-        # Convert points to required format
-        locations = "|".join([f"{point['lat']},{point['lng']}" for point in batch])
-        
-        params = {
-            "locations": locations,
-            "key": GOOGLE_MAPS_API_KEY
+    return [
+        {
+            "lat": point["lat"],
+            "lng": point["lng"],
+            "elevation": float(elevation)
         }
+        for point, elevation in zip(points, elevations.tolist())
+        if not np.isnan(elevation)
+    ]
+
+def fetch_elevation_batch(lats, lngs):
+    """
+    Fetch elevations from the Google Maps Elevation API in one request
+    
+    Args:
+        lats, lngs: Coordinate arrays (at most ELEVATION_CONFIG['batch_size'])
         
-        try:
-            response = requests.get(url, params=params)
-            data = response.json()
-            
-            if data["status"] != "OK":
-                current_app.logger.error(f"Error getting elevation data: {data['status']}")
-                continue
-            
-            # Extract elevation data
-            for j, result in enumerate(data["results"]):
-                if i + j < len(points):
-                    all_results.append({
-                        "lat": points[i + j]["lat"],
-                        "lng": points[i + j]["lng"],
-                        "elevation": result["elevation"]
-                    })
-            
-            # Avoid rate limits
-            time.sleep(0.1)
-        
-        except Exception as e:
-            current_app.logger.error(f"Error getting elevation data: {str(e)}")
+    Returns:
+        List of elevations in meters, one per coordinate
+    """
+    url = "https://maps.googleapis.com/maps/api/elevation/json"
+    
+    params = {
+        "locations": "|".join(f"{lat},{lng}" for lat, lng in zip(lats.tolist(), lngs.tolist())),
+        "key": GOOGLE_MAPS_API_KEY
+    }
     
-    return all_results
+    response = http_get('google_maps', url, params=params)
+    data = response.json()
+    
+    # Raise so the batch is not stored
+    if data["status"] != "OK":
+        raise ValueError(f"Elevation API returned status {data['status']}")
+    
+    return [result["elevation"] for result in data["results"]]
 
 def get_traffic_data(points):
     """
     Get traffic data from Google Maps Roads API
     
     Args:
-        points: List of dictionaries with lat, lng coordinates
+        points: RouteGeometry or list of dictionaries with lat, lng coordinates
         
     Returns:
         List of dictionaries with traffic information
     """
-    # Sample points to reduce API calls
-    sampled_points = [points[i] for i in range(0, len(points), max(1, len(points) // 50))]
+    # Sample points to reduce API calls (one every 2 km, at route points
+    # so the samples join back onto them)
+    sampled_points = RouteGeometry.from_points(points).for_stage('traffic').points()
+    
+    # Get traffic data (one lookup per geohash cell)
+    cell_traffic = cell_cached_points('traffic', sampled_points, get_cell_traffic)
+    congestion_levels = [traffic["congestion_level"] for traffic in cell_traffic]
+    speed_limits = synthetic_speed_limits(*to_arrays(sampled_points), congestion_levels)
     
-    # Get traffic data
     traffic_data = []
     
-    for point in sampled_points:
-        # In a real application, we would use the Google Maps Roads API
-        # For this demo, generate synthetic traffic data
-        congestion_level = generate_synthetic_congestion(point["lat"], point["lng"])
-        
+    for point, traffic, speed_limit in zip(sampled_points, cell_traffic, speed_limits.tolist()):
         traffic_data.append({
             "location": {
                 "lat": point["lat"],
                 "lng": point["lng"]
             },
-            "congestion_level": congestion_level,
-            "speed_limit": get_synthetic_speed_limit(congestion_level),
-            "road_type": get_synthetic_road_type(point["lat"], point["lng"])
+            "congestion_level": traffic["congestion_level"],
+            "speed_limit": speed_limit,
+            "road_type": traffic["road_type"]
         })
     
     return traffic_data
 
+def get_cell_traffic(lats, lngs):
+    """Traffic conditions for the cells centered on each coordinate"""
+    # In a real application, we would use the Google Maps Roads API
+    # For this demo, generate synthetic traffic data
+    congestion_levels = synthetic_congestion(lats, lngs)
+    road_types = synthetic_road_types(lats, lngs)
+    
+    return [
+        {"congestion_level": congestion_level, "road_type": road_type}
+        for congestion_level, road_type in zip(congestion_levels.tolist(), road_types.tolist())
+    ]
+
 def get_nearby_places(lat, lng, place_type, radius=1000):
     """
     Get nearby places from Google Maps Places API
@@ -220,7 +238,7 @@ def get_nearby_places(lat, lng, place_type, radius=1000):
     }
     
     try:
-        response = requests.get(url, params=params)
+        response = http_get('google_maps', url, params=params)
         data = response.json()
         
         if data["status"] not in ["OK", "ZERO_RESULTS"]:
@@ -228,20 +246,19 @@ def get_nearby_places(lat, lng, place_type, radius=1000):
             return []
         
         places = []
+        results = data.get("results", [])
+        
+        # Calculate distances to all places at once
+        place_lats, place_lngs = to_arrays([place["geometry"]["location"] for place in results])
+        distances = haversine(lat, lng, place_lats, place_lngs) * 1000  # to meters
         
-        for place in data.get("results", []):
-            # Calculate distance
-            place_lat = place["geometry"]["location"]["lat"]
-            place_lng = place["geometry"]["location"]["lng"]
-            
-            distance = calculate_distance(lat, lng, place_lat, place_lng) * 1000  # to meters
-            
+        for place, distance in zip(results, distances):
             places.append({
                 "place_id": place["place_id"],
                 "name": place["name"],
                 "vicinity": place.get("vicinity", ""),
                 "geometry": place["geometry"],
-                "distance": distance
+                "distance": float(distance)
             })
         
         return places
@@ -262,124 +279,65 @@ def get_road_geometry(points):
     """
     # In a real application, we would use the Google Maps Roads API
     # For this demo, generate synthetic road geometry data
+    route = RouteGeometry.from_points(points)
+    rng = LocationRandom(route.lats, route.lngs, 'road_geometry')
     
-    geometry_data = []
+    # Roughly every 10th point is an intersection
+    is_intersection = np.arange(len(route)) % 10 == 0
+    road_width = rng.normal(8, 2)  # meters
     
-    for i, point in enumerate(points):
-        # Generate synthetic data
-        is_intersection = (i % 10 == 0)  # Roughly every 10th point
-        road_width = np.random.normal(8, 2)  # meters
-        
-        # Calculate curvature based on neighboring points
-        curvature = 0
-        if i > 0 and i < len(points) - 1:
-            prev_point = points[i-1]
-            next_point = points[i+1]
-            
-            # Calculate vectors
-            vector1 = (
-                point["lat"] - prev_point["lat"],
-                point["lng"] - prev_point["lng"]
-            )
-            
-            vector2 = (
-                next_point["lat"] - point["lat"],
-                next_point["lng"] - point["lng"]
-            )
-            
-            # Calculate angle
-            dot_product = vector1[0] * vector2[0] + vector1[1] * vector2[1]
-            mag1 = math.sqrt(vector1[0]**2 + vector1[1]**2)
-            mag2 = math.sqrt(vector2[0]**2 + vector2[1]**2)
-            
-            if mag1 > 0 and mag2 > 0:
-                cos_angle = dot_product / (mag1 * mag2)
-                cos_angle = max(-1, min(1, cos_angle))
-                angle_rad = math.acos(cos_angle)
-                angle_deg = math.degrees(angle_rad)
-                
-                # Curvature is inversely related to angle
-                # 180 degrees (straight) -> 0 curvature
-                # 90 degrees (right angle) -> higher curvature
-                curvature = 2 - (angle_deg / 90) if angle_deg <= 180 else 0
-        
-        # Calculate visibility
-        visibility = np.random.normal(10, 3)  # km
-        
-        # Calculate gradient
-        gradient = np.random.normal(0, 3)  # percent
-        
-        geometry_data.append({
-            "location": {
-                "lat": point["lat"],
-                "lng": point["lng"]
-            },
-            "road_width": road_width,
-            "curvature": curvature,
-            "gradient": gradient,
-            "visibility": visibility,
-            "is_intersection": is_intersection
-        })
+    # Curvature is inversely related to the turn angle
+    # 180 degrees (straight) -> 0 curvature
+    # 90 degrees (right angle) -> higher curvature
+    curvature = 2 - route.turn_angle / 90
+    
+    visibility = rng.normal(10, 3)  # km
+    gradient = rng.normal(0, 3)  # percent
     
-    return geometry_data
+    return [
+        {
+            "location": location,
+            "road_width": width,
+            "curvature": bend,
+            "gradient": grade,
+            "visibility": sight,
+            "is_intersection": intersection
+        }
+        for location, width, bend, grade, sight, intersection in zip(
+            route.points(), road_width.tolist(), curvature.tolist(), gradient.tolist(),
+            visibility.tolist(), is_intersection.tolist()
+        )
+    ]
 
-def generate_synthetic_congestion(lat, lng):
-    """Generate synthetic traffic congestion level (0-4)"""
-    # Use lat/lng to seed a pseudo-random generator for consistent results
-    seed = int(abs(lat * 1000) + abs(lng * 1000))
-    np.random.seed(seed)
+def synthetic_congestion(lats, lngs, hour=None):
+    """Generate synthetic traffic congestion levels (0-4) for each coordinate"""
+    rng = LocationRandom(lats, lngs, 'congestion')
     
     # Higher chance of congestion in certain patterns
-    hour = datetime.datetime.now().hour
+    if hour is None:
+        hour = datetime.datetime.now().hour
     
     # Rush hour congestion
-    if 7 <= hour <= 9 or 16 <= hour <= 18:
-        return min(4, int(np.random.exponential(2)))
-    else:
-        return min(4, int(np.random.exponential(1)))
+    scale = 2 if 7 <= hour <= 9 or 16 <= hour <= 18 else 1
+    return np.minimum(4, rng.exponential(scale).astype(np.int64))
 
-def get_synthetic_speed_limit(congestion_level):
-    """Get synthetic speed limit based on congestion"""
-    # Base speed limits for different road types
-    base_limits = [100, 80, 60, 50, 30]
+def synthetic_speed_limits(lats, lngs, congestion_levels):
+    """Generate synthetic speed limits (km/h) from each coordinate's congestion"""
+    rng = LocationRandom(lats, lngs, 'speed_limit')
+    congestion_levels = np.asarray(congestion_levels)
     
-    # Choose a base limit
-    base_limit = np.random.choice(base_limits)
+    # Base speed limits for different road types
+    base_limits = rng.choice([100, 80, 60, 50, 30])
     
     # Adjust based on congestion
-    if congestion_level >= 3:
-        return max(30, base_limit - 30)
-    elif congestion_level >= 1:
-        return max(30, base_limit - 10)
-    else:
-        return base_limit
+    reduction = np.select([congestion_levels >= 3, congestion_levels >= 1], [30, 10], 0)
+    return np.where(reduction > 0, np.maximum(30, base_limits - reduction), base_limits)
 
-def get_synthetic_road_type(lat, lng):
-    """Get synthetic road type"""
-    # Use lat/lng to seed a pseudo-random generator for consistent results
-    seed = int(abs(lat * 10000) + abs(lng * 10000))
-    np.random.seed(seed)
+def synthetic_road_types(lats, lngs):
+    """Generate synthetic road types for each coordinate"""
+    rng = LocationRandom(lats, lngs, 'road_type')
     
     road_types = ["highway", "primary", "secondary", "residential", "intersection"]
     weights = [0.2, 0.3, 0.3, 0.15, 0.05]
     
-    return np.random.choice(road_types, p=weights)
-
-def calculate_distance(lat1, lon1, lat2, lon2):
-    """Calculate distance between two points in km using Haversine formula"""
-    R = 6371  # Earth radius in km
-    
-    # Convert to radians
-    lat1_rad = math.radians(lat1)
-    lon1_rad = math.radians(lon1)
-    lat2_rad = math.radians(lat2)
-    lon2_rad = math.radians(lon2)
-    
-    # Haversine formula
-    dlon = lon2_rad - lon1_rad
-    dlat = lat2_rad - lat1_rad
-    a = math.sin(dlat/2)**2 + math.cos(lat1_rad) * math.cos(lat2_rad) * math.sin(dlon/2)**2
-    c = 2 * math.atan2(math.sqrt(a), math.sqrt(1-a))
-    distance = R * c
-    
-    return distance
\ No newline at end of file
+    return rng.choice(road_types, p=weights)
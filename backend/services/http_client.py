@@ -0,0 +1,251 @@
+# backend/services/http_client.py
+import collections
+import os
+import random
+import threading
+import time
+
+import numpy as np
+import requests
+from requests.adapters import HTTPAdapter
+from config import HTTP_CLIENT_CONFIG
+
+# Upper bounds (ms) of the request latency histogram buckets
+LATENCY_BUCKETS = (10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+def provider_config(provider):
+    """HTTP_CLIENT_CONFIG of a provider, filled in from 'default'"""
+    return {**HTTP_CLIENT_CONFIG['default'], **HTTP_CLIENT_CONFIG.get(provider, {})}
+
+class RateLimiter:
+    """
+    Token bucket allowing `rate` acquisitions per second on average, in
+    bursts of up to `burst` (one second's worth by default)
+    """
+
+    def __init__(self, rate, burst=None):
+        self.rate = float(rate)
+        self.capacity = float(burst or max(1.0, self.rate))
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """Take one token, waiting for it if needed; returns the seconds waited"""
+        waited = 0.0
+
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return waited
+
+                wait = (1 - self._tokens) / self.rate
+
+            time.sleep(wait)
+            waited += wait
+
+class ProviderClient:
+    """
+    Shared HTTP client of one external data provider
+
+    A requests Session with its own connection pool, so calls to the
+    provider reuse keep-alive connections instead of paying a TCP and TLS
+    handshake each. Every attempt takes a token from the provider's
+    `rate_limit` bucket (when set), has a connect and read timeout and
+    holds one of `max_concurrency` slots while in flight. Timeouts, connection
+    errors and `retry_statuses` are retried up to `retries` times after a
+    full-jitter exponential backoff (or the server's Retry-After, capped
+    at `backoff_max`). Attempt latencies go into a histogram and failures
+    are counted by kind.
+    """
+
+    def __init__(self, name, config):
+        self.name = name
+        self.config = config
+        self.timeout = (config['connect_timeout'], config['read_timeout'])
+
+        adapter = HTTPAdapter(pool_connections=config['pool_size'], pool_maxsize=config['pool_size'], max_retries=0)
+        self.session = requests.Session()
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+
+        self._limiter = RateLimiter(config['rate_limit']) if config.get('rate_limit') else None
+        self._slots = threading.BoundedSemaphore(config['max_concurrency'])
+        self._stats_lock = threading.Lock()
+        self._stats = dict.fromkeys(('calls', 'attempts', 'retries', 'failed', 'in_flight', 'throttled'), 0)
+        self._stats['total_latency'] = 0.0
+        self._stats['throttle_wait'] = 0.0
+        self._errors = collections.Counter()
+        self._histogram = [0] * (len(LATENCY_BUCKETS) + 1)
+
+    def get(self, url, params=None, timeout=None, **kwargs):
+        """
+        GET with pooling, retries and the concurrency limit
+
+        Returns:
+            The response (the last one if a retryable status persisted)
+
+        Raises:
+            requests.RequestException if every attempt failed without a
+            response
+        """
+        self._count('calls')
+        attempts = self.config['retries'] + 1
+
+        for attempt in range(attempts):
+            delay = None
+
+            try:
+                response = self._attempt(url, params, timeout or self.timeout, kwargs)
+            except requests.Timeout:
+                kind = 'timeout'
+                if attempt == attempts - 1:
+                    self._fail(kind)
+                    raise
+            except requests.ConnectionError:
+                kind = 'connection'
+                if attempt == attempts - 1:
+                    self._fail(kind)
+                    raise
+            except requests.RequestException:
+                # Bad URL, invalid request, ...: retrying will not help
+                self._fail('request')
+                raise
+            else:
+                if response.status_code not in self.config['retry_statuses']:
+                    if response.status_code >= 400:
+                        self._error(f'http_{response.status_code}')
+                    return response
+
+                kind = f'http_{response.status_code}'
+                if attempt == attempts - 1:
+                    self._fail(kind)
+                    return response
+                delay = retry_after(response)
+                response.close()
+
+            self._error(kind)
+            self._count('retries')
+            time.sleep(self._backoff(attempt, delay))
+
+    def _attempt(self, url, params, timeout, kwargs):
+        if self._limiter is not None:
+            waited = self._limiter.acquire()
+            if waited:
+                with self._stats_lock:
+                    self._stats['throttled'] += 1
+                    self._stats['throttle_wait'] += waited
+
+        with self._slots:
+            self._count('in_flight')
+            start = time.perf_counter()
+            try:
+                return self.session.get(url, params=params, timeout=timeout, **kwargs)
+            finally:
+                elapsed = time.perf_counter() - start
+                with self._stats_lock:
+                    self._stats['in_flight'] -= 1
+                    self._stats['attempts'] += 1
+                    self._stats['total_latency'] += elapsed
+                    self._histogram[np.searchsorted(LATENCY_BUCKETS, elapsed * 1000)] += 1
+
+    def _backoff(self, attempt, retry_after=None):
+        """Seconds to wait before retry `attempt + 1`"""
+        if retry_after is not None:
+            return min(retry_after, self.config['backoff_max'])
+
+        ceiling = min(self.config['backoff_max'], self.config['backoff_base'] * 2 ** attempt)
+        return random.uniform(0, ceiling)
+
+    def _count(self, name):
+        with self._stats_lock:
+            self._stats[name] += 1
+
+    def _error(self, kind):
+        with self._stats_lock:
+            self._errors[kind] += 1
+
+    def _fail(self, kind):
+        with self._stats_lock:
+            self._errors[kind] += 1
+            self._stats['failed'] += 1
+
+    def stats(self):
+        """Call, retry and error counters and the attempt latency histogram"""
+        with self._stats_lock:
+            stats = dict(self._stats)
+            errors = dict(self._errors)
+            histogram = list(self._histogram)
+
+        attempts = stats['attempts']
+        stats['avg_latency_ms'] = round(stats.pop('total_latency') / attempts * 1000, 2) if attempts else 0
+        stats['throttle_wait'] = round(stats['throttle_wait'], 3)
+        stats['p50_latency_ms'] = histogram_quantile(histogram, 0.5)
+        stats['p95_latency_ms'] = histogram_quantile(histogram, 0.95)
+        stats['errors'] = errors
+        stats['latency_ms_histogram'] = {
+            **{f'<={bound}': count for bound, count in zip(LATENCY_BUCKETS, histogram)},
+            f'>{LATENCY_BUCKETS[-1]}': histogram[-1]
+        }
+        stats['max_concurrency'] = self.config['max_concurrency']
+        stats['rate_limit'] = self.config.get('rate_limit')
+        stats['pool_size'] = self.config['pool_size']
+
+        return stats
+
+def retry_after(response):
+    """Seconds from a Retry-After header in delta-seconds form, or None"""
+    try:
+        return max(0.0, float(response.headers.get('Retry-After')))
+    except (TypeError, ValueError):
+        return None
+
+def histogram_quantile(histogram, q):
+    """Upper bucket bound (ms) containing quantile q (None when empty or in the open bucket)"""
+    total = sum(histogram)
+    if not total:
+        return None
+
+    bucket = int(np.searchsorted(np.cumsum(histogram), q * total))
+    return LATENCY_BUCKETS[bucket] if bucket < len(LATENCY_BUCKETS) else None
+
+_clients = {}
+_clients_lock = threading.Lock()
+_clients_pid = None
+
+def get_client(provider):
+    """
+    Shared client of a provider, created on first use in each process (a
+    forked worker must not reuse its parent's pooled sockets)
+    """
+    global _clients_pid
+
+    client = _clients.get(provider)
+    if client is not None and _clients_pid == os.getpid():
+        return client
+
+    with _clients_lock:
+        if _clients_pid != os.getpid():
+            _clients.clear()
+            _clients_pid = os.getpid()
+
+        if provider not in _clients:
+            _clients[provider] = ProviderClient(provider, provider_config(provider))
+
+        return _clients[provider]
+
+def http_get(provider, url, params=None, **kwargs):
+    """GET through the shared client of `provider` ('google_maps', 'openweather', ...)"""
+    return get_client(provider).get(url, params=params, **kwargs)
+
+def get_http_stats():
+    """Per-provider request counters and latency histograms in this process"""
+    with _clients_lock:
+        clients = dict(_clients) if _clients_pid == os.getpid() else {}
+
+    return {name: client.stats() for name, client in clients.items()}
@@ -0,0 +1,209 @@
+# backend/services/inference_batcher.py
+import queue
+import threading
+import time
+from concurrent.futures import Future
+import numpy as np
+from config import ML_BATCHING_CONFIG
+from services.lazy_imports import lazy_import
+
+pd = lazy_import('pandas')
+
+# Upper bounds (rows) of the batch-size histogram buckets
+HISTOGRAM_BUCKETS = (1, 2, 4, 8, 16, 32, 64, 128, 256, 512, 1024, 2048, 4096)
+
+class InferenceBatcher:
+    """
+    Coalesces concurrent predict_proba calls for one model
+
+    Route jobs run in their own threads and each score a small feature
+    frame. Requests are queued and a single worker thread drains them:
+    after taking the first request it keeps collecting for up to
+    `max_wait_ms` or until `max_batch_rows` rows are pending, scores each
+    group of requests that share a model object in one vectorized call,
+    and hands every caller back its own rows.
+    """
+
+    def __init__(self, name, max_batch_rows=1024, max_wait_ms=2.0):
+        self.name = name
+        self.max_batch_rows = max_batch_rows
+        self.max_wait = max_wait_ms / 1000.0
+
+        self._queue = queue.Queue()
+        self._pending_rows = 0
+        self._held = None
+        self._stats_lock = threading.Lock()
+        self._stats = {
+            'requests': 0,
+            'rows': 0,
+            'batches': 0,
+            'errors': 0,
+            'max_queue_depth': 0,
+            'total_wait_time': 0.0,
+            'total_predict_time': 0.0
+        }
+        self._histogram = [0] * (len(HISTOGRAM_BUCKETS) + 1)
+
+        self._thread = threading.Thread(
+            target=self._run, name=f'inference-batcher-{name}', daemon=True
+        )
+        self._thread.start()
+
+    def predict_proba(self, model, features):
+        """
+        Score a feature frame as part of the next batch
+
+        Args:
+            model: Model object the caller fetched from the registry; only
+                requests for the same object are scored together
+            features: DataFrame of feature rows
+
+        Returns:
+            Array of class probabilities for the rows of `features`
+        """
+        if len(features) == 0:
+            return model.predict_proba(features)
+
+        future = Future()
+
+        with self._stats_lock:
+            self._pending_rows += len(features)
+            self._stats['max_queue_depth'] = max(
+                self._stats['max_queue_depth'], self._queue.qsize() + 1
+            )
+
+        self._queue.put((model, features, future, time.perf_counter()))
+        return future.result()
+
+    def stats(self):
+        """Counters, current queue depth and batch-size histogram"""
+        with self._stats_lock:
+            stats = dict(self._stats)
+            histogram = list(self._histogram)
+            pending_rows = self._pending_rows
+
+        batches = stats['batches']
+        stats['queue_depth'] = self._queue.qsize()
+        stats['pending_rows'] = pending_rows
+        stats['avg_batch_rows'] = round(stats['rows'] / batches, 2) if batches else 0
+        stats['avg_requests_per_batch'] = round(stats['requests'] / batches, 2) if batches else 0
+        stats['total_wait_time'] = round(stats['total_wait_time'], 4)
+        stats['total_predict_time'] = round(stats['total_predict_time'], 4)
+        stats['batch_rows_histogram'] = {
+            **{f'<={bound}': count for bound, count in zip(HISTOGRAM_BUCKETS, histogram)},
+            f'>{HISTOGRAM_BUCKETS[-1]}': histogram[-1]
+        }
+        stats['max_batch_rows'] = self.max_batch_rows
+        stats['max_wait_ms'] = self.max_wait * 1000.0
+
+        return stats
+
+    def _run(self):
+        while True:
+            batch = self._collect()
+            now = time.perf_counter()
+
+            # Score each model's requests together (normally there is only
+            # one model, but a hot reload can land mid-batch)
+            groups = {}
+            for request in batch:
+                groups.setdefault(id(request[0]), []).append(request)
+
+            for requests in groups.values():
+                self._score(requests)
+
+            rows = sum(len(request[1]) for request in batch)
+            with self._stats_lock:
+                self._pending_rows -= rows
+                self._stats['requests'] += len(batch)
+                self._stats['rows'] += rows
+                self._stats['batches'] += 1
+                self._stats['total_wait_time'] += sum(now - request[3] for request in batch)
+                self._histogram[np.searchsorted(HISTOGRAM_BUCKETS, rows)] += 1
+
+    def _collect(self):
+        """Block for the first request, then gather more until full or timed out"""
+        first = self._held or self._queue.get()
+        self._held = None
+
+        batch = [first]
+        rows = len(first[1])
+        deadline = time.perf_counter() + self.max_wait
+
+        while rows < self.max_batch_rows:
+            timeout = deadline - time.perf_counter()
+            if timeout <= 0:
+                break
+
+            try:
+                request = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                break
+
+            if rows + len(request[1]) > self.max_batch_rows:
+                # Keep it for the next batch rather than splitting it
+                self._held = request
+                break
+
+            batch.append(request)
+            rows += len(request[1])
+
+        return batch
+
+    def _score(self, requests):
+        model = requests[0][0]
+        start = time.perf_counter()
+
+        try:
+            if len(requests) == 1:
+                results = [model.predict_proba(requests[0][1])]
+            else:
+                combined = pd.concat([request[1] for request in requests], ignore_index=True, copy=False)
+                probabilities = model.predict_proba(combined)
+                offsets = np.cumsum([len(request[1]) for request in requests])[:-1]
+                results = np.split(probabilities, offsets)
+        except Exception as e:
+            with self._stats_lock:
+                self._stats['errors'] += 1
+            for request in requests:
+                request[2].set_exception(e)
+            return
+
+        with self._stats_lock:
+            self._stats['total_predict_time'] += time.perf_counter() - start
+
+        for request, result in zip(requests, results):
+            request[2].set_result(result)
+
+_batchers = {}
+_batchers_lock = threading.Lock()
+
+def get_batcher(name):
+    """Get (creating on first use) the batcher for a model"""
+    batcher = _batchers.get(name)
+    if batcher is None:
+        with _batchers_lock:
+            batcher = _batchers.get(name)
+            if batcher is None:
+                batcher = InferenceBatcher(
+                    name,
+                    max_batch_rows=ML_BATCHING_CONFIG['max_batch_rows'],
+                    max_wait_ms=ML_BATCHING_CONFIG['max_wait_ms']
+                )
+                _batchers[name] = batcher
+    return batcher
+
+def predict_proba(name, model, features):
+    """
+    Score features with a model, coalescing with concurrent callers
+
+    Falls back to a direct predict_proba call when batching is disabled.
+    """
+    if not ML_BATCHING_CONFIG['enabled']:
+        return model.predict_proba(features)
+
+    return get_batcher(name).predict_proba(model, features)
+
+def get_batcher_stats():
+    """Get queue depth and batch-size statistics for every batcher"""
+    return {name: batcher.stats() for name, batcher in list(_batchers.items())}
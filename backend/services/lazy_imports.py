@@ -0,0 +1,79 @@
+# backend/services/lazy_imports.py
+import importlib
+import threading
+import time
+import types
+
+class LazyModule(types.ModuleType):
+    """
+    Module stand-in that imports the real module on first attribute access
+
+    Service modules bind heavy libraries (pandas, xgboost) at import time
+    as `pd = lazy_import('pandas')`, so importing the app no longer pays for
+    them; the first request or job that touches `pd.DataFrame` does.
+    """
+
+    def __init__(self, name):
+        super().__init__(name)
+        self.__dict__['_lazy_module'] = None
+
+    def __getattr__(self, attr):
+        return getattr(self._load(), attr)
+
+    def __dir__(self):
+        return dir(self._load())
+
+    def __repr__(self):
+        state = 'loaded' if self.__dict__['_lazy_module'] is not None else 'not loaded'
+        return f"<lazy module '{self.__name__}' ({state})>"
+
+    def _load(self):
+        module = self.__dict__['_lazy_module']
+        if module is None:
+            module = _import(self.__name__)
+            self.__dict__['_lazy_module'] = module
+        return module
+
+_modules = {}
+_import_times = {}
+_lock = threading.Lock()
+
+def lazy_import(name):
+    """Get a LazyModule for `name` (shared by every caller)"""
+    with _lock:
+        module = _modules.get(name)
+        if module is None:
+            module = _modules[name] = LazyModule(name)
+        return module
+
+def preload(names):
+    """
+    Import modules now, e.g. from a background thread after startup so the
+    first request does not pay for them
+    """
+    for name in names:
+        lazy_import(name)._load()
+
+def start_preload(names):
+    """Preload modules in a daemon thread"""
+    thread = threading.Thread(target=preload, args=(list(names),), name='import-preload', daemon=True)
+    thread.start()
+    return thread
+
+def get_import_stats():
+    """Seconds spent importing each lazily loaded module in this process"""
+    return {
+        name: {
+            'loaded': name in _import_times,
+            'import_time': _import_times.get(name)
+        }
+        for name in list(_modules)
+    }
+
+def _import(name):
+    # importlib holds per-module import locks, so concurrent first uses of
+    # the same module wait for a single import
+    start = time.perf_counter()
+    module = importlib.import_module(name)
+    _import_times.setdefault(name, round(time.perf_counter() - start, 4))
+    return module
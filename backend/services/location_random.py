@@ -0,0 +1,92 @@
+# backend/services/location_random.py
+import zlib
+
+import numpy as np
+
+# Decimal places of the coordinates that key the generators (about 11 m,
+# the resolution of the old int(abs(lat * 10000) + abs(lng * 10000)) seeds)
+LOCATION_PRECISION = 4
+
+_GOLDEN = 0x9E3779B97F4A7C15
+
+def _mix(x):
+    """SplitMix64 finalizer: a bijective avalanche hash of uint64 values"""
+    x = (x ^ (x >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+    x = (x ^ (x >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+    return x ^ (x >> np.uint64(31))
+
+class LocationRandom:
+    """
+    Deterministic random numbers for arrays of coordinates
+
+    Counter-based: draw k for a point is a hash of its quantized
+    coordinate, the stream name and k, with no generator state shared
+    between calls or threads. The same location and stream always give
+    the same sequence, so synthetic providers stay consistent across
+    requests without seeding NumPy's global generator point by point,
+    and a whole coordinate array is drawn in one vectorized call.
+
+    Each method returns one draw per point (as an array) and advances the
+    counter, so successive calls give independent values.
+    """
+
+    def __init__(self, lats, lngs, stream, precision=LOCATION_PRECISION):
+        scale = 10 ** precision
+        lat_units = np.rint(np.asarray(lats, dtype=np.float64) * scale).astype(np.int64).astype(np.uint64)
+        lng_units = np.rint(np.asarray(lngs, dtype=np.float64) * scale).astype(np.int64).astype(np.uint64)
+        stream_key = np.uint64(zlib.crc32(stream.encode('utf-8')))
+
+        self._keys = _mix(_mix(lat_units ^ (stream_key << np.uint64(32))) + lng_units * np.uint64(_GOLDEN))
+        self._counter = 0
+
+    def __len__(self):
+        return len(self._keys)
+
+    def _bits(self):
+        self._counter += 1
+        return _mix(self._keys + np.uint64(self._counter * _GOLDEN % 2 ** 64))
+
+    def random(self):
+        """Uniform floats in [0, 1)"""
+        return (self._bits() >> np.uint64(11)).astype(np.float64) * 2.0 ** -53
+
+    def normal(self, loc=0.0, scale=1.0):
+        """Normal draws (Box-Muller)"""
+        radius = np.sqrt(-2 * np.log1p(-self.random()))
+        return loc + scale * radius * np.cos(2 * np.pi * self.random())
+
+    def exponential(self, scale=1.0):
+        """Exponential draws"""
+        return -scale * np.log1p(-self.random())
+
+    def integers(self, low, high):
+        """Integers in [low, high)"""
+        return low + np.floor(self.random() * (high - low)).astype(np.int64)
+
+    def choice(self, options, p=None):
+        """
+        One of `options` per point
+
+        `p` is a list of probabilities, or an (n, len(options)) array with
+        different probabilities for each point.
+        """
+        options = np.asarray(options)
+        uniforms = self.random()
+
+        if p is None:
+            return options[np.floor(uniforms * len(options)).astype(np.int64)]
+
+        cumulative = np.cumsum(np.asarray(p, dtype=np.float64), axis=-1)
+        cumulative = cumulative / cumulative[..., -1:]
+        index = (uniforms[:, None] >= np.broadcast_to(cumulative, (len(uniforms), len(options)))).sum(axis=1)
+        return options[np.minimum(index, len(options) - 1)]
+
+    def samples(self, options, sizes):
+        """
+        `sizes[i]` distinct options for point i (a choice without
+        replacement), in random order
+        """
+        # Rank the options by one uniform each
+        ranks = np.column_stack([self.random() for _ in options]).argsort(axis=1)
+        options = list(options)
+        return [[options[j] for j in row[:size]] for row, size in zip(ranks.tolist(), np.asarray(sizes).tolist())]
@@ -0,0 +1,421 @@
+# backend/services/model_registry.py
+import datetime
+import glob
+import json
+import os
+import pickle
+import shutil
+import threading
+import time
+from config import (
+    MODEL_FOLDER, MODEL_ARTIFACTS, MODEL_REGISTRY_CONFIG, ML_INFERENCE_CONFIG,
+    TRAINING_CONFIG, REDIS_URL
+)
+
+class ModelRegistry:
+    """
+    Process-wide cache of the pickled ML models in MODEL_FOLDER
+
+    Each model is unpickled once per process and shared by every request.
+    Tree ensembles are also saved as a .forest bundle of .npy node arrays;
+    with the compiled engine and `mmap` enabled those are memory-mapped
+    read-only instead, so worker processes share the pages rather than
+    each holding a private copy.
+    The artifact's mtime and size are re-checked at most every
+    `check_interval` seconds; when a retrained artifact lands, the new model
+    is loaded off to the side and swapped in with a single reference
+    assignment, so callers always see either the old or the new model.
+    """
+
+    def __init__(self, model_folder, artifacts, check_interval=30, engine='native',
+                 keep_versions=3, mmap=True):
+        self.model_folder = model_folder
+        self.artifacts = artifacts
+        self.check_interval = check_interval
+        self.engine = engine
+        self.keep_versions = keep_versions
+        self.mmap = mmap
+
+        self._entries = {}
+        # Re-entrant: a trainer invoked from get() ends up in save()
+        self._locks = {name: threading.RLock() for name in artifacts}
+        self._stats = {name: _empty_stats() for name in artifacts}
+        # Guards the counters; held only for the update, never while loading
+        self._stats_lock = threading.Lock()
+
+    def get_path(self, name):
+        """Absolute path of a model artifact"""
+        return os.path.join(self.model_folder, self.artifacts[name])
+
+    def get(self, name, trainer=None):
+        """
+        Get a loaded model
+
+        Args:
+            name: Model name (key of MODEL_ARTIFACTS)
+            trainer: Optional callable used to train the model if the
+                artifact does not exist yet
+
+        Returns:
+            The model object (or its compiled form when the compiled
+            inference engine is enabled), or None if it is unavailable
+        """
+        entry = self._entries.get(name)
+        now = time.time()
+
+        if entry and now - entry['checked_at'] < self.check_interval:
+            self._count(name, 'hits')
+            return entry['serving']
+
+        with self._locks[name]:
+            # Another thread may have refreshed the entry while we waited
+            entry = self._entries.get(name)
+            if entry and now - entry['checked_at'] < self.check_interval:
+                self._count(name, 'hits')
+                return entry['serving']
+
+            version = self._artifact_version(name)
+
+            if entry and version == entry['version']:
+                entry['checked_at'] = now
+                self._count(name, 'hits')
+                return entry['serving']
+
+            if version is None:
+                if entry:
+                    # Artifact disappeared; keep serving the loaded model
+                    entry['checked_at'] = now
+                    return entry['serving']
+                if trainer is None:
+                    return None
+
+                # trainer() calls save_model(), which registers the model
+                trainer()
+                entry = self._entries.get(name)
+                return entry['serving'] if entry else None
+
+            try:
+                self._load(name, version)
+            except (EOFError, pickle.UnpicklingError):
+                self._count(name, 'errors')
+                if entry:
+                    entry['checked_at'] = now
+                    return entry['serving']
+                if trainer is None:
+                    raise
+                trainer()
+
+            entry = self._entries.get(name)
+            return entry['serving'] if entry else None
+
+    def save(self, name, model, metadata=None):
+        """
+        Persist a model and swap it in for this process
+
+        The model is written to a temporary file and renamed to a versioned
+        artifact (e.g. model.20240101T000000000000-1234.pkl), which is then linked
+        over the canonical path with a second rename. Readers in other
+        processes therefore never see a partial pickle, and the previous
+        `keep_versions` artifacts stay on disk for rollback. Tree ensembles
+        also get a matching versioned .forest bundle, recorded in the
+        metadata before the canonical path is replaced. Extra `metadata`
+        (e.g. values derived from the training data) goes into the same
+        sidecar and is served with the model by get_metadata_for().
+        """
+        path = self.get_path(name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        payload = pickle.dumps(model)
+        artifact_version = f"{datetime.datetime.utcnow().strftime('%Y%m%dT%H%M%S%f')}-{os.getpid()}"
+        root, ext = os.path.splitext(path)
+        versioned_path = f"{root}.{artifact_version}{ext}"
+        tmp_path = f"{path}.tmp-{os.getpid()}-{threading.get_ident()}"
+
+        with open(tmp_path, 'wb') as f:
+            f.write(payload)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, versioned_path)
+
+        metadata = {
+            **(metadata or {}),
+            'version': artifact_version,
+            'saved_at': datetime.datetime.utcnow().isoformat(),
+            'size_bytes': len(payload)
+        }
+        bundle = self._write_bundle(name, model, artifact_version)
+        if bundle:
+            metadata['bundle'] = bundle
+        self._write_metadata(name, metadata)
+
+        try:
+            os.link(versioned_path, tmp_path)
+        except OSError:
+            # Filesystems without hard links get a copy instead
+            shutil.copyfile(versioned_path, tmp_path)
+        os.replace(tmp_path, path)
+
+        self._prune_versions(name)
+
+        with self._locks[name]:
+            self._swap(name, model, self._artifact_version(name), len(payload),
+                       forest=self._load_bundle(name))
+
+        return model
+
+    def reload(self, name):
+        """Force the next get() to re-check the artifact on disk"""
+        entry = self._entries.get(name)
+        if entry:
+            entry['checked_at'] = 0
+
+    def stats(self):
+        """Per-model load counters for this process"""
+        result = {}
+
+        for name in self.artifacts:
+            entry = self._entries.get(name)
+            with self._stats_lock:
+                stats = dict(self._stats[name])
+            stats['loaded'] = entry is not None
+            stats['version'] = entry['artifact_version'] if entry else None
+            stats['engine'] = entry['engine'] if entry else None
+            result[name] = stats
+
+        return result
+
+    def _artifact_version(self, name):
+        """Return (mtime_ns, size) of the artifact, or None if missing"""
+        try:
+            st = os.stat(self.get_path(name))
+        except FileNotFoundError:
+            return None
+        return (st.st_mtime_ns, st.st_size)
+
+    def get_metadata_for(self, name):
+        """Sidecar metadata of the model currently served (empty if not loaded)"""
+        entry = self._entries.get(name)
+        return entry['metadata'] if entry else {}
+
+    def get_metadata(self, name):
+        """Read the sidecar metadata written by save(), if any"""
+        try:
+            with open(f"{self.get_path(name)}.json") as f:
+                return json.load(f)
+        except (FileNotFoundError, ValueError):
+            return {}
+
+    def _write_metadata(self, name, metadata):
+        meta_path = f"{self.get_path(name)}.json"
+        tmp_path = f"{meta_path}.tmp-{os.getpid()}-{threading.get_ident()}"
+
+        with open(tmp_path, 'w') as f:
+            json.dump(metadata, f)
+        os.replace(tmp_path, meta_path)
+
+    def _write_bundle(self, name, model, artifact_version):
+        """Save a versioned .forest bundle for tree ensembles, return its name"""
+        from services.tree_inference import compile_model
+
+        try:
+            forest = compile_model(model)
+        except TypeError:
+            return None
+
+        root, _ = os.path.splitext(self.get_path(name))
+        bundle_path = f"{root}.{artifact_version}.forest"
+        tmp_path = f"{bundle_path}.tmp-{os.getpid()}-{threading.get_ident()}"
+
+        forest.save(tmp_path)
+        os.replace(tmp_path, bundle_path)
+
+        return os.path.basename(bundle_path)
+
+    def _load_bundle(self, name):
+        """Memory-map the model's .forest bundle, or None if not applicable"""
+        if self.engine != 'compiled' or not self.mmap:
+            return None
+
+        bundle = self.get_metadata(name).get('bundle')
+        if not bundle:
+            return None
+
+        from services.tree_inference import CompiledForest
+
+        try:
+            return CompiledForest.load(
+                os.path.join(os.path.dirname(self.get_path(name)), bundle),
+                mmap_mode='r'
+            )
+        except (FileNotFoundError, ValueError):
+            # Pruned or unreadable; fall back to the pickle
+            return None
+
+    def _prune_versions(self, name):
+        """Delete all but the newest `keep_versions` versioned artifacts"""
+        root, ext = os.path.splitext(self.get_path(name))
+        versions = sorted(glob.glob(f"{glob.escape(root)}.*{ext}"))
+        bundles = sorted(glob.glob(f"{glob.escape(root)}.*.forest"))
+
+        for old_path in versions[:-self.keep_versions]:
+            try:
+                os.remove(old_path)
+            except OSError:
+                pass
+
+        # Processes still mapping a removed bundle keep their pages until
+        # they swap to the new one
+        for old_path in bundles[:-self.keep_versions]:
+            shutil.rmtree(old_path, ignore_errors=True)
+
+    def _load(self, name, version):
+        start = time.perf_counter()
+
+        forest = self._load_bundle(name)
+        if forest is not None:
+            # The mapped arrays are all that is served; skip the pickle
+            model = None
+            size_bytes = forest.nbytes
+        else:
+            with open(self.get_path(name), 'rb') as f:
+                payload = f.read()
+            model = pickle.loads(payload)
+            size_bytes = len(payload)
+
+        load_time = time.perf_counter() - start
+        self._swap(name, model, version, size_bytes, load_time, forest=forest)
+
+    def _compile(self, name, model):
+        """Return (serving object, engine name) for a freshly loaded model"""
+        if self.engine != 'compiled':
+            return model, 'native'
+
+        from services.tree_inference import compile_model
+
+        try:
+            return compile_model(model), 'compiled'
+        except TypeError:
+            # Not a tree ensemble (e.g. logistic regression, CoxPH)
+            return model, 'native'
+
+    def _swap(self, name, model, version, size_bytes, load_time=None, forest=None):
+        # Readers grab self._entries[name] without a lock, so the new entry
+        # is fully built before it replaces the old one
+        if forest is not None:
+            serving, engine = forest, 'compiled-mmap'
+        else:
+            serving, engine = self._compile(name, model)
+        metadata = self.get_metadata(name)
+        self._entries[name] = {
+            'model': model,
+            'serving': serving,
+            'engine': engine,
+            'version': version,
+            'artifact_version': metadata.get('version'),
+            'metadata': metadata,
+            'checked_at': time.time()
+        }
+
+        with self._stats_lock:
+            stats = self._stats[name]
+            if load_time is not None:
+                stats['loads'] += 1
+                stats['total_load_time'] = round(stats['total_load_time'] + load_time, 4)
+                stats['last_load_time'] = round(load_time, 4)
+            else:
+                stats['saves'] += 1
+            stats['size_bytes'] = size_bytes
+            stats['last_swap'] = time.time()
+
+    def _count(self, name, counter):
+        # += on a shared dict is a read-modify-write; concurrent hits would drop counts
+        with self._stats_lock:
+            self._stats[name][counter] += 1
+
+def _empty_stats():
+    return {
+        'loads': 0,
+        'saves': 0,
+        'hits': 0,
+        'errors': 0,
+        'total_load_time': 0.0,
+        'last_load_time': None,
+        # Approximated by the pickled size, which for the tree ensembles is
+        # dominated by the same node arrays that live in memory (for mapped
+        # bundles, the size of the mapped arrays)
+        'size_bytes': 0,
+        'last_swap': None
+    }
+
+registry = ModelRegistry(
+    MODEL_FOLDER,
+    MODEL_ARTIFACTS,
+    check_interval=MODEL_REGISTRY_CONFIG['check_interval'],
+    engine=ML_INFERENCE_CONFIG['engine'],
+    keep_versions=TRAINING_CONFIG['keep_versions'],
+    mmap=ML_INFERENCE_CONFIG['mmap']
+)
+
+def get_model(name, trainer=None):
+    """Get a model from the process-wide registry"""
+    return registry.get(name, trainer)
+
+def save_model(name, model, metadata=None):
+    """Persist a trained model (with optional sidecar metadata) and swap it into the registry"""
+    return registry.save(name, model, metadata)
+
+def reload_model(name):
+    """Make the registry re-check a model artifact on next use"""
+    registry.reload(name)
+
+def get_model_version(name):
+    """Artifact version of the model currently served, or None if not loaded"""
+    entry = registry._entries.get(name)
+    return entry['artifact_version'] or entry['version'] if entry else None
+
+def get_model_metadata(name):
+    """Sidecar metadata saved with the model currently served"""
+    return registry.get_metadata_for(name)
+
+def get_model_stats():
+    """Get model registry counters for this process"""
+    return registry.stats()
+
+def start_reload_listener(redis_url=REDIS_URL):
+    """
+    Subscribe this process to model reload notifications
+
+    Training publishes the model name on TRAINING_CONFIG['reload_channel']
+    after swapping in a new artifact. Without Redis the registry still picks
+    up new artifacts through its periodic mtime check.
+    """
+    try:
+        import redis
+        pubsub = redis.Redis.from_url(redis_url).pubsub(ignore_subscribe_messages=True)
+        pubsub.subscribe(TRAINING_CONFIG['reload_channel'])
+    except Exception:
+        return None
+
+    def listen():
+        try:
+            for message in pubsub.listen():
+                name = message.get('data')
+                if isinstance(name, bytes):
+                    name = name.decode()
+                if name in registry.artifacts:
+                    registry.reload(name)
+        except Exception:
+            # Connection lost; fall back to mtime polling
+            pass
+
+    thread = threading.Thread(target=listen, name='model-reload-listener', daemon=True)
+    thread.start()
+    return thread
+
+def publish_reload(name, redis_url=REDIS_URL):
+    """Tell every serving process to re-check a model artifact"""
+    try:
+        import redis
+        redis.Redis.from_url(redis_url).publish(TRAINING_CONFIG['reload_channel'], name)
+    except Exception:
+        pass
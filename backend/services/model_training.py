@@ -0,0 +1,170 @@
+# backend/services/model_training.py
+import collections
+import datetime
+import importlib
+import json
+import logging
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from config import TRAINING_CONFIG
+
+# Model name -> "module:function" of the trainer run in the worker process
+TRAINING_JOBS = {
+    'accident_risk': 'services.accident_prediction:train_accident_model',
+    'weather_hazard': 'services.weather_service:train_weather_hazard_model',
+    'blind_spot': 'services.route_safety:train_blind_spot_model',
+    'eta_optimization': 'services.eta_optimizer:train_eta_model',
+    'breakdown_prediction': 'services.breakdown_predictor:train_breakdown_model',
+    'breakdown_survival': 'services.breakdown_predictor:train_survival_model'
+}
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Each job runs in its own `python -m services.model_training` process, so the
+# web process only waits on it from a pool thread and never spends CPU on fitting
+_executor = ThreadPoolExecutor(
+    max_workers=TRAINING_CONFIG['max_concurrent_jobs'],
+    thread_name_prefix='model-training'
+)
+_running = set()
+_running_lock = threading.Lock()
+_runs = collections.deque(maxlen=50)
+
+logger = logging.getLogger(__name__)
+
+def submit_training(name):
+    """
+    Train a model in a separate process
+
+    The worker writes a versioned artifact and renames it into MODEL_FOLDER;
+    when it finishes, every serving process is told to reload the model.
+
+    Args:
+        name: Model name (key of TRAINING_JOBS)
+
+    Returns:
+        Future resolving to the run record, or None if a run for the same
+        model is already in progress
+    """
+    if name not in TRAINING_JOBS:
+        raise ValueError(f"Unknown model: {name}")
+
+    with _running_lock:
+        if name in _running:
+            logger.info(f"Training for {name} already running, skipping")
+            return None
+        _running.add(name)
+
+    future = _executor.submit(_run_worker, name)
+    future.add_done_callback(lambda f: _on_finished(name, f))
+    return future
+
+def get_training_runs():
+    """Get the most recent training runs started from this process"""
+    return list(_runs)
+
+def _run_worker(name):
+    """Run a training job in a child process and return its run record"""
+    started_at = datetime.datetime.utcnow()
+    start = time.perf_counter()
+
+    # The worker writes its timings to a file of their own, so whatever the
+    # trainer prints cannot get mixed into them
+    fd, report_path = tempfile.mkstemp(prefix=f'training-{name}-', suffix='.json')
+    os.close(fd)
+
+    try:
+        result = subprocess.run(
+            [sys.executable, '-m', 'services.model_training', name, report_path],
+            cwd=BACKEND_DIR,
+            capture_output=True,
+            text=True,
+            timeout=TRAINING_CONFIG['timeout']
+        )
+        report = _read_report(report_path)
+    finally:
+        os.remove(report_path)
+
+    run = {
+        'model': name,
+        'started_at': started_at.isoformat(),
+        'wall_time': round(time.perf_counter() - start, 3),
+        'status': 'completed' if result.returncode == 0 and report is not None else 'failed'
+    }
+
+    if run['status'] == 'completed':
+        run.update(report)
+    elif result.returncode == 0:
+        run['error'] = 'Training worker exited without reporting a result'
+    else:
+        run['error'] = result.stderr.strip()[-2000:]
+
+    return run
+
+def _read_report(path):
+    """Timings a worker wrote to `path`, or None if it wrote none"""
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+def _on_finished(name, future):
+    with _running_lock:
+        _running.discard(name)
+
+    try:
+        run = future.result()
+    except Exception as e:
+        run = {'model': name, 'status': 'failed', 'error': str(e)}
+
+    _runs.append(run)
+
+    if run['status'] != 'completed':
+        logger.error(f"Training {name} failed: {run.get('error')}")
+        return
+
+    logger.info(
+        f"Trained {name} in {run['duration']:.1f}s "
+        f"(cpu {run['cpu_time']:.1f}s, worker pid {run['pid']})"
+    )
+
+    from services.model_registry import reload_model, publish_reload
+    reload_model(name)
+    publish_reload(name)
+
+def _train(name):
+    """Worker-process entry point: run the trainer and report timings"""
+    # Trainers log through current_app, so give them a bare app context
+    from flask import Flask
+    app = Flask('jrm_training')
+
+    module_name, function_name = TRAINING_JOBS[name].split(':')
+    trainer = getattr(importlib.import_module(module_name), function_name)
+
+    start = time.perf_counter()
+    cpu_start = time.process_time()
+
+    with app.app_context():
+        trainer()
+
+    from services.model_registry import registry
+    metadata = registry.get_metadata(name)
+
+    return {
+        'pid': os.getpid(),
+        'version': metadata.get('version'),
+        'duration': round(time.perf_counter() - start, 3),
+        'cpu_time': round(time.process_time() - cpu_start, 3)
+    }
+
+if __name__ == '__main__':
+    report = _train(sys.argv[1])
+
+    with open(sys.argv[2], 'w') as f:
+        json.dump(report, f)
@@ -6,6 +6,8 @@ import datetime
 import math
 from flask import current_app
 from config import OPENCELLID_API_KEY
+from services.cell_cache import cell_cached_points
+from services.location_random import LocationRandom
 
 def get_network_data(points):
     """
@@ -20,16 +22,9 @@ def get_network_data(points):
     # Sample points to reduce API calls
     sampled_points = [points[i] for i in range(0, len(points), max(1, len(points) // 30))]
     
-    coverage_data = []
-    
     # In a real application, use OpenCellID API or similar
     # For this demo, generate synthetic network coverage data
-    for point in sampled_points:
-        # Generate synthetic data
-        coverage = generate_synthetic_coverage(point["lat"], point["lng"])
-        coverage_data.append(coverage)
-    
-    return coverage_data
+    return get_cell_coverage(sampled_points)
 
 def get_network_coverage_by_provider(points, provider):
     """
@@ -45,72 +40,109 @@ def get_network_coverage_by_provider(points, provider):
     # Sample points to reduce API calls
     sampled_points = [points[i] for i in range(0, len(points), max(1, len(points) // 30))]
     
-    coverage_data = []
-    
-    for point in sampled_points:
-        # Generate synthetic data for specific provider
-        coverage = generate_synthetic_coverage(point["lat"], point["lng"], provider)
-        coverage_data.append(coverage)
+    return get_cell_coverage(sampled_points, provider)
+
+def get_cell_coverage(points, provider=None):
+    """
+    Coverage at each point, looked up once per geohash cell
     
-    return coverage_data
+    Args:
+        points: List of dictionaries with lat, lng coordinates
+        provider: Optional provider name
+        
+    Returns:
+        List of coverage dictionaries located at the given points
+    """
+    cell_coverage = cell_cached_points(
+        'network_coverage', points,
+        lambda lats, lngs: generate_synthetic_coverage(lats, lngs, provider),
+        variant=provider
+    )
+    
+    now = datetime.datetime.utcnow()
+    
+    return [
+        {**coverage, "location": {"lat": point["lat"], "lng": point["lng"]}, "timestamp": now}
+        for point, coverage in zip(points, cell_coverage)
+    ]
 
-def generate_synthetic_coverage(lat, lng, provider=None):
+def generate_synthetic_coverage(lats, lngs, provider=None):
     """
     Generate synthetic network coverage data
     
     Args:
-        lat: Latitude
-        lng: Longitude
+        lats: Latitudes
+        lngs: Longitudes
         provider: Optional provider name
         
     Returns:
-        Dictionary with coverage information
+        List of dictionaries with coverage information, one per coordinate
     """
-    # Use lat/lng to seed a pseudo-random generator for consistent results
-    seed = int(abs(lat * 10000) + abs(lng * 10000))
-    np.random.seed(seed)
+    lats = np.asarray(lats, dtype=np.float64)
+    lngs = np.asarray(lngs, dtype=np.float64)
+    rng = LocationRandom(lats, lngs, 'network_coverage')
     
     # Generate random provider if not specified
-    if not provider:
-        providers = ["Verizon", "AT&T", "T-Mobile", "Sprint"]
-        provider = np.random.choice(providers)
+    providers = ["Verizon", "AT&T", "T-Mobile", "Sprint"]
+    provider_names = rng.choice(providers).tolist()
+    if provider:
+        provider_names = [provider] * len(lats)
     
     # Generate signal strength (0-100)
     # Lower in remote areas (approximated by latitude)
-    base_signal = np.random.normal(70, 20)
+    base_signal = rng.normal(70, 20)
     
     # Adjust signal based on location (simplified model)
     # More remote areas tend to have worse coverage
-    remoteness_factor = min(1, max(0, 1 - (abs(lat) % 1) * 2))
+    remoteness_factor = np.clip(1 - (np.abs(lats) % 1) * 2, 0, 1)
     
-    signal_strength = max(0, min(100, base_signal * (0.5 + 0.5 * remoteness_factor)))
+    signal_strength = np.clip(base_signal * (0.5 + 0.5 * remoteness_factor), 0, 100)
     
     # Generate network type
     network_types = ["5G", "4G", "3G", "2G"]
-    network_weights = [0.3, 0.5, 0.15, 0.05]
     
     # Adjust weights based on signal strength
-    if signal_strength < 30:
-        network_weights = [0.0, 0.2, 0.5, 0.3]  # Worse signal, more likely to have older network
-    elif signal_strength < 60:
-        network_weights = [0.1, 0.4, 0.4, 0.1]
-    
-    network_type = np.random.choice(network_types, p=network_weights)
-    
-    return {
-        "location": {
-            "lat": lat,
-            "lng": lng
-        },
-        "provider": provider,
-        "network_type": network_type,
-        "signal_strength": round(signal_strength, 1),
-        "data_speed": calculate_data_speed(network_type, signal_strength),
-        "timestamp": datetime.datetime.utcnow()
-    }
+    # (worse signal, more likely to have older network)
+    network_weights = np.select(
+        [signal_strength[:, None] < 30, signal_strength[:, None] < 60],
+        [[0.0, 0.2, 0.5, 0.3], [0.1, 0.4, 0.4, 0.1]],
+        [0.3, 0.5, 0.15, 0.05]
+    )
+    
+    network_type = rng.choice(network_types, p=network_weights)
+    data_speed = calculate_data_speed(network_type, signal_strength, rng.normal(1, 0.2))
+    now = datetime.datetime.utcnow()
+    
+    return [
+        {
+            "location": {
+                "lat": lat,
+                "lng": lng
+            },
+            "provider": name,
+            "network_type": kind,
+            "signal_strength": round(signal, 1),
+            "data_speed": speed,
+            "timestamp": now
+        }
+        for lat, lng, name, kind, signal, speed in zip(
+            lats.tolist(), lngs.tolist(), provider_names, network_type.tolist(),
+            signal_strength.tolist(), data_speed.tolist()
+        )
+    ]
 
-def calculate_data_speed(network_type, signal_strength):
-    """Calculate synthetic data speed based on network type and signal strength"""
+def calculate_data_speed(network_type, signal_strength, random_factor):
+    """
+    Calculate synthetic data speeds based on network type and signal strength
+    
+    Args:
+        network_type: Array of network types
+        signal_strength: Array of signal strengths (0-100)
+        random_factor: Array of random variations (around 1)
+        
+    Returns:
+        Array of data speeds in Mbps
+    """
     # Base speeds in Mbps
     base_speeds = {
         "5G": 100,
@@ -118,13 +150,11 @@ def calculate_data_speed(network_type, signal_strength):
         "3G": 3,
         "2G": 0.1
     }
+    base_speed = np.array([base_speeds[kind] for kind in np.asarray(network_type).tolist()], dtype=np.float64)
     
     # Adjust based on signal strength (50% at min signal, 100% at max signal)
-    signal_factor = 0.5 + (signal_strength / 100) * 0.5
-    
-    # Add some random variation
-    random_factor = np.random.normal(1, 0.2)
+    signal_factor = 0.5 + (np.asarray(signal_strength) / 100) * 0.5
     
-    speed = base_speeds[network_type] * signal_factor * random_factor
+    speed = base_speed * signal_factor * np.asarray(random_factor)
     
-    return round(max(0.1, speed), 1)  # Mbps
\ No newline at end of file
+    return np.round(np.maximum(0.1, speed), 1)  # Mbps
@@ -0,0 +1,358 @@
+# backend/services/risk_index.py
+import threading
+import time
+
+import numpy as np
+from config import RISK_INDEX_CONFIG
+from services.geo import EARTH_RADIUS_KM
+from services.spatial_index import SpatialIndex
+
+# risk_points categories served as hotspots
+RISK_TYPES = ['accident', 'weather', 'blind_spot', 'elevation']
+
+# risk_level strings by severity (index 0 is unknown)
+RISK_LEVELS = [None, 'Low', 'Medium', 'High']
+
+_LEVEL_CODES = {level: code for code, level in enumerate(RISK_LEVELS) if level}
+
+KM_PER_DEGREE = EARTH_RADIUS_KM * np.pi / 180
+
+# Fields of the risk_points documents the index reads
+RISK_POINT_PROJECTION = {'_id': 0, 'route_id': 1, 'category': 1, 'level': 1, 'location': 1,
+                         'details.probability': 1}
+
+def extract_risk_points(documents):
+    """
+    Columns of risk_points documents, per route
+
+    Args:
+        documents: Iterable of risk_points documents (RISK_POINT_PROJECTION
+            is enough); categories outside RISK_TYPES are skipped
+
+    Returns:
+        Dictionary of route_id -> equal-length arrays: lats, lngs, types
+        (index into RISK_TYPES), levels (index into RISK_LEVELS) and
+        probability (NaN where the point has none)
+    """
+    type_codes = {risk_type: code for code, risk_type in enumerate(RISK_TYPES)}
+    routes = {}
+
+    for document in documents:
+        code = type_codes.get(document.get('category'))
+        if code is None:
+            continue
+        lng, lat = document['location']['coordinates']
+        columns = routes.setdefault(document['route_id'], ([], [], [], [], []))
+        columns[0].append(lat)
+        columns[1].append(lng)
+        columns[2].append(code)
+        columns[3].append(_LEVEL_CODES.get(document.get('level'), 0))
+        probability = (document.get('details') or {}).get('probability')
+        columns[4].append(np.nan if probability is None else probability)
+
+    return {
+        route_id: {
+            'lats': np.array(lats, dtype=np.float64),
+            'lngs': np.array(lngs, dtype=np.float64),
+            'types': np.array(types, dtype=np.int8),
+            'levels': np.array(levels, dtype=np.int8),
+            'probability': np.array(probability, dtype=np.float64)
+        }
+        for route_id, (lats, lngs, types, levels, probability) in routes.items()
+    }
+
+class RiskPointSnapshot:
+    """
+    Immutable columnar index over the risk points of many routes
+
+    Radius queries go through a SpatialIndex (KD-tree on the unit sphere).
+    Bounding-box queries use a latitude-sorted permutation: a binary search
+    picks the latitude band and only the points in it are tested for
+    longitude. Both stay in the low milliseconds for millions of points,
+    so the cost of a request is dominated by the number of results.
+    """
+
+    def __init__(self, routes):
+        """
+        Args:
+            routes: Dictionary of route_id -> extract_risk_points() columns
+        """
+        self.route_ids = list(routes)
+        self._route_positions = {route_id: i for i, route_id in enumerate(self.route_ids)}
+        chunks = [routes[route_id] for route_id in self.route_ids]
+        sizes = [len(chunk['lats']) for chunk in chunks]
+
+        for name in ('lats', 'lngs', 'types', 'levels', 'probability'):
+            columns = [chunk[name] for chunk in chunks]
+            setattr(self, name, np.concatenate(columns) if columns else np.empty(0))
+
+        self.types = self.types.astype(np.int8)
+        self.levels = self.levels.astype(np.int8)
+        self.routes = np.repeat(np.arange(len(chunks), dtype=np.int32), sizes)
+        self.spatial = SpatialIndex(self.lats, self.lngs)
+        self.lat_order = np.argsort(self.lats, kind='stable')
+        self._sorted_lats = self.lats[self.lat_order]
+
+    def __len__(self):
+        return len(self.lats)
+
+    def route_positions(self, route_ids):
+        """Positions in route_ids (the values of `routes`) of the given route_ids present in the snapshot"""
+        positions = [self._route_positions.get(route_id) for route_id in route_ids]
+        return np.array([i for i in positions if i is not None], dtype=np.int32)
+
+    def within_radius(self, lat, lng, radius):
+        """Indices and distances (km) of the points within `radius` km, nearest first"""
+        return self.spatial.within(lat, lng, radius)
+
+    def within_bbox(self, south, west, north, east):
+        """Indices of the points inside a bounding box (west > east crosses the antimeridian)"""
+        start = np.searchsorted(self._sorted_lats, south, side='left')
+        stop = np.searchsorted(self._sorted_lats, north, side='right')
+        band = self.lat_order[start:stop]
+        band_lngs = self.lngs[band]
+
+        if west <= east:
+            inside = (band_lngs >= west) & (band_lngs <= east)
+        else:
+            inside = (band_lngs >= west) | (band_lngs <= east)
+
+        return np.sort(band[inside])
+
+class RiskIndex:
+    """
+    Process-wide index of the stored risk points of every analyzed route
+
+    An in-memory copy of the risk_points collection, loaded on first use.
+    Every `refresh_interval` seconds the points of routes whose risk_data
+    changed since the last sync are re-read and a new snapshot is built
+    in a background thread, so requests never wait for a rebuild; a full
+    reload every `full_reload_interval` seconds drops routes deleted by
+    other workers and picks up any update missed by the incremental query.
+
+    Hotspot queries run against the snapshot rather than as aggregations
+    on risk_points: ranking and clustering every match of a country-sized
+    box stays in the low milliseconds in memory, where a $group over the
+    same matches would scan them all in MongoDB on each request.
+    """
+
+    def __init__(self, config):
+        self.config = config
+        self._routes = {}
+        self._snapshot = None
+        self._synced_at = None
+        self._checked_at = 0
+        self._loaded_at = 0
+        self._lock = threading.Lock()
+        self._state_lock = threading.Lock()
+        self._building = False
+
+    def snapshot(self):
+        """Current snapshot, loading it on first use and refreshing it when due"""
+        if self._snapshot is None:
+            with self._lock:
+                if self._snapshot is None:
+                    self._refresh()
+        elif time.monotonic() - self._checked_at >= self.config['refresh_interval']:
+            self._refresh_in_background()
+
+        return self._snapshot
+
+    def _refresh_in_background(self):
+        with self._state_lock:
+            if self._building:
+                return
+            self._building = True
+            self._checked_at = time.monotonic()
+
+        def run():
+            try:
+                with self._lock:
+                    self._refresh()
+            except Exception:
+                # Keep serving the previous snapshot
+                pass
+            finally:
+                self._building = False
+
+        threading.Thread(target=run, name='risk-index-refresh', daemon=True).start()
+
+    def _refresh(self):
+        from models import db
+
+        now = time.monotonic()
+        full = self._synced_at is None or now - self._loaded_at >= self.config['full_reload_interval']
+
+        # risk_data.last_updated marks every change to a route's risk
+        # points (including ones that removed all points of a category);
+        # the points themselves come from risk_points
+        query = {} if full else {'last_updated': {'$gt': self._synced_at}}
+        routes = {} if full else dict(self._routes)
+        synced_at = None if full else self._synced_at
+        changed = []
+
+        for document in db.risk_data.find(query, {'route_id': 1, 'last_updated': 1}):
+            changed.append(document['route_id'])
+            if document.get('last_updated') and (synced_at is None or document['last_updated'] > synced_at):
+                synced_at = document['last_updated']
+
+        if changed:
+            points = {'category': {'$in': RISK_TYPES}}
+            if not full:
+                points['route_id'] = {'$in': changed}
+            loaded = extract_risk_points(db.risk_points.find(points, RISK_POINT_PROJECTION))
+            for route_id in changed:
+                if route_id in loaded:
+                    routes[route_id] = loaded[route_id]
+                else:
+                    routes.pop(route_id, None)
+
+        if changed or full or self._snapshot is None:
+            self._snapshot = RiskPointSnapshot(routes)
+            self._routes = routes
+
+        self._synced_at = synced_at or self._synced_at
+        self._checked_at = now
+        if full:
+            self._loaded_at = now
+
+    def remove_route(self, route_id):
+        """Drop a deleted route from this process's index"""
+        with self._lock:
+            if route_id in self._routes:
+                routes = dict(self._routes)
+                del routes[route_id]
+                self._routes = routes
+                self._snapshot = RiskPointSnapshot(routes)
+
+    def stats(self):
+        snapshot = self._snapshot
+        return {
+            'routes': len(snapshot.route_ids) if snapshot else 0,
+            'points': len(snapshot) if snapshot else 0,
+            'synced_at': self._synced_at
+        }
+
+def query_hotspots(snapshot, center=None, radius=None, bbox=None, types=None, min_level=None, route_ids=None):
+    """
+    Risk points inside a circle or bounding box
+
+    Args:
+        snapshot: RiskPointSnapshot
+        center: (lat, lng) of a radius query
+        radius: Radius in km
+        bbox: (south, west, north, east) of a bounding-box query
+        types: Optional list of RISK_TYPES to keep
+        min_level: Optional lowest risk_level to keep ('Low', 'Medium', 'High')
+        route_ids: Optional collection of the route_ids whose points to keep
+            (None keeps every route)
+
+    Returns:
+        Tuple of (point indices, distances in km or None for box queries);
+        radius matches are nearest first
+    """
+    if center is not None:
+        index, distance = snapshot.within_radius(center[0], center[1], radius)
+    else:
+        index, distance = snapshot.within_bbox(*bbox), None
+
+    keep = np.ones(len(index), dtype=bool)
+    if types:
+        keep &= np.isin(snapshot.types[index], [RISK_TYPES.index(t) for t in types])
+    if min_level:
+        keep &= snapshot.levels[index] >= _LEVEL_CODES[min_level]
+    if route_ids is not None:
+        keep &= np.isin(snapshot.routes[index], snapshot.route_positions(route_ids))
+
+    return index[keep], (distance[keep] if distance is not None else None)
+
+def rank_hotspots(snapshot, index, limit):
+    """
+    Positions in `index` of the `limit` most severe points: highest risk
+    level first, then highest probability, then input order (nearest
+    first for radius matches)
+
+    Only the candidates that can make the cut are fully sorted, so large
+    areas cost a linear partition rather than a sort of every match.
+    """
+    # Level and probability folded into one key (probability is in [0, 1])
+    score = 2.0 * snapshot.levels[index] + np.clip(np.nan_to_num(snapshot.probability[index]), 0, 1)
+
+    if limit < len(index):
+        threshold = np.partition(score, len(score) - limit)[len(score) - limit] if limit else np.inf
+        candidates = np.flatnonzero(score >= threshold)
+    else:
+        candidates = np.arange(len(index))
+
+    order = np.lexsort((candidates, -score[candidates]))
+    return candidates[order][:limit]
+
+def cluster_hotspots(snapshot, index, cell_size, limit=None):
+    """
+    Grid clusters of risk points
+
+    Points are binned into square cells of `cell_size` km (on an
+    equirectangular projection around their mean latitude) and each
+    occupied cell becomes one cluster with its centroid, point count,
+    highest risk level and count per risk type.
+
+    Returns:
+        List of cluster dictionaries, highest risk level and largest first
+    """
+    if len(index) == 0:
+        return []
+
+    lats, lngs = snapshot.lats[index], snapshot.lngs[index]
+    lng_scale = KM_PER_DEGREE * np.cos(np.radians(lats.mean()))
+    rows = np.floor(lats * KM_PER_DEGREE / cell_size).astype(np.int64)
+    cols = np.floor(lngs * lng_scale / cell_size).astype(np.int64)
+    # Cells compared as (row, col) pairs, so no cell size can make two collide
+    _, cluster, counts = np.unique(np.stack([rows, cols], axis=1), axis=0, return_inverse=True,
+                                   return_counts=True)
+    cluster = cluster.reshape(-1)
+    n_clusters = len(counts)
+
+    centroid_lats = np.bincount(cluster, weights=lats, minlength=n_clusters) / counts
+    centroid_lngs = np.bincount(cluster, weights=lngs, minlength=n_clusters) / counts
+    levels = np.zeros(n_clusters, dtype=np.int8)
+    np.maximum.at(levels, cluster, snapshot.levels[index])
+    type_counts = np.bincount(
+        cluster * len(RISK_TYPES) + snapshot.types[index], minlength=n_clusters * len(RISK_TYPES)
+    ).reshape(n_clusters, len(RISK_TYPES))
+
+    order = np.lexsort((-counts, -levels))[:limit]
+
+    return [
+        {
+            'location': {'lat': float(centroid_lats[c]), 'lng': float(centroid_lngs[c])},
+            'count': int(counts[c]),
+            'risk_level': RISK_LEVELS[levels[c]],
+            'types': {risk_type: int(n) for risk_type, n in zip(RISK_TYPES, type_counts[c]) if n}
+        }
+        for c in order.tolist()
+    ]
+
+def hotspot_records(snapshot, index, distance=None):
+    """Risk points at `index` as API dictionaries"""
+    records = []
+
+    for i, point in enumerate(index.tolist()):
+        record = {
+            'location': {'lat': float(snapshot.lats[point]), 'lng': float(snapshot.lngs[point])},
+            'risk_type': RISK_TYPES[snapshot.types[point]],
+            'risk_level': RISK_LEVELS[snapshot.levels[point]],
+            'route_id': str(snapshot.route_ids[snapshot.routes[point]])
+        }
+        if not np.isnan(snapshot.probability[point]):
+            record['probability'] = float(snapshot.probability[point])
+        if distance is not None:
+            record['distance'] = round(float(distance[i]), 3)  # km
+        records.append(record)
+
+    return records
+
+risk_index = RiskIndex(RISK_INDEX_CONFIG)
+
+def get_risk_index_stats():
+    """Routes and points in this process's risk point index"""
+    return risk_index.stats()
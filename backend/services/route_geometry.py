@@ -0,0 +1,357 @@
+# backend/services/route_geometry.py
+import numpy as np
+from config import ROUTE_SAMPLING_CONFIG
+from services.geo import curvature_radius, polyline_metrics, simplify_indices, to_arrays, turn_segments
+
+# Packed geometry: little-endian int32 latitudes and longitudes in 1e-7
+# degrees (E7, about 1 cm, lossless for decoded polylines) followed by
+# float32 cumulative distance in km (within about 0.1 m over 1,000 km)
+GEOMETRY_ENCODING = 'e7-v1'
+
+E7 = 10 ** 7
+
+def decode_polyline(polyline_str, precision=5):
+    """
+    Decode a Google Maps encoded polyline into coordinate arrays
+
+    Vectorized equivalent of polyline.decode: each value is a run of 5-bit
+    chunks (bit 0x20 set on all but the last), zigzag-encoded and stored
+    as a delta from the previous point.
+
+    Returns:
+        Tuple of (lats, lngs) float64 arrays
+    """
+    chunks = np.frombuffer(polyline_str.encode('ascii'), dtype=np.uint8).astype(np.int64) - 63
+    ends = np.flatnonzero((chunks & 0x20) == 0)
+
+    if len(ends) < 2:
+        return np.empty(0), np.empty(0)
+
+    starts = np.concatenate([[0], ends[:-1] + 1])
+    shifts = 5 * (np.arange(len(chunks)) - np.repeat(starts, ends - starts + 1))
+    values = np.add.reduceat((chunks[:ends[-1] + 1] & 0x1f) << shifts[:ends[-1] + 1], starts)
+    values = np.where(values & 1, ~(values >> 1), values >> 1)
+
+    coords = np.cumsum(values[:len(values) // 2 * 2].reshape(-1, 2), axis=0) / 10 ** precision
+    return coords[:, 0], coords[:, 1]
+
+def pack_geometry(lats, lngs, distance):
+    """Pack coordinate and distance arrays into GEOMETRY_ENCODING bytes"""
+    return b''.join([
+        np.rint(np.asarray(lats) * E7).astype('<i4').tobytes(),
+        np.rint(np.asarray(lngs) * E7).astype('<i4').tobytes(),
+        np.asarray(distance).astype('<f4').tobytes()
+    ])
+
+def unpack_geometry(data, count):
+    """
+    Unpack GEOMETRY_ENCODING bytes of `count` points
+
+    Reads the buffer in place (np.frombuffer) with no per-point objects.
+
+    Returns:
+        Tuple of (lats, lngs, distance) float64 arrays
+    """
+    lats = np.frombuffer(data, dtype='<i4', count=count, offset=0) / E7
+    lngs = np.frombuffer(data, dtype='<i4', count=count, offset=4 * count) / E7
+    distance = np.frombuffer(data, dtype='<f4', count=count, offset=8 * count).astype(np.float64)
+    return lats, lngs, distance
+
+class RouteGeometry:
+    """
+    Route polyline as contiguous float64 arrays
+
+    Holds one entry per point in `lats`, `lngs`, `distance` (km along the
+    route from its first point), `bearing` (heading in degrees of the
+    segment leaving the point; the last point repeats the final heading)
+    and `turn_angle` (interior angle in degrees, 180 = straight and at
+    both end points).
+
+    Built once per route and passed to every service. Slicing with
+    `route[a:b]` returns a zero-copy view whose arrays share memory with
+    the parent and still describe the full route (so distances keep their
+    offset from the route start). `take`, `every`, `sample_by_distance`,
+    `resample` and `simplify` build a coarser polyline over the chosen
+    points, with distances and angles recomputed between them.
+
+    Analysis stages sample with `for_stage(name)` (or `stage_indices`
+    when they need positions in this route), at the resolution declared
+    for them in ROUTE_SAMPLING_CONFIG.
+    """
+
+    def __init__(self, lats, lngs, distance=None):
+        """
+        Args:
+            lats, lngs: Coordinate arrays
+            distance: Optional precomputed cumulative distance in km (as
+                stored with packed geometry); bearings and turn angles are
+                then computed on first use
+        """
+        self.lats = np.ascontiguousarray(lats, dtype=np.float64)
+        self.lngs = np.ascontiguousarray(lngs, dtype=np.float64)
+        self._bearing = self._turn_angle = None
+
+        if distance is None:
+            self._set_metrics()
+        else:
+            self.distance = np.ascontiguousarray(distance, dtype=np.float64)
+
+    def _set_metrics(self):
+        n = len(self.lats)
+        lengths, headings, angles = polyline_metrics(self.lats, self.lngs)
+
+        if not hasattr(self, 'distance'):
+            self.distance = np.zeros(n)
+            np.cumsum(lengths, out=self.distance[1:])
+
+        self._bearing = np.zeros(n)
+        if n > 1:
+            self._bearing[:-1] = headings
+            self._bearing[-1] = headings[-1]
+
+        self._turn_angle = np.full(n, 180.0)
+        self._turn_angle[1:-1] = angles
+
+    @property
+    def bearing(self):
+        if self._bearing is None:
+            self._set_metrics()
+        return self._bearing
+
+    @property
+    def turn_angle(self):
+        if self._turn_angle is None:
+            self._set_metrics()
+        return self._turn_angle
+
+    @classmethod
+    def from_polyline(cls, polyline_str):
+        """Decode a Google Maps encoded polyline"""
+        return cls(*decode_polyline(polyline_str or ''))
+
+    @classmethod
+    def from_packed(cls, packed):
+        """Build from a to_packed() dictionary (as stored on the route)"""
+        if packed.get('encoding') != GEOMETRY_ENCODING:
+            raise ValueError(f"Unsupported geometry encoding: {packed.get('encoding')}")
+
+        return cls(*unpack_geometry(packed['data'], packed['count']))
+
+    @classmethod
+    def from_points(cls, points):
+        """
+        Build from a list of {'lat', 'lng'} dictionaries
+
+        An existing RouteGeometry is returned as is, so services can accept
+        either form.
+        """
+        if isinstance(points, cls):
+            return points
+
+        return cls(*to_arrays(points or []))
+
+    @classmethod
+    def _view(cls, parent, key):
+        view = cls.__new__(cls)
+        for name in ('lats', 'lngs', 'distance'):
+            setattr(view, name, getattr(parent, name)[key])
+        # A view's end points keep the parent's bearings and angles
+        view._bearing = parent.bearing[key]
+        view._turn_angle = parent.turn_angle[key]
+        return view
+
+    def __len__(self):
+        return len(self.lats)
+
+    def __getitem__(self, key):
+        """Zero-copy view of a slice of the route"""
+        if not isinstance(key, slice):
+            raise TypeError('RouteGeometry supports slices; use point() or take() for indices')
+
+        return RouteGeometry._view(self, key)
+
+    @property
+    def curvature_radius(self):
+        """Radius of curvature in meters at each point (infinite where straight)"""
+        return curvature_radius(self.distance, self.turn_angle)
+
+    def turn_segments(self, threshold=150):
+        """
+        Runs of consecutive points sharper than `threshold` degrees, merged
+        into one segment each (see geo.turn_segments)
+        """
+        segments = turn_segments(self.turn_angle, self.distance, threshold)
+        segments['min_radius'] = self.curvature_radius[segments['apex']]
+        return segments
+
+    @property
+    def length(self):
+        """Length of the route (or slice) in km"""
+        return float(self.distance[-1] - self.distance[0]) if len(self) else 0.0
+
+    def take(self, indices):
+        """Polyline through the points at `indices` (in the given order)"""
+        indices = np.asarray(indices, dtype=np.int64)
+        return RouteGeometry(self.lats[indices], self.lngs[indices])
+
+    def every(self, step):
+        """Polyline through every `step`-th point, always keeping the last point"""
+        return self.take(self.every_indices(step))
+
+    def every_indices(self, step):
+        """Indices of every `step`-th point plus the last point"""
+        n = len(self)
+        indices = np.arange(0, n, max(1, int(step)))
+
+        if n and indices[-1] != n - 1:
+            indices = np.append(indices, n - 1)
+
+        return indices
+
+    def sample_by_distance(self, interval):
+        """Polyline through a point about every `interval` km along the route"""
+        return self.take(self.distance_indices(interval))
+
+    def distance_indices(self, interval):
+        """
+        Indices of the first point at or beyond each multiple of `interval`
+        km along the route, plus the last point
+        """
+        n = len(self)
+        if n == 0:
+            return np.empty(0, dtype=np.int64)
+
+        if interval <= 0:
+            return np.arange(n)
+
+        offsets = self.distance - self.distance[0]
+        marks = np.arange(0, offsets[-1], interval)
+        indices = np.unique(np.concatenate([[0], np.searchsorted(offsets, marks, side='left')]))
+
+        if indices[-1] != n - 1:
+            indices = np.append(indices, n - 1)
+
+        return indices
+
+    def resample(self, interval):
+        """
+        Polyline through points interpolated exactly every `interval` km
+        along the route, plus the last point
+        """
+        n = len(self)
+        if n < 2 or interval <= 0:
+            return RouteGeometry(self.lats, self.lngs)
+
+        offsets = self.distance - self.distance[0]
+        marks = np.append(np.arange(0, offsets[-1], interval), offsets[-1])
+
+        # Segment containing each mark and the fraction of it covered
+        segment = np.clip(np.searchsorted(offsets, marks, side='right') - 1, 0, n - 2)
+        lengths = offsets[segment + 1] - offsets[segment]
+        fraction = np.divide(marks - offsets[segment], lengths, out=np.zeros_like(marks), where=lengths > 0)
+
+        lats = self.lats[segment] + fraction * (self.lats[segment + 1] - self.lats[segment])
+        lngs = self.lngs[segment] + fraction * (self.lngs[segment + 1] - self.lngs[segment])
+        return RouteGeometry(lats, lngs)
+
+    def simplify(self, tolerance, max_spacing=None):
+        """Polyline through the points kept by simplify_indices"""
+        return self.take(self.simplify_indices(tolerance, max_spacing))
+
+    def simplify_indices(self, tolerance, max_spacing=None):
+        """
+        Indices of the points kept by Douglas-Peucker simplification with a
+        `tolerance` in meters (see geo.simplify_indices)
+
+        With `max_spacing` (km), long straight stretches also keep a point
+        at least every `max_spacing` km, so later sampling still has points
+        to choose from there.
+        """
+        return simplify_indices(self.lats, self.lngs, tolerance, max_spacing)
+
+    def stage_indices(self, stage):
+        """
+        Indices of the points an analysis stage should use, at the
+        resolution set for it in ROUTE_SAMPLING_CONFIG
+
+        'resample' stages have no positions in this route; they are served
+        from the nearest polyline points at the same interval.
+        """
+        settings = ROUTE_SAMPLING_CONFIG[stage]
+
+        if settings['mode'] == 'simplify':
+            return self.simplify_indices(settings['tolerance'], settings.get('max_spacing'))
+
+        return self.distance_indices(self._stage_interval(settings))
+
+    def for_stage(self, stage):
+        """Polyline an analysis stage should use (see stage_indices)"""
+        settings = ROUTE_SAMPLING_CONFIG[stage]
+
+        if settings['mode'] == 'resample':
+            return self.resample(self._stage_interval(settings))
+
+        return self.take(self.stage_indices(stage))
+
+    def _stage_interval(self, settings):
+        # Widen the interval on long routes so the stage stays within its
+        # point budget (the last point is always added on top)
+        max_points = settings.get('max_points')
+        if max_points and max_points > 1:
+            return max(settings['interval'], self.length / (max_points - 1))
+
+        return settings['interval']
+
+    def to_packed(self):
+        """Packed form for storage: encoding, point count, length in km and data bytes"""
+        return {
+            'encoding': GEOMETRY_ENCODING,
+            'count': len(self),
+            'length': self.length,
+            'data': pack_geometry(self.lats, self.lngs, self.distance - (self.distance[0] if len(self) else 0))
+        }
+
+    def point(self, i):
+        """Point i as a {'lat', 'lng'} dictionary"""
+        return {'lat': float(self.lats[i]), 'lng': float(self.lngs[i])}
+
+    def points(self, indices=None):
+        """Points (all, or those at `indices`) as {'lat', 'lng'} dictionaries"""
+        lats = self.lats if indices is None else self.lats[indices]
+        lngs = self.lngs if indices is None else self.lngs[indices]
+        return [{'lat': lat, 'lng': lng} for lat, lng in zip(lats.tolist(), lngs.tolist())]
+
+    def to_geojson(self, properties=None):
+        """GeoJSON LineString feature ([lng, lat] coordinates) for API responses"""
+        return {
+            'type': 'Feature',
+            'geometry': {
+                'type': 'LineString',
+                'coordinates': np.column_stack([self.lngs, self.lats]).tolist()
+            },
+            'properties': {
+                'distance_km': round(self.length, 3),
+                'points': len(self),
+                **(properties or {})
+            }
+        }
+
+def load_route_geometry(route):
+    """
+    RouteGeometry of a route document
+
+    Read from the packed geometry stored when the route was processed.
+    Routes stored before that have their polyline decoded once and the
+    packed geometry saved for next time.
+    """
+    from models.route import Route
+
+    packed = Route.load_geometry(route)
+    if packed is not None:
+        return RouteGeometry.from_packed(packed)
+
+    geometry = RouteGeometry.from_polyline(route.get('polyline'))
+    if len(geometry):
+        Route.save_geometry(route['route_id'], geometry.to_packed())
+
+    return geometry
@@ -1,26 +1,34 @@
 # backend/services/route_safety.py (COMPLETE CODE)
-import os
 import numpy as np
-import pandas as pd
-import pickle
 import datetime
-from sklearn.ensemble import RandomForestClassifier
-from sklearn.preprocessing import StandardScaler
 from flask import current_app
-from config import MODEL_FOLDER
-import math
+from services.cell_cache import cell_cached_points
+from services.geo import gradients, segment_lengths, to_arrays, turn_angles
+from services.lazy_imports import lazy_import
+from services.location_random import LocationRandom
+from services.model_registry import get_model, save_model
+from services.route_geometry import RouteGeometry
+
+pd = lazy_import('pandas')
+
+# Feature order used to train and score the blind spot model
+BLIND_SPOT_FEATURES = [
+    'road_width', 'curvature', 'gradient', 'visibility', 'is_intersection', 'elevation'
+]
 
 def analyze_route_safety(route_points):
     """
     Analyze route safety features like elevation, sharp turns, etc.
     
     Args:
-        route_points: List of dictionaries with lat, lng coordinates
+        route_points: RouteGeometry or list of dictionaries with lat, lng coordinates
         
     Returns:
         Dictionary with different safety analyses
     """
-    if not route_points or len(route_points) < 3:
+    route = RouteGeometry.from_points(route_points)
+    
+    if len(route) < 3:
         return {
             'elevation_risks': [],
             'blind_spots': [],
@@ -28,17 +36,22 @@ def analyze_route_safety(route_points):
             'eco_sensitive_zones': []
         }
     
+    # Elevation of every route point, fetched once and shared by the
+    # elevation and blind spot analyses
+    from services.elevation import get_elevations
+    elevations = get_elevations(route.lats, route.lngs)
+    
     # Analyze elevation
-    elevation_risks = analyze_elevation_risks(route_points)
+    elevation_risks = analyze_elevation_risks(route, elevations)
     
     # Analyze blind spots
-    blind_spots = analyze_blind_spots(route_points)
+    blind_spots = analyze_blind_spots(route, elevations)
     
     # Analyze network coverage
-    network_coverage = analyze_network_coverage(route_points)
+    network_coverage = analyze_network_coverage(route)
     
     # Analyze eco-sensitive zones
-    eco_sensitive_zones = analyze_eco_sensitive_zones(route_points)
+    eco_sensitive_zones = analyze_eco_sensitive_zones(route)
     
     return {
         'elevation_risks': elevation_risks,
@@ -47,147 +60,155 @@ def analyze_route_safety(route_points):
         'eco_sensitive_zones': eco_sensitive_zones
     }
 
-def analyze_elevation_risks(route_points):
-    """Analyze elevation changes and identify risks"""
+def analyze_elevation_risks(route_points, elevations=None):
+    """
+    Analyze elevation changes and identify risks
+    
+    Args:
+        route_points: RouteGeometry or list of dictionaries with lat, lng coordinates
+        elevations: Optional elevation of each route point (fetched if not
+            given; NaN where unknown)
+    """
+    route = RouteGeometry.from_points(route_points)
+    
     # Get elevation data
-    from services.google_maps import get_elevation_data
-    elevation_data = get_elevation_data(route_points)
+    if elevations is None:
+        from services.elevation import get_elevations
+        elevations = get_elevations(route.lats, route.lngs)
     
     elevation_risks = []
     
-    # Analyze elevation changes
-    for i in range(1, len(elevation_data)):
-        prev_point = elevation_data[i-1]
-        curr_point = elevation_data[i]
-        
-        # Calculate distance between points
-        distance = calculate_distance(
-            prev_point['lat'], prev_point['lng'],
-            curr_point['lat'], curr_point['lng']
-        )
-        
-        # Skip if distance is too small
-        if distance < 0.01:  # 10 meters
-            continue
-        
-        # Calculate elevation change
-        elevation_change = curr_point['elevation'] - prev_point['elevation']
+    # Points whose elevation could not be fetched are left out
+    known = np.flatnonzero(~np.isnan(elevations))
+    
+    if len(known) < 2:
+        return elevation_risks
+    
+    # Distances and gradients for every segment at once
+    lats, lngs = route.lats[known], route.lngs[known]
+    elevations = elevations[known]
+    distances = segment_lengths(lats, lngs)
+    
+    # Gradient of every segment (segments shorter than 10 meters get 0)
+    gradient_series = gradients(elevations, distances, min_length=0.01)
+    
+    # Identify significant gradients (in percentage)
+    for i in np.flatnonzero(np.abs(gradient_series) >= 7):
+        gradient = float(gradient_series[i])
+        risk_type = 'Ascent' if gradient > 0 else 'Descent'
         
-        # Calculate gradient (in percentage)
-        if distance > 0:
-            gradient = (elevation_change / (distance * 1000)) * 100
+        # Determine risk level based on gradient
+        if abs(gradient) >= 15:
+            risk_level = 'High'
+        elif abs(gradient) >= 10:
+            risk_level = 'Medium'
         else:
-            gradient = 0
+            risk_level = 'Low'
         
-        # Identify significant gradients
-        if abs(gradient) >= 7:
-            risk_type = 'Ascent' if gradient > 0 else 'Descent'
-            
-            # Determine risk level based on gradient
-            if abs(gradient) >= 15:
-                risk_level = 'High'
-            elif abs(gradient) >= 10:
-                risk_level = 'Medium'
-            else:
-                risk_level = 'Low'
-            
-            elevation_risks.append({
-                'location': {
-                    'lat': curr_point['lat'],
-                    'lng': curr_point['lng']
-                },
-                'risk_type': risk_type,
-                'risk_level': risk_level,
-                'gradient': round(gradient, 1),
-                'elevation': round(curr_point['elevation'], 1),
-                'distance': round(distance * 1000, 0)  # meters
-            })
+        elevation_risks.append({
+            'location': {
+                'lat': float(lats[i + 1]),
+                'lng': float(lngs[i + 1])
+            },
+            'risk_type': risk_type,
+            'risk_level': risk_level,
+            'gradient': round(gradient, 1),
+            'elevation': round(float(elevations[i + 1]), 1),
+            'distance': round(float(distances[i]) * 1000, 0)  # meters
+        })
     
     return elevation_risks
 
-def analyze_blind_spots(route_points):
-    """Analyze route for potential blind spots"""
-    # Load blind spot model
-    model_path = os.path.join(MODEL_FOLDER, 'route_safety', 'blind_spot_model.pkl')
-    
-    try:
-        with open(model_path, 'rb') as f:
-            model = pickle.load(f)
-    except (FileNotFoundError, EOFError):
-        # If model doesn't exist, train a new one
-        model = train_blind_spot_model()
+def analyze_blind_spots(route_points, elevations=None):
+    """
+    Analyze route for potential blind spots
+    
+    Args:
+        route_points: RouteGeometry or list of dictionaries with lat, lng coordinates
+        elevations: Optional elevation of each route point (fetched for the
+            sampled points if not given; NaN where unknown)
+    """
+    # Get blind spot model (trained on first use if missing)
+    model = get_model('blind_spot', trainer=train_blind_spot_model)
     
     blind_spots = []
+    route = RouteGeometry.from_points(route_points)
     
-    # Sample route points (every 20th point)
-    sampled_points = [route_points[i] for i in range(0, len(route_points), 20)]
+    # Sample route points (about one per km) and ensure we have critical
+    # points (significant turns), by point index
+    sampled = np.concatenate([
+        route.stage_indices('blind_spots'),
+        np.flatnonzero(route.turn_angle < 135)
+    ])
     
-    # Ensure we have critical points (turns)
-    turns = identify_sharp_turns(route_points)
-    for turn in turns:
-        if turn['angle'] < 135:  # Significant turn
-            sampled_points.append(turn['location'])
+    # Remove duplicates (keeping sample order)
+    _, first = np.unique(sampled, return_index=True)
+    sampled = sampled[np.sort(first)]
+    sampled_points = route.points(sampled)
     
-    # Remove duplicates
-    sampled_points = [dict(t) for t in {tuple(sorted(d.items())) for d in sampled_points}]
+    if not sampled_points:
+        return blind_spots
     
-    # Get road geometry for sampled points
+    # Get road geometry for sampled points (returned in input order)
     from services.google_maps import get_road_geometry
     road_geometry = get_road_geometry(sampled_points)
     
-    # Get elevation data
-    from services.google_maps import get_elevation_data
-    elevation_data = get_elevation_data(sampled_points)
+    # Get elevation data for the sampled points
+    if elevations is None:
+        from services.elevation import get_elevations
+        sampled_elevation = get_elevations(route.lats[sampled], route.lngs[sampled])
+    else:
+        sampled_elevation = elevations[sampled]
     
-    # Analyze each point
-    for i, point in enumerate(sampled_points):
-        # Find corresponding geometry and elevation
-        geometry = next((g for g in road_geometry if 
-                       g['location']['lat'] == point['lat'] and 
-                       g['location']['lng'] == point['lng']), None)
-        
-        elevation = next((e for e in elevation_data if 
-                        e['lat'] == point['lat'] and 
-                        e['lng'] == point['lng']), None)
-        
-        if not geometry or not elevation:
+    # Build the feature matrix for every point that has geometry and elevation
+    scored_points = []
+    rows = []
+    
+    for point, geometry, elevation in zip(sampled_points, road_geometry, sampled_elevation.tolist()):
+        if not geometry or np.isnan(elevation):
             continue
         
-        # Prepare features
-        features = {
-            'road_width': geometry.get('road_width', 0),
-            'curvature': geometry.get('curvature', 0),
-            'gradient': geometry.get('gradient', 0),
-            'visibility': geometry.get('visibility', 10),
-            'is_intersection': 1 if geometry.get('is_intersection', False) else 0,
-            'elevation': elevation.get('elevation', 0)
-        }
+        scored_points.append(point)
+        rows.append((
+            geometry.get('road_width', 0),
+            geometry.get('curvature', 0),
+            geometry.get('gradient', 0),
+            geometry.get('visibility', 10),
+            1 if geometry.get('is_intersection', False) else 0,
+            elevation
+        ))
+    
+    if not rows:
+        return blind_spots
+    
+    features = np.array(rows, dtype=np.float64)
+    
+    # Score all points in a single call
+    probabilities = model.predict_proba(
+        pd.DataFrame(features, columns=BLIND_SPOT_FEATURES, copy=False)
+    )[:, 1]
+    
+    # Add to blind spots if probability is high enough
+    for i in np.flatnonzero(probabilities >= 0.6):
+        point = scored_points[i]
+        probability = float(probabilities[i])
+        risk_level = 'High' if probability >= 0.8 else 'Medium'
         
-        # Convert to DataFrame
-        df = pd.DataFrame([features])
-        
-        # Make prediction
-        probability = model.predict_proba(df)[0][1]
-        
-        # Add to blind spots if probability is high enough
-        if probability >= 0.6:
-            risk_level = 'High' if probability >= 0.8 else 'Medium'
-            
-            blind_spots.append({
-                'location': {
-                    'lat': point['lat'],
-                    'lng': point['lng']
-                },
-                'risk_level': risk_level,
-                'probability': round(probability, 3),
-                'features': {
-                    'road_width': features['road_width'],
-                    'curvature': features['curvature'],
-                    'gradient': features['gradient'],
-                    'visibility': features['visibility'],
-                    'is_intersection': features['is_intersection'] == 1
-                }
-            })
+        blind_spots.append({
+            'location': {
+                'lat': point['lat'],
+                'lng': point['lng']
+            },
+            'risk_level': risk_level,
+            'probability': round(probability, 3),
+            'features': {
+                'road_width': float(features[i, 0]),
+                'curvature': float(features[i, 1]),
+                'gradient': float(features[i, 2]),
+                'visibility': float(features[i, 3]),
+                'is_intersection': bool(features[i, 4] == 1)
+            }
+        })
     
     return blind_spots
 
@@ -195,8 +216,8 @@ def analyze_network_coverage(route_points):
     """Analyze network coverage along the route"""
     network_coverage = []
     
-    # Sample route points (every 30th point)
-    sampled_points = [route_points[i] for i in range(0, len(route_points), 30)]
+    # Sample route points (one every 2 km)
+    sampled_points = RouteGeometry.from_points(route_points).for_stage('network_coverage').points()
     
     # Get network coverage data
     from services.network_service import get_network_data
@@ -230,8 +251,8 @@ def analyze_eco_sensitive_zones(route_points):
     """Identify eco-sensitive zones along the route"""
     eco_sensitive_zones = []
     
-    # Sample route points (every 50th point)
-    sampled_points = [route_points[i] for i in range(0, len(route_points), 50)]
+    # Sample route points (one every 5 km)
+    sampled_points = RouteGeometry.from_points(route_points).for_stage('eco_zones').points()
     
     # Get eco-sensitive zone data
     from services.environmental_service import get_eco_zones
@@ -247,56 +268,33 @@ def analyze_eco_sensitive_zones(route_points):
     
     return eco_sensitive_zones
 
-def identify_sharp_turns(route_points):
-    """Identify sharp turns in the route"""
+def identify_sharp_turns(route_points, threshold=150):
+    """
+    Identify sharp turns in the route
+    
+    Consecutive points with angles significantly different from 180
+    degrees (below `threshold`) belong to the same bend and are reported
+    as one turn, located at its sharpest point.
+    """
     turns = []
+    route = RouteGeometry.from_points(route_points)
     
     # Need at least 3 points to identify turns
-    if len(route_points) < 3:
+    if len(route) < 3:
         return turns
     
-    for i in range(1, len(route_points) - 1):
-        prev_point = route_points[i-1]
-        curr_point = route_points[i]
-        next_point = route_points[i+1]
-        
-        # Calculate vectors
-        vector1 = (
-            curr_point['lat'] - prev_point['lat'],
-            curr_point['lng'] - prev_point['lng']
-        )
-        
-        vector2 = (
-            next_point['lat'] - curr_point['lat'],
-            next_point['lng'] - curr_point['lng']
-        )
-        
-        # Calculate dot product
-        dot_product = vector1[0] * vector2[0] + vector1[1] * vector2[1]
-        
-        # Calculate magnitudes
-        mag1 = math.sqrt(vector1[0]**2 + vector1[1]**2)
-        mag2 = math.sqrt(vector2[0]**2 + vector2[1]**2)
-        
-        # Calculate angle in degrees
-        if mag1 > 0 and mag2 > 0:
-            cos_angle = dot_product / (mag1 * mag2)
-            # Clamp to valid range for acos
-            cos_angle = max(-1, min(1, cos_angle))
-            angle_rad = math.acos(cos_angle)
-            angle_deg = math.degrees(angle_rad)
-        else:
-            angle_deg = 0
-        
-        # Identify sharp turns (angles significantly different from 180 degrees)
-        if angle_deg < 150:
-            turns.append({
-                'location': {
-                    'lat': curr_point['lat'],
-                    'lng': curr_point['lng']
-                },
-                'angle': angle_deg
-            })
+    segments = route.turn_segments(threshold)
+    
+    for k, apex in enumerate(segments['apex'].tolist()):
+        turns.append({
+            'location': route.point(apex),
+            'angle': float(segments['min_angle'][k]),
+            'start_location': route.point(segments['start'][k]),
+            'end_location': route.point(segments['end'][k]),
+            'deflection': round(float(segments['deflection'][k]), 1),
+            'length': round(float(segments['length'][k]), 0),  # meters
+            'radius': round(float(min(segments['min_radius'][k], 1e6)), 0)  # meters
+        })
     
     return turns
 
@@ -337,29 +335,29 @@ def train_blind_spot_model():
     y = np.random.binomial(1, blind_spot_prob)
     
     # Train model
+    from sklearn.ensemble import RandomForestClassifier
     model = RandomForestClassifier(n_estimators=100, random_state=42)
     model.fit(X, y)
     
-    # Save model
-    os.makedirs(os.path.join(MODEL_FOLDER, 'route_safety'), exist_ok=True)
-    model_path = os.path.join(MODEL_FOLDER, 'route_safety', 'blind_spot_model.pkl')
-    
-    with open(model_path, 'wb') as f:
-        pickle.dump(model, f)
+    # Save model and swap it into the registry
+    save_model('blind_spot', model)
     
     return model
 
 def update_route_safety():
     """Update route safety models"""
-    current_app.logger.info("Updating route safety models")
-    
     # In a real-world scenario, you would fetch new data about road safety
     # and update the models. For demonstration, just train a new model.
-    train_blind_spot_model()
+    # Training runs in a separate process and the new artifact is swapped in
+    # by every serving process once it lands.
+    from services.model_training import submit_training
+    return submit_training('blind_spot')
 
 def analyze_route_geometry(route_points):
     """Analyze route geometry for potential risk factors"""
-    if len(route_points) < 3:
+    route = RouteGeometry.from_points(route_points)
+    
+    if len(route) < 3:
         return {
             'sharp_turns': [],
             'dangerous_intersections': []
@@ -368,25 +366,13 @@ def analyze_route_geometry(route_points):
     sharp_turns = []
     dangerous_intersections = []
     
-    # Identify sharp turns
-    for i in range(1, len(route_points) - 1):
-        turn = calculate_turn_angle(
-            route_points[i-1],
-            route_points[i],
-            route_points[i+1]
-        )
-        
-        # Angles less than 135 degrees are considered sharp
-        if turn['angle'] < 135:
-            risk_level = 'High' if turn['angle'] < 90 else 'Medium'
-            sharp_turns.append({
-                'location': turn['location'],
-                'angle': turn['angle'],
-                'risk_level': risk_level
-            })
+    # Identify sharp turns (angles less than 135 degrees are considered sharp)
+    for turn in identify_sharp_turns(route, threshold=135):
+        turn['risk_level'] = 'High' if turn['angle'] < 90 else 'Medium'
+        sharp_turns.append(turn)
     
     # Get road geometry for additional analysis
-    road_geometry = get_road_geometry(route_points)
+    road_geometry = get_road_geometry(route.points())
     
     # Identify dangerous intersections
     for geometry in road_geometry:
@@ -411,40 +397,14 @@ def analyze_route_geometry(route_points):
 
 def calculate_turn_angle(prev_point, curr_point, next_point):
     """Calculate the angle of a turn between three points"""
-    # Calculate vectors
-    vector1 = (
-        curr_point['lat'] - prev_point['lat'],
-        curr_point['lng'] - prev_point['lng']
-    )
-    
-    vector2 = (
-        next_point['lat'] - curr_point['lat'],
-        next_point['lng'] - curr_point['lng']
-    )
-    
-    # Calculate dot product
-    dot_product = vector1[0] * vector2[0] + vector1[1] * vector2[1]
-    
-    # Calculate magnitudes
-    mag1 = math.sqrt(vector1[0]**2 + vector1[1]**2)
-    mag2 = math.sqrt(vector2[0]**2 + vector2[1]**2)
-    
-    # Calculate angle in degrees
-    if mag1 > 0 and mag2 > 0:
-        cos_angle = dot_product / (mag1 * mag2)
-        # Clamp to valid range for acos
-        cos_angle = max(-1, min(1, cos_angle))
-        angle_rad = math.acos(cos_angle)
-        angle_deg = math.degrees(angle_rad)
-    else:
-        angle_deg = 0
+    angle = turn_angles(*to_arrays([prev_point, curr_point, next_point]))[0]
     
     return {
         'location': {
             'lat': curr_point['lat'],
             'lng': curr_point['lng']
         },
-        'angle': angle_deg
+        'angle': float(angle)
     }
 
 def get_road_geometry(points):
@@ -454,87 +414,59 @@ def get_road_geometry(points):
     In a real implementation, this would call Google Maps Roads API
     or another service. For this demo, we generate synthetic data.
     """
-    geometry_data = []
+    route = RouteGeometry.from_points(points)
+    rng = LocationRandom(route.lats, route.lngs, 'route_geometry')
     
-    for i, point in enumerate(points):
-        # Generate synthetic data
-        is_intersection = (i % 10 == 0)  # Roughly every 10th point is an intersection
-        
-        # Road width varies (narrow roads are higher risk)
-        road_width = np.random.normal(8, 2)
-        
-        # Calculate curvature based on neighboring points
-        curvature = 0
-        if i > 0 and i < len(points) - 1:
-            prev_point = points[i-1]
-            next_point = points[i+1]
-            
-            # Calculate vectors
-            vector1 = (
-                point['lat'] - prev_point['lat'],
-                point['lng'] - prev_point['lng']
-            )
-            
-            vector2 = (
-                next_point['lat'] - point['lat'],
-                next_point['lng'] - point['lng']
-            )
-            
-            # Calculate angle
-            dot_product = vector1[0] * vector2[0] + vector1[1] * vector2[1]
-            mag1 = math.sqrt(vector1[0]**2 + vector1[1]**2)
-            mag2 = math.sqrt(vector2[0]**2 + vector2[1]**2)
-            
-            if mag1 > 0 and mag2 > 0:
-                cos_angle = dot_product / (mag1 * mag2)
-                cos_angle = max(-1, min(1, cos_angle))
-                angle_rad = math.acos(cos_angle)
-                angle_deg = math.degrees(angle_rad)
-                
-                # Curvature is inversely related to angle
-                # 180 degrees (straight) -> 0 curvature
-                # 90 degrees (right angle) -> higher curvature
-                curvature = 2 - (angle_deg / 90) if angle_deg <= 180 else 0
-        
-        # Visibility (in km) - lower visibility is higher risk
-        visibility = np.random.normal(10, 3)
-        
-        # Traffic congestion (0-4) - higher congestion is higher risk
-        traffic_congestion = min(4, int(np.random.exponential(1)))
-        
-        # Road type affects risk
-        road_types = ["highway", "primary", "secondary", "residential", "intersection"]
-        road_type = np.random.choice(road_types, p=[0.2, 0.3, 0.3, 0.15, 0.05])
-        
-        # Speed limit (km/h)
-        speed_limits = {
-            "highway": 100,
-            "primary": 80,
-            "secondary": 60,
-            "residential": 30,
-            "intersection": 40
-        }
-        speed_limit = speed_limits[road_type]
-        
-        # Road quality (0-10) - lower quality is higher risk
-        road_quality = np.random.normal(7, 2).clip(0, 10)
-        
-        geometry_data.append({
-            'location': {
-                'lat': point['lat'],
-                'lng': point['lng']
-            },
-            'road_width': road_width,
-            'curvature': curvature,
-            'visibility': visibility,
-            'is_intersection': is_intersection,
-            'traffic_congestion': traffic_congestion,
-            'road_type': road_type,
-            'speed_limit': speed_limit,
-            'road_quality': road_quality
-        })
+    # Roughly every 10th point is an intersection
+    is_intersection = np.arange(len(route)) % 10 == 0
+    
+    # Road width varies (narrow roads are higher risk)
+    road_width = rng.normal(8, 2)
+    
+    # Curvature is inversely related to the turn angle
+    # 180 degrees (straight) -> 0 curvature
+    # 90 degrees (right angle) -> higher curvature
+    curvature = 2 - route.turn_angle / 90
     
-    return geometry_data
+    # Visibility (in km) - lower visibility is higher risk
+    visibility = rng.normal(10, 3)
+    
+    # Traffic congestion (0-4) - higher congestion is higher risk
+    traffic_congestion = np.minimum(4, rng.exponential(1).astype(np.int64))
+    
+    # Road type affects risk
+    road_types = ["highway", "primary", "secondary", "residential", "intersection"]
+    road_type = rng.choice(road_types, p=[0.2, 0.3, 0.3, 0.15, 0.05]).tolist()
+    
+    # Speed limit (km/h)
+    speed_limits = {
+        "highway": 100,
+        "primary": 80,
+        "secondary": 60,
+        "residential": 30,
+        "intersection": 40
+    }
+    
+    # Road quality (0-10) - lower quality is higher risk
+    road_quality = rng.normal(7, 2).clip(0, 10)
+    
+    return [
+        {
+            'location': location,
+            'road_width': width,
+            'curvature': bend,
+            'visibility': sight,
+            'is_intersection': intersection,
+            'traffic_congestion': congestion,
+            'road_type': kind,
+            'speed_limit': speed_limits[kind],
+            'road_quality': quality
+        }
+        for location, width, bend, sight, intersection, congestion, kind, quality in zip(
+            route.points(), road_width.tolist(), curvature.tolist(), visibility.tolist(),
+            is_intersection.tolist(), traffic_congestion.tolist(), road_type, road_quality.tolist()
+        )
+    ]
 
 def analyze_historical_accidents(route_points):
     """
@@ -544,44 +476,59 @@ def analyze_historical_accidents(route_points):
     or APIs. For this demo, we generate synthetic data.
     """
     # Sample points to reduce computation
-    sampled_points = [route_points[i] for i in range(0, len(route_points), max(1, len(route_points) // 20))]
+    sampled_points = RouteGeometry.from_points(route_points).for_stage('historical_accidents').points()
     
     accident_hotspots = []
+    cell_statistics = cell_cached_points('historical_accidents', sampled_points, generate_accident_statistics)
     
-    for point in sampled_points:
-        # Synthetic algorithm to determine if a point is an accident hotspot
-        # Use lat/lng to seed a pseudo-random generator for consistent results
-        seed = int(abs(point['lat'] * 10000) + abs(point['lng'] * 10000))
-        np.random.seed(seed)
-        
-        # 5% chance of being an accident hotspot
-        if np.random.random() < 0.05:
-            # Generate synthetic accident statistics
-            accident_count = np.random.randint(5, 30)
-            injury_rate = np.random.random() * 0.5  # 0-50% injury rate
-            fatality_rate = np.random.random() * 0.1  # 0-10% fatality rate
-            
-            # Determine risk level based on statistics
-            if accident_count > 20 or fatality_rate > 0.05:
-                risk_level = 'High'
-            elif accident_count > 10 or injury_rate > 0.25:
-                risk_level = 'Medium'
-            else:
-                risk_level = 'Low'
-            
+    for point, statistics in zip(sampled_points, cell_statistics):
+        if statistics:
             accident_hotspots.append({
                 'location': {
                     'lat': point['lat'],
                     'lng': point['lng']
                 },
-                'accident_count': accident_count,
-                'injury_rate': round(injury_rate * 100, 1),
-                'fatality_rate': round(fatality_rate * 100, 1),
-                'risk_level': risk_level
+                **statistics
             })
     
     return accident_hotspots
 
+def generate_accident_statistics(lats, lngs):
+    """
+    Synthetic accident statistics for each coordinate
+    
+    Returns a list with a dictionary of statistics for each accident
+    hotspot, and None for the other coordinates.
+    """
+    rng = LocationRandom(lats, lngs, 'historical_accidents')
+    
+    # 5% chance of being an accident hotspot
+    is_hotspot = (rng.random() < 0.05).tolist()
+    
+    # Generate synthetic accident statistics
+    accident_count = rng.integers(5, 30)
+    injury_rate = rng.random() * 0.5  # 0-50% injury rate
+    fatality_rate = rng.random() * 0.1  # 0-10% fatality rate
+    
+    # Determine risk level based on statistics
+    risk_level = np.select(
+        [(accident_count > 20) | (fatality_rate > 0.05), (accident_count > 10) | (injury_rate > 0.25)],
+        ['High', 'Medium'],
+        'Low'
+    ).tolist()
+    
+    return [
+        {
+            'accident_count': count,
+            'injury_rate': round(injury * 100, 1),
+            'fatality_rate': round(fatality * 100, 1),
+            'risk_level': level
+        } if hotspot else None
+        for hotspot, count, injury, fatality, level in zip(
+            is_hotspot, accident_count.tolist(), injury_rate.tolist(), fatality_rate.tolist(), risk_level
+        )
+    ]
+
 def get_speed_limit_recommendation(risk_level):
     """Get recommended speed limit based on risk level"""
     if risk_level == 'High':
@@ -638,6 +585,80 @@ def calculate_route_safety_score(risk_data):
     
     return round(safety_score, 1), risk_level
 
+def overall_risk(risk_data):
+    """
+    Overall risk score (0-10, higher is riskier) and level of a route
+    
+    Args:
+        risk_data: risk_data document (or the risk arrays being written)
+        
+    Returns:
+        Tuple of (score, level)
+    """
+    from config import RISK_THRESHOLDS
+    
+    # Count risks by category and severity
+    risk_counts = {
+        'high': 0,
+        'medium': 0,
+        'low': 0
+    }
+    
+    # Count accident risks
+    for risk in risk_data.get('accident_risks', []):
+        risk_level = risk.get('risk_level', '').lower()
+        if risk_level in risk_counts:
+            risk_counts[risk_level] += 1
+    
+    # Count weather hazards
+    for hazard in risk_data.get('weather_hazards', []):
+        risk_level = hazard.get('risk_level', '').lower()
+        if risk_level in risk_counts:
+            risk_counts[risk_level] += 1
+    
+    # Count elevation risks
+    for risk in risk_data.get('elevation_risks', []):
+        risk_level = risk.get('risk_level', '').lower()
+        if risk_level in risk_counts:
+            risk_counts[risk_level] += 1
+    
+    # Count blind spots
+    for spot in risk_data.get('blind_spots', []):
+        risk_level = spot.get('risk_level', '').lower()
+        if risk_level in risk_counts:
+            risk_counts[risk_level] += 1
+    
+    # Count network coverage issues
+    for issue in risk_data.get('network_coverage', []):
+        risk_level = issue.get('risk_level', '').lower()
+        if risk_level in risk_counts:
+            risk_counts[risk_level] += 1
+    
+    # Calculate weighted risk score
+    total_risks = sum(risk_counts.values())
+    if total_risks == 0:
+        return 0, 'low'
+    
+    # Weight: high=5, medium=2, low=1
+    weighted_score = (
+        5 * risk_counts['high'] + 
+        2 * risk_counts['medium'] + 
+        1 * risk_counts['low']
+    ) / total_risks
+    
+    # Normalize to 0-10 scale
+    normalized_score = min(10, (weighted_score / 5) * 10)
+    
+    # Determine risk level
+    if normalized_score >= RISK_THRESHOLDS['route_safety']['high']:
+        risk_level = 'high'
+    elif normalized_score >= RISK_THRESHOLDS['route_safety']['medium']:
+        risk_level = 'medium'
+    else:
+        risk_level = 'low'
+    
+    return round(normalized_score, 1), risk_level
+
 def get_safety_recommendations(risk_data):
     """Generate safety recommendations based on risk data"""
     if not risk_data:
@@ -722,23 +743,4 @@ def get_safety_recommendations(risk_data):
             'importance': 'Medium'
         })
     
-    return recommendations
-
-def calculate_distance(lat1, lon1, lat2, lon2):
-    """Calculate distance between two points in km using Haversine formula"""
-    R = 6371  # Earth radius in km
-    
-    # Convert to radians
-    lat1_rad = math.radians(lat1)
-    lon1_rad = math.radians(lon1)
-    lat2_rad = math.radians(lat2)
-    lon2_rad = math.radians(lon2)
-    
-    # Haversine formula
-    dlon = lon2_rad - lon1_rad
-    dlat = lat2_rad - lat1_rad
-    a = math.sin(dlat/2)**2 + math.cos(lat1_rad) * math.cos(lat2_rad) * math.sin(dlon/2)**2
-    c = 2 * math.atan2(math.sqrt(a), math.sqrt(1-a))
-    distance = R * c
-    
-    return distance
\ No newline at end of file
+    return recommendations
\ No newline at end of file
@@ -0,0 +1,160 @@
+# backend/services/segment_analysis.py
+import collections
+import hashlib
+import threading
+
+import numpy as np
+from config import SEGMENT_ANALYSIS_CONFIG
+
+_stats = collections.defaultdict(lambda: dict.fromkeys(('runs', 'reused', 'recomputed'), 0))
+_stats_lock = threading.Lock()
+
+def segment_bounds(route, length=None):
+    """
+    Point index boundaries of fixed-length segments along a route
+
+    Segment s covers route points bounds[s] to bounds[s + 1] - 1, the
+    points from s * length to (s + 1) * length km along the route.
+
+    Args:
+        route: RouteGeometry
+        length: Segment length in km (SEGMENT_ANALYSIS_CONFIG by default)
+
+    Returns:
+        Integer array of n_segments + 1 boundaries
+    """
+    length = length or SEGMENT_ANALYSIS_CONFIG['segment_length']
+    n = len(route)
+
+    if n == 0:
+        return np.zeros(1, dtype=np.int64)
+
+    offsets = route.distance - route.distance[0]
+    marks = np.arange(1, int(offsets[-1] // length) + 1) * length
+    return np.concatenate([[0], np.searchsorted(offsets, marks, side='left'), [n]]).astype(np.int64)
+
+def segment_of(indices, bounds):
+    """Segment number of each route point index"""
+    return np.searchsorted(bounds, indices, side='right') - 1
+
+def _update(digest, value):
+    if isinstance(value, np.ndarray):
+        if value.dtype == object:
+            digest.update('\x1f'.join(map(str, value.tolist())).encode('utf-8'))
+        else:
+            digest.update(np.ascontiguousarray(value).tobytes())
+    else:
+        digest.update(repr(value).encode('utf-8'))
+    digest.update(b'\x1e')
+
+def fingerprints(segments, n_segments, columns, *parts):
+    """
+    Input fingerprint of every segment
+
+    Args:
+        segments: Segment number of each input row (rows in route order)
+        n_segments: Number of segments
+        columns: Arrays with one entry per input row (coordinates, model
+            features, ...); each segment hashes its own rows
+        parts: Values shared by all segments (model version, ...)
+
+    Returns:
+        List of hex digests, one per segment
+    """
+    segments = np.asarray(segments, dtype=np.int64)
+    starts = np.searchsorted(segments, np.arange(n_segments + 1), side='left')
+    shared = hashlib.blake2b(digest_size=16)
+    for part in parts:
+        _update(shared, part)
+
+    result = []
+    for s in range(n_segments):
+        digest = shared.copy()
+        for column in columns:
+            _update(digest, np.asarray(column)[starts[s]:starts[s + 1]])
+        result.append(digest.hexdigest())
+
+    return result
+
+def geometry_fingerprint_columns(route, indices=None):
+    """E7 coordinates of route points, the geometry part of a fingerprint"""
+    lats = route.lats if indices is None else route.lats[indices]
+    lngs = route.lngs if indices is None else route.lngs[indices]
+    return [np.rint(lats * 1e7).astype(np.int64), np.rint(lngs * 1e7).astype(np.int64)]
+
+def reanalyze(risk_data, category, segment_fingerprints, compute):
+    """
+    Results of one risk category, recomputing only segments whose inputs
+    changed
+
+    Stored results carry the number of the segment they belong to in
+    'segment', and risk_data['segment_fingerprints'][category] holds the
+    fingerprint each segment was computed from. Segments whose
+    fingerprint matches keep their stored results.
+
+    Args:
+        risk_data: Stored risk_data document (or None)
+        category: risk_data array, e.g. 'weather_hazards'
+        segment_fingerprints: Current fingerprint of every segment
+        compute: Called with an array of segment numbers to recompute;
+            returns their results, each with its 'segment'
+
+    Returns:
+        Tuple of (results in segment order, number of segments recomputed)
+    """
+    stored = (risk_data or {}).get(category) or []
+    stored_fingerprints = ((risk_data or {}).get('segment_fingerprints') or {}).get(category) or []
+
+    reused = {
+        s for s, fingerprint in enumerate(segment_fingerprints)
+        if s < len(stored_fingerprints) and stored_fingerprints[s] == fingerprint
+    }
+    changed = np.array([s for s in range(len(segment_fingerprints)) if s not in reused], dtype=np.int64)
+
+    kept = [result for result in stored if result.get('segment') in reused]
+    fresh = list(compute(changed)) if len(changed) else []
+    results = sorted(kept + fresh, key=lambda result: result['segment'])
+
+    record_segments(category, len(reused), len(changed))
+
+    return results, len(changed)
+
+def route_fingerprint(route, *parts):
+    """
+    Single fingerprint of the whole route, for categories analyzed as one
+    unit (stored as a one-segment list like segment fingerprints)
+    """
+    return fingerprints(np.zeros(len(route), dtype=np.int64), 1, geometry_fingerprint_columns(route), *parts)
+
+def reuse_stored(risk_data, category, segment_fingerprints):
+    """
+    Whether the stored results of a category were computed from these
+    inputs and can be kept as they are (counted in the segment stats)
+    """
+    reuse = not fingerprints_changed(risk_data, category, segment_fingerprints)
+    n = len(segment_fingerprints)
+    record_segments(category, n if reuse else 0, 0 if reuse else n)
+    return reuse
+
+def record_segments(category, reused, recomputed):
+    """Count one analysis run of a category"""
+    with _stats_lock:
+        _stats[category]['runs'] += 1
+        _stats[category]['reused'] += reused
+        _stats[category]['recomputed'] += recomputed
+
+def fingerprints_changed(risk_data, category, segment_fingerprints):
+    """Whether the stored fingerprints of a category differ from these"""
+    stored = ((risk_data or {}).get('segment_fingerprints') or {}).get(category)
+    return stored != list(segment_fingerprints)
+
+def get_segment_stats():
+    """Segments reused and recomputed per risk category in this process"""
+    with _stats_lock:
+        stats = {category: dict(counts) for category, counts in _stats.items()}
+
+    for counts in stats.values():
+        total = counts['reused'] + counts['recomputed']
+        counts['reuse_rate'] = round(counts['reused'] / total, 3) if total else None
+
+    return stats
@@ -0,0 +1,100 @@
+# backend/services/spatial_index.py
+import numpy as np
+from services.geo import EARTH_RADIUS_KM, to_arrays
+from services.lazy_imports import lazy_import
+
+neighbors = lazy_import('sklearn.neighbors')
+
+def to_unit_vectors(lats, lngs):
+    """Project coordinates onto the unit sphere as (n, 3) x/y/z vectors"""
+    lats = np.radians(np.asarray(lats, dtype=np.float64))
+    lngs = np.radians(np.asarray(lngs, dtype=np.float64))
+    cos_lats = np.cos(lats)
+    return np.column_stack([cos_lats * np.cos(lngs), cos_lats * np.sin(lngs), np.sin(lats)])
+
+class SpatialIndex:
+    """
+    Nearest-neighbour index over a set of sample locations
+
+    Samples are projected onto the unit sphere and stored in a
+    scikit-learn KDTree. Straight-line (chord) distance between unit
+    vectors grows monotonically with great-circle distance, so the
+    Euclidean nearest neighbour is the haversine nearest neighbour, and a
+    whole array of query points is answered in one call in O(log n) per
+    point instead of scanning every sample.
+    """
+
+    def __init__(self, lats, lngs, leaf_size=40):
+        coords = to_unit_vectors(lats, lngs)
+        self.size = len(coords)
+        self._tree = neighbors.KDTree(coords, leaf_size=leaf_size) if self.size else None
+
+    @classmethod
+    def from_locations(cls, locations):
+        """Build an index over a list of {'lat', 'lng'} dictionaries"""
+        return cls(*to_arrays(locations))
+
+    def query(self, lats, lngs, k=1):
+        """
+        Find the k closest samples to each query point
+
+        Args:
+            lats, lngs: Query coordinate arrays
+            k: Neighbours per point (capped at the number of samples)
+
+        Returns:
+            Tuple of (index, distance_km) arrays of shape (points, k),
+            nearest first
+        """
+        n = len(np.atleast_1d(lats))
+        k = min(k, self.size)
+
+        if k == 0 or n == 0:
+            return np.empty((n, k), dtype=np.int64), np.empty((n, k))
+
+        chord, index = self._tree.query(to_unit_vectors(lats, lngs), k=k)
+        distance = 2 * np.arcsin(np.minimum(chord / 2, 1.0)) * EARTH_RADIUS_KM
+        return index.astype(np.int64), distance
+
+    def nearest(self, lats, lngs, max_distance=None):
+        """
+        Find the closest sample to each query point
+
+        Args:
+            lats, lngs: Query coordinate arrays
+            max_distance: Optional cut-off in km; points with no sample
+                within it get index -1
+
+        Returns:
+            Tuple of (index, distance_km) arrays with one entry per query point
+        """
+        n = len(np.atleast_1d(lats))
+
+        if self.size == 0:
+            return np.full(n, -1, dtype=np.int64), np.full(n, np.inf)
+
+        index, distance = self.query(lats, lngs, k=1)
+        index, distance = index[:, 0], distance[:, 0]
+
+        if max_distance is not None:
+            index[distance >= max_distance] = -1
+
+        return index, distance
+
+    def within(self, lat, lng, radius):
+        """
+        Find every sample within `radius` km of a point
+
+        Returns:
+            Tuple of (index, distance_km) arrays, nearest first
+        """
+        if self.size == 0 or radius <= 0:
+            return np.empty(0, dtype=np.int64), np.empty(0)
+
+        # Chord length of the great-circle radius on the unit sphere
+        chord = 2 * np.sin(min(radius / EARTH_RADIUS_KM, np.pi) / 2)
+        index, chords = self._tree.query_radius(
+            to_unit_vectors([lat], [lng]), r=chord, return_distance=True, sort_results=True
+        )
+        distance = 2 * np.arcsin(np.minimum(chords[0] / 2, 1.0)) * EARTH_RADIUS_KM
+        return index[0].astype(np.int64), distance
@@ -0,0 +1,352 @@
+# backend/services/tree_inference.py
+import json
+import os
+import numpy as np
+
+# Rows evaluated per block; bounds the (rows x trees) working arrays
+BLOCK_ROWS = 8192
+
+# Arrays written to a forest bundle, one .npy file each (derived traversal
+# tables included, so a memory-mapped forest holds no private copies)
+BUNDLE_ARRAYS = (
+    'feature', 'threshold', 'left', 'right', 'missing', 'value', 'roots',
+    'children', 'is_leaf'
+)
+
+class CompiledForest:
+    """
+    Tree ensemble flattened into packed node arrays
+
+    All trees share one set of node arrays; `roots` holds the index of each
+    tree's root node and leaves point to themselves. Every row is walked down
+    every tree at once, one level per step, with a handful of vectorized
+    gathers instead of per-node Python branching.
+    """
+
+    def __init__(self, feature, threshold, left, right, missing, value, roots,
+                 max_depth, feature_names=None, classes=None, strict=False,
+                 aggregate='mean', base_score=0.0):
+        self.feature = np.ascontiguousarray(feature, dtype=np.int32)
+        self.threshold = np.ascontiguousarray(threshold, dtype=np.float64)
+        self.left = np.ascontiguousarray(left, dtype=np.int32)
+        self.right = np.ascontiguousarray(right, dtype=np.int32)
+        self.missing = np.ascontiguousarray(missing, dtype=np.int32)
+        self.value = np.ascontiguousarray(value, dtype=np.float64)
+        self.roots = np.ascontiguousarray(roots, dtype=np.int32)
+        self.max_depth = int(max_depth)
+        self.feature_names = [str(f) for f in feature_names] if feature_names is not None else None
+        self.classes_ = np.asarray(classes) if classes is not None else None
+        # sklearn splits on `x <= threshold`, XGBoost on `x < threshold`
+        self.strict = bool(strict)
+        # 'mean' for random forests, 'sum' (plus base_score) for boosting
+        self.aggregate = aggregate
+        self.base_score = float(base_score)
+
+        # Derived traversal tables: interleaved (left, right) children and
+        # a leaf mask (leaves point to themselves)
+        self.children = np.stack([self.left, self.right], axis=1).ravel()
+        self.is_leaf = (self.left == np.arange(len(self.left))) & (self.right == self.left)
+
+    def save(self, path):
+        """
+        Write the forest as a bundle directory of .npy files plus meta.json
+
+        The bundle can be loaded with mmap_mode='r', letting every process
+        on a host share the node arrays through the page cache.
+        """
+        os.makedirs(path, exist_ok=True)
+
+        for name in BUNDLE_ARRAYS:
+            np.save(os.path.join(path, f'{name}.npy'), getattr(self, name))
+
+        with open(os.path.join(path, 'meta.json'), 'w') as f:
+            json.dump({
+                'max_depth': self.max_depth,
+                'feature_names': self.feature_names,
+                'classes': self.classes_.tolist() if self.classes_ is not None else None,
+                'strict': self.strict,
+                'aggregate': self.aggregate,
+                'base_score': self.base_score
+            }, f)
+
+    @classmethod
+    def load(cls, path, mmap_mode='r'):
+        """
+        Load a bundle written by save()
+
+        Args:
+            path: Bundle directory
+            mmap_mode: Passed to np.load; 'r' maps the arrays read-only
+                instead of reading them into private memory
+
+        Returns:
+            CompiledForest backed by the bundle's arrays
+        """
+        with open(os.path.join(path, 'meta.json')) as f:
+            meta = json.load(f)
+
+        # Bypass __init__ so the mapped arrays are used as-is
+        forest = cls.__new__(cls)
+        for name in BUNDLE_ARRAYS:
+            setattr(forest, name, np.load(os.path.join(path, f'{name}.npy'), mmap_mode=mmap_mode))
+
+        forest.max_depth = meta['max_depth']
+        forest.feature_names = meta['feature_names']
+        forest.classes_ = np.asarray(meta['classes']) if meta['classes'] is not None else None
+        forest.strict = meta['strict']
+        forest.aggregate = meta['aggregate']
+        forest.base_score = meta['base_score']
+
+        return forest
+
+    @property
+    def n_trees(self):
+        return len(self.roots)
+
+    @property
+    def nbytes(self):
+        return sum(a.nbytes for a in (
+            self.feature, self.threshold, self.left, self.right,
+            self.missing, self.value, self.roots
+        ))
+
+    def predict_proba(self, X):
+        """Class probabilities, matching the source classifier's predict_proba"""
+        if self.classes_ is None:
+            raise AttributeError("predict_proba is only available for classifiers")
+        return self._evaluate(X)
+
+    def predict(self, X):
+        """Predicted class labels or regression outputs"""
+        output = self._evaluate(X)
+
+        if self.classes_ is not None:
+            return self.classes_[np.argmax(output, axis=1)]
+
+        return output[:, 0]
+
+    def _evaluate(self, X):
+        X = self._prepare(X)
+        n_rows = X.shape[0]
+        output = np.empty((n_rows, self.value.shape[1]), dtype=np.float64)
+
+        for start in range(0, n_rows, BLOCK_ROWS):
+            block = X[start:start + BLOCK_ROWS]
+            leaves = self._apply(block)
+            leaf_values = self.value[leaves]  # (rows, trees, outputs)
+
+            if self.aggregate == 'sum':
+                output[start:start + len(block)] = leaf_values.sum(axis=1) + self.base_score
+            else:
+                output[start:start + len(block)] = leaf_values.mean(axis=1)
+
+        return output
+
+    def _apply(self, X):
+        """Leaf node index reached by every row in every tree"""
+        n_rows, n_features = X.shape
+        X_flat = X.ravel()
+
+        # One slot per (row, tree) pair; only pairs not yet at a leaf are
+        # advanced, so shallow leaves stop costing work early
+        nodes = np.tile(self.roots, n_rows)
+        row_offset = np.repeat(np.arange(n_rows, dtype=np.int64) * n_features, self.n_trees)
+        active = np.flatnonzero(~self.is_leaf[nodes])
+
+        while active.size:
+            current = nodes[active]
+            x = X_flat.take(row_offset[active] + self.feature.take(current))
+            threshold = self.threshold.take(current)
+
+            if self.strict:
+                go_right = ~(x < threshold)
+            else:
+                go_right = ~(x <= threshold)
+
+            following = self.children.take(current * 2 + go_right)
+
+            nan_mask = np.isnan(x)
+            if nan_mask.any():
+                following = np.where(nan_mask, self.missing.take(current), following)
+
+            nodes[active] = following
+            active = active[~self.is_leaf.take(following)]
+
+        return nodes.reshape(n_rows, self.n_trees)
+
+    def _prepare(self, X):
+        if hasattr(X, 'columns'):
+            if self.feature_names is not None:
+                X = X[self.feature_names]
+            X = X.to_numpy(dtype=np.float32)
+        else:
+            X = np.asarray(X, dtype=np.float32)
+
+        if X.ndim == 1:
+            X = X.reshape(1, -1)
+
+        # Both libraries compare float32 inputs against the thresholds
+        return X.astype(np.float64)
+
+def compile_model(model):
+    """
+    Export a trained tree ensemble into a CompiledForest
+
+    Supports scikit-learn forests/trees (classifiers and regressors) and
+    XGBoost gbtree models with an identity-link objective.
+
+    Raises:
+        TypeError: If the model type is not supported
+    """
+    if hasattr(model, 'get_booster'):
+        return export_xgboost(model)
+
+    if hasattr(model, 'estimators_') or hasattr(model, 'tree_'):
+        return export_sklearn_forest(model)
+
+    raise TypeError(f"Unsupported model type for compiled inference: {type(model).__name__}")
+
+def export_sklearn_forest(model):
+    """Flatten a scikit-learn forest (or single tree) into packed node arrays"""
+    estimators = model.estimators_ if hasattr(model, 'estimators_') else [model]
+    is_classifier = hasattr(model, 'classes_')
+
+    if is_classifier and np.ndim(model.classes_) != 1:
+        raise TypeError("Multi-output classifiers are not supported")
+
+    features, thresholds, lefts, rights, missings, values, roots = [], [], [], [], [], [], []
+    offset = 0
+    max_depth = 0
+
+    for estimator in estimators:
+        tree = estimator.tree_
+        n_nodes = tree.node_count
+        node_ids = np.arange(n_nodes) + offset
+        is_leaf = tree.children_left == -1
+
+        left = np.where(is_leaf, node_ids, tree.children_left + offset)
+        right = np.where(is_leaf, node_ids, tree.children_right + offset)
+
+        # Trees trained with missing-value support record the NaN direction
+        missing_go_left = getattr(tree, 'missing_go_to_left', None)
+        if missing_go_left is not None:
+            missing = np.where(np.asarray(missing_go_left, dtype=bool), left, right)
+        else:
+            missing = right
+
+        value = tree.value[:, 0, :].astype(np.float64)
+        if is_classifier:
+            # Older releases store weighted class counts, newer ones fractions
+            totals = value.sum(axis=1, keepdims=True)
+            value = np.divide(value, totals, out=np.zeros_like(value), where=totals > 0)
+
+        features.append(np.where(is_leaf, 0, tree.feature))
+        thresholds.append(tree.threshold)
+        lefts.append(left)
+        rights.append(right)
+        missings.append(missing)
+        values.append(value)
+        roots.append(offset)
+
+        offset += n_nodes
+        max_depth = max(max_depth, tree.max_depth)
+
+    return CompiledForest(
+        feature=np.concatenate(features),
+        threshold=np.concatenate(thresholds),
+        left=np.concatenate(lefts),
+        right=np.concatenate(rights),
+        missing=np.concatenate(missings),
+        value=np.concatenate(values),
+        roots=np.array(roots),
+        max_depth=max_depth,
+        feature_names=getattr(model, 'feature_names_in_', None),
+        classes=model.classes_ if is_classifier else None,
+        strict=False,
+        aggregate='mean'
+    )
+
+def export_xgboost(model):
+    """Flatten an XGBoost gbtree regressor into packed node arrays"""
+    booster = model.get_booster() if hasattr(model, 'get_booster') else model
+    config = json.loads(booster.save_raw(raw_format='json'))
+    learner = config['learner']
+
+    objective = learner['objective']['name']
+    if objective not in ('reg:squarederror', 'reg:linear', 'reg:pseudohubererror', 'reg:absoluteerror'):
+        raise TypeError(f"Unsupported XGBoost objective for compiled inference: {objective}")
+
+    gradient_booster = learner['gradient_booster']
+    if gradient_booster.get('name') != 'gbtree':
+        raise TypeError(f"Unsupported XGBoost booster: {gradient_booster.get('name')}")
+
+    trees = gradient_booster['model']['trees']
+    base_score = _parse_xgb_float(learner['learner_model_param']['base_score'])
+
+    features, thresholds, lefts, rights, missings, values, roots = [], [], [], [], [], [], []
+    offset = 0
+    max_depth = 0
+
+    for tree in trees:
+        children_left = np.asarray(tree['left_children'], dtype=np.int64)
+        children_right = np.asarray(tree['right_children'], dtype=np.int64)
+        split_conditions = np.asarray(tree['split_conditions'], dtype=np.float32)
+        default_left = np.asarray(tree['default_left'], dtype=bool)
+
+        n_nodes = len(children_left)
+        node_ids = np.arange(n_nodes) + offset
+        is_leaf = children_left == -1
+
+        left = np.where(is_leaf, node_ids, children_left + offset)
+        right = np.where(is_leaf, node_ids, children_right + offset)
+
+        features.append(np.where(is_leaf, 0, np.asarray(tree['split_indices'], dtype=np.int64)))
+        # Leaves keep their value in split_conditions
+        thresholds.append(split_conditions.astype(np.float64))
+        lefts.append(left)
+        rights.append(right)
+        missings.append(np.where(default_left, left, right))
+        values.append(np.where(is_leaf, split_conditions, 0).astype(np.float64)[:, None])
+        roots.append(offset)
+
+        offset += n_nodes
+        max_depth = max(max_depth, _tree_depth(children_left, children_right))
+
+    return CompiledForest(
+        feature=np.concatenate(features),
+        threshold=np.concatenate(thresholds),
+        left=np.concatenate(lefts),
+        right=np.concatenate(rights),
+        missing=np.concatenate(missings),
+        value=np.concatenate(values),
+        roots=np.array(roots),
+        max_depth=max_depth,
+        feature_names=booster.feature_names,
+        classes=None,
+        strict=True,
+        aggregate='sum',
+        base_score=base_score
+    )
+
+def _parse_xgb_float(value):
+    """Parse an XGBoost config scalar such as 5E-1 or [5E-1]"""
+    if isinstance(value, str):
+        value = value.strip('[]').split(',')[0]
+    return float(value)
+
+def _tree_depth(children_left, children_right):
+    """Depth of a tree given its child index arrays"""
+    depth = 0
+    level = [0]
+
+    while level:
+        next_level = []
+        for node in level:
+            if children_left[node] != -1:
+                next_level.append(children_left[node])
+                next_level.append(children_right[node])
+        if next_level:
+            depth += 1
+        level = next_level
+
+    return depth
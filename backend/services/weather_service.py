@@ -1,109 +1,208 @@
 # backend/services/weather_service.py
-import requests
 import os
-import pickle
 import numpy as np
-import pandas as pd
-from sklearn.linear_model import LogisticRegression
 from flask import current_app
-from config import OPENWEATHER_API_KEY, MODEL_FOLDER
+from config import OPENWEATHER_API_KEY
+from services.lazy_imports import lazy_import
+from services.model_registry import get_model, get_model_version, save_model
+from services.cell_cache import cell_cached
+from services.http_client import http_get
+from services.route_geometry import RouteGeometry, load_route_geometry
+from services.spatial_index import SpatialIndex
 import datetime
-import time
-import math
+
+pd = lazy_import('pandas')
+
+# Numeric fields interpolated between weather samples
+WEATHER_FIELDS = [
+    'temperature', 'feels_like', 'humidity', 'pressure',
+    'wind_speed', 'cloudiness', 'visibility', 'precipitation'
+]
+
+# Text fields taken from the closest sample
+WEATHER_TEXT_FIELDS = ['weather_condition', 'weather_description', 'weather_icon']
+
+# Points closer than this (km) to a sample use its data unchanged
+WEATHER_SNAP_DISTANCE = 5
+
+# Weather hazard model features, in training order
+WEATHER_HAZARD_FEATURES = ['temperature', 'visibility', 'wind_speed', 'precipitation', 'cloudiness', 'humidity']
+
+class WeatherProfile:
+    """
+    Weather along a route as parallel NumPy arrays
+    
+    Holds one entry per route point: `lats`/`lngs`, a float array per
+    field in WEATHER_FIELDS (`profile['visibility']`) and `nearest`, the
+    index of the closest fetched sample, which also supplies the text
+    fields. Points within WEATHER_SNAP_DISTANCE of a sample (`snapped`)
+    carry that sample's values; the rest are inverse-distance weighted
+    between their two closest samples.
+    """
+    
+    def __init__(self, lats, lngs, values, nearest, snapped, samples):
+        self.lats = lats
+        self.lngs = lngs
+        self.values = values
+        self.nearest = nearest
+        self.snapped = snapped
+        self.samples = samples
+        self.timestamp = datetime.datetime.utcnow()
+    
+    def __len__(self):
+        return len(self.lats)
+    
+    def __getitem__(self, field):
+        """Array of a numeric or text field for every route point"""
+        if field in self.values:
+            return self.values[field]
+        
+        return np.array([sample[field] for sample in self.samples], dtype=object)[self.nearest]
+    
+    def record(self, i):
+        """Weather dictionary for route point i"""
+        sample = self.samples[self.nearest[i]]
+        
+        if self.snapped[i]:
+            return sample
+        
+        record = {
+            'location': {
+                'lat': float(self.lats[i]),
+                'lng': float(self.lngs[i])
+            },
+            'timestamp': self.timestamp
+        }
+        
+        for field in WEATHER_FIELDS:
+            record[field] = float(self.values[field][i])
+        
+        for field in WEATHER_TEXT_FIELDS:
+            record[field] = sample[field]
+        
+        return record
+    
+    def to_records(self):
+        """One weather dictionary per route point"""
+        return [self.record(i) for i in range(len(self))]
 
 def get_weather_data(route_points):
     """
     Get weather data for the given route points
     
     Args:
-        route_points: List of dictionaries with lat, lng coordinates
+        route_points: RouteGeometry or list of dictionaries with lat, lng coordinates
         
     Returns:
         List of weather data points
     """
-    if not route_points:
-        return []
+    profile = get_weather_profile(route_points)
+    return profile.to_records() if profile else []
+
+def get_weather_profile(route_points):
+    """
+    Get weather along the given route points
     
-    # Sample points to reduce API calls (take every 20th point)
-    sampled_points = [point for i, point in enumerate(route_points) if i % 20 == 0]
+    Args:
+        route_points: RouteGeometry or list of dictionaries with lat, lng coordinates
+        
+    Returns:
+        WeatherProfile aligned with route_points, or None if no weather
+        could be fetched
+    """
+    route = RouteGeometry.from_points(route_points)
+    
+    if not len(route):
+        return None
+    
+    # Sample points to reduce API calls (about one every 10 km)
+    sampled = route.stage_indices('weather')
     
     # Ensure we have at least 3 points (start, middle, end)
-    if len(sampled_points) < 3 and len(route_points) >= 3:
-        sampled_points = [
-            route_points[0],
-            route_points[len(route_points) // 2],
-            route_points[-1]
-        ]
+    if len(sampled) < 3 and len(route) >= 3:
+        sampled = [0, len(route) // 2, len(route) - 1]
+    
+    sampled_points = route.points(sampled)
     
     # Get weather for each sampled point
     weather_data = []
     
     for point in sampled_points:
         try:
-            # Check if data is in cache
-            cache_key = f"weather_{point['lat']}_{point['lng']}"
-            cached_data = get_from_cache(cache_key)
-            
-            if cached_data:
-                weather_data.append(cached_data)
-                continue
+            # Weather of the point's geohash cell, fetched once per cell
+            weather_point = cell_cached('weather', point['lat'], point['lng'], fetch_weather)
             
-            # If not in cache, fetch from API
-            url = "https://api.openweathermap.org/data/2.5/weather"
-            params = {
-                "lat": point['lat'],
-                "lon": point['lng'],
-                "appid": OPENWEATHER_API_KEY,
-                "units": "metric"  # Use metric units
-            }
-            
-            response = requests.get(url, params=params)
-            
-            if response.status_code == 200:
-                data = response.json()
-                
-                weather_point = {
-                    'location': {
-                        'lat': point['lat'],
-                        'lng': point['lng']
-                    },
-                    'timestamp': datetime.datetime.utcnow(),
-                    'temperature': data['main']['temp'],
-                    'feels_like': data['main']['feels_like'],
-                    'humidity': data['main']['humidity'],
-                    'pressure': data['main']['pressure'],
-                    'wind_speed': data['wind']['speed'],
-                    'wind_direction': data['wind'].get('deg', 0),
-                    'cloudiness': data['clouds']['all'],
-                    'visibility': data.get('visibility', 10000) / 1000,  # Convert to km
-                    'precipitation': 0,
-                    'weather_condition': data['weather'][0]['main'],
-                    'weather_description': data['weather'][0]['description'],
-                    'weather_icon': data['weather'][0]['icon']
+            weather_data.append({
+                **weather_point,
+                'location': {
+                    'lat': point['lat'],
+                    'lng': point['lng']
                 }
-                
-                # Get precipitation if available
-                if 'rain' in data:
-                    weather_point['precipitation'] = data['rain'].get('1h', 0)
-                elif 'snow' in data:
-                    weather_point['precipitation'] = data['snow'].get('1h', 0)
-                
-                # Cache the data
-                save_to_cache(cache_key, weather_point, expiration=1800)  # 30 minutes
-                
-                weather_data.append(weather_point)
-                
-                # Rate limit to avoid API throttling
-                time.sleep(0.1)
+            })
             
         except Exception as e:
             current_app.logger.error(f"Error fetching weather data: {str(e)}")
     
     # Interpolate weather for all points
     if weather_data:
-        return interpolate_weather_for_all_points(route_points, weather_data)
+        return interpolate_weather_profile(route, weather_data)
     
-    return []
+    return None
+
+def fetch_weather(lat, lng):
+    """
+    Fetch current weather for a location from OpenWeather
+    
+    Args:
+        lat: Latitude
+        lng: Longitude
+        
+    Returns:
+        Dictionary with weather information
+    """
+    url = "https://api.openweathermap.org/data/2.5/weather"
+    params = {
+        "lat": lat,
+        "lon": lng,
+        "appid": OPENWEATHER_API_KEY,
+        "units": "metric"  # Use metric units
+    }
+    
+    response = http_get('openweather', url, params=params)
+    
+    # Raise so failed requests are not cached
+    if response.status_code != 200:
+        raise ValueError(f"OpenWeather returned status {response.status_code}")
+    
+    data = response.json()
+    
+    weather_point = {
+        'location': {
+            'lat': lat,
+            'lng': lng
+        },
+        'timestamp': datetime.datetime.utcnow(),
+        'temperature': data['main']['temp'],
+        'feels_like': data['main']['feels_like'],
+        'humidity': data['main']['humidity'],
+        'pressure': data['main']['pressure'],
+        'wind_speed': data['wind']['speed'],
+        'wind_direction': data['wind'].get('deg', 0),
+        'cloudiness': data['clouds']['all'],
+        'visibility': data.get('visibility', 10000) / 1000,  # Convert to km
+        'precipitation': 0,
+        'weather_condition': data['weather'][0]['main'],
+        'weather_description': data['weather'][0]['description'],
+        'weather_icon': data['weather'][0]['icon']
+    }
+    
+    # Get precipitation if available
+    if 'rain' in data:
+        weather_point['precipitation'] = data['rain'].get('1h', 0)
+    elif 'snow' in data:
+        weather_point['precipitation'] = data['snow'].get('1h', 0)
+    
+    return weather_point
 
 def interpolate_weather_for_all_points(route_points, weather_data):
     """
@@ -116,129 +215,95 @@ def interpolate_weather_for_all_points(route_points, weather_data):
     Returns:
         Weather data for all points
     """
-    # If we only have weather for one point, use it for all points
-    if len(weather_data) == 1:
-        return [weather_data[0]] * len(route_points)
-    
-    # Create dictionary to store interpolated weather
-    all_weather = []
-    
-    # Process each point in the route
-    for point in route_points:
-        # Find the closest two weather points
-        distances = []
-        for w_point in weather_data:
-            dist = calculate_distance(
-                point['lat'], point['lng'],
-                w_point['location']['lat'], w_point['location']['lng']
-            )
-            distances.append((dist, w_point))
-        
-        # Sort by distance
-        distances.sort(key=lambda x: x[0])
-        
-        # If point is very close to a weather point, use that data
-        if distances[0][0] < 5:  # Less than 5 km
-            all_weather.append(distances[0][1])
-            continue
-        
-        # Otherwise, interpolate between the two closest points
-        w1 = distances[0][1]
-        w2 = distances[1][1]
-        
-        d1 = distances[0][0]
-        d2 = distances[1][0]
-        
-        # Avoid division by zero
-        if d1 + d2 == 0:
-            all_weather.append(w1)
-            continue
-        
-        # Calculate weights for interpolation
-        w1_weight = 1 - (d1 / (d1 + d2))
-        w2_weight = 1 - (d2 / (d1 + d2))
-        
-        # Interpolate numeric values
-        numeric_fields = [
-            'temperature', 'feels_like', 'humidity', 'pressure',
-            'wind_speed', 'cloudiness', 'visibility', 'precipitation'
-        ]
-        
-        interpolated = {
-            'location': {
-                'lat': point['lat'],
-                'lng': point['lng']
-            },
-            'timestamp': datetime.datetime.utcnow()
-        }
-        
-        for field in numeric_fields:
-            interpolated[field] = (
-                w1[field] * w1_weight + 
-                w2[field] * w2_weight
-            )
-        
-        # Use the condition from the closest point
-        interpolated['weather_condition'] = w1['weather_condition']
-        interpolated['weather_description'] = w1['weather_description']
-        interpolated['weather_icon'] = w1['weather_icon']
+    return interpolate_weather_profile(route_points, weather_data).to_records()
+
+def interpolate_weather_profile(route_points, weather_data):
+    """
+    Interpolate weather for all route points as a WeatherProfile
+    
+    Args:
+        route_points: RouteGeometry or list of all route points
+        weather_data: Weather data for sampled points (at least one)
         
-        all_weather.append(interpolated)
+    Returns:
+        WeatherProfile with one entry per route point
+    """
+    route = RouteGeometry.from_points(route_points)
+    lats, lngs = route.lats, route.lngs
+    
+    # Two closest samples for every point in one query
+    index = SpatialIndex.from_locations([w['location'] for w in weather_data])
+    nearest, distance = index.query(lats, lngs, k=2)
     
-    return all_weather
+    if len(weather_data) == 1:
+        # Only one sample: use it for all points
+        snapped = np.ones(len(lats), dtype=bool)
+        weights = np.ones((len(lats), 1))
+    else:
+        snapped = distance[:, 0] < WEATHER_SNAP_DISTANCE
+        
+        # Each sample is weighted by the other's share of the total
+        # distance, so the closer sample counts for more
+        total = distance.sum(axis=1, keepdims=True)
+        weights = np.divide(distance[:, ::-1], total, out=np.zeros_like(distance), where=total > 0)
+        weights[snapped] = [1, 0]
+    
+    values = {}
+    for field in WEATHER_FIELDS:
+        sample_values = np.array([w[field] for w in weather_data], dtype=np.float64)
+        values[field] = (sample_values[nearest] * weights).sum(axis=1)
+    
+    return WeatherProfile(lats, lngs, values, nearest[:, 0], snapped, weather_data)
 
 def get_weather_hazards(route_points):
     """
     Analyze weather data to identify hazards
     
     Args:
-        route_points: List of dictionaries with lat, lng coordinates
+        route_points: RouteGeometry or list of dictionaries with lat, lng coordinates
         
     Returns:
         List of weather hazard points with risk level
     """
-    # Get weather data
-    weather_data = get_weather_data(route_points)
+    # Get weather along the route
+    profile = get_weather_profile(route_points)
     
-    if not weather_data:
+    if profile is None:
         return []
     
-    # Load hazard prediction model
-    model_path = os.path.join(MODEL_FOLDER, 'weather_hazard', 'model.pkl')
+    return [hazard for _, hazard in predict_weather_hazards(profile)]
+
+def predict_weather_hazards(profile, indices=None):
+    """
+    Weather hazards predicted by the hazard model
     
-    try:
-        with open(model_path, 'rb') as f:
-            model = pickle.load(f)
-    except (FileNotFoundError, EOFError):
-        # If model doesn't exist, train a new one
-        model = train_weather_hazard_model()
-    
-    # Prepare input data for model
-    features = []
-    
-    for weather in weather_data:
-        feature_dict = {
-            'temperature': weather['temperature'],
-            'visibility': weather['visibility'],
-            'wind_speed': weather['wind_speed'],
-            'precipitation': weather['precipitation'],
-            'cloudiness': weather['cloudiness'],
-            'humidity': weather['humidity']
-        }
+    Args:
+        profile: WeatherProfile along the route
+        indices: Optional route point indices to check (all by default)
         
-        features.append((weather, feature_dict))
+    Returns:
+        List of (route point index, weather hazard) pairs
+    """
+    indices = np.arange(len(profile)) if indices is None else np.asarray(indices, dtype=np.int64)
     
-    # Convert to DataFrame
-    feature_df = pd.DataFrame([f[1] for f in features])
+    if not len(indices):
+        return []
     
-    # Make predictions
-    probabilities = model.predict_proba(feature_df)
+    # Get hazard prediction model (trained on first use if missing)
+    model = get_model('weather_hazard', trainer=train_weather_hazard_model)
     
-    # Process results
+    # Feature columns come straight from the profile arrays
+    feature_df = pd.DataFrame({field: profile[field][indices] for field in WEATHER_HAZARD_FEATURES})
+    
+    # Make predictions (coalesced with concurrent route jobs)
+    from services.inference_batcher import predict_proba
+    probabilities = predict_proba('weather_hazard', model, feature_df)[:, 1]  # Probability of hazard
+    
+    # Process results, skipping points where risk is low
     weather_hazards = []
     
-    for i, (weather, _) in enumerate(features):
-        probability = float(probabilities[i][1])  # Probability of hazard
+    for j in np.flatnonzero(probabilities >= 0.3):
+        probability = float(probabilities[j])
         
         # Determine risk level
         if probability >= 0.7:
@@ -248,13 +313,9 @@ def get_weather_hazards(route_points):
         else:
             risk_level = 'Low'
         
-        # Skip if risk is low
-        if probability < 0.3:
-            continue
+        weather = profile.record(indices[j])
         
-        hazard_types = get_weather_hazard_types(weather)
-        
-        weather_hazards.append({
+        weather_hazards.append((int(indices[j]), {
             'location': weather['location'],
             'risk_level': risk_level,
             'probability': round(probability, 3),
@@ -263,11 +324,61 @@ def get_weather_hazards(route_points):
             'visibility': round(weather['visibility'], 1),
             'wind_speed': round(weather['wind_speed'], 1),
             'precipitation': round(weather['precipitation'], 1),
-            'hazard_types': hazard_types
-        })
+            'hazard_types': get_weather_hazard_types(weather)
+        }))
     
     return weather_hazards
 
+def reanalyze_weather_hazards(route, risk_data, profile=None):
+    """
+    Weather hazards per route segment, re-checking with
+    predict_weather_hazards only the segments whose inputs (coordinates,
+    weather of the samples they draw on, model version) changed since the
+    stored results
+    
+    Args:
+        route: RouteGeometry
+        risk_data: Stored risk_data document (or None)
+        profile: WeatherProfile along the route (fetched if not given)
+        
+    Returns:
+        Tuple of (weather hazards, segment fingerprints, number of segments
+        recomputed), or None if no weather could be fetched
+    """
+    from services.segment_analysis import (fingerprints, geometry_fingerprint_columns, reanalyze,
+                                           segment_bounds, segment_of)
+    
+    route = RouteGeometry.from_points(route)
+    if profile is None:
+        profile = get_weather_profile(route)
+    
+    if profile is None:
+        return None
+    
+    get_model('weather_hazard', trainer=train_weather_hazard_model)
+    version = get_model_version('weather_hazard')
+    
+    bounds = segment_bounds(route)
+    segments = segment_of(np.arange(len(route)), bounds)
+    
+    # Snapped points report their sample's location
+    sample_lats = np.array([sample['location']['lat'] for sample in profile.samples])[profile.nearest]
+    sample_lngs = np.array([sample['location']['lng'] for sample in profile.samples])[profile.nearest]
+    
+    segment_fingerprints = fingerprints(
+        segments, len(bounds) - 1,
+        geometry_fingerprint_columns(route) + [profile[field] for field in WEATHER_FIELDS + WEATHER_TEXT_FIELDS]
+        + [profile.snapped, sample_lats, sample_lngs],
+        'predict_weather_hazards', version
+    )
+    
+    def compute(changed):
+        indices = np.flatnonzero(np.isin(segments, changed))
+        return [{**hazard, 'segment': int(segments[i])} for i, hazard in predict_weather_hazards(profile, indices)]
+    
+    weather_hazards, recomputed = reanalyze(risk_data, 'weather_hazards', segment_fingerprints, compute)
+    return weather_hazards, segment_fingerprints, recomputed
+
 def get_weather_hazard_types(weather):
     """Determine specific hazard types based on weather conditions"""
     hazard_types = []
@@ -363,21 +474,22 @@ def train_weather_hazard_model():
     y = np.random.binomial(1, hazard_prob)
     
     # Train model
+    from sklearn.linear_model import LogisticRegression
     model = LogisticRegression(random_state=42)
     model.fit(X, y)
     
-    # Save model
-    os.makedirs(os.path.join(MODEL_FOLDER, 'weather_hazard'), exist_ok=True)
-    model_path = os.path.join(MODEL_FOLDER, 'weather_hazard', 'model.pkl')
-    
-    with open(model_path, 'wb') as f:
-        pickle.dump(model, f)
+    # Save model and swap it into the registry
+    save_model('weather_hazard', model)
     
     return model
 
 def update_weather_data():
     """Background task to update weather data for active routes"""
+    from models import db
+    from models.risk_data import RiskData
     from models.route import Route
+    from services.route_safety import overall_risk
+    from services.segment_analysis import fingerprints_changed
     
     try:
         # Get active routes (created in the last 24 hours)
@@ -385,67 +497,51 @@ def update_weather_data():
         routes = list(db.routes.find({
             'created_at': {'$gte': day_ago},
             'status': 'completed'
-        }))
+        }, {'route_id': 1, 'user_id': 1, 'polyline': 1, 'geometry': 1}))
         
         for route in routes:
             try:
-                # Decode polyline to get route points
-                from services.google_maps import decode_polyline
-                route_points = decode_polyline(route.get('polyline', ''))
+                # Load the stored route geometry, simplified as in
+                # process_route so segment fingerprints match its results
+                route_points = load_route_geometry(route).for_stage('route')
+                
+                if not len(route_points):
+                    continue
+                
+                # Re-check only the segments whose weather changed, with the
+                # same hazard model process_route uses
+                risk_data = RiskData.get_by_route_id(route['route_id'])
+                result = reanalyze_weather_hazards(route_points, risk_data)
                 
-                if not route_points:
+                if result is None:
                     continue
                 
-                # Get updated weather
-                weather_data = get_weather_data(route_points)
+                weather_hazards, segment_fingerprints, recomputed = result
                 
-                # Get updated hazards
-                weather_hazards = []
-                for weather in weather_data:
-                    # Check if hazardous
-                    if (weather['visibility'] < 3 or 
-                        weather['precipitation'] > 2 or 
-                        weather['temperature'] < 0 or 
-                        weather['wind_speed'] > 15):
-                        
-                        # Determine risk level
-                        if (weather['visibility'] < 1 or 
-                            weather['precipitation'] > 5):
-                            risk_level = 'High'
-                        elif (weather['visibility'] < 2 or 
-                             weather['precipitation'] > 3 or 
-                             weather['temperature'] < -5 or 
-                             weather['wind_speed'] > 20):
-                            risk_level = 'Medium'
-                        else:
-                            risk_level = 'Low'
-                        
-                        hazard_types = get_weather_hazard_types(weather)
-                        
-                        weather_hazards.append({
-                            'location': weather['location'],
-                            'risk_level': risk_level,
-                            'weather_condition': weather['weather_condition'],
-                            'temperature': round(weather['temperature'], 1),
-                            'visibility': round(weather['visibility'], 1),
-                            'wind_speed': round(weather['wind_speed'], 1),
-                            'precipitation': round(weather['precipitation'], 1),
-                            'hazard_types': hazard_types
-                        })
+                if not recomputed and not fingerprints_changed(risk_data, 'weather_hazards', segment_fingerprints):
+                    continue
                 
                 # Update risk data
-                if weather_hazards:
-                    from models.risk_data import RiskData
-                    RiskData.update(route['route_id'], {
-                        'weather_hazards': weather_hazards,
-                        'last_updated': datetime.datetime.utcnow()
-                    })
-                    
-                    # Emit real-time update via Socket.IO
-                    from app import socketio
-                    socketio.emit(f'weather_update_{route["route_id"]}', {
-                        'hazards': weather_hazards
-                    })
+                RiskData.update(route['route_id'], {
+                    'weather_hazards': weather_hazards,
+                    'segment_fingerprints.weather_hazards': segment_fingerprints
+                }, user_id=route.get('user_id'))
+                
+                # Patch the overall score with the new hazards
+                risk_score, risk_level = overall_risk({**(risk_data or {}), 'weather_hazards': weather_hazards})
+                RiskData.update_risk_score(route['route_id'], risk_score, risk_level)
+                Route.update_route_details(route['route_id'], {
+                    'risk_score': risk_score,
+                    'risk_level': risk_level
+                })
+                
+                # Emit real-time update via Socket.IO
+                from app import socketio
+                socketio.emit(f'weather_update_{route["route_id"]}', {
+                    'hazards': weather_hazards,
+                    'risk_score': risk_score,
+                    'risk_level': risk_level
+                })
             
             except Exception as e:
                 current_app.logger.error(f"Error updating weather for route {route['route_id']}: {str(e)}")
@@ -455,7 +551,9 @@ def update_weather_data():
 
 def get_current_weather_alerts(user_id):
     """Get current weather alerts for a user's active routes"""
-    from models.route import Route
+    from bson.objectid import ObjectId
+    from models import db
+    from models.risk_point import RiskPoint
     
     # Get active routes (created in the last 24 hours)
     day_ago = datetime.datetime.utcnow() - datetime.timedelta(hours=24)
@@ -463,73 +561,32 @@ def get_current_weather_alerts(user_id):
         'user_id': ObjectId(user_id),
         'created_at': {'$gte': day_ago},
         'status': 'completed'
-    }))
+    }, {'route_id': 1, 'name': 1}))
+    
+    route_names = {
+        route['route_id']: route.get('name', f"Route {route['route_id'][:8]}")
+        for route in routes
+    }
+    
+    # High-risk weather hazards of those routes, in one indexed query
+    hazards = RiskPoint.find(
+        route_names, categories=['weather'], levels=['High'],
+        projection={'_id': 0, 'route_id': 1, 'location': 1, 'details': 1}
+    )
     
     alerts = []
     
-    for route in routes:
-        # Get risk data
-        risk_data = db.risk_data.find_one({'route_id': route['route_id']})
-        
-        if not risk_data:
-            continue
-        
-        # Check for high-risk weather hazards
-        for hazard in risk_data.get('weather_hazards', []):
-            if hazard.get('risk_level') == 'High':
-                alerts.append({
-                    'route_id': route['route_id'],
-                    'route_name': route.get('name', f"Route {route['route_id'][:8]}"),
-                    'alert_type': 'weather',
-                    'risk_level': 'High',
-                    'location': hazard['location'],
-                    'description': f"Severe weather: {hazard['weather_condition']}",
-                    'details': hazard.get('hazard_types', [])
-                })
+    for hazard in hazards:
+        lng, lat = hazard['location']['coordinates']
+        details = hazard.get('details', {})
+        alerts.append({
+            'route_id': hazard['route_id'],
+            'route_name': route_names[hazard['route_id']],
+            'alert_type': 'weather',
+            'risk_level': 'High',
+            'location': {'lat': lat, 'lng': lng},
+            'description': f"Severe weather: {details.get('weather_condition')}",
+            'details': details.get('hazard_types', [])
+        })
     
     return alerts
-
-def calculate_distance(lat1, lon1, lat2, lon2):
-    """Calculate distance between two points in km using Haversine formula"""
-    R = 6371  # Earth radius in km
-    
-    # Convert to radians
-    lat1_rad = math.radians(lat1)
-    lon1_rad = math.radians(lon1)
-    lat2_rad = math.radians(lat2)
-    lon2_rad = math.radians(lon2)
-    
-    # Haversine formula
-    dlon = lon2_rad - lon1_rad
-    dlat = lat2_rad - lat1_rad
-    a = math.sin(dlat/2)**2 + math.cos(lat1_rad) * math.cos(lat2_rad) * math.sin(dlon/2)**2
-    c = 2 * math.atan2(math.sqrt(a), math.sqrt(1-a))
-    distance = R * c
-    
-    return distance
-
-def get_from_cache(key):
-    """Get data from cache"""
-    try:
-        from app import redis_client
-        
-        data = redis_client.get(key)
-        if data:
-            return pickle.loads(data)
-    except:
-        pass
-    
-    return None
-
-def save_to_cache(key, data, expiration=300):
-    """Save data to cache"""
-    try:
-        from app import redis_client
-        
-        redis_client.setex(
-            key,
-            expiration,
-            pickle.dumps(data)
-        )
-    except:
-        pass
\ No newline at end of file
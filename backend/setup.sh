@@ -33,6 +33,10 @@ if [ $? -ne 0 ]; then
     echo "Warning: Could not connect to MongoDB. Please make sure MongoDB is running."
 else
     echo "MongoDB connection successful."
+    
+    # Copy risk points of routes analyzed before the risk_points collection existed
+    echo "Backfilling risk points..."
+    flask --app app init-risk-points
 fi
 
 # Check Redis connection
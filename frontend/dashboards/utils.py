@@ -1,13 +1,43 @@
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import dash_leaflet as dl
 from dash import html
 from flask import session
 import json
 import os
+from http.cookiejar import DefaultCookiePolicy
 
 # Get backend URL from environment variable
 BACKEND_URL = os.getenv('BACKEND_URL', 'http://localhost:5000')
 
+# Seconds to wait for the backend to accept the connection and to answer
+BACKEND_TIMEOUT = (3.05, float(os.getenv('BACKEND_TIMEOUT', 15)))
+
+def make_api_session():
+    """
+    Session for backend calls: keep-alive connections shared by all
+    dashboard callbacks, with GETs retried on connection errors and
+    gateway errors while the backend restarts
+    """
+    retry = Retry(
+        total=2,
+        backoff_factor=0.2,
+        status_forcelist=[502, 503, 504],
+        allowed_methods=['GET'],
+        raise_on_status=False
+    )
+    adapter = HTTPAdapter(pool_connections=4, pool_maxsize=20, max_retries=retry)
+    
+    api_session = requests.Session()
+    # Shared by every user's requests, so never keep response cookies
+    api_session.cookies.set_policy(DefaultCookiePolicy(allowed_domains=[]))
+    api_session.mount('http://', adapter)
+    api_session.mount('https://', adapter)
+    return api_session
+
+api_session = make_api_session()
+
 def get_api_data(endpoint, use_session=False, raw_response=False):
     """
     Utility function to get data from API
@@ -31,7 +61,7 @@ def get_api_data(endpoint, use_session=False, raw_response=False):
         if use_session and 'access_token' in session:
             headers['Authorization'] = f'Bearer {session["access_token"]}'
         
-        response = requests.get(url, headers=headers)
+        response = api_session.get(url, headers=headers, timeout=BACKEND_TIMEOUT)
         
         if raw_response:
             return response